@@ -0,0 +1,173 @@
+"""
+Замер get_bank_statement на эмуляторе банков: пропускная способность, пик памяти и перцентили задержки.
+
+Запуск:
+    python -m benchmarks.bench_statement --provider tbank --operations 100000 --latency-ms 20 --runs 5
+
+Эмулятор (benchmarks.fake_bank) поднимается в фоновом потоке на свободном порту; tool вызывается
+напрямую, как его вызывает FastMCP. Результат печатается одной строкой JSON.
+"""
+# CHANGE: Нагрузочный замер выписки на синтетических данных
+# WHY: Поведение на выписках в 100 тыс. операций и под задержкой банка нужно измерять
+#      воспроизводимо и без сети
+# QUOTE(TЗ): "A benchmark suite should measure get_bank_statement throughput, memory peak and
+#             latency percentiles against it."
+# REF: user-041
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_bank import DEFAULT_ACCOUNT, FakeBankConfig, create_app  # noqa: E402
+
+TOKEN_VARS = {"tbank": "T_BANK_TOKEN", "modulbank": "MODULBANK_TOKEN", "alfa": "ALFA_TOKEN"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeBankServer:
+    """Эмулятор в фоновом потоке со своим event loop."""
+
+    def __init__(self, config: FakeBankConfig) -> None:
+        self.port = _free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(create_app(config), host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "FakeBankServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace, base_url: str) -> Dict[str, object]:
+    # Импорт после настройки окружения: модули tools читают его при вызове, но не раньше
+    from tools.get_bank_statement import get_bank_statement
+    from tools.http_clients import get_http_clients
+
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=args.days - 1)
+    account_id = None if args.provider == "tbank" and not args.account else args.account
+
+    async def call() -> Dict[str, object]:
+        started = time.perf_counter()
+        result = await get_bank_statement.fn(
+            from_date=start.isoformat(),
+            to_date=end.isoformat(),
+            account_id=account_id,
+            bank_provider=args.provider,
+            ctx=None,
+        )
+        return {"seconds": time.perf_counter() - started, "operations": result.meta["total_operations"]}
+
+    async with get_http_clients().session():
+        # Прогрев: соединения пула и кэш генератора эмулятора
+        await call()
+        latencies: List[float] = []
+        operations = 0
+        tracemalloc.start()
+        wall = time.perf_counter()
+        for _ in range(args.runs):
+            results = await asyncio.gather(*(call() for _ in range(args.concurrency)))
+            latencies.extend(item["seconds"] for item in results)
+            operations += sum(int(item["operations"]) for item in results)
+        wall = time.perf_counter() - wall
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "provider": args.provider,
+        "period_days": args.days,
+        "operations_per_call": operations // max(1, len(latencies)),
+        "calls": len(latencies),
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "throughput_ops_per_s": round(operations / wall, 1),
+        "calls_per_s": round(len(latencies) / wall, 2),
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(statistics.fmean(latencies), 3),
+        },
+        "memory_peak_mb": round(peak / 2**20, 1),
+        "fake_bank": base_url,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description="Замер get_bank_statement на эмуляторе банков")
+    parser.add_argument("--provider", choices=sorted(TOKEN_VARS), default="tbank")
+    parser.add_argument("--operations", type=int, default=100_000, help="Операций за период")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--account", default=DEFAULT_ACCOUNT)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1, help="Параллельных вызовов в раунде")
+    parser.add_argument(
+        "--cache", action="store_true", help="Оставить кэш выписок и хранилище операций включёнными"
+    )
+    args = parser.parse_args(argv)
+
+    config = FakeBankConfig(
+        operations_per_day=args.operations / args.days,
+        max_page_size=args.max_page_size,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        accounts=(args.account,),
+    )
+    with FakeBankServer(config) as fake_bank:
+        os.environ.update(
+            {
+                "MODE": "prod",
+                "BANK_API_BASE_URL": fake_bank.url,
+                TOKEN_VARS[args.provider]: "benchmark-token",
+            }
+        )
+        if not args.cache:
+            os.environ.update({"BANK_CACHE": "off", "BANK_STORE": "off"})
+        report = asyncio.run(run(args, fake_bank.url))
+    print(json.dumps(report, ensure_ascii=False))
+    return report
+
+
+if __name__ == "__main__":
+    main()
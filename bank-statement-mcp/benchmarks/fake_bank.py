@@ -0,0 +1,311 @@
+"""
+Локальный эмулятор API выписок T‑Bank, Модульбанка и Альфа-Банка с синтетическими операциями.
+
+Запуск:
+    python -m benchmarks.fake_bank --port 8765 --operations-per-day 300 --latency-ms 50
+
+Сервер направляется на эмулятор переменной BANK_API_BASE_URL=http://127.0.0.1:8765
+(MODE=prod, любые токены). Пути эмулятора — хост и путь настоящего API банка:
+/business-api.tinkoff.ru/api/v1/statement, /api.modulbank.ru/v1/operation-history/{id} и т.д.
+"""
+# CHANGE: Эмулятор API банков для нагрузочных замеров
+# WHY: В test режиме есть только крошечная заглушка mocks.get_bank_statement_mock или песочницы
+#      по сети — ни выписку на 100 тыс. операций, ни задержку банка на них не воспроизвести
+# QUOTE(TЗ): "a local stand-in that emulates the T-Bank, Modulbank and Alfa statement endpoints.
+#             It should generate synthetic but realistic operations at configurable volume,
+#             page size, latency and error rate"
+# REF: user-041
+import argparse
+import asyncio
+import hashlib
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DEFAULT_ACCOUNT = "40702810000000000001"
+
+_PURPOSES_IN = (
+    "Оплата по счёту № {n} за услуги, НДС не облагается",
+    "Оплата по договору поставки № {n}",
+    "Предоплата по счёту {n} за товары",
+    "Оплата за выполненные работы по акту № {n}",
+)
+_PURPOSES_OUT = (
+    "Оплата по счёту № {n} за аренду помещения",
+    "Оплата поставщику по договору № {n}",
+    "Комиссия банка за ведение счёта",
+    "Заработная плата за период, реестр № {n}",
+    "Оплата услуг связи по счёту {n}",
+    "Перечисление налога по требованию № {n}",
+)
+_FORMS = ("ООО", "АО", "ИП")
+_NAMES = ("Вектор", "Ромашка", "Альфа Трейд", "Северный ветер", "Техсервис", "Логистик", "Медиа Плюс")
+
+
+@dataclass(frozen=True)
+class FakeBankConfig:
+    """
+    Параметры эмулятора.
+
+    Attributes:
+        operations_per_day: Среднее число операций по счёту в день
+        max_page_size: Максимум операций на странице T‑Bank и Альфы (Модульбанк отдаёт не больше 50)
+        latency_ms: Средняя задержка ответа
+        latency_jitter_ms: Разброс задержки (нормальное распределение)
+        error_rate: Доля ответов 503
+        accounts: Счета, которые отдаются списком счетов
+        seed: Зерно генератора: одинаковые параметры дают одинаковые операции
+    """
+
+    operations_per_day: float = 100.0
+    max_page_size: int = 1000
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    accounts: Tuple[str, ...] = (DEFAULT_ACCOUNT,)
+    seed: int = 42
+
+
+@dataclass(frozen=True)
+class _Operation:
+    id: str
+    timestamp: str
+    credit: bool
+    amount: float
+    inn: str
+    name: str
+    purpose: str
+
+
+def _rng(*parts: object) -> random.Random:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def _counterparties(seed: int, count: int = 500) -> List[Tuple[str, str]]:
+    rng = _rng(seed, "parties")
+    parties = []
+    for index in range(count):
+        form = rng.choice(_FORMS)
+        inn_length = 12 if form == "ИП" else 10
+        inn = str(rng.randrange(10 ** (inn_length - 1), 10 ** inn_length))
+        parties.append((inn, f"{form} «{rng.choice(_NAMES)} {index}»"))
+    return parties
+
+
+class FakeBank:
+    """Генератор операций: операции дня зависят только от (seed, банк, счёт, день)."""
+
+    def __init__(self, config: FakeBankConfig) -> None:
+        self.config = config
+        self.parties = _counterparties(config.seed)
+        self.range = lru_cache(maxsize=32)(self._range)
+
+    def day(self, provider: str, account: str, day: date) -> List[_Operation]:
+        rng = _rng(self.config.seed, provider, account, day.isoformat())
+        whole = int(self.config.operations_per_day)
+        count = whole + (1 if rng.random() < self.config.operations_per_day - whole else 0)
+        seconds = sorted(rng.randrange(8 * 3600, 21 * 3600) for _ in range(count))
+        operations = []
+        for index, second in enumerate(seconds):
+            credit = rng.random() < 0.4
+            inn, name = self.parties[int(rng.paretovariate(1.2)) % len(self.parties)]
+            template = rng.choice(_PURPOSES_IN if credit else _PURPOSES_OUT)
+            clock = f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            operations.append(
+                _Operation(
+                    id=f"{provider}-{account[-4:]}-{day.strftime('%Y%m%d')}-{index:05d}",
+                    timestamp=f"{day.isoformat()}T{clock}",
+                    credit=credit,
+                    amount=round(min(rng.lognormvariate(9.5, 1.4), 50_000_000.0), 2),
+                    inn=inn,
+                    name=name,
+                    purpose=template.format(n=rng.randrange(1, 10_000)),
+                )
+            )
+        return operations
+
+    def _range(self, provider: str, account: str, start: date, end: date) -> Tuple[_Operation, ...]:
+        operations: List[_Operation] = []
+        current = start
+        while current <= end:
+            operations.extend(self.day(provider, account, current))
+            current += timedelta(days=1)
+        return tuple(operations)
+
+    def count(self, provider: str, account: str, start: date, end: date) -> int:
+        return len(self.range(provider, account, start, end))
+
+
+def _tbank(op: _Operation) -> Dict[str, object]:
+    return {
+        "operationId": op.id,
+        "operationDate": f"{op.timestamp}Z",
+        "typeOfOperation": "Credit" if op.credit else "Debit",
+        "operationAmount": op.amount,
+        "operationCurrencyDigitalCode": "643",
+        "payPurpose": op.purpose,
+        "counterParty": {"inn": op.inn, "name": op.name},
+    }
+
+
+def _modulbank(op: _Operation) -> Dict[str, object]:
+    return {
+        "id": op.id,
+        "executed": op.timestamp,
+        "category": "Credit" if op.credit else "Debet",
+        "status": "Executed",
+        "amount": op.amount,
+        "currency": "RUR",
+        "contragentInn": op.inn,
+        "contragentName": op.name,
+        "paymentPurpose": op.purpose,
+    }
+
+
+def _alfa(op: _Operation) -> Dict[str, object]:
+    party = "payer" if op.credit else "payee"
+    return {
+        "transactionId": op.id,
+        "operationDate": op.timestamp,
+        "direction": "CREDIT" if op.credit else "DEBIT",
+        "amount": {"amount": op.amount, "currencyName": "RUR"},
+        "rurTransfer": {f"{party}Inn": op.inn, f"{party}Name": op.name},
+        "paymentPurpose": op.purpose,
+    }
+
+
+def _period(start: Optional[str], end: Optional[str]) -> Tuple[date, date]:
+    """Даты из параметров банка (YYYY-MM-DD или ISO с временем); без дат — последние 30 дней."""
+    if not start or not end:
+        today = date.today()
+        return today - timedelta(days=29), today
+    return date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+
+
+def _page_size(requested: Optional[str], default: int, cap: int) -> int:
+    try:
+        size = int(requested) if requested else default
+    except ValueError:
+        size = default
+    return max(1, min(size, cap))
+
+
+def create_app(config: FakeBankConfig = FakeBankConfig()) -> Starlette:
+    """ASGI-приложение эмулятора."""
+    bank = FakeBank(config)
+    rng = random.Random(config.seed)
+
+    async def upstream_behaviour() -> Optional[JSONResponse]:
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = rng.gauss(config.latency_ms, config.latency_jitter_ms) / 1000
+            await asyncio.sleep(max(0.0, delay))
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse({"error": "Service Unavailable"}, status_code=503)
+        return None
+
+    async def tbank_statement(request: Request) -> JSONResponse:
+        failure = await upstream_behaviour()
+        if failure is not None:
+            return failure
+        params = request.query_params
+        account = params.get("accountId") or params.get("accountNumber") or DEFAULT_ACCOUNT
+        start, end = _period(params.get("from"), params.get("to"))
+        operations = bank.range("tbank", account, start, end)
+        limit = _page_size(params.get("limit"), 1000, config.max_page_size)
+        offset = int(params.get("cursor") or 0)
+        page = operations[offset : offset + limit]
+        payload: Dict[str, object] = {"operations": [_tbank(op) for op in page]}
+        if offset + limit < len(operations):
+            payload["nextCursor"] = str(offset + limit)
+        return JSONResponse(payload)
+
+    async def tbank_accounts(request: Request) -> JSONResponse:
+        failure = await upstream_behaviour()
+        return failure or JSONResponse([{"accountNumber": account} for account in config.accounts])
+
+    async def modulbank_history(request: Request) -> JSONResponse:
+        failure = await upstream_behaviour()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        start, end = _period(body.get("from"), body.get("till"))
+        operations = bank.range("modulbank", request.path_params["account_id"], start, end)
+        # Модульбанк отдаёт не больше 50 записей; короткая страница — конец выписки
+        records = max(0, min(int(body.get("records") or 50), 50))
+        skip = int(body.get("skip") or 0)
+        return JSONResponse([_modulbank(op) for op in operations[skip : skip + records]])
+
+    async def modulbank_accounts(request: Request) -> JSONResponse:
+        failure = await upstream_behaviour()
+        accounts = [{"id": account, "status": "New"} for account in config.accounts]
+        return failure or JSONResponse([{"companyName": "ООО «Эмулятор»", "bankAccounts": accounts}])
+
+    async def alfa_statement(request: Request) -> JSONResponse:
+        failure = await upstream_behaviour()
+        if failure is not None:
+            return failure
+        params = request.query_params
+        start, end = _period(params.get("from"), params.get("to"))
+        operations = bank.range("alfa", params.get("accountId") or DEFAULT_ACCOUNT, start, end)
+        size = _page_size(params.get("size"), 100, config.max_page_size)
+        number = max(1, int(params.get("page") or 1))
+        page = operations[(number - 1) * size : number * size]
+        total_pages = max(1, -(-len(operations) // size))
+        return JSONResponse(
+            {"transactions": [_alfa(op) for op in page], "pagination": {"totalPages": total_pages}}
+        )
+
+    app = Starlette(
+        routes=[
+            Route("/business-api.tinkoff.ru/api/v1/statement", tbank_statement),
+            Route("/business.tbank.ru/openapi/sandbox/api/v1/statement", tbank_statement),
+            Route("/business-api.tinkoff.ru/api/v4/bank-accounts", tbank_accounts),
+            Route("/business.tbank.ru/openapi/sandbox/api/v4/bank-accounts", tbank_accounts),
+            Route(
+                "/api.modulbank.ru/v1/operation-history/{account_id}",
+                modulbank_history,
+                methods=["POST"],
+            ),
+            Route("/api.modulbank.ru/v1/account-info", modulbank_accounts, methods=["POST"]),
+            Route("/api.alfabank.ru/statement/v2", alfa_statement),
+        ]
+    )
+    app.state.bank = bank
+    return app
+
+
+def parse_config(argv: Optional[List[str]] = None) -> Tuple[FakeBankConfig, argparse.Namespace]:
+    parser = argparse.ArgumentParser(description="Эмулятор API выписок банков")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--operations-per-day", type=float, default=100.0)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    config = FakeBankConfig(
+        operations_per_day=args.operations_per_day,
+        max_page_size=args.max_page_size,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    return config, args
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    fake_config, cli = parse_config()
+    uvicorn.run(create_app(fake_config), host=cli.host, port=cli.port, log_level="warning")
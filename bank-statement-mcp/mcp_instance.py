@@ -2,11 +2,28 @@
 Единый экземпляр FastMCP для bank-statement-mcp.
 Соответствует стандарту Cloud.ru: один экземпляр на весь сервер.
 """
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
 from fastmcp import FastMCP
 
+
+# CHANGE: HTTP-клиенты банков живут в lifespan сервера
+# WHY: Пул соединений и circuit breaker каждого банка общие для всех вызовов tools,
+#      соединения закрываются вместе с сервером
+# QUOTE(TЗ): "one long-lived pooled client per provider, owned by the server lifespan"
+# REF: user-039
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[Dict[str, object]]:
+    # Импорт внутри: tools импортирует mcp из этого модуля
+    from tools.http_clients import get_http_clients
+
+    async with get_http_clients().session() as clients:
+        yield {"http_clients": clients}
+
+
 # CHANGE: Создание единого экземпляра FastMCP
 # WHY: Стандарт Cloud.ru требует единый экземпляр в mcp_instance.py
 # QUOTE(TЗ): "Единый экземпляр FastMCP в mcp_instance.py"
 # REF: ТЗ раздел 3, стандарт Cloud.ru
-mcp = FastMCP("bank-statement-mcp")
-
+mcp = FastMCP("bank-statement-mcp", lifespan=lifespan)
@@ -0,0 +1,96 @@
+"""Prometheus metrics for bank-statement-mcp."""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+
+# CHANGE: Метрики запросов к API банков вместо span на каждый httpx-вызов
+# WHY: Задержку банков нужно видеть постоянно, а трассировка каждого запроса с выводом в stdout
+#      слишком дорога для прода
+# QUOTE(TЗ): "a Prometheus /metrics endpoint with per-provider upstream latency, operation counts
+#             and payload sizes"
+# REF: user-040
+bank_upstream_latency_seconds = Histogram(
+    "bank_upstream_latency_seconds",
+    "Bank API request latency seconds by provider and outcome",
+    labelnames=("provider", "outcome"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+
+bank_upstream_requests_total = Counter(
+    "bank_upstream_requests_total",
+    "Bank API requests by provider and outcome (ok, client_error, server_error, network_error)",
+    labelnames=("provider", "outcome"),
+)
+
+bank_upstream_response_bytes = Histogram(
+    "bank_upstream_response_bytes",
+    "Bank API response body size bytes by provider",
+    labelnames=("provider",),
+    buckets=(1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7),
+)
+
+bank_circuit_open = Gauge(
+    "bank_circuit_open",
+    "1 if the provider circuit breaker is open or half-open, 0 if closed",
+    labelnames=("provider",),
+)
+
+bank_circuit_rejected_total = Counter(
+    "bank_circuit_rejected_total",
+    "Bank API calls rejected without a request because the circuit breaker is open",
+    labelnames=("provider",),
+)
+
+bank_statement_size = Histogram(
+    "bank_statement_size_operations",
+    "Operations per loaded account statement by provider",
+    labelnames=("provider",),
+    buckets=(10, 100, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000),
+)
+
+bank_statement_operations_total = Counter(
+    "bank_statement_operations_total",
+    "Operations loaded from bank statements by provider",
+    labelnames=("provider",),
+)
+
+
+def observe_upstream(provider: str, outcome: str, seconds: float) -> None:
+    try:
+        bank_upstream_latency_seconds.labels(provider=provider, outcome=outcome).observe(seconds)
+        bank_upstream_requests_total.labels(provider=provider, outcome=outcome).inc()
+    except Exception:
+        pass
+
+
+def observe_response_bytes(provider: str, size: int) -> None:
+    try:
+        bank_upstream_response_bytes.labels(provider=provider).observe(size)
+    except Exception:
+        pass
+
+
+def set_circuit_open(provider: str, is_open: bool) -> None:
+    try:
+        bank_circuit_open.labels(provider=provider).set(1 if is_open else 0)
+    except Exception:
+        pass
+
+
+def record_circuit_rejected(provider: str) -> None:
+    try:
+        bank_circuit_rejected_total.labels(provider=provider).inc()
+    except Exception:
+        pass
+
+
+def record_statement(provider: str, operations: int) -> None:
+    try:
+        bank_statement_size.labels(provider=provider).observe(operations)
+        bank_statement_operations_total.labels(provider=provider).inc(operations)
+    except Exception:
+        pass
+
+
+async def metrics_handler() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -11,16 +11,12 @@ import os
 from typing import Dict
 
 from dotenv import load_dotenv, find_dotenv
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
 from starlette.requests import Request
-from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 from mcp_instance import mcp
+from metrics import metrics_handler
+from telemetry import configure_tracing
 
 # CHANGE: Загрузка переменных окружения
 # WHY: Требуется для HOST/PORT и OTEL конфигурации
@@ -37,19 +33,17 @@ OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "bank-statement-mcp")
 # WHY: Стандарт Cloud.ru требует трейсинг
 # QUOTE(TЗ): "OpenTelemetry спаны внутри каждого tool"
 # REF: user-message
-resource = Resource.create({"service.name": OTEL_SERVICE_NAME})
-provider = TracerProvider(resource=resource)
-provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
-if OTEL_ENDPOINT:
-    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_ENDPOINT)))
-trace.set_tracer_provider(provider)
-HTTPXClientInstrumentor().instrument()
+# CHANGE: Выборка трасс, экспортеры и лимиты атрибутов задаются окружением (telemetry.py)
+# WHY: ConsoleSpanExporter и span на каждый вызов httpx были включены всегда
+# REF: user-040
+configure_tracing(OTEL_SERVICE_NAME, OTEL_ENDPOINT)
 
 # CHANGE: Импорт tools для регистрации
 # WHY: FastMCP регистрирует декорированные функции при импорте
 # QUOTE(TЗ): "Каждый tool — отдельный файл в tools/"
 # REF: user-message
 import tools  # noqa: E402,F401
+from tools.http_clients import get_http_clients  # noqa: E402
 
 # CHANGE: Добавление кастомных endpoints через @mcp.custom_route()
 # WHY: FastMCP 2.0 поддерживает кастомные routes через декоратор
@@ -61,6 +55,15 @@ async def health(request: Request) -> PlainTextResponse:
     return PlainTextResponse("ok")
 
 
+# CHANGE: Prometheus метрики запросов к банкам
+# WHY: Задержка, число операций и размер ответов банков видны без трассировки каждого запроса
+# QUOTE(TЗ): "We need to see bank latency without paying for it on every request."
+# REF: user-040
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_route(request: Request) -> Response:
+    return await metrics_handler()
+
+
 @mcp.custom_route("/", methods=["GET"])
 async def info(request: Request) -> JSONResponse:
     """
@@ -83,6 +86,9 @@ async def info(request: Request) -> JSONResponse:
         "mcp_endpoint": "/mcp",
         "description": "MCP server для получения банковских выписок",
         "tools_endpoint": "POST /mcp с method: tools/list",
+        # CHANGE: Состояние circuit breaker банков
+        # REF: user-039
+        "circuit_breakers": get_http_clients().states(),
     }
     return JSONResponse(payload)
 
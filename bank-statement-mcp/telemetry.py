@@ -0,0 +1,61 @@
+"""
+Настройка OpenTelemetry для bank-statement-mcp: выборка трасс, экспортеры и лимиты атрибутов.
+"""
+# CHANGE: Трассировка настраивается переменными окружения, console-экспортер выключен по умолчанию
+# WHY: server.py всегда подключал ConsoleSpanExporter и инструментировал каждый вызов httpx:
+#      в проде каждый span сериализовался в stdout вместе с полными номерами счетов
+# QUOTE(TЗ): "We want configurable head sampling, the console exporter off by default,
+#             attribute size limits"
+# REF: user-040
+import os
+from typing import Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import SpanLimits, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+
+def _enabled(name: str, default: str = "off") -> bool:
+    return os.getenv(name, default).lower() in ("on", "1", "true", "yes")
+
+
+def sample_ratio() -> float:
+    """OTEL_TRACES_SAMPLER_ARG — доля трасс, начинаемых на сервере (0–1, по умолчанию 0.1)."""
+    return min(1.0, max(0.0, float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.1"))))
+
+
+def build_tracer_provider(service_name: str, endpoint: Optional[str] = None) -> TracerProvider:
+    """
+    TracerProvider с head sampling (ParentBased(TraceIdRatioBased)): решение о записи
+    принимается в корневом span, дочерние span и входящие трассы следуют решению родителя.
+    Невыбранные span не записываются и не экспортируются.
+    """
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio())),
+        span_limits=SpanLimits(
+            max_span_attributes=int(os.getenv("OTEL_SPAN_ATTRIBUTE_COUNT_LIMIT", "32")),
+            max_attribute_length=int(os.getenv("OTEL_ATTRIBUTE_VALUE_LENGTH_LIMIT", "128")),
+        ),
+    )
+    if _enabled("OTEL_CONSOLE_EXPORTER"):
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    if endpoint:
+        # Импорт только при заданном OTEL_ENDPOINT: экспортер OTLP тянет protobuf
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    return provider
+
+
+def configure_tracing(service_name: str, endpoint: Optional[str] = None) -> TracerProvider:
+    """Глобальный TracerProvider; span на каждый вызов httpx — только при OTEL_INSTRUMENT_HTTPX=on."""
+    provider = build_tracer_provider(service_name, endpoint)
+    trace.set_tracer_provider(provider)
+    if _enabled("OTEL_INSTRUMENT_HTTPX"):
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+        HTTPXClientInstrumentor().instrument(tracer_provider=provider)
+    return provider
@@ -0,0 +1,22 @@
+"""
+Общие фикстуры тестов bank-statement-mcp.
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_statement_cache(tmp_path, monkeypatch):
+    """Каждый тест получает свой каталог кэша выписок."""
+    # CHANGE: Изоляция кэша выписок между тестами
+    # WHY: Закрытые дни, сохранённые одним тестом, не должны отдаваться из кэша в другом
+    # REF: user-033
+    monkeypatch.setenv("BANK_CACHE_DIR", str(tmp_path / "statement-cache"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_http_clients(monkeypatch):
+    """Каждый тест создаёт свои клиенты банков: httpx.AsyncClient подменяется моком в самом тесте."""
+    # CHANGE: Сброс пула клиентов и circuit breaker между тестами
+    # WHY: Клиент, созданный в одном тесте, держал бы мок этого теста и состояние breaker
+    # REF: user-039
+    monkeypatch.setattr("tools.http_clients._registry", None)
@@ -0,0 +1,134 @@
+"""
+Тесты векторной аналитики денежного потока.
+"""
+import os
+import time
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tools.analytics import analyze_operations
+from tools.analyze_cash_flow import analyze_cash_flow
+
+
+def _op(op_id, day, amount, inn=None, purpose="Оплата", balance=None, currency="RUB"):
+    return {
+        "bank": "tbank",
+        "account_id": "acc",
+        "id": op_id,
+        "date": day,
+        "timestamp": f"{day}T10:00:00Z",
+        "amount": amount,
+        "currency": currency,
+        "counterparty_inn": inn,
+        "counterparty_name": f"ООО {inn}" if inn else None,
+        "purpose": purpose,
+        "balance": balance,
+    }
+
+
+def test_turnover_balances_and_flags():
+    """Обороты, остатки по дням, концентрация и флаги считаются по правилам."""
+    operations = [
+        _op("1", "2025-01-01", 100_000.0, inn="1", balance=150_000.0),
+        _op("2", "2025-01-02", -200_000.0, inn="2"),
+        _op("3", "2025-02-10", 2_500_000.0, inn="1", purpose=None),
+        _op("4", "2025-02-11", 50.0, currency="USD"),
+    ]
+
+    summary = analyze_operations(
+        operations, start=date(2025, 1, 1), end=date(2025, 2, 28), group_by="month", top_n=5
+    )
+
+    assert summary["operations"] == 3
+    assert summary["turnover"] == {"inflow": 2_600_000.0, "outflow": 200_000.0, "net": 2_400_000.0}
+    assert [p["period"] for p in summary["flows"]["periods"]] == ["2025-01-01", "2025-02-01"]
+    assert summary["balances"]["source"] == "bank"
+    assert summary["balances"]["opening"] == 50_000.0
+    assert summary["balances"]["negative_days"][0] == "2025-01-02"
+    assert summary["balances"]["closing"] == 2_450_000.0
+    assert len(summary["balances"]["daily"]) == 59
+    assert summary["counterparties"]["top"][0]["key"] == "1"
+    assert summary["counterparties"]["concentration"]["inflow"]["top1"] == 1.0
+    assert summary["anomalies"]["large_without_purpose"]["operations"][0]["id"] == "3"
+    assert summary["anomalies"]["negative_balance"]["count"] == 39
+
+
+def test_week_grouping_starts_on_monday():
+    """Неделя начинается с понедельника и может начаться до начала периода."""
+    summary = analyze_operations(
+        [_op("1", "2025-01-01", 10.0), _op("2", "2025-01-06", -5.0)],
+        start=date(2025, 1, 1),
+        end=date(2025, 1, 31),
+        group_by="week",
+    )
+    assert [p["period"] for p in summary["flows"]["periods"]] == ["2024-12-30", "2025-01-06"]
+    assert summary["balances"]["source"] == "relative"
+    assert summary["anomalies"]["negative_balance"]["count"] == 0
+
+
+def test_hundred_thousand_operations_under_a_second():
+    """100 тыс. операций анализируются быстрее секунды."""
+    start = date(2025, 1, 1)
+    operations = [
+        _op(
+            str(i),
+            (start + timedelta(days=i % 365)).isoformat(),
+            (i % 997) * (1 if i % 3 else -1) + 0.5,
+            inn=str(7700000000 + i % 500),
+        )
+        for i in range(100_000)
+    ]
+
+    started = time.perf_counter()
+    summary = analyze_operations(operations, start=start, end=date(2025, 12, 31))
+    elapsed = time.perf_counter() - started
+
+    assert summary["operations"] == 100_000
+    assert len(summary["counterparties"]["top"]) == 10
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_analyze_cash_flow_tool_returns_summary_only():
+    """Tool возвращает сводку без списка операций."""
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {
+        "operations": [
+            {
+                "operationId": "t-1",
+                "operationDate": "2025-01-10T10:00:00Z",
+                "typeOfOperation": "Credit",
+                "operationAmount": 1_500_000,
+                "counterParty": {"inn": "7707083893", "name": "ПАО Сбербанк"},
+            },
+            {
+                "operationId": "t-2",
+                "operationDate": "2025-01-12T10:00:00Z",
+                "typeOfOperation": "Debit",
+                "operationAmount": 1000,
+                "payPurpose": "Комиссия",
+            },
+        ]
+    }
+
+    with patch.dict(
+        os.environ, {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "prod", "BANK_CACHE": "off"}
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        result = await analyze_cash_flow.fn(
+            from_date="2025-01-01", to_date="2025-01-31", account_id="40702", ctx=AsyncMock()
+        )
+
+    assert result.meta["total_operations"] == 2
+    assert result.structured_content["turnover"]["net"] == 1_499_000.0
+    assert result.structured_content["anomalies"]["large_without_purpose"]["count"] == 1
+    assert result.structured_content["counterparties"]["top"][0]["name"] == "ПАО Сбербанк"
+    assert "🛑" in result.content[0].text
@@ -0,0 +1,146 @@
+"""
+Тесты сводной выписки и единой схемы операций.
+"""
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+
+from tools.get_consolidated_statement import get_consolidated_statement, parse_accounts
+from tools.normalize import NORMALIZED_FIELDS, normalize_operation
+
+
+def test_normalize_bank_formats():
+    """Операции трёх банков приводятся к одной схеме со знаком суммы по направлению."""
+    tbank = normalize_operation(
+        "tbank",
+        "40702",
+        {
+            "operationId": "t-1",
+            "operationDate": "2025-01-10T09:00:00Z",
+            "typeOfOperation": "Debit",
+            "operationAmount": 1500,
+            "operationCurrencyDigitalCode": "643",
+            "payPurpose": "Оплата по счёту 12",
+            "receiver": {"inn": "7707083893", "name": "ПАО Сбербанк"},
+        },
+    )
+    modulbank = normalize_operation(
+        "modulbank",
+        "mb-acc",
+        {
+            "id": "m-1",
+            "executed": "2025-01-11T10:00:00",
+            "category": "Credit",
+            "amount": 2500.5,
+            "currency": "RUR",
+            "contragentInn": "500100732259",
+            "contragentName": "ИП Иванов",
+            "paymentPurpose": "Оплата услуг",
+        },
+    )
+    alfa = normalize_operation(
+        "alfa",
+        None,
+        {
+            "transactionId": "a-1",
+            "operationDate": "2025-01-12T11:00:00",
+            "direction": "DEBIT",
+            "amount": {"amount": 300, "currencyName": "RUR"},
+            "rurTransfer": {"payeeInn": "7728168971", "payeeName": "АО Альфа"},
+            "paymentPurpose": "Комиссия",
+        },
+    )
+
+    assert set(tbank) == set(NORMALIZED_FIELDS)
+    assert (tbank["amount"], tbank["currency"], tbank["counterparty_inn"]) == (-1500.0, "RUB", "7707083893")
+    assert (modulbank["amount"], modulbank["currency"], modulbank["date"]) == (2500.5, "RUB", "2025-01-11")
+    assert (alfa["id"], alfa["amount"], alfa["counterparty_name"]) == ("a-1", -300.0, "АО Альфа")
+
+
+def test_parse_accounts_requires_bank():
+    """Счёт указывается вместе с банком; повторы отбрасываются."""
+    assert parse_accounts(["tbank:1", "TBANK:1", "alfa"]) == [("tbank", "1"), ("alfa", None)]
+    with pytest.raises(McpError) as exc_info:
+        parse_accounts(["40702810"])
+    assert exc_info.value.error.code == -32602
+
+
+@pytest.mark.asyncio
+async def test_consolidated_statement_merges_banks_and_keeps_partial_results():
+    """Счета разных банков сливаются в одну ленту, ошибка одного счёта не ломает остальные."""
+
+    def get_response(*args, **kwargs):
+        response = MagicMock()
+        if kwargs["params"].get("accountId") == "broken":
+            response.status_code = 401
+            response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                "Unauthorized", request=MagicMock(), response=response
+            )
+            return response
+        response.raise_for_status = MagicMock()
+        response.json.return_value = {
+            "operations": [
+                {
+                    "operationId": "t-1",
+                    "operationDate": "2025-01-20T10:00:00Z",
+                    "typeOfOperation": "Credit",
+                    "operationAmount": 1000,
+                }
+            ]
+        }
+        return response
+
+    def post_response(*args, **kwargs):
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = [
+            {"id": "m-1", "executed": "2025-01-05T10:00:00", "category": "Debet", "amount": 400}
+        ]
+        return response
+
+    with patch.dict(
+        os.environ,
+        {"T_BANK_TOKEN": "t", "MODULBANK_TOKEN": "m", "MODE": "prod", "BANK_CACHE": "off"},
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.side_effect = get_response
+        mock_client_instance.post.side_effect = post_response
+        mock_client.return_value = mock_client_instance
+
+        result = await get_consolidated_statement.fn(
+            from_date="2025-01-01",
+            to_date="2025-01-31",
+            accounts=["tbank:40702", "modulbank:mb-acc", "tbank:broken"],
+            ctx=AsyncMock(),
+        )
+
+    operations = result.structured_content["operations"]
+    assert [op["id"] for op in operations] == ["m-1", "t-1"]
+    assert [op["amount"] for op in operations] == [-400.0, 1000.0]
+    assert result.structured_content["totals"]["RUB"] == {"inflow": 1000.0, "outflow": 400.0}
+    assert result.meta["accounts"] == 2
+    assert result.structured_content["errors"] == [
+        {"bank": "tbank", "account_id": "broken", "error": "Банк вернул ошибку 401"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_consolidated_statement_discovers_accounts_in_test_mode():
+    """Без списка счетов в test режиме счета Альфы берутся из заглушки."""
+    with patch.dict(os.environ, {"ALFA_TOKEN": "a", "MODE": "test"}, clear=False):
+        os.environ.pop("T_BANK_TOKEN", None)
+        with patch("tools.get_consolidated_statement.configured_providers", return_value=["alfa"]):
+            result = await get_consolidated_statement.fn(
+                from_date="2025-01-01", to_date="2025-01-31", ctx=AsyncMock()
+            )
+
+    assert result.meta["accounts"] == 2
+    assert {op["account_id"] for op in result.structured_content["operations"]} == {
+        "alfa-account-001",
+        "alfa-account-002",
+    }
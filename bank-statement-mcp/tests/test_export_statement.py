@@ -0,0 +1,157 @@
+"""
+Тесты ограничения ответа tool и выгрузки полной выписки.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_instance import mcp
+from tools.export_statement import export_csv, export_csv_page, export_ndjson, export_ndjson_page
+from tools.get_bank_statement import get_bank_statement
+from tools.normalize import normalize_operation
+from tools.operation_store import get_operation_store
+from tools.render import select_top
+
+
+def test_select_top_keeps_order_and_sums_rest():
+    """Крупнейшие операции остаются в исходном порядке, остальные суммируются."""
+    operations = [{"id": str(i), "amount": amount} for i, amount in enumerate([5, -50, 1, 30, -2])]
+
+    top = select_top(operations, 2, lambda op: op["amount"])
+
+    assert [op["id"] for op in top.shown] == ["1", "3"]
+    assert (top.rest_count, top.rest_inflow, top.rest_outflow) == (3, 6, 2)
+
+
+def _tbank_operations(count):
+    return [
+        {
+            "operationId": f"t-{i}",
+            "operationDate": f"2025-01-{1 + i % 28:02d}T10:00:00Z",
+            "typeOfOperation": "Credit" if i % 2 else "Debit",
+            "operationAmount": 100 + i,
+            "payPurpose": f"Платёж {i}",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_large_statement_is_capped_and_exported():
+    """В ответе ограниченный список операций, полная выписка доступна ресурсом и HTTP."""
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {"operations": _tbank_operations(120)}
+
+    with patch.dict(
+        os.environ,
+        {
+            "BANK_PROVIDER": "tbank",
+            "T_BANK_TOKEN": "token",
+            "MODE": "prod",
+            "BANK_INLINE_OPERATIONS": "10",
+            "BANK_WINDOW": "none",
+            "BANK_EXPORT_PAGE_ROWS": "50",
+        },
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        result = await get_bank_statement.fn(
+            from_date="2025-01-01", to_date="2025-01-31", account_id="40702", ctx=AsyncMock()
+        )
+
+        assert len(result.structured_content["operations"]) == 10
+        assert result.meta["total_operations"] == 120
+        assert result.meta["operations_truncated"] is True
+        export = result.structured_content["export"]
+        assert export["page_rows"] == 50
+
+        lines = (await export_ndjson.fn(export_id=export["id"])).splitlines()
+        assert len(lines) == 50
+        assert json.loads(lines[0])["id"] == "t-0"
+        pages = [
+            (await export_ndjson_page.fn(export_id=export["id"], page=str(page))).splitlines()
+            for page in (2, 3, 4)
+        ]
+        assert [len(page) for page in pages] == [50, 20, 0]
+        ids = {json.loads(line)["id"] for line in lines + pages[0] + pages[1]}
+        assert len(ids) == 120
+
+        rows = list(
+            csv.DictReader(io.StringIO(await export_csv_page.fn(export_id=export["id"], page="3")))
+        )
+        assert len(rows) == 20
+        first = list(csv.DictReader(io.StringIO(await export_csv.fn(export_id=export["id"]))))
+        assert {row["amount"] for row in first if row["id"] == "t-1"} == {"101.0"}
+
+    with TestClient(mcp.http_app()) as client:
+        streamed = client.get(export["urls"]["ndjson"])
+        missing = client.get("/exports/unknown/csv")
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    assert len(streamed.text.splitlines()) == 120
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_tbank_sandbox_text_shows_top_operations_only():
+    """В human_text песочницы T-Bank только top-N операций и итог по остальным."""
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {"operations": _tbank_operations(30)}
+
+    with patch.dict(
+        os.environ,
+        {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "test", "BANK_RENDER_TOP_N": "5"},
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        result = await get_bank_statement.fn(
+            from_date="2025-01-01", to_date="2025-01-31", account_id="40702", ctx=AsyncMock()
+        )
+
+    text = result.content[0].text
+    assert text.count("Платёж") == 5
+    assert "Платёж 29" in text
+    assert "… ещё 25 операций" in text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_http_exports(tmp_path, monkeypatch):
+    """Две параллельные потоковые выгрузки читаются кусками и не мешают друг другу."""
+    monkeypatch.setenv("BANK_STORE_PATH", str(tmp_path / "ops.sqlite3"))
+    monkeypatch.setattr("tools.operation_store.EXPORT_CHUNK_ROWS", 7)
+    store = get_operation_store()
+    operations = [
+        normalize_operation("tbank", "40702", op) for op in _tbank_operations(120)
+    ]
+    await store.save("scope", "40702", date(2025, 1, 1), date(2025, 1, 31), operations, complete=True)
+    export_id = await store.create_export("scope", "40702", date(2025, 1, 1), date(2025, 1, 31))
+
+    transport = httpx.ASGITransport(app=mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        ndjson, csv_export = await asyncio.gather(
+            client.get(f"/exports/{export_id}/ndjson"), client.get(f"/exports/{export_id}/csv")
+        )
+
+    assert ndjson.status_code == csv_export.status_code == 200
+    ids = [json.loads(line)["id"] for line in ndjson.text.splitlines()]
+    assert len(ids) == len(set(ids)) == 120
+    rows = list(csv.DictReader(io.StringIO(csv_export.text)))
+    assert [row["id"] for row in rows] == ids
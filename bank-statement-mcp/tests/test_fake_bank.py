@@ -0,0 +1,60 @@
+"""
+Тесты выписки против эмулятора банков (benchmarks.fake_bank) через ASGI-транспорт httpx.
+"""
+import os
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from benchmarks.fake_bank import DEFAULT_ACCOUNT, FakeBank, FakeBankConfig, create_app
+from tools.get_bank_statement import get_bank_statement
+from tools.statement_source import api_url
+from tools.windows import operation_id
+
+TOKEN_VARS = {"tbank": "T_BANK_TOKEN", "modulbank": "MODULBANK_TOKEN", "alfa": "ALFA_TOKEN"}
+
+
+def test_api_url_redirects_to_base():
+    """BANK_API_BASE_URL подменяет схему и хост, исходный хост остаётся первым сегментом пути."""
+    url = "https://business.tbank.ru/openapi/api/v1/statement"
+    with patch.dict(os.environ, {"BANK_API_BASE_URL": "http://127.0.0.1:8080/"}):
+        assert api_url(url) == "http://127.0.0.1:8080/business.tbank.ru/openapi/api/v1/statement"
+    os.environ.pop("BANK_API_BASE_URL", None)
+    assert api_url(url) == url
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("provider", ["tbank", "modulbank", "alfa"])
+async def test_statement_against_fake_bank(provider):
+    """Многостраничная выписка эмулятора загружается полностью и без дублей."""
+    config = FakeBankConfig(operations_per_day=700, max_page_size=1000)
+    app = create_app(config)
+    start, end = date(2025, 3, 1), date(2025, 3, 3)
+    expected = FakeBank(config).count(provider, DEFAULT_ACCOUNT, start, end)
+    real_client = httpx.AsyncClient
+
+    def asgi_client(**kwargs):
+        return real_client(transport=httpx.ASGITransport(app=app), **kwargs)
+
+    env = {
+        "MODE": "prod",
+        "BANK_PROVIDER": provider,
+        TOKEN_VARS[provider]: "token",
+        "BANK_API_BASE_URL": "http://fake-bank",
+        "BANK_CACHE": "off",
+        "BANK_STORE": "off",
+    }
+    with patch.dict(os.environ, env), patch("httpx.AsyncClient", side_effect=asgi_client):
+        result = await get_bank_statement.fn(
+            from_date=start.isoformat(),
+            to_date=end.isoformat(),
+            account_id=DEFAULT_ACCOUNT,
+            ctx=AsyncMock(),
+        )
+
+    assert expected > 1000
+    assert result.meta["total_operations"] == expected
+    ids = [operation_id(op) for op in result.structured_content["operations"]]
+    assert len(ids) == len(set(ids))
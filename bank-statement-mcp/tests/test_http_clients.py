@@ -0,0 +1,133 @@
+"""
+Тесты пула HTTP-клиентов банков, circuit breaker и повторов.
+"""
+import os
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+
+from tools.get_bank_statement import get_bank_statement
+from tools.pagination import StatementAccumulator
+from tools.windows import fetch_windows
+from tools.http_clients import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderClient,
+    get_http_clients,
+)
+
+
+def _response(status_code=200, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    if status_code >= 400:
+        response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            str(status_code), request=MagicMock(), response=response
+        )
+    else:
+        response.raise_for_status = MagicMock()
+    response.json.return_value = payload if payload is not None else {"operations": []}
+    return response
+
+
+def test_breaker_opens_and_probes_once():
+    """После N отказов breaker открыт; по истечении паузы пропускается один пробный запрос."""
+    now = [0.0]
+    breaker = CircuitBreaker("alfa", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 10.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    now[0] = 20.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_idempotent_read_retried_and_4xx_not_counted():
+    """5xx повторяется с джиттером, 4xx не повторяется и не открывает breaker."""
+    client = AsyncMock()
+    client.get.side_effect = [_response(503), _response(200)]
+    breaker = CircuitBreaker("tbank", failure_threshold=5)
+    provider_client = ProviderClient("tbank", client, breaker, retries=2, backoff=0)
+
+    assert (await provider_client.get("https://bank")).status_code == 200
+    assert client.get.call_count == 2
+
+    client.post.side_effect = [_response(401)]
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider_client.post("https://bank", idempotent=True)
+    assert client.post.call_count == 1
+    assert breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_window_not_retried_after_client_retries():
+    """Повторы выполняются одним уровнем: окно не повторяет запрос, уже повторённый клиентом."""
+    client = AsyncMock()
+    client.get.return_value = _response(503)
+    provider_client = ProviderClient(
+        "tbank", client, CircuitBreaker("tbank", failure_threshold=100), retries=2, backoff=0
+    )
+
+    async def fetch(window_from, window_to):
+        await provider_client.get("https://bank")
+        return StatementAccumulator()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetch_windows([(date(2025, 1, 1), date(2025, 1, 31))], fetch, retries=2, backoff=0)
+    assert client.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_sick_bank_fails_fast_and_client_is_reused():
+    """Один клиент на банк для всех вызовов; после серии 503 вызовы отклоняются без запроса в банк."""
+    env = {
+        "BANK_PROVIDER": "alfa",
+        "ALFA_TOKEN": "token",
+        "MODE": "prod",
+        "BANK_WINDOW": "none",
+        "BANK_CACHE": "off",
+        "BANK_HTTP_RETRIES": "1",
+        "BANK_WINDOW_RETRIES": "0",
+        "BANK_BREAKER_FAILURES": "2",
+    }
+    with patch.dict(os.environ, env), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.return_value = _response(503)
+        mock_client.return_value = mock_client_instance
+
+        with pytest.raises(McpError) as first:
+            await get_bank_statement.fn(from_date="2025-01-01", to_date="2025-01-31", ctx=AsyncMock())
+        with pytest.raises(McpError) as second:
+            await get_bank_statement.fn(from_date="2025-01-01", to_date="2025-01-31", ctx=AsyncMock())
+
+    assert mock_client.call_count == 1
+    assert mock_client_instance.get.call_count == 2
+    assert "503" in first.value.error.message
+    assert "временно недоступен" in second.value.error.message
+    assert get_http_clients().states() == {"alfa": OPEN}
+
+    async with get_http_clients().session():
+        pass
+    mock_client_instance.aclose.assert_awaited_once()
+    assert get_http_clients().clients == {}
@@ -43,6 +43,10 @@ async def test_tool_registration():
         registry_names.discard("")
 
     assert "get_bank_statement" in registry_names
+    assert "get_consolidated_statement" in registry_names
+    assert "analyze_cash_flow" in registry_names
+    assert "query_operations" in registry_names
+    assert "get_usn_tax_base" in registry_names
 
 
 def test_env_options_structure():
@@ -74,8 +78,13 @@ def test_catalog_yaml_structure():
     assert "tools" in catalog
     assert "rawEnvs" in catalog
     assert "secretEnvs" in catalog
-    assert len(catalog["tools"]) == 1
-    assert catalog["tools"][0]["name"] == "get_bank_statement"
+    assert [tool["name"] for tool in catalog["tools"]] == [
+        "get_bank_statement",
+        "get_consolidated_statement",
+        "analyze_cash_flow",
+        "query_operations",
+        "get_usn_tax_base",
+    ]
 
 
 def test_mcp_tools_json_structure():
@@ -87,7 +96,12 @@ def test_mcp_tools_json_structure():
 
     # Проверка структуры
     assert "tools" in tools_json
-    assert len(tools_json["tools"]) == 1
-    assert tools_json["tools"][0]["name"] == "get_bank_statement"
-    assert "inputSchema" in tools_json["tools"][0]
+    assert [tool["name"] for tool in tools_json["tools"]] == [
+        "get_bank_statement",
+        "get_consolidated_statement",
+        "analyze_cash_flow",
+        "query_operations",
+        "get_usn_tax_base",
+    ]
+    assert all("inputSchema" in tool for tool in tools_json["tools"])
 
@@ -0,0 +1,168 @@
+"""
+Тесты КУДиР и tool get_usn_tax_base.
+"""
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp.shared.exceptions import McpError
+
+from tools.get_usn_tax_base import get_usn_tax_base
+from tools.kudir import build_kudir, compile_patterns
+
+
+def _op(op_id, day, amount, purpose, inn=None, currency="RUB"):
+    return {
+        "bank": "tbank",
+        "account_id": "acc",
+        "id": op_id,
+        "date": day,
+        "timestamp": f"{day}T10:00:00Z",
+        "amount": amount,
+        "currency": currency,
+        "counterparty_inn": inn,
+        "counterparty_name": None,
+        "purpose": purpose,
+        "balance": None,
+    }
+
+
+OPERATIONS = [
+    _op("1", "2025-01-15", 100_000.0, "Оплата по договору 1", inn="7707083893"),
+    _op("2", "2025-02-01", 500_000.0, "Предоставление займа по договору 5"),
+    _op("3", "2025-02-10", -20_000.0, "Аренда офиса за февраль"),
+    _op("4", "2025-04-05", 50_000.0, "Перевод собственных средств"),
+    _op("5", "2025-04-20", -10_000.0, "Возврат предоплаты покупателю"),
+    _op("6", "2025-05-01", -6_000.0, "Авансовый платёж по налогу УСН за 1 кв."),
+    _op("7", "2025-07-01", 200_000.0, "Оплата услуг", inn="500100732259"),
+    _op("8", "2025-10-01", 1_000.0, "Проценты по депозиту"),
+    _op("9", "2025-11-01", 300.0, "Оплата услуг", currency="USD"),
+    _op("10", "2024-12-31", 999.0, "Оплата по договору 0"),
+]
+
+
+def test_kudir_rules_and_cumulative_periods():
+    """Займы, свои переводы и налог исключаются, возврат покупателю уменьшает доходы."""
+    kudir = build_kudir(OPERATIONS, year=2025, tax_rate=15, exclude_inns=["500100732259"])
+
+    assert [q["income"] for q in kudir["quarters"]] == [100_000.0, -10_000.0, 0.0, 1_000.0]
+    assert [q["expenses"] for q in kudir["quarters"]] == [20_000.0, 0.0, 0.0, 0.0]
+    assert {e["rule"]: e["operations"] for e in kudir["exclusions"]} == {
+        "excluded_inn": 1,
+        "own_transfer": 1,
+        "usn_tax": 1,
+        "loan": 1,
+        "refund_to_customer": 1,
+    }
+    declaration = {item["period"]: item for item in kudir["declaration"]}
+    assert declaration["Q2"]["income"] == 90_000.0
+    assert declaration["YEAR"]["generate_usn_declaration_args"] == {
+        "period": "YEAR",
+        "year": 2025,
+        "income": 91_000.0,
+        "expenses": 20_000.0,
+        "tax_rate": 15,
+    }
+    assert declaration["YEAR"]["estimated_tax"] == 10_650.0
+    assert kudir["skipped_foreign_currency"] == 1
+    assert [row["document"] for row in kudir["book"]] == ["1", "3", "5", "8"]
+
+
+def test_supplier_refund_reduces_expenses_for_15_percent():
+    """Возврат от поставщика при УСН 15% уменьшает расходы, при 6% исключается."""
+    operations = [
+        _op("1", "2025-03-01", 100_000.0, "Оплата по договору 1"),
+        _op("2", "2025-03-02", -30_000.0, "Закупка товара"),
+        _op("3", "2025-03-20", 5_000.0, "Возврат излишне уплаченной суммы поставщиком"),
+    ]
+
+    net = build_kudir(operations, year=2025, tax_rate=15)
+    assert (net["income"], net["expenses"]) == (100_000.0, 25_000.0)
+    assert net["exclusions"][0]["rule"] == "refund_received"
+    assert net["exclusions"][0]["category"] == "expense_reduction"
+    assert [row["category"] for row in net["book"]] == ["income", "expense", "expense_reduction"]
+    assert net["book"][-1]["expense"] == -5_000.0
+
+    gross = build_kudir(operations, year=2025, tax_rate=6)
+    assert gross["income"] == 100_000.0
+    assert gross["exclusions"][0]["category"] == "excluded"
+    assert [row["document"] for row in gross["book"]] == ["1", "2"]
+
+
+def test_kudir_custom_rules_and_minimum_tax():
+    """Пользовательские правила заменяют встроенные; для УСН 15% за год действует минимальный налог."""
+    operations = [
+        _op("1", "2025-03-01", 100_000.0, "Агентское вознаграждение"),
+        _op("2", "2025-03-02", -150_000.0, "Закупка товара"),
+        _op("3", "2025-03-03", 40_000.0, "Возврат займа"),
+    ]
+    kudir = build_kudir(operations, year=2025, tax_rate=15, rules=compile_patterns(["агентск"]))
+
+    assert kudir["income"] == 40_000.0
+    assert kudir["exclusions"] == [
+        {
+            "rule": "pattern_1",
+            "category": "excluded",
+            "operations": 1,
+            "inflow": 100_000.0,
+            "outflow": 0.0,
+        }
+    ]
+    year = kudir["declaration"][-1]
+    assert year["estimated_tax"] == 400.0
+
+    with pytest.raises(ValueError):
+        compile_patterns(["("])
+
+
+@pytest.mark.asyncio
+async def test_get_usn_tax_base_tool():
+    """Tool загружает выписку за год и возвращает аргументы декларации с ИНН."""
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {
+        "operations": [
+            {
+                "operationId": "t-1",
+                "operationDate": "2024-03-10T10:00:00Z",
+                "typeOfOperation": "Credit",
+                "operationAmount": 250_000,
+                "payPurpose": "Оплата по счёту 7",
+            },
+            {
+                "operationId": "t-2",
+                "operationDate": "2024-08-10T10:00:00Z",
+                "typeOfOperation": "Credit",
+                "operationAmount": 70_000,
+                "payPurpose": "Перевод между своими счетами",
+            },
+        ]
+    }
+
+    with patch.dict(
+        os.environ, {"T_BANK_TOKEN": "token", "MODE": "prod", "BANK_WINDOW": "none"}
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        result = await get_usn_tax_base.fn(
+            year=2024, inn="7707083893", accounts=["tbank:40702"], ctx=AsyncMock()
+        )
+        with pytest.raises(McpError):
+            await get_usn_tax_base.fn(year=2024, tax_rate=13, accounts=["tbank:40702"])
+
+    year = result.structured_content["declaration"][-1]
+    assert year["generate_usn_declaration_args"] == {
+        "inn": "7707083893",
+        "period": "YEAR",
+        "year": 2024,
+        "income": 250_000.0,
+        "expenses": 0.0,
+        "tax_rate": 6,
+    }
+    assert year["estimated_tax"] == 15_000.0
+    assert result.structured_content["period"] == {"from": "2024-01-01", "to": "2024-12-31"}
+    assert "КУДиР за 2024 год" in result.content[0].text
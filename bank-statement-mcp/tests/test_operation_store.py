@@ -0,0 +1,165 @@
+"""
+Тесты локального хранилища операций и tool query_operations.
+"""
+import os
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tools.operation_store import OperationFilter, OperationStore
+from tools.query_operations import query_operations
+from tools.statement_source import LoadedStatement
+from tools.windows import WindowedStatement, WindowFailure
+
+
+def _op(op_id, day, amount, inn=None, name=None, purpose=None):
+    return {
+        "bank": "tbank",
+        "account_id": "acc",
+        "id": op_id,
+        "date": day,
+        "timestamp": f"{day}T10:00:00Z",
+        "amount": amount,
+        "currency": "RUB",
+        "counterparty_inn": inn,
+        "counterparty_name": name,
+        "purpose": purpose,
+        "balance": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_store_filters_and_aggregates(tmp_path):
+    """Фильтры по ИНН, названию, сумме и назначению; агрегаты по контрагенту."""
+    store = OperationStore(str(tmp_path / "ops.sqlite3"))
+    operations = [
+        _op("1", "2025-01-10", 600_000.0, inn="7707083893", name="ПАО Сбербанк", purpose="Оплата по договору 1"),
+        _op("2", "2025-02-15", -700_000.0, inn="7707083893", name="ПАО Сбербанк", purpose="Возврат займа"),
+        _op("3", "2025-03-01", -1_000.0, inn="500100732259", name="ИП Иванов", purpose="Аренда 50%"),
+    ]
+    await store.save("scope", "acc", date(2025, 1, 1), date(2025, 3, 31), operations, complete=True)
+
+    period = dict(start=date(2025, 1, 1), end=date(2025, 3, 31), account_id="acc")
+    by_inn = await store.query("scope", OperationFilter(**period, counterparty="7707083893"))
+    assert [op["id"] for op in by_inn["operations"]] == ["1", "2"]
+
+    large = await store.query("scope", OperationFilter(**period, min_amount=500_000, direction="out"))
+    assert [op["id"] for op in large["operations"]] == ["2"]
+    assert large["totals"] == [
+        {"currency": "RUB", "operations": 1, "inflow": 0.0, "outflow": 700_000.0, "net": -700_000.0}
+    ]
+
+    # Регистр кириллицы и спецсимволы LIKE не мешают поиску
+    assert (await store.query("scope", OperationFilter(**period, counterparty="сбер")))["matched"] == 2
+    assert (await store.query("scope", OperationFilter(**period, purpose="50%")))["matched"] == 1
+    assert (await store.query("other", OperationFilter(**period)))["matched"] == 0
+
+    grouped = await store.query("scope", OperationFilter(**period), group_by="counterparty", limit=1)
+    assert grouped["truncated"] is True
+    assert grouped["groups"] == [
+        {
+            "key": "7707083893",
+            "currency": "RUB",
+            "operations": 2,
+            "inflow": 600_000.0,
+            "outflow": 700_000.0,
+            "name": "ПАО Сбербанк",
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_store_coverage_only_for_complete_closed_days(tmp_path):
+    """Покрытыми считаются только закрытые дни из полной загрузки; повторная загрузка заменяет день."""
+    store = OperationStore(str(tmp_path / "ops.sqlite3"), closed_lag_days=1)
+    today = date(2025, 3, 10)
+    start = date(2025, 3, 1)
+
+    await store.save("s", None, start, today, [_op("1", "2025-03-02", 10.0)], complete=True, today=today)
+    assert await store.covers("s", None, start, date(2025, 3, 8))
+    assert not await store.covers("s", None, start, today)
+
+    await store.save(
+        "s", None, start, date(2025, 3, 5), [], complete=True, failed_days=[date(2025, 3, 3)], today=today
+    )
+    result = await store.query("s", OperationFilter(start=start, end=today, account_id=""))
+    assert result["matched"] == 0
+
+    await store.save("s", "x", start, today, [_op("2", "2025-03-02", 5.0)], complete=False, today=today)
+    assert not await store.covers("s", "x", start, date(2025, 3, 2))
+
+
+@pytest.mark.asyncio
+async def test_follow_up_query_served_without_bank():
+    """Второй запрос за тот же закрытый период не обращается к банку."""
+    start = date.today() - timedelta(days=60)
+    end = date.today() - timedelta(days=30)
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {
+        "operations": [
+            {
+                "operationId": "t-1",
+                "operationDate": f"{start.isoformat()}T10:00:00Z",
+                "typeOfOperation": "Credit",
+                "operationAmount": 900_000,
+                "counterParty": {"inn": "7707083893", "name": "ПАО Сбербанк"},
+            },
+            {
+                "operationId": "t-2",
+                "operationDate": f"{end.isoformat()}T10:00:00Z",
+                "typeOfOperation": "Debit",
+                "operationAmount": 1000,
+                "payPurpose": "Комиссия банка",
+            },
+        ]
+    }
+
+    with patch.dict(
+        os.environ, {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "prod", "BANK_WINDOW": "none"}
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        first = await query_operations.fn(
+            from_date=start.isoformat(), to_date=end.isoformat(), account_id="40702", ctx=AsyncMock()
+        )
+        second = await query_operations.fn(
+            from_date=start.isoformat(),
+            to_date=end.isoformat(),
+            account_id="40702",
+            purpose="КОМИССИЯ",
+            ctx=AsyncMock(),
+        )
+
+    assert mock_client_instance.get.call_count == 1
+    assert first.meta["source"] == "bank"
+    assert first.meta["failed_windows"] == [] and first.meta["statement_truncated"] is False
+    assert first.structured_content["matched"] == 2
+    assert second.meta["source"] == "store"
+    assert [op["id"] for op in second.structured_content["operations"]] == ["t-2"]
+
+
+@pytest.mark.asyncio
+async def test_incomplete_load_reported_in_meta():
+    """Незагруженные окна и обрезка по BANK_MAX_PAGES видны в meta и тексте."""
+    statement = WindowedStatement(
+        truncated=True, failed=[WindowFailure("2025-01-01", "2025-01-31", "HTTP 502")]
+    )
+    loaded = LoadedStatement(provider="tbank", mode="prod", account_id="40702", statement=statement)
+
+    with patch.dict(
+        os.environ, {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "prod", "BANK_WINDOW": "none"}
+    ), patch("tools.query_operations.load_statement", AsyncMock(return_value=loaded)):
+        result = await query_operations.fn(
+            from_date="2025-01-01", to_date="2025-02-28", account_id="40702", ctx=AsyncMock()
+        )
+
+    assert result.meta["source"] == "bank"
+    assert result.meta["failed_windows"] == [{"from": "2025-01-01", "to": "2025-01-31", "error": "HTTP 502"}]
+    assert result.meta["statement_truncated"] is True
+    assert "не загружены периоды: 2025-01-01–2025-01-31" in result.content[0].text
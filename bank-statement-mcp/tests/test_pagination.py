@@ -0,0 +1,105 @@
+"""
+Тесты постраничной загрузки выписки.
+"""
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tools.get_bank_statement import get_bank_statement
+from tools.pagination import (
+    StatementAccumulator,
+    StatementPage,
+    iter_cursor_pages,
+    iter_numbered_pages,
+    iter_offset_pages,
+)
+
+
+def _ops(start: int, count: int):
+    return [{"id": str(i)} for i in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_offset_pages_bounded_and_ordered():
+    """Страницы skip/records грузятся окном не шире concurrency и склеиваются по порядку."""
+    total = 230
+    state = {"inflight": 0, "peak": 0}
+
+    async def fetch(skip: int, records: int):
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        # Поздние страницы отвечают быстрее ранних
+        await asyncio.sleep(0.01 * (5 - (skip // records) % 5))
+        state["inflight"] -= 1
+        return _ops(skip, max(0, min(records, total - skip)))
+
+    statement = await StatementAccumulator().consume(iter_offset_pages(fetch, 50, 3))
+
+    assert [op["id"] for op in statement.operations] == [str(i) for i in range(total)]
+    assert statement.pages == 5
+    assert state["peak"] <= 3
+
+
+@pytest.mark.asyncio
+async def test_numbered_pages_use_total_pages():
+    """Если банк сообщил totalPages, загружаются ровно эти страницы."""
+    requested = []
+
+    async def fetch(number: int) -> StatementPage:
+        requested.append(number)
+        return StatementPage(operations=_ops(number * 10, 10), has_more=number < 4, total_pages=4)
+
+    statement = await StatementAccumulator().consume(iter_numbered_pages(fetch, 2))
+
+    assert sorted(requested) == [1, 2, 3, 4]
+    assert [op["id"] for op in statement.operations][:3] == ["10", "11", "12"]
+    assert statement.pages == 4
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_and_page_limit():
+    """Курсорная пагинация останавливается на BANK_MAX_PAGES и помечает выписку как обрезанную."""
+
+    async def fetch(cursor):
+        number = int(cursor or 0)
+        return StatementPage(operations=_ops(number, 1), has_more=True, next_cursor=str(number + 1))
+
+    statement = await StatementAccumulator(limit_pages=3).consume(iter_cursor_pages(fetch))
+
+    assert statement.pages == 3
+    assert statement.truncated is True
+
+
+@pytest.mark.asyncio
+async def test_modulbank_fetches_all_pages():
+    """Модульбанк: выписка больше 50 операций выгружается полностью, meta содержит число страниц."""
+    total = 120
+
+    def page_response(*args, **kwargs):
+        payload = kwargs["json"]
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = _ops(payload["skip"], min(payload["records"], total - payload["skip"]))
+        return response
+
+    with patch.dict(
+        os.environ, {"BANK_PROVIDER": "modulbank", "MODULBANK_TOKEN": "token", "MODE": "prod"}
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.post.side_effect = page_response
+        mock_client.return_value = mock_client_instance
+
+        result = await get_bank_statement.fn(
+            from_date="2025-01-01", to_date="2025-01-31", account_id="acc-1", ctx=AsyncMock()
+        )
+
+    assert result.meta["total_operations"] == total
+    assert result.meta["pages_fetched"] == 3
+    assert result.meta["truncated"] is False
+    first_payload = mock_client_instance.post.call_args_list[0].kwargs["json"]
+    assert first_payload["from"] == "2025-01-01T00:00:00"
+    assert first_payload["skip"] == 0
@@ -0,0 +1,143 @@
+"""
+Тесты инкрементального кэша выписок.
+"""
+import os
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tools.get_bank_statement import get_bank_statement
+from tools.pagination import StatementAccumulator
+from tools.statement_cache import StatementCache
+from tools.windows import StatementFold, WindowedStatement, WindowFailure, fetch_windows, split_period
+
+
+def _day_operations(start: date, end: date):
+    operations = []
+    day = start
+    while day <= end:
+        operations.append({"id": day.isoformat(), "operationDate": f"{day.isoformat()}T12:00:00Z"})
+        day += timedelta(days=1)
+    return operations
+
+
+@pytest.mark.asyncio
+async def test_closed_days_served_from_cache(tmp_path):
+    """Повторный запрос догружает из банка только незакрытые дни."""
+    cache = StatementCache(str(tmp_path), closed_lag_days=1)
+    today = date(2025, 3, 10)
+    calls = []
+
+    async def fetch_range(range_start: date, range_end: date, on_window=None) -> WindowedStatement:
+        calls.append((range_start, range_end))
+        return WindowedStatement(operations=_day_operations(range_start, range_end), pages=1, windows=1)
+
+    first = await cache.load("acc", date(2025, 1, 1), today, fetch_range, today=today)
+    assert calls == [(date(2025, 1, 1), today)]
+    assert len(first.operations) == 69
+
+    calls.clear()
+    second = await cache.load("acc", date(2025, 1, 1), today, fetch_range, today=today)
+    assert calls == [(date(2025, 3, 9), today)]
+    assert second.cached_days == 67
+    assert [op["id"] for op in second.operations] == [op["id"] for op in first.operations]
+
+
+@pytest.mark.asyncio
+async def test_failed_window_days_not_cached(tmp_path):
+    """Дни из окна, которое не удалось загрузить, при следующем запросе запрашиваются снова."""
+    cache = StatementCache(str(tmp_path))
+    today = date(2025, 6, 1)
+
+    async def partial(range_start: date, range_end: date, on_window=None) -> WindowedStatement:
+        return WindowedStatement(
+            operations=_day_operations(date(2025, 1, 1), date(2025, 1, 31)),
+            windows=2,
+            failed=[WindowFailure("2025-02-01", "2025-02-28", "ConnectTimeout")],
+        )
+
+    await cache.load("acc", date(2025, 1, 1), date(2025, 2, 28), partial, today=today)
+
+    calls = []
+
+    async def fetch_range(range_start: date, range_end: date, on_window=None) -> WindowedStatement:
+        calls.append((range_start, range_end))
+        return WindowedStatement(operations=_day_operations(range_start, range_end), windows=1)
+
+    statement = await cache.load("acc", date(2025, 1, 1), date(2025, 2, 28), fetch_range, today=today)
+    assert calls == [(date(2025, 2, 1), date(2025, 2, 28))]
+    assert len(statement.operations) == 59
+
+
+@pytest.mark.asyncio
+async def test_windows_streamed_into_fold(tmp_path):
+    """Окна попадают в fold по мере загрузки: в памяти только keep операций, кэш пишется по окнам."""
+    cache = StatementCache(str(tmp_path))
+    today = date(2025, 6, 1)
+
+    async def fetch_window(date_from: str, date_to: str) -> StatementAccumulator:
+        return StatementAccumulator(
+            operations=_day_operations(date.fromisoformat(date_from), date.fromisoformat(date_to)),
+            pages=1,
+        )
+
+    async def fetch_range(range_start: date, range_end: date, on_window=None) -> WindowedStatement:
+        windows = split_period(range_start, range_end, "month")
+        return await fetch_windows(windows, fetch_window, on_window=on_window)
+
+    fold = StatementFold(keep=5)
+    statement = await cache.load(
+        "acc", date(2025, 1, 1), date(2025, 3, 31), fetch_range, today=today, fold=fold
+    )
+    assert statement.operations == []
+    assert statement.windows == 3
+    assert fold.count == 90
+    assert [op["id"] for op in fold.operations] == [f"2025-01-0{day}" for day in range(1, 6)]
+
+    cached = StatementFold(keep=5)
+    again = await cache.load(
+        "acc", date(2025, 1, 1), date(2025, 3, 31), fetch_range, today=today, fold=cached
+    )
+    assert again.cached_days == 90
+    assert cached.count == 90
+    assert cached.operations == fold.operations
+
+
+@pytest.mark.asyncio
+async def test_tool_repeated_call_fetches_delta_only():
+    """Повторный вызов get_bank_statement не перезапрашивает закрытые дни."""
+    today = date.today()
+    start = today - timedelta(days=40)
+
+    def statement_response(*args, **kwargs):
+        params = kwargs["params"]
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = {
+            "operations": _day_operations(
+                date.fromisoformat(params["from"]), date.fromisoformat(params["to"])
+            )
+        }
+        return response
+
+    with patch.dict(
+        os.environ, {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "prod"}
+    ), patch("httpx.AsyncClient") as mock_client:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.__aenter__.return_value = mock_client_instance
+        mock_client_instance.__aexit__.return_value = None
+        mock_client_instance.get.side_effect = statement_response
+        mock_client.return_value = mock_client_instance
+
+        first = await get_bank_statement.fn(
+            from_date=start.isoformat(), to_date=today.isoformat(), account_id="acc-1", ctx=AsyncMock()
+        )
+        second = await get_bank_statement.fn(
+            from_date=start.isoformat(), to_date=today.isoformat(), account_id="acc-1", ctx=AsyncMock()
+        )
+
+    assert first.meta["cache"]["fetched_days"] == 41
+    assert second.meta["cache"]["cached_days"] == 39
+    assert second.meta["cache"]["fetched_days"] == 2
+    assert second.meta["total_operations"] == first.meta["total_operations"] == 41
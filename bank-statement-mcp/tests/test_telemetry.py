@@ -0,0 +1,71 @@
+"""
+Тесты настройки трассировки и метрик запросов к банкам.
+"""
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from telemetry import build_tracer_provider
+from tools.get_bank_statement import get_bank_statement
+
+
+def _processors(provider):
+    return provider._active_span_processor._span_processors
+
+
+def test_tracer_defaults_sample_and_limit_attributes():
+    """По умолчанию нет console-экспортера, длинные атрибуты обрезаются, выборка — доля трасс."""
+    with patch.dict(os.environ, {"OTEL_TRACES_SAMPLER_ARG": "0"}, clear=False):
+        os.environ.pop("OTEL_CONSOLE_EXPORTER", None)
+        provider = build_tracer_provider("bank-statement-mcp")
+        tracer = provider.get_tracer(__name__)
+        with tracer.start_as_current_span("unsampled") as span:
+            assert not span.is_recording()
+
+    assert _processors(provider) == ()
+
+    with patch.dict(os.environ, {"OTEL_TRACES_SAMPLER_ARG": "1", "OTEL_CONSOLE_EXPORTER": "on"}):
+        provider = build_tracer_provider("bank-statement-mcp")
+        with provider.get_tracer(__name__).start_as_current_span("sampled") as span:
+            span.set_attribute("payload", "x" * 1000)
+            assert span.is_recording()
+            assert len(span.attributes["payload"]) == 128
+    assert len(_processors(provider)) == 1
+    provider.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_upstream_metrics_recorded_per_provider():
+    """Каждый запрос к банку учитывается в метриках задержки и числа операций."""
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    before_requests = sample("bank_upstream_requests_total", provider="tbank", outcome="ok")
+    before_operations = sample("bank_statement_operations_total", provider="tbank")
+
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.content = b'{"operations": []}'
+    response.json.return_value = {
+        "operations": [
+            {"operationId": "t-1", "operationDate": "2025-01-10T10:00:00Z", "operationAmount": 10}
+        ]
+    }
+    env = {"BANK_PROVIDER": "tbank", "T_BANK_TOKEN": "token", "MODE": "prod", "BANK_WINDOW": "none"}
+    with patch.dict(os.environ, env), patch("httpx.AsyncClient") as mock_client, patch(
+        "tools.utils.orjson", None
+    ):
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.return_value = response
+        mock_client.return_value = mock_client_instance
+
+        await get_bank_statement.fn(
+            from_date="2025-01-01", to_date="2025-01-31", account_id="40702810", ctx=AsyncMock()
+        )
+
+    assert sample("bank_upstream_requests_total", provider="tbank", outcome="ok") == before_requests + 1
+    assert sample("bank_statement_operations_total", provider="tbank") == before_operations + 1
+    assert sample("bank_upstream_response_bytes_count", provider="tbank") >= 1
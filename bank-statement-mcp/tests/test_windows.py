@@ -0,0 +1,95 @@
+"""
+Тесты загрузки выписки окнами по датам.
+"""
+from datetime import date
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+
+from tools.pagination import StatementAccumulator
+from tools.windows import fetch_windows, parse_period, split_period
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    response = MagicMock()
+    response.status_code = status
+    return httpx.HTTPStatusError("error", request=MagicMock(), response=response)
+
+
+def _statement(*ids: str) -> StatementAccumulator:
+    return StatementAccumulator(operations=[{"id": op_id} for op_id in ids], pages=1)
+
+
+def test_split_period_by_month_and_week():
+    """Окна не пересекаются и покрывают весь период."""
+    months = split_period(date(2024, 1, 15), date(2024, 4, 10), "month")
+    assert months == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 31)),
+        (date(2024, 4, 1), date(2024, 4, 10)),
+    ]
+    weeks = split_period(date(2025, 1, 1), date(2025, 1, 12), "week")
+    assert weeks == [(date(2025, 1, 1), date(2025, 1, 5)), (date(2025, 1, 6), date(2025, 1, 12))]
+    assert split_period(date(2025, 1, 1), date(2025, 12, 31), "none") == [
+        (date(2025, 1, 1), date(2025, 12, 31))
+    ]
+
+
+def test_parse_period_validation():
+    """Неверный формат или порядок дат — ошибка валидации."""
+    with pytest.raises(McpError) as exc_info:
+        parse_period("2025-02-01", "2025-01-01")
+    assert exc_info.value.error.code == -32602
+    with pytest.raises(McpError):
+        parse_period("01.01.2025", "2025-01-31")
+
+
+@pytest.mark.asyncio
+async def test_failed_window_retried_alone_and_boundaries_deduplicated():
+    """Повторяется только упавшее окно, дубликаты на границе окон отбрасываются."""
+    calls = []
+
+    async def fetch(window_from: str, window_to: str) -> StatementAccumulator:
+        calls.append(window_from)
+        if window_from == "2025-02-01" and calls.count(window_from) == 1:
+            raise _status_error(503)
+        if window_from == "2025-01-01":
+            return _statement("a", "b")
+        if window_from == "2025-02-01":
+            return _statement("b", "c")
+        return _statement("d")
+
+    windows = split_period(date(2025, 1, 1), date(2025, 3, 31), "month")
+    statement = await fetch_windows(windows, fetch, concurrency=2, retries=2, backoff=0)
+
+    assert [op["id"] for op in statement.operations] == ["a", "b", "c", "d"]
+    assert statement.duplicates == 1
+    assert calls.count("2025-01-01") == 1
+    assert calls.count("2025-02-01") == 2
+    assert statement.failed == []
+
+
+@pytest.mark.asyncio
+async def test_partial_failure_and_non_retryable_error():
+    """Окно, упавшее после повторов, попадает в failed; 401 пробрасывается сразу."""
+
+    async def flaky(window_from: str, window_to: str) -> StatementAccumulator:
+        if window_from == "2025-02-01":
+            raise httpx.ConnectTimeout("timeout")
+        return _statement(window_from)
+
+    windows = split_period(date(2025, 1, 1), date(2025, 3, 31), "month")
+    statement = await fetch_windows(windows, flaky, retries=1, backoff=0)
+    assert len(statement.operations) == 2
+    assert statement.failed_windows() == [
+        {"from": "2025-02-01", "to": "2025-02-28", "error": "ConnectTimeout"}
+    ]
+
+    async def unauthorized(window_from: str, window_to: str) -> StatementAccumulator:
+        raise _status_error(401)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetch_windows(windows, unauthorized, retries=3, backoff=0)
@@ -6,6 +6,17 @@ Tools для bank-statement-mcp.
 # WHY: FastMCP автоматически регистрирует декорированные функции при импорте
 # REF: Стандарт Cloud.ru
 from .get_bank_statement import get_bank_statement  # noqa: F401
+from .get_consolidated_statement import get_consolidated_statement  # noqa: F401
+from .analyze_cash_flow import analyze_cash_flow  # noqa: F401
+from .query_operations import query_operations  # noqa: F401
+from .get_usn_tax_base import get_usn_tax_base  # noqa: F401
+from . import export_statement  # noqa: F401  ресурсы и HTTP выгрузки выписки
 
-__all__ = ["get_bank_statement"]
+__all__ = [
+    "get_bank_statement",
+    "get_consolidated_statement",
+    "analyze_cash_flow",
+    "query_operations",
+    "get_usn_tax_base",
+]
 
@@ -0,0 +1,179 @@
+"""
+Анализ денежного потока по расчётному счёту: обороты, остатки, контрагенты, аномалии.
+"""
+# CHANGE: Tool аналитики выписки поверх векторного движка tools.analytics
+# WHY: Агент получал сырую выписку и сам считал обороты и риски; теперь MCP отдаёт готовую сводку
+# QUOTE(TЗ): "return only the compact results"
+# REF: user-035
+from typing import Optional
+
+from fastmcp import Context
+from mcp.shared.exceptions import McpError
+from mcp.types import TextContent
+from opentelemetry import trace
+from pydantic import Field
+
+from mcp_instance import mcp
+from .analytics import GROUP_BY, LARGE_AMOUNT, analyze_operations
+from .normalize import normalize_operation
+from .statement_source import (
+    bank_error,
+    current_mode,
+    load_statement,
+    normalize_account_id,
+    require_account,
+    resolve_provider,
+    resolve_token,
+)
+from .utils import NoopContext, ToolResult, format_error
+from .windows import parse_period
+
+tracer = trace.get_tracer(__name__)
+
+
+@mcp.tool(
+    name="analyze_cash_flow",
+    description="""Анализ денежного потока по расчётному счёту за период.
+Возвращает обороты (поступления/списания/сальдо) по дням, неделям, месяцам или кварталам, остатки на
+конец каждого дня, крупнейших контрагентов и долю концентрации, а также флаги рисков: операции
+больше 1 млн без назначения платежа, выбросы по сумме и дни с отрицательным остатком.""",
+)
+async def analyze_cash_flow(
+    from_date: str = Field(..., description="Дата начала в формате YYYY-MM-DD"),
+    to_date: str = Field(..., description="Дата конца в формате YYYY-MM-DD"),
+    account_id: Optional[str] = Field(None, description="ID счёта (опционально, если несколько)"),
+    bank_provider: Optional[str] = Field(
+        default=None,
+        description="Банк для запроса: tbank | modulbank | alfa. Если не указано — используется BANK_PROVIDER из окружения.",
+    ),
+    group_by: str = Field("month", description="Период оборотов: day | week | month | quarter"),
+    currency: str = Field("RUB", description="Валюта операций для анализа (буквенный код)"),
+    top_n: int = Field(10, description="Сколько крупнейших контрагентов и подозрительных операций вернуть"),
+    large_amount: float = Field(
+        LARGE_AMOUNT, description="Порог крупной операции без назначения платежа"
+    ),
+    ctx: Optional[Context] = None,
+) -> ToolResult:
+    """
+    Возвращает сводку денежного потока в structured_content; сами операции не возвращаются.
+
+    Args:
+        from_date: Дата начала периода в формате YYYY-MM-DD
+        to_date: Дата конца периода в формате YYYY-MM-DD
+        account_id: Опциональный ID счёта
+        bank_provider: Банк, если не задан BANK_PROVIDER
+        group_by: Период группировки оборотов
+        currency: Валюта анализа
+        top_n: Размер рейтингов
+        large_amount: Порог крупной операции
+        ctx: Context для логирования и прогресса
+
+    Returns:
+        ToolResult с content, structured_content (turnover, flows, balances, counterparties, anomalies) и meta
+
+    Raises:
+        McpError: При ошибках валидации (-32602) или API (-32603)
+    """
+    # При прямом вызове .fn параметры по умолчанию приходят как FieldInfo
+    group_by = group_by if isinstance(group_by, str) else "month"
+    currency = currency.upper() if isinstance(currency, str) else "RUB"
+    top_n = top_n if isinstance(top_n, int) else 10
+    large_amount = float(large_amount) if isinstance(large_amount, (int, float)) else LARGE_AMOUNT
+    if group_by not in GROUP_BY:
+        raise format_error("group_by должен быть day | week | month | quarter", code=-32602)
+    if not 1 <= top_n <= 100:
+        raise format_error("top_n должен быть от 1 до 100", code=-32602)
+
+    provider = resolve_provider(bank_provider)
+    mode = current_mode()
+    token = resolve_token(provider, mode)
+
+    safe_ctx = ctx or NoopContext()
+
+    normalized_account_id = normalize_account_id(account_id)
+    require_account(provider, normalized_account_id)
+    start, end = parse_period(from_date, to_date)
+
+    with tracer.start_as_current_span("analyze_cash_flow") as span:
+        span.set_attribute("bank", provider)
+        span.set_attribute("from_date", from_date)
+        span.set_attribute("to_date", to_date)
+        span.set_attribute("group_by", group_by)
+
+        await safe_ctx.info(f"📊 Анализ денежного потока {provider.upper()} за {from_date} — {to_date}")
+        await safe_ctx.report_progress(progress=0, total=100)
+
+        try:
+            loaded = await load_statement(
+                provider=provider,
+                token=token,
+                mode=mode,
+                account_id=normalized_account_id,
+                from_date=from_date,
+                to_date=to_date,
+                ctx=safe_ctx,
+            )
+        except McpError:
+            raise
+        except Exception as error:
+            mcp_error = bank_error(error)
+            await safe_ctx.error(f"❌ {mcp_error.error.message}: {error}")
+            raise mcp_error from error
+        await safe_ctx.report_progress(progress=70, total=100)
+
+        operations = [
+            normalize_operation(provider, normalized_account_id, op) for op in loaded.operations
+        ]
+        summary = analyze_operations(
+            operations,
+            start=start,
+            end=end,
+            currency=currency,
+            group_by=group_by,
+            top_n=top_n,
+            large_amount=large_amount,
+        )
+        span.set_attribute("operations", summary["operations"])
+        await safe_ctx.report_progress(progress=100, total=100)
+
+        turnover = summary["turnover"]
+        balances = summary["balances"]
+        anomalies = summary["anomalies"]
+        await safe_ctx.info(f"✅ Проанализировано {summary['operations']} операций")
+
+        lines = [
+            f"Анализ денежного потока {provider.upper()} за {from_date}–{to_date} ({currency})",
+            f"Операций: {summary['operations']}",
+            f"📈 Поступления: {turnover['inflow']:,.2f}",
+            f"📉 Списания: {turnover['outflow']:,.2f}",
+            f"Сальдо за период: {turnover['net']:+,.2f}",
+        ]
+        if balances["source"] != "relative":
+            lines.append(f"Остаток: {balances['opening']:,.2f} → {balances['closing']:,.2f}")
+        if summary["counterparties"]["top"]:
+            leader = summary["counterparties"]["top"][0]
+            lines.append(
+                f"Крупнейший контрагент: {leader['name'] or leader['key']} "
+                f"(+{leader['inflow']:,.2f} / −{leader['outflow']:,.2f})"
+            )
+        if anomalies["large_without_purpose"]["count"]:
+            lines.append(
+                f"🛑 Операций больше {large_amount:,.0f} без назначения: {anomalies['large_without_purpose']['count']}"
+            )
+        if anomalies["amount_outlier"]["count"]:
+            lines.append(f"⚠️ Нетипично крупных операций: {anomalies['amount_outlier']['count']}")
+        if anomalies["negative_balance"]["count"]:
+            lines.append(f"⚠️ Дней с отрицательным остатком: {anomalies['negative_balance']['count']}")
+
+        meta = loaded.meta()
+        meta["total_operations"] = len(operations)
+        meta["analyzed_operations"] = summary["operations"]
+        return ToolResult(
+            content=[TextContent(type="text", text="\n".join(lines))],
+            structured_content={
+                "bank": provider,
+                "period": {"from": from_date, "to": to_date},
+                **summary,
+            },
+            meta=meta,
+        )
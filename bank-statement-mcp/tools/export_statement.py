@@ -0,0 +1,154 @@
+"""
+Выгрузка полной выписки в NDJSON/CSV: MCP-ресурсы и потоковый HTTP endpoint.
+"""
+# CHANGE: Полная выписка отдаётся отдельной выгрузкой, а не внутри ответа tool
+# WHY: В ответ tool попадает ограниченное число операций (tools.render), остальные нужно
+#      получать без многомегабайтного JSON в контексте LLM
+# QUOTE(TЗ): "The full dataset should be exposed as a streamed NDJSON/CSV export resource
+#             written chunk by chunk."
+# REF: user-037
+import os
+import sqlite3
+from datetime import date
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+
+from mcp_instance import mcp
+from .operation_store import (
+    EXPORT_FORMATS,
+    OperationStore,
+    get_operation_store,
+    store_enabled,
+    store_scope,
+)
+from .utils import format_error
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_page_rows() -> int:
+    """BANK_EXPORT_PAGE_ROWS — сколько операций в одной странице ресурса выгрузки (по умолчанию 5000)."""
+    return max(1, int(os.getenv("BANK_EXPORT_PAGE_ROWS", "5000")))
+
+
+def export_ttl_hours() -> float:
+    """BANK_EXPORT_TTL_HOURS — сколько часов действует ссылка на выгрузку (по умолчанию 24)."""
+    return float(os.getenv("BANK_EXPORT_TTL_HOURS", "24"))
+
+
+async def register_export(
+    *, provider: str, mode: str, token: str, account_id: Optional[str], start: date, end: date
+) -> Optional[Dict[str, object]]:
+    """
+    Регистрирует выгрузку операций счёта из хранилища операций.
+    None — хранилище отключено (BANK_STORE=off) или недоступно: выгружать нечего.
+    """
+    if not store_enabled():
+        return None
+    ttl_hours = export_ttl_hours()
+    try:
+        export_id = await get_operation_store().create_export(
+            store_scope(provider, mode, token), account_id, start, end, ttl_hours=ttl_hours
+        )
+    except (sqlite3.Error, OSError):
+        return None
+    return {
+        "id": export_id,
+        "resources": {fmt: f"bank-export://{fmt}/{export_id}" for fmt in EXPORT_FORMATS},
+        "page_resources": {
+            fmt: f"bank-export://{fmt}/{export_id}/{{page}}" for fmt in EXPORT_FORMATS
+        },
+        "page_rows": export_page_rows(),
+        "urls": {fmt: f"/exports/{export_id}/{fmt}" for fmt in EXPORT_FORMATS},
+        "expires_in_hours": ttl_hours,
+    }
+
+
+# CHANGE: Ресурс выгрузки отдаёт одну страницу не больше BANK_EXPORT_PAGE_ROWS операций
+# WHY: Ответ MCP-ресурса — одна строка, и _read_export собирал в неё всю выписку целиком
+# REF: user-037
+async def _read_export(store: OperationStore, export_id: str, fmt: str, page: str = "1") -> str:
+    if not page.isdigit() or int(page) < 1:
+        raise format_error("Номер страницы выгрузки — целое число от 1", code=-32602)
+    found = await store.find_export(export_id)
+    if found is None:
+        raise format_error("Выгрузка не найдена или срок её действия истёк", code=-32602)
+    scope, where = found
+    page_rows = export_page_rows()
+    chunks = []
+    async for chunk in store.export_chunks(
+        scope, where, fmt, offset=(int(page) - 1) * page_rows, limit=page_rows
+    ):
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+@mcp.resource(
+    "bank-export://ndjson/{export_id}",
+    name="bank_statement_export_ndjson",
+    description="Первая страница полной выписки в NDJSON (одна операция в единой схеме на строку)",
+    mime_type=MEDIA_TYPES["ndjson"],
+)
+async def export_ndjson(export_id: str) -> str:
+    """Первая страница выгрузки export_id в NDJSON."""
+    return await _read_export(get_operation_store(), export_id, "ndjson")
+
+
+@mcp.resource(
+    "bank-export://ndjson/{export_id}/{page}",
+    name="bank_statement_export_ndjson_page",
+    description="Страница полной выписки в NDJSON; страница короче page_rows — последняя",
+    mime_type=MEDIA_TYPES["ndjson"],
+)
+async def export_ndjson_page(export_id: str, page: str) -> str:
+    """Страница page (с 1) выгрузки export_id в NDJSON."""
+    return await _read_export(get_operation_store(), export_id, "ndjson", page)
+
+
+@mcp.resource(
+    "bank-export://csv/{export_id}",
+    name="bank_statement_export_csv",
+    description="Первая страница полной выписки в CSV (колонки единой схемы операций)",
+    mime_type=MEDIA_TYPES["csv"],
+)
+async def export_csv(export_id: str) -> str:
+    """Первая страница выгрузки export_id в CSV."""
+    return await _read_export(get_operation_store(), export_id, "csv")
+
+
+@mcp.resource(
+    "bank-export://csv/{export_id}/{page}",
+    name="bank_statement_export_csv_page",
+    description="Страница полной выписки в CSV с заголовком; страница короче page_rows — последняя",
+    mime_type=MEDIA_TYPES["csv"],
+)
+async def export_csv_page(export_id: str, page: str) -> str:
+    """Страница page (с 1) выгрузки export_id в CSV."""
+    return await _read_export(get_operation_store(), export_id, "csv", page)
+
+
+@mcp.custom_route("/exports/{export_id}/{fmt}", methods=["GET"])
+async def export_stream(request: Request) -> Response:
+    """
+    Потоковая выгрузка: строки читаются из SQLite кусками и сразу отправляются клиенту,
+    память сервера не зависит от размера выписки.
+    """
+    export_id = request.path_params["export_id"]
+    fmt = request.path_params["fmt"]
+    if fmt not in EXPORT_FORMATS:
+        return PlainTextResponse("format must be ndjson or csv", status_code=404)
+    store = get_operation_store()
+    try:
+        found = await store.find_export(export_id)
+    except (sqlite3.Error, OSError):
+        found = None
+    if found is None:
+        return PlainTextResponse("export not found or expired", status_code=404)
+    scope, where = found
+    return StreamingResponse(
+        store.export_chunks(scope, where, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="statement-{export_id}.{fmt}"'},
+    )
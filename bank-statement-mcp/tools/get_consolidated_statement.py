@@ -0,0 +1,278 @@
+"""
+Сводная выписка по всем счетам во всех подключённых банках в единой схеме операций.
+"""
+# CHANGE: Tool сводной выписки по нескольким счетам и банкам
+# WHY: Клиент со счетами в T‑Bank, Модульбанке и Альфе делал несколько последовательных вызовов
+#      get_bank_statement и получал списки операций в разных форматах
+# QUOTE(TЗ): "fetches them concurrently, normalizes the operations into one schema ... and returns
+#             a single merged timeline"
+# REF: user-034
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from fastmcp import Context
+from mcp.types import TextContent
+from opentelemetry import trace
+from pydantic import Field
+
+from mcp_instance import mcp
+from .normalize import normalize_operation
+from .render import inline_operations_limit
+from .statement_source import (
+    PROVIDERS,
+    LoadedStatement,
+    bank_error,
+    configured_providers,
+    current_mode,
+    discover_accounts,
+    load_statement,
+    require_account,
+    resolve_token,
+)
+from .utils import NoopContext, ToolResult, format_error
+from .windows import parse_period
+
+tracer = trace.get_tracer(__name__)
+
+Target = Tuple[str, Optional[str]]
+
+
+def parse_accounts(accounts: List[str]) -> List[Target]:
+    """Разбирает ["tbank:40702...", "alfa"] в пары (банк, счёт); счёт без банка не допускается."""
+    targets: List[Target] = []
+    for raw in accounts:
+        provider, _, account_id = str(raw).strip().partition(":")
+        provider = provider.lower()
+        if provider not in PROVIDERS:
+            raise format_error(
+                f"Счёт {raw!r}: укажите банк в формате bank:account_id, bank — tbank|modulbank|alfa",
+                code=-32602,
+            )
+        target = (provider, account_id.strip() or None)
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+@dataclass
+class AccountPlan:
+    """
+    Счета для загрузки: явно заданные (targets) или пустой список — обнаружить во всех providers.
+
+    Attributes:
+        mode: Режим MODE
+        providers: Банки с токенами
+        tokens: Токен каждого банка
+        targets: Пары (банк, счёт)
+    """
+
+    mode: str
+    providers: List[str]
+    tokens: Dict[str, str]
+    targets: List[Target] = field(default_factory=list)
+
+
+@dataclass
+class ConsolidatedLoad:
+    """Операции всех счетов в единой схеме, по времени; сведения о загрузке счетов и ошибки."""
+
+    operations: List[Dict[str, object]] = field(default_factory=list)
+    accounts: List[Dict[str, object]] = field(default_factory=list)
+    errors: List[Dict[str, object]] = field(default_factory=list)
+
+
+def plan_accounts(accounts: Optional[List[str]]) -> AccountPlan:
+    """Проверяет счета и токены до обращения к банкам; McpError(-32602) при ошибке."""
+    mode = current_mode()
+    explicit = accounts if isinstance(accounts, list) and accounts else None
+    if explicit:
+        targets = parse_accounts(explicit)
+        providers = sorted({provider for provider, _ in targets})
+    else:
+        targets = []
+        providers = configured_providers(mode)
+        if not providers:
+            raise format_error(
+                "Не задан ни один токен банка: T_BANK_TOKEN, MODULBANK_TOKEN или ALFA_TOKEN", code=-32602
+            )
+    tokens: Dict[str, str] = {provider: resolve_token(provider, mode) for provider in providers}
+    for provider, account_id in targets:
+        require_account(provider, account_id)
+    return AccountPlan(mode=mode, providers=providers, tokens=tokens, targets=targets)
+
+
+async def load_consolidated(
+    plan: AccountPlan, from_date: str, to_date: str, ctx: NoopContext
+) -> ConsolidatedLoad:
+    """
+    Загружает счета плана параллельно (BANK_ACCOUNT_CONCURRENCY) и нормализует операции.
+    Ошибка отдельного счёта попадает в errors; если не загрузился ни один — McpError(-32603).
+    """
+    # CHANGE: Загрузка нескольких счетов вынесена из tool, чтобы её использовал и расчёт КУДиР
+    # REF: user-038
+    mode, tokens = plan.mode, plan.tokens
+    targets = list(plan.targets)
+    result = ConsolidatedLoad()
+    await ctx.report_progress(progress=0, total=100)
+
+    if not targets:
+        discovered = await asyncio.gather(
+            *(discover_accounts(provider, tokens[provider], mode) for provider in plan.providers),
+            return_exceptions=True,
+        )
+        for provider, found in zip(plan.providers, discovered):
+            if isinstance(found, BaseException):
+                result.errors.append(
+                    {"bank": provider, "account_id": None, "error": bank_error(found).error.message}
+                )
+                continue
+            targets.extend((provider, account_id) for account_id in found)
+        await ctx.info(f"🏦 Найдено счетов: {len(targets)}")
+    await ctx.report_progress(progress=20, total=100)
+
+    semaphore = asyncio.Semaphore(max(1, int(os.getenv("BANK_ACCOUNT_CONCURRENCY", "4"))))
+
+    async def load(target: Target) -> LoadedStatement:
+        provider, account_id = target
+        async with semaphore:
+            return await load_statement(
+                provider=provider,
+                token=tokens[provider],
+                mode=mode,
+                account_id=account_id,
+                from_date=from_date,
+                to_date=to_date,
+                ctx=ctx,
+            )
+
+    results = await asyncio.gather(*(load(target) for target in targets), return_exceptions=True)
+    await ctx.report_progress(progress=80, total=100)
+
+    for (provider, account_id), loaded in zip(targets, results):
+        if isinstance(loaded, BaseException):
+            if isinstance(loaded, asyncio.CancelledError):
+                raise loaded
+            result.errors.append(
+                {"bank": provider, "account_id": account_id, "error": bank_error(loaded).error.message}
+            )
+            continue
+        result.operations.extend(
+            normalize_operation(provider, account_id, op) for op in loaded.operations
+        )
+        result.accounts.append({"account_id": account_id, **loaded.meta()})
+
+    if not result.accounts and result.errors:
+        await ctx.error(f"❌ Не удалось загрузить ни один счёт: {result.errors[0]['error']}")
+        raise format_error(f"Не удалось загрузить ни один счёт: {result.errors[0]['error']}")
+
+    # Лента по времени; операции без даты — в конце
+    result.operations.sort(key=lambda op: (op["timestamp"] is None, op["timestamp"] or ""))
+    return result
+
+
+@mcp.tool(
+    name="get_consolidated_statement",
+    description="""Сводная выписка за период по всем счетам во всех подключённых банках.
+Счета загружаются параллельно, операции приводятся к единой схеме (дата, сумма со знаком,
+валюта, ИНН и название контрагента, назначение, остаток) и сливаются в одну ленту по времени.""",
+)
+async def get_consolidated_statement(
+    from_date: str = Field(..., description="Дата начала в формате YYYY-MM-DD"),
+    to_date: str = Field(..., description="Дата конца в формате YYYY-MM-DD"),
+    accounts: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            "Счета в формате bank:account_id (например tbank:40702810..., modulbank:uuid) или просто bank "
+            "для счёта по умолчанию. Если не указано — счета обнаруживаются во всех банках, для которых задан токен."
+        ),
+    ),
+    ctx: Optional[Context] = None,
+) -> ToolResult:
+    """
+    Возвращает единую ленту операций всех счетов в structured_content.
+
+    Args:
+        from_date: Дата начала периода в формате YYYY-MM-DD
+        to_date: Дата конца периода в формате YYYY-MM-DD
+        accounts: Опциональный список счетов bank:account_id
+        ctx: Context для логирования и прогресса
+
+    Returns:
+        ToolResult с content, structured_content (operations, accounts, errors) и meta
+
+    Raises:
+        McpError: При ошибках валидации (-32602) или если не загрузился ни один счёт (-32603)
+    """
+    parse_period(from_date, to_date)
+    safe_ctx = ctx or NoopContext()
+    plan = plan_accounts(accounts)
+
+    with tracer.start_as_current_span("get_consolidated_statement") as span:
+        span.set_attribute("from_date", from_date)
+        span.set_attribute("to_date", to_date)
+        span.set_attribute("banks", ",".join(plan.providers))
+
+        await safe_ctx.info(
+            f"🔍 Сводная выписка за {from_date} — {to_date}, банки: {', '.join(plan.providers)}"
+        )
+        loaded = await load_consolidated(plan, from_date, to_date, safe_ctx)
+        mode, providers = plan.mode, plan.providers
+        operations, account_summaries, errors = loaded.operations, loaded.accounts, loaded.errors
+
+        totals: Dict[str, Dict[str, float]] = {}
+        for op in operations:
+            bucket = totals.setdefault(str(op["currency"]), {"inflow": 0.0, "outflow": 0.0})
+            amount = float(op["amount"])
+            if amount >= 0:
+                bucket["inflow"] += amount
+            else:
+                bucket["outflow"] += -amount
+
+        await safe_ctx.report_progress(progress=100, total=100)
+        await safe_ctx.info(
+            f"✅ Счетов: {len(account_summaries)}, операций: {len(operations)}, ошибок: {len(errors)}"
+        )
+
+        lines = [f"Сводная выписка за {from_date}–{to_date}"]
+        for summary in account_summaries:
+            lines.append(
+                f"{str(summary['bank']).upper()} {summary['account_id'] or 'счёт по умолчанию'}: "
+                f"операций {summary['total_operations']}"
+            )
+        for currency, bucket in sorted(totals.items()):
+            lines.append(
+                f"{currency}: поступления {bucket['inflow']:,.2f}, списания {bucket['outflow']:,.2f}"
+            )
+        for error in errors:
+            lines.append(f"⚠️ {str(error['bank']).upper()} {error['account_id'] or ''}: {error['error']}")
+
+        # CHANGE: Лента в structured_content ограничена BANK_INLINE_OPERATIONS, итоги считаются по всем
+        # REF: user-037
+        inline_limit = inline_operations_limit()
+        if len(operations) > inline_limit:
+            lines.append(
+                f"В ответе первые {inline_limit} из {len(operations)} операций; "
+                "выписка по отдельному счёту доступна выгрузкой get_bank_statement"
+            )
+
+        return ToolResult(
+            content=[TextContent(type="text", text="\n".join(lines))],
+            structured_content={
+                "period": {"from": from_date, "to": to_date},
+                "accounts": account_summaries,
+                "totals": totals,
+                "operations": operations[:inline_limit],
+                "errors": errors,
+            },
+            meta={
+                "mode": mode,
+                "total_operations": len(operations),
+                "inline_operations": min(len(operations), inline_limit),
+                "operations_truncated": len(operations) > inline_limit,
+                "accounts": len(account_summaries),
+                "failed_accounts": len(errors),
+                "banks": providers,
+            },
+        )
@@ -0,0 +1,171 @@
+"""
+Налоговая база УСН за год по выпискам всех подключённых счетов: КУДиР и данные для декларации.
+"""
+# CHANGE: Tool расчёта КУДиР и налоговой базы УСН поверх сводной выписки и tools.kudir
+# WHY: Декларация УСН (generate_usn_declaration в fns-tax-mcp) строится по доходам и расходам,
+#      которые агенту приходилось собирать по выпискам вручную
+# QUOTE(TЗ): "return period totals ready for declaration generation"
+# REF: user-038
+import re
+from datetime import date
+from typing import List, Optional
+
+from fastmcp import Context
+from mcp.types import TextContent
+from opentelemetry import trace
+from pydantic import Field
+
+from mcp_instance import mcp
+from .get_consolidated_statement import load_consolidated, plan_accounts
+from .kudir import DEFAULT_RULES, TAX_RATES, build_kudir, compile_patterns
+from .render import inline_operations_limit
+from .utils import NoopContext, ToolResult, format_error
+
+tracer = trace.get_tracer(__name__)
+
+
+def _strings(value: object) -> List[str]:
+    """Список непустых строк; FieldInfo при прямом вызове .fn и None — пустой список."""
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+@mcp.tool(
+    name="get_usn_tax_base",
+    description="""Книга учёта доходов и расходов (КУДиР) и налоговая база УСН за год по выпискам всех
+подключённых счетов. Переводы между своими счетами, займы, депозиты, взносы в капитал и уплата
+налога УСН исключаются по правилам; возвраты покупателям уменьшают доходы, возвраты от поставщиков
+при УСН 15% уменьшают расходы (при 6% исключаются). Возвращает итоги по кварталам
+и нарастающим итогом за Q1, полугодие, 9 месяцев и год — готовые аргументы generate_usn_declaration.""",
+)
+async def get_usn_tax_base(
+    year: int = Field(..., description="Налоговый год, например 2025"),
+    tax_rate: int = Field(6, description="Ставка УСН: 6 (доходы) или 15 (доходы минус расходы)"),
+    inn: Optional[str] = Field(
+        None, description="ИНН налогоплательщика: исключает переводы самому себе и подставляется в декларацию"
+    ),
+    accounts: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            "Счета в формате bank:account_id или просто bank. "
+            "Если не указано — используются все счета во всех банках, для которых задан токен."
+        ),
+    ),
+    exclude_inns: Optional[List[str]] = Field(
+        None, description="ИНН контрагентов, операции с которыми не учитываются (например свои компании)"
+    ),
+    exclude_patterns: Optional[List[str]] = Field(
+        None, description="Регулярные выражения по назначению платежа для исключения операций"
+    ),
+    use_default_rules: bool = Field(
+        True, description="Применять встроенные правила исключений (займы, свои счета, возвраты и т.д.)"
+    ),
+    ctx: Optional[Context] = None,
+) -> ToolResult:
+    """
+    Возвращает КУДиР за год в structured_content.
+
+    Args:
+        year: Налоговый год
+        tax_rate: Ставка УСН, 6 или 15
+        inn: ИНН налогоплательщика
+        accounts: Счета bank[:account_id]
+        exclude_inns: ИНН контрагентов для исключения
+        exclude_patterns: Регулярные выражения по назначению платежа
+        use_default_rules: Применять встроенные правила
+        ctx: Context для логирования и прогресса
+
+    Returns:
+        ToolResult с content, structured_content (quarters, declaration, exclusions, book) и meta
+
+    Raises:
+        McpError: При ошибках валидации (-32602) или если не загрузился ни один счёт (-32603)
+    """
+    tax_rate = tax_rate if isinstance(tax_rate, int) else 6
+    use_default_rules = use_default_rules if isinstance(use_default_rules, bool) else True
+    inn = inn.strip() if isinstance(inn, str) and inn.strip() else None
+    today = date.today()
+    if not isinstance(year, int) or not 2000 <= year <= today.year:
+        raise format_error(f"year должен быть от 2000 до {today.year}", code=-32602)
+    if tax_rate not in TAX_RATES:
+        raise format_error("tax_rate должен быть 6 или 15", code=-32602)
+    if inn and not re.fullmatch(r"\d{10}|\d{12}", inn):
+        raise format_error(f"ИНН должен содержать 10 или 12 цифр, получено: {inn!r}", code=-32602)
+    try:
+        custom_rules = compile_patterns(_strings(exclude_patterns))
+    except ValueError as error:
+        raise format_error(f"Некорректное регулярное выражение: {error}", code=-32602) from error
+    rules = (list(DEFAULT_RULES) if use_default_rules else []) + custom_rules
+
+    from_date = date(year, 1, 1).isoformat()
+    to_date = min(date(year, 12, 31), today).isoformat()
+    safe_ctx = ctx or NoopContext()
+    plan = plan_accounts(accounts if isinstance(accounts, list) else None)
+
+    with tracer.start_as_current_span("get_usn_tax_base") as span:
+        span.set_attribute("year", year)
+        span.set_attribute("tax_rate", tax_rate)
+        span.set_attribute("banks", ",".join(plan.providers))
+
+        await safe_ctx.info(f"📒 КУДиР за {year} год, УСН {tax_rate}%, банки: {', '.join(plan.providers)}")
+        loaded = await load_consolidated(plan, from_date, to_date, safe_ctx)
+
+        kudir = build_kudir(
+            loaded.operations,
+            year=year,
+            tax_rate=tax_rate,
+            inn=inn,
+            exclude_inns=_strings(exclude_inns),
+            rules=rules,
+            book_limit=inline_operations_limit(),
+        )
+        span.set_attribute("operations", kudir["operations"])
+        await safe_ctx.report_progress(progress=100, total=100)
+        await safe_ctx.info(
+            f"✅ Доходы {kudir['income']:,.2f}, расходы {kudir['expenses']:,.2f}, "
+            f"исключено правил: {len(kudir['exclusions'])}"
+        )
+
+        lines = [f"КУДиР за {year} год (УСН {tax_rate}%), период {from_date}–{to_date}"]
+        for quarter in kudir["quarters"]:
+            lines.append(
+                f"{quarter['quarter']} кв.: доходы {quarter['income']:,.2f}, "
+                f"расходы {quarter['expenses']:,.2f}"
+            )
+        for item in kudir["declaration"]:
+            lines.append(
+                f"{item['period']}: доходы {item['income']:,.2f}, расходы {item['expenses']:,.2f}, "
+                f"налог ≈ {item['estimated_tax']:,.2f}"
+            )
+        for exclusion in kudir["exclusions"]:
+            lines.append(
+                f"Исключено {exclusion['rule']}: {exclusion['operations']} оп., "
+                f"📈 {exclusion['inflow']:,.2f}, 📉 {exclusion['outflow']:,.2f}"
+            )
+        if kudir["skipped_foreign_currency"]:
+            lines.append(
+                f"⚠️ Операций в валюте не учтено: {kudir['skipped_foreign_currency']} "
+                "(доход в валюте пересчитывается по курсу ЦБ на дату поступления)"
+            )
+        for error in loaded.errors:
+            lines.append(f"⚠️ {str(error['bank']).upper()} {error['account_id'] or ''}: {error['error']}")
+
+        return ToolResult(
+            content=[TextContent(type="text", text="\n".join(lines))],
+            structured_content={
+                "period": {"from": from_date, "to": to_date},
+                "accounts": loaded.accounts,
+                **kudir,
+                "errors": loaded.errors,
+            },
+            meta={
+                "mode": plan.mode,
+                "banks": plan.providers,
+                "accounts": len(loaded.accounts),
+                "failed_accounts": len(loaded.errors),
+                "operations": kudir["operations"],
+                "book_rows": kudir["book_rows"],
+                "book_truncated": kudir["book_truncated"],
+            },
+        )
@@ -0,0 +1,270 @@
+"""
+Долгоживущие HTTP-клиенты банков: пул соединений, circuit breaker и повтор идемпотентных запросов.
+"""
+# CHANGE: Один httpx.AsyncClient с пулом соединений на банк вместо нового клиента на каждый запрос
+# WHY: Каждая загрузка открывала свой клиент с общим таймаутом 30 с; при деградации API одного банка
+#      все вызовы к нему висели до таймаута и занимали соединения
+# QUOTE(TЗ): "one long-lived pooled client per provider, owned by the server lifespan. Each provider
+#             should have its own circuit breaker (open after N failures, half-open probes) and
+#             jittered retry for idempotent reads, so a sick bank fails fast"
+# REF: user-039
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+from metrics import (
+    observe_response_bytes,
+    observe_upstream,
+    record_circuit_rejected,
+    set_circuit_open,
+)
+from .windows import is_retryable, mark_retried
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Запрос к банку не выполнялся: circuit breaker открыт после серии отказов."""
+
+    def __init__(self, provider: str, retry_after: float) -> None:
+        super().__init__(f"{provider}: circuit open, retry after {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker банка.
+
+    closed — запросы идут; после failure_threshold отказов подряд — open.
+    open — запросы сразу отклоняются CircuitOpenError; через reset_timeout — half_open.
+    half_open — проходит один пробный запрос: успех закрывает breaker, отказ снова открывает.
+    Отказом считаются только ошибки, которые windows.is_retryable признаёт временными
+    (сеть, таймаут, 429, 5xx); 4xx означает, что банк отвечает.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def before_call(self) -> None:
+        """Пропускает запрос или отклоняет его CircuitOpenError."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return
+        remaining = self.reset_timeout - (self.clock() - (self.opened_at or 0.0))
+        raise CircuitOpenError(self.provider, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def release(self) -> None:
+        """Запрос завершился не ответом банка (отмена, ошибка разбора) — состояние не меняется."""
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self.probing = False
+
+
+class ProviderClient:
+    """
+    HTTP-клиент одного банка. Статус ответа проверяется здесь (raise_for_status), чтобы
+    ошибки банка учитывались circuit breaker; идемпотентные запросы повторяются
+    с экспоненциальной задержкой и полным джиттером.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        client: httpx.AsyncClient,
+        breaker: CircuitBreaker,
+        retries: int = 2,
+        backoff: float = 0.2,
+    ) -> None:
+        self.provider = provider
+        self.client = client
+        self.breaker = breaker
+        self.retries = max(0, retries)
+        self.backoff = backoff
+
+    async def get(self, url: str, **kwargs: object) -> httpx.Response:
+        return await self.request("GET", url, idempotent=True, **kwargs)
+
+    async def post(self, url: str, *, idempotent: bool = False, **kwargs: object) -> httpx.Response:
+        """POST; idempotent=True для запросов на чтение (история операций, список счетов)."""
+        return await self.request("POST", url, idempotent=idempotent, **kwargs)
+
+    async def request(
+        self, method: str, url: str, *, idempotent: bool, **kwargs: object
+    ) -> httpx.Response:
+        send = self.client.get if method == "GET" else self.client.post
+        attempts = self.retries + 1 if idempotent else 1
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                record_circuit_rejected(self.provider)
+                raise
+            started = time.perf_counter()
+            try:
+                response = await send(url, **kwargs)
+                response.raise_for_status()
+            except BaseException as error:
+                outcome = _outcome(error)
+                if outcome is not None:
+                    observe_upstream(self.provider, outcome, time.perf_counter() - started)
+                if isinstance(error, httpx.HTTPStatusError) and not is_retryable(error):
+                    # 4xx: банк отвечает, ошибка в запросе или токене
+                    self._record(success=True)
+                    raise
+                if not is_retryable(error):
+                    self.breaker.release()
+                    raise
+                self._record(success=False)
+                attempt += 1
+                if attempt >= attempts:
+                    if attempts > 1:
+                        # fetch_windows не повторяет окно поверх уже сделанных повторов
+                        mark_retried(error)
+                    raise
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                continue
+            observe_upstream(self.provider, "ok", time.perf_counter() - started)
+            content = getattr(response, "content", None)
+            if isinstance(content, (bytes, bytearray)):
+                observe_response_bytes(self.provider, len(content))
+            self._record(success=True)
+            return response
+
+    def _record(self, *, success: bool) -> None:
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        set_circuit_open(self.provider, self.breaker.state != CLOSED)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def _outcome(error: BaseException) -> Optional[str]:
+    """Исход запроса для метрик; None — запрос не дошёл до банка или отменён."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code if error.response is not None else 0
+        return "server_error" if status == 429 or status >= 500 else "client_error"
+    if isinstance(error, httpx.TransportError):
+        return "network_error"
+    return None
+
+
+def _client_settings() -> Dict[str, float]:
+    return {
+        "timeout": float(os.getenv("BANK_HTTP_TIMEOUT", "30")),
+        "connect_timeout": float(os.getenv("BANK_HTTP_CONNECT_TIMEOUT", "5")),
+        "max_connections": int(os.getenv("BANK_HTTP_MAX_CONNECTIONS", "20")),
+        "retries": int(os.getenv("BANK_HTTP_RETRIES", "2")),
+        "breaker_failures": int(os.getenv("BANK_BREAKER_FAILURES", "5")),
+        "breaker_reset": float(os.getenv("BANK_BREAKER_RESET_SECONDS", "30")),
+    }
+
+
+class HttpClients:
+    """
+    Клиенты банков, создаются при первом запросе к банку. Ключ — банк, у песочницы T-Bank
+    (другой хост) отдельный ключ tbank_sandbox.
+
+    Жизненный цикл задаёт lifespan сервера (mcp_instance): в FastMCP 2.x lifespan входит на
+    каждую MCP-сессию, поэтому сессии считаются, и пулы закрываются после выхода последней.
+    Состояние circuit breaker переживает закрытие пулов.
+    """
+
+    def __init__(self) -> None:
+        self.clients: Dict[str, ProviderClient] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.sessions = 0
+
+    def client(self, key: str) -> ProviderClient:
+        existing = self.clients.get(key)
+        if existing is not None:
+            return existing
+        settings = _client_settings()
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                key, int(settings["breaker_failures"]), settings["breaker_reset"]
+            )
+            self.breakers[key] = breaker
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=int(settings["max_connections"]),
+                max_keepalive_connections=int(settings["max_connections"]),
+            ),
+        )
+        created = ProviderClient(key, client, breaker, retries=int(settings["retries"]))
+        self.clients[key] = created
+        return created
+
+    def states(self) -> Dict[str, str]:
+        """Состояние circuit breaker каждого банка, к которому были запросы."""
+        return {key: breaker.state for key, breaker in self.breakers.items()}
+
+    async def aclose(self) -> None:
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator["HttpClients"]:
+        self.sessions += 1
+        try:
+            yield self
+        finally:
+            self.sessions -= 1
+            if self.sessions == 0:
+                await self.aclose()
+
+
+_registry: Optional[HttpClients] = None
+
+
+def get_http_clients() -> HttpClients:
+    global _registry
+    if _registry is None:
+        _registry = HttpClients()
+    return _registry
@@ -0,0 +1,261 @@
+"""
+Книга учёта доходов и расходов (КУДиР) и налоговая база УСН по операциям в единой схеме (tools.normalize).
+"""
+# CHANGE: Налоговая база УСН считается по выписке на сервере
+# WHY: Для generate_usn_declaration (fns-tax-mcp) доходы и расходы за период агент складывал сам по
+#      сырому JSON выписки, не отделяя переводы между своими счетами, займы и возвраты
+# QUOTE(TЗ): "build a book of income and expenses (KUDiR) per quarter and year from fetched
+#             operations, with configurable exclusion rules, using vectorized aggregation"
+# REF: user-038
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Sequence
+
+import numpy as np
+
+TAX_RATES = (6, 15)
+DECLARATION_PERIODS = ("Q1", "Q2", "Q3", "YEAR")
+# Минимальный налог УСН 15% — 1% доходов за год (п. 6 ст. 346.18 НК РФ)
+MIN_TAX_RATE = 0.01
+
+# Категории строки книги
+INCOME = "income"
+INCOME_REDUCTION = "income_reduction"
+EXPENSE = "expense"
+EXPENSE_REDUCTION = "expense_reduction"
+EXCLUDED = "excluded"
+
+
+@dataclass(frozen=True)
+class ExclusionRule:
+    """
+    Правило исключения операции из доходов/расходов по назначению платежа.
+
+    Attributes:
+        name: Код правила в отчёте
+        pattern: Регулярное выражение по назначению платежа (без учёта регистра)
+        direction: in — только поступления, out — только списания, all — оба направления
+        category: EXCLUDED, INCOME_REDUCTION (возврат покупателю уменьшает доходы) или
+            EXPENSE_REDUCTION (возврат от поставщика уменьшает расходы при УСН 15%, при 6% исключается)
+    """
+
+    name: str
+    pattern: Pattern[str]
+    direction: str = "all"
+    category: str = EXCLUDED
+
+
+def _rule(name: str, pattern: str, direction: str = "all", category: str = EXCLUDED) -> ExclusionRule:
+    return ExclusionRule(name, re.compile(pattern, re.IGNORECASE), direction, category)
+
+
+# Правила проверяются по порядку, срабатывает первое подходящее. Проценты по займам и депозитам
+# не исключаются: это расход и доход соответственно.
+DEFAULT_RULES = (
+    _rule(
+        "own_transfer",
+        r"(перевод|перечисление)\s+(собственных|своих)\s+средств|между\s+(своими|собственными)\s+счетами",
+    ),
+    _rule("usn_tax", r"^(?!.*пени)(?=.*(усн|упрощ)).*(налог|аванс)", direction="out"),
+    _rule("loan", r"^(?!.*процент).*(за[её]м|займ|кредит(?!ов))"),
+    _rule("deposit", r"^(?!.*процент).*депозит"),
+    _rule("capital", r"уставн\w*\s+капитал|вклад\w*\s+в\s+имущество", direction="in"),
+    _rule("owner_withdrawal", r"дивиденд|на\s+(собственные|личные)\s+нужды", direction="out"),
+    _rule("refund_received", r"возврат", direction="in", category=EXPENSE_REDUCTION),
+    _rule("refund_to_customer", r"возврат", direction="out", category=INCOME_REDUCTION),
+)
+
+
+def compile_patterns(patterns: Sequence[str]) -> List[ExclusionRule]:
+    """Пользовательские правила exclude_patterns; ValueError при некорректном выражении."""
+    rules = []
+    for index, pattern in enumerate(patterns):
+        try:
+            rules.append(_rule(f"pattern_{index + 1}", pattern))
+        except re.error as error:
+            raise ValueError(f"exclude_patterns[{index}]: {error}") from error
+    return rules
+
+
+def _money(value: float) -> float:
+    return round(float(value), 2)
+
+
+def estimated_tax(income: float, expenses: float, tax_rate: int, *, year_total: bool) -> float:
+    """Налог (аванс) без учёта уменьшения на страховые взносы и ранее уплаченных авансов."""
+    if tax_rate == 6:
+        return _money(max(income, 0.0) * 0.06)
+    tax = max(income - expenses, 0.0) * 0.15
+    if year_total:
+        tax = max(tax, max(income, 0.0) * MIN_TAX_RATE)
+    return _money(tax)
+
+
+def build_kudir(
+    operations: Sequence[Dict[str, object]],
+    *,
+    year: int,
+    tax_rate: int,
+    inn: Optional[str] = None,
+    exclude_inns: Sequence[str] = (),
+    rules: Sequence[ExclusionRule] = DEFAULT_RULES,
+    book_limit: int = 500,
+) -> Dict[str, object]:
+    """
+    КУДиР за год: итоги по кварталам, нарастающие итоги для декларации, исключённые операции по правилам
+    и строки книги (первые book_limit). Учитываются только операции в рублях за год year.
+    """
+    # Один проход по словарям, дальше только массивы
+    quarters: List[int] = []
+    amounts: List[object] = []
+    purposes: List[str] = []
+    inns: List[str] = []
+    rows: List[Dict[str, object]] = []
+    foreign = 0
+    prefix = f"{year:04d}-"
+    for op in operations:
+        day = op.get("date")
+        if not isinstance(day, str) or not day.startswith(prefix):
+            continue
+        if op.get("currency") != "RUB":
+            foreign += 1
+            continue
+        quarters.append((int(day[5:7]) - 1) // 3)
+        amounts.append(op.get("amount") or 0.0)
+        purposes.append(str(op.get("purpose") or "").casefold())
+        inns.append(str(op.get("counterparty_inn") or ""))
+        rows.append(op)
+
+    quarter_index = np.array(quarters, dtype=np.int64)
+    amount = np.array(amounts, dtype=np.float64)
+    incoming = amount >= 0
+
+    # Регулярные выражения проверяются один раз на каждое уникальное назначение платежа
+    unique_purposes, inverse = np.unique(np.array(purposes, dtype=str), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    rule_names = ["excluded_inn"] + [rule.name for rule in rules]
+    rule_index = np.full(amount.size, -1, dtype=np.int64)
+    excluded_inns = [value for value in [*exclude_inns, inn] if value]
+    if excluded_inns:
+        rule_index[np.isin(np.array(inns, dtype=str), excluded_inns)] = 0
+    for position, rule in enumerate(rules, start=1):
+        hits = np.fromiter(
+            (bool(rule.pattern.search(text)) for text in unique_purposes.tolist()),
+            dtype=bool,
+            count=unique_purposes.size,
+        )
+        mask = hits[inverse] & (rule_index < 0)
+        if rule.direction != "all":
+            mask &= incoming if rule.direction == "in" else ~incoming
+        rule_index[mask] = position
+
+    # CHANGE: Возврат от поставщика при УСН 15% уменьшает расходы, а не исключается
+    # WHY: При «доходы минус расходы» исключение возврата завышало расходы и занижало налог
+    # REF: user-038
+    category_of = {
+        position: EXCLUDED if rule.category == EXPENSE_REDUCTION and tax_rate != 15 else rule.category
+        for position, rule in enumerate(rules, start=1)
+    }
+    reduction_rules = [i for i, category in category_of.items() if category == INCOME_REDUCTION]
+    expense_reduction_rules = [i for i, category in category_of.items() if category == EXPENSE_REDUCTION]
+    reduces = np.isin(rule_index, reduction_rules)
+    reduces_expenses = np.isin(rule_index, expense_reduction_rules)
+    excluded = (rule_index >= 0) & ~reduces & ~reduces_expenses
+    income = np.where(~excluded & incoming & ~reduces_expenses, amount, 0.0) + np.where(reduces, amount, 0.0)
+    expenses = np.where(~excluded & ~incoming & ~reduces, -amount, 0.0) - np.where(
+        reduces_expenses, amount, 0.0
+    )
+
+    by_quarter_income = np.bincount(quarter_index, weights=income, minlength=4)
+    by_quarter_expenses = np.bincount(quarter_index, weights=expenses, minlength=4)
+    by_quarter_excluded = np.bincount(quarter_index, weights=excluded.astype(np.float64), minlength=4)
+    cumulative_income = np.cumsum(by_quarter_income)
+    cumulative_expenses = np.cumsum(by_quarter_expenses)
+
+    quarter_totals = [
+        {
+            "quarter": quarter + 1,
+            "income": _money(by_quarter_income[quarter]),
+            "expenses": _money(by_quarter_expenses[quarter]),
+            "excluded_operations": int(by_quarter_excluded[quarter]),
+        }
+        for quarter in range(4)
+    ]
+
+    declaration = []
+    for quarter, period in enumerate(DECLARATION_PERIODS):
+        last = 3 if period == "YEAR" else quarter
+        period_income = _money(cumulative_income[last])
+        period_expenses = _money(cumulative_expenses[last]) if tax_rate == 15 else 0.0
+        arguments: Dict[str, object] = {
+            "period": period,
+            "year": year,
+            "income": period_income,
+            "expenses": period_expenses,
+            "tax_rate": tax_rate,
+        }
+        if inn:
+            arguments = {"inn": inn, **arguments}
+        declaration.append(
+            {
+                "period": period,
+                "income": period_income,
+                "expenses": period_expenses,
+                "estimated_tax": estimated_tax(
+                    period_income, period_expenses, tax_rate, year_total=period == "YEAR"
+                ),
+                "generate_usn_declaration_args": arguments,
+            }
+        )
+
+    exclusions = []
+    for position, name in enumerate(rule_names):
+        matched = rule_index == position
+        count = int(matched.sum())
+        if not count:
+            continue
+        exclusions.append(
+            {
+                "rule": name,
+                "category": category_of.get(position, EXCLUDED),
+                "operations": count,
+                "inflow": _money(amount[matched & incoming].sum()),
+                "outflow": _money(-amount[matched & ~incoming].sum()),
+            }
+        )
+
+    counted = np.flatnonzero(~excluded)
+    book = [
+        {
+            "date": rows[i]["date"],
+            "document": rows[i].get("id"),
+            "content": rows[i].get("purpose"),
+            "counterparty_inn": rows[i].get("counterparty_inn"),
+            "counterparty_name": rows[i].get("counterparty_name"),
+            "income": _money(income[i]),
+            "expense": _money(expenses[i]),
+            "category": (
+                INCOME_REDUCTION
+                if reduces[i]
+                else EXPENSE_REDUCTION
+                if reduces_expenses[i]
+                else (INCOME if incoming[i] else EXPENSE)
+            ),
+        }
+        for i in counted[: max(0, book_limit)].tolist()
+    ]
+
+    return {
+        "year": year,
+        "tax_rate": tax_rate,
+        "income": _money(cumulative_income[3]),
+        "expenses": _money(cumulative_expenses[3]),
+        "quarters": quarter_totals,
+        "declaration": declaration,
+        "exclusions": exclusions,
+        "book": book,
+        "book_rows": int(counted.size),
+        "book_truncated": int(counted.size) > len(book),
+        "operations": int(amount.size),
+        "skipped_foreign_currency": foreign,
+    }
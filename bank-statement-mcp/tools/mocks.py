@@ -107,3 +107,14 @@ def get_bank_statement_mock(
         "dateRange": date_range,
     }
 
+
+
+def get_accounts_mock(provider: str) -> List[Dict[str, object]]:
+    """Счета клиента в банке для test режима сводной выписки."""
+    # CHANGE: Заглушка списка счетов
+    # WHY: Сводная выписка без явного списка счетов обнаруживает их сама
+    # REF: user-034
+    return [
+        {"id": f"{provider}-account-001", "number": "40702810000000000001", "currency": "RUB"},
+        {"id": f"{provider}-account-002", "number": "40702810000000000002", "currency": "RUB"},
+    ]
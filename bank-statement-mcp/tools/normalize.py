@@ -0,0 +1,155 @@
+"""
+Приведение операций T‑Bank, Модульбанка и Альфа-Банка к единой схеме.
+"""
+# CHANGE: Единая схема операции для всех банков
+# WHY: Каждый банк возвращает свой формат (operationAmount/typeOfOperation, amount/category,
+#      amount.amount/direction), и агенту приходилось разбирать их по отдельности
+# QUOTE(TЗ): "normalizes the operations into one schema (date, signed amount, currency,
+#             counterparty INN/name, purpose, balance)"
+# REF: user-034
+from typing import Dict, Optional, Tuple
+
+from .pagination import Operation
+from .windows import operation_id
+
+NORMALIZED_FIELDS = (
+    "bank",
+    "account_id",
+    "id",
+    "date",
+    "timestamp",
+    "amount",
+    "currency",
+    "counterparty_inn",
+    "counterparty_name",
+    "purpose",
+    "balance",
+)
+
+# Цифровые коды валют ОКВ и устаревший код RUR
+_CURRENCY_CODES: Dict[str, str] = {"643": "RUB", "810": "RUB", "RUR": "RUB", "840": "USD", "978": "EUR", "156": "CNY"}
+
+_CREDIT = {"credit"}
+_DEBIT = {"debit", "debet"}
+
+
+def _text(value: object) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _number(value: object) -> Optional[float]:
+    if isinstance(value, dict):
+        value = value.get("amount")
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _currency(value: object) -> str:
+    text = _text(value) or "RUB"
+    return _CURRENCY_CODES.get(text.upper(), text.upper())
+
+
+def _direction(value: object) -> Optional[str]:
+    text = (_text(value) or "").lower()
+    if text in _CREDIT:
+        return "credit"
+    if text in _DEBIT:
+        return "debit"
+    return None
+
+
+def _signed(amount: Optional[float], direction: Optional[str]) -> float:
+    """Сумма со знаком: приход +, расход −; без направления знак берётся из суммы."""
+    if amount is None:
+        return 0.0
+    if direction == "credit":
+        return abs(amount)
+    if direction == "debit":
+        return -abs(amount)
+    return amount
+
+
+def _party(party: object) -> Tuple[Optional[str], Optional[str]]:
+    if not isinstance(party, dict):
+        return None, None
+    return _text(party.get("inn")), _text(party.get("name"))
+
+
+def _tbank(op: Operation) -> Dict[str, object]:
+    direction = _direction(op.get("typeOfOperation"))
+    inn, name = _party(op.get("counterParty"))
+    if inn is None and name is None:
+        # В выписке v1 контрагент — плательщик для прихода и получатель для расхода
+        inn, name = _party(op.get("payer") if direction == "credit" else op.get("receiver"))
+    amount = _number(op.get("operationAmount"))
+    if amount is None:
+        amount = _number(op.get("accountAmount"))
+    return {
+        "timestamp": _text(op.get("operationDate") or op.get("date") or op.get("chargeDate")),
+        "amount": _signed(amount if amount is not None else _number(op.get("amount")), direction),
+        "currency": _currency(op.get("operationCurrencyDigitalCode") or op.get("currency")),
+        "counterparty_inn": inn,
+        "counterparty_name": name,
+        "purpose": _text(op.get("payPurpose") or op.get("description")),
+        "balance": _number(op.get("balanceAfter")),
+    }
+
+
+def _modulbank(op: Operation) -> Dict[str, object]:
+    return {
+        "timestamp": _text(op.get("executed") or op.get("created") or op.get("date")),
+        "amount": _signed(_number(op.get("amount")), _direction(op.get("category"))),
+        "currency": _currency(op.get("currency")),
+        "counterparty_inn": _text(op.get("contragentInn")),
+        "counterparty_name": _text(op.get("contragentName")),
+        "purpose": _text(op.get("paymentPurpose") or op.get("description")),
+        "balance": _number(op.get("balanceAfter")),
+    }
+
+
+def _alfa(op: Operation) -> Dict[str, object]:
+    direction = _direction(op.get("direction"))
+    amount = op.get("amount")
+    currency = amount.get("currencyName") if isinstance(amount, dict) else op.get("currency")
+    transfer = op.get("rurTransfer") if isinstance(op.get("rurTransfer"), dict) else {}
+    if direction == "credit":
+        inn, name = _text(transfer.get("payerInn")), _text(transfer.get("payerName"))
+    else:
+        inn, name = _text(transfer.get("payeeInn")), _text(transfer.get("payeeName"))
+    return {
+        "timestamp": _text(op.get("operationDate") or op.get("date")),
+        "amount": _signed(_number(amount), direction),
+        "currency": _currency(currency),
+        "counterparty_inn": inn,
+        "counterparty_name": name,
+        "purpose": _text(op.get("paymentPurpose") or op.get("description")),
+        "balance": _number(op.get("balanceAfter")),
+    }
+
+
+_MAPPERS = {"tbank": _tbank, "modulbank": _modulbank, "alfa": _alfa}
+
+
+def normalize_operation(provider: str, account_id: Optional[str], op: Operation) -> Dict[str, object]:
+    """
+    Операция банка в единой схеме NORMALIZED_FIELDS.
+
+    Инварианты: amount > 0 — приход, amount < 0 — расход; date — YYYY-MM-DD или None;
+    currency — буквенный код (RUR и цифровые коды ОКВ приводятся к RUB/USD/EUR/CNY).
+    """
+    fields = _MAPPERS.get(provider, _alfa)(op)
+    timestamp = fields["timestamp"]
+    return {
+        "bank": provider,
+        "account_id": account_id or _text(op.get("accountId") or op.get("bankAccountNumber")),
+        "id": operation_id(op),
+        "date": timestamp[:10] if isinstance(timestamp, str) and len(timestamp) >= 10 else None,
+        **fields,
+    }
@@ -0,0 +1,586 @@
+"""
+Локальное хранилище операций в единой схеме (SQLite) с индексами по дате, контрагенту и сумме.
+"""
+# CHANGE: Загруженные операции сохраняются в SQLite и доступны для запросов без обращения к банку
+# WHY: После ответа tool выписка терялась, и каждый уточняющий вопрос («платежи ИНН X за квартал»,
+#      «все операции больше 500 тыс.») требовал нового запроса в банк и полной передачи агенту
+# QUOTE(TЗ): "persist normalized operations in a local indexed store ... A query tool should filter
+#             and aggregate server-side by date range, counterparty, amount and purpose text"
+# REF: user-036
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import secrets
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .statement_cache import statement_cache_dir
+
+STORE_GROUP_BY = ("none", "counterparty", "day", "month")
+
+EXPORT_FORMATS = ("ndjson", "csv")
+# Строк в одном куске потоковой выгрузки
+EXPORT_CHUNK_ROWS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    scope TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    op_key TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    id TEXT,
+    date TEXT NOT NULL,
+    timestamp TEXT,
+    amount REAL NOT NULL,
+    abs_amount REAL NOT NULL,
+    currency TEXT NOT NULL,
+    counterparty_inn TEXT,
+    counterparty_name TEXT,
+    counterparty_name_lc TEXT,
+    purpose TEXT,
+    purpose_lc TEXT,
+    balance REAL,
+    PRIMARY KEY (scope, account_id, op_key)
+);
+CREATE INDEX IF NOT EXISTS operations_date ON operations (scope, date);
+CREATE INDEX IF NOT EXISTS operations_inn ON operations (scope, counterparty_inn, date);
+CREATE INDEX IF NOT EXISTS operations_amount ON operations (scope, abs_amount);
+CREATE TABLE IF NOT EXISTS coverage (
+    scope TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (scope, account_id, day)
+);
+CREATE TABLE IF NOT EXISTS staged_operations (
+    load_id TEXT NOT NULL,
+    staged_at TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    op_key TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    id TEXT,
+    date TEXT NOT NULL,
+    timestamp TEXT,
+    amount REAL NOT NULL,
+    abs_amount REAL NOT NULL,
+    currency TEXT NOT NULL,
+    counterparty_inn TEXT,
+    counterparty_name TEXT,
+    counterparty_name_lc TEXT,
+    purpose TEXT,
+    purpose_lc TEXT,
+    balance REAL
+);
+CREATE INDEX IF NOT EXISTS staged_operations_load ON staged_operations (load_id);
+CREATE TABLE IF NOT EXISTS exports (
+    export_id TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "id",
+    "bank",
+    "account_id",
+    "date",
+    "timestamp",
+    "amount",
+    "currency",
+    "counterparty_inn",
+    "counterparty_name",
+    "purpose",
+    "balance",
+)
+
+_STORED_COLUMNS = (
+    "scope, account_id, op_key, bank, id, date, timestamp, amount, abs_amount, currency,"
+    " counterparty_inn, counterparty_name, counterparty_name_lc, purpose, purpose_lc, balance"
+)
+
+# Файлы хранилища, для которых уже созданы схема и WAL (get_operation_store создаёт объект на вызов)
+_prepared: Set[str] = set()
+_prepare_lock = threading.Lock()
+
+# Через сколько часов брошенная (не завершённая finish/abort) загрузка удаляется из staged_operations
+STAGED_TTL_HOURS = 24
+
+
+def store_enabled() -> bool:
+    """BANK_STORE = on | off (по умолчанию on)."""
+    return os.getenv("BANK_STORE", "on").lower() not in ("off", "0", "false", "no")
+
+
+def store_scope(provider: str, mode: str, token: str) -> str:
+    """
+    Область данных (банк, режим, токен) в виде хэша: запросы видят только операции,
+    загруженные с тем же токеном.
+    """
+    raw = "|".join(["store", provider, mode, token])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _like(text: str) -> str:
+    escaped = text.casefold().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _money(value: Optional[float]) -> float:
+    return round(float(value or 0.0), 2)
+
+
+@dataclass
+class OperationFilter:
+    """
+    Условия выборки операций.
+
+    Attributes:
+        start, end: Период по дате операции включительно
+        account_id: Счёт; None — все счета области
+        counterparty: ИНН (только цифры) или часть названия контрагента
+        min_amount, max_amount: Границы суммы по модулю
+        direction: in — поступления, out — списания, all — все
+        purpose: Часть текста назначения платежа
+    """
+
+    start: date
+    end: date
+    account_id: Optional[str] = None
+    counterparty: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    direction: str = "all"
+    purpose: Optional[str] = None
+
+    def where(self, scope: str) -> Tuple[str, List[object]]:
+        clauses = ["scope = ?", "date BETWEEN ? AND ?"]
+        params: List[object] = [scope, self.start.isoformat(), self.end.isoformat()]
+        if self.account_id is not None:
+            clauses.append("account_id = ?")
+            params.append(self.account_id)
+        if self.counterparty:
+            if self.counterparty.isdigit():
+                clauses.append("counterparty_inn = ?")
+                params.append(self.counterparty)
+            else:
+                clauses.append("counterparty_name_lc LIKE ? ESCAPE '\\'")
+                params.append(_like(self.counterparty))
+        if self.min_amount is not None:
+            clauses.append("abs_amount >= ?")
+            params.append(self.min_amount)
+        if self.max_amount is not None:
+            clauses.append("abs_amount <= ?")
+            params.append(self.max_amount)
+        if self.direction == "in":
+            clauses.append("amount > 0")
+        elif self.direction == "out":
+            clauses.append("amount < 0")
+        if self.purpose:
+            clauses.append("purpose_lc LIKE ? ESCAPE '\\'")
+            params.append(_like(self.purpose))
+        return " AND ".join(clauses), params
+
+
+class OperationStore:
+    """
+    Файл SQLite с таблицами operations и coverage (и staged_operations для загрузок по частям).
+
+    Инварианты:
+    - операция однозначно определяется (scope, account_id, op_key), повторная загрузка её заменяет;
+    - в coverage попадают только закрытые дни (как в StatementCache), загруженные полностью:
+      без обрезки по страницам и не из отказавшего окна. Только такие дни отдаются без банка.
+    """
+
+    def __init__(self, path: str, closed_lag_days: int = 1) -> None:
+        self.path = path
+        self.closed_lag_days = max(0, closed_lag_days)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path not in _prepared:
+            self._prepare()
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    def _prepare(self) -> None:
+        """Каталог, WAL и схема — один раз на файл за время жизни процесса."""
+        with _prepare_lock:
+            if self.path in _prepared:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with closing(sqlite3.connect(self.path, timeout=30.0)) as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+            _prepared.add(self.path)
+
+    def _stage(
+        self,
+        load_id: str,
+        scope: str,
+        account_id: str,
+        operations: Sequence[Dict[str, object]],
+    ) -> None:
+        staged_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for op in operations:
+            if not isinstance(op.get("date"), str):
+                continue
+            key = op.get("id") or "|".join(
+                str(op.get(name)) for name in ("timestamp", "amount", "counterparty_inn", "purpose")
+            )
+            name, purpose = op.get("counterparty_name"), op.get("purpose")
+            rows.append(
+                (
+                    load_id,
+                    staged_at,
+                    scope,
+                    account_id,
+                    str(key),
+                    op.get("bank"),
+                    op.get("id"),
+                    op["date"],
+                    op.get("timestamp"),
+                    float(op.get("amount") or 0.0),
+                    abs(float(op.get("amount") or 0.0)),
+                    op.get("currency") or "RUB",
+                    op.get("counterparty_inn"),
+                    name,
+                    name.casefold() if isinstance(name, str) else None,
+                    purpose,
+                    purpose.casefold() if isinstance(purpose, str) else None,
+                    op.get("balance"),
+                )
+            )
+        if not rows:
+            return
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT INTO staged_operations VALUES"
+                " (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _commit(self, load_id: str, scope: str, account_id: str, covered: List[str]) -> None:
+        expired = datetime.now(timezone.utc) - timedelta(hours=STAGED_TTL_HOURS)
+        with closing(self._connect()) as connection, connection:
+            # Полностью загруженные дни заменяются целиком: операции, отменённые банком, уходят
+            connection.executemany(
+                "DELETE FROM operations WHERE scope = ? AND account_id = ? AND date = ?",
+                [(scope, account_id, day) for day in covered],
+            )
+            connection.execute(
+                f"INSERT OR REPLACE INTO operations SELECT {_STORED_COLUMNS}"
+                " FROM staged_operations WHERE load_id = ? ORDER BY rowid",
+                (load_id,),
+            )
+            connection.execute(
+                "DELETE FROM staged_operations WHERE load_id = ? OR staged_at < ?",
+                (load_id, expired.isoformat()),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO coverage VALUES (?, ?, ?)",
+                [(scope, account_id, day) for day in covered],
+            )
+
+    def _discard(self, load_id: str) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM staged_operations WHERE load_id = ?", (load_id,))
+
+    def begin_load(self, scope: str, account_id: Optional[str]) -> "StagedLoad":
+        """Сохранение выписки частями по мере загрузки окон (см. StagedLoad)."""
+        return StagedLoad(self, scope, account_id or "")
+
+    async def save(
+        self,
+        scope: str,
+        account_id: Optional[str],
+        start: date,
+        end: date,
+        operations: Sequence[Dict[str, object]],
+        complete: bool,
+        failed_days: Iterable[date] = (),
+        today: Optional[date] = None,
+    ) -> None:
+        """
+        Сохраняет нормализованные операции счёта за [start, end]. complete=False — операции
+        сохраняются, но период не считается покрытым (нужен повторный запрос в банк).
+        """
+        load = self.begin_load(scope, account_id)
+        try:
+            await load.add(operations)
+            await load.finish(start, end, complete, failed_days, today)
+        except BaseException:
+            await load.abort()
+            raise
+
+    def _covered(self, scope: str, account_id: str, start: date, end: date) -> int:
+        with closing(self._connect()) as connection:
+            (count,) = connection.execute(
+                "SELECT COUNT(*) FROM coverage WHERE scope = ? AND account_id = ? AND day BETWEEN ? AND ?",
+                (scope, account_id, start.isoformat(), end.isoformat()),
+            ).fetchone()
+        return int(count)
+
+    async def covers(self, scope: str, account_id: Optional[str], start: date, end: date) -> bool:
+        """Все дни периода загружены полностью и закрыты — запрос можно выполнить без банка."""
+        count = await asyncio.to_thread(self._covered, scope, account_id or "", start, end)
+        return count == (end - start).days + 1
+
+    def _query(
+        self, scope: str, where: OperationFilter, group_by: str, limit: int
+    ) -> Dict[str, object]:
+        condition, params = where.where(scope)
+        with closing(self._connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            totals = [
+                {
+                    "currency": row["currency"],
+                    "operations": row["operations"],
+                    "inflow": _money(row["inflow"]),
+                    "outflow": _money(row["outflow"]),
+                    "net": _money(row["inflow"] - row["outflow"]),
+                }
+                for row in connection.execute(
+                    "SELECT currency, COUNT(*) AS operations,"
+                    " TOTAL(CASE WHEN amount > 0 THEN amount END) AS inflow,"
+                    " TOTAL(CASE WHEN amount < 0 THEN -amount END) AS outflow"
+                    f" FROM operations WHERE {condition} GROUP BY currency ORDER BY currency",
+                    params,
+                )
+            ]
+            matched = sum(int(total["operations"]) for total in totals)
+
+            if group_by == "none":
+                rows = connection.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM operations WHERE {condition}"
+                    " ORDER BY COALESCE(timestamp, date), op_key LIMIT ?",
+                    [*params, limit],
+                ).fetchall()
+                return {
+                    "totals": totals,
+                    "matched": matched,
+                    "truncated": matched > len(rows),
+                    "operations": [dict(row) for row in rows],
+                }
+
+            group = {
+                "counterparty": "COALESCE(counterparty_inn, counterparty_name, '')",
+                "day": "date",
+                "month": "substr(date, 1, 7)",
+            }[group_by]
+            order = "volume DESC" if group_by == "counterparty" else "grp"
+            groups = connection.execute(
+                f"SELECT {group} AS grp, currency, MAX(counterparty_name) AS name, COUNT(*) AS operations,"
+                " TOTAL(CASE WHEN amount > 0 THEN amount END) AS inflow,"
+                " TOTAL(CASE WHEN amount < 0 THEN -amount END) AS outflow,"
+                " TOTAL(abs_amount) AS volume"
+                f" FROM operations WHERE {condition} GROUP BY grp, currency ORDER BY {order} LIMIT ?",
+                [*params, limit + 1],
+            ).fetchall()
+        items = []
+        for row in groups[:limit]:
+            item: Dict[str, object] = {
+                "key": row["grp"],
+                "currency": row["currency"],
+                "operations": row["operations"],
+                "inflow": _money(row["inflow"]),
+                "outflow": _money(row["outflow"]),
+            }
+            if group_by == "counterparty":
+                item["name"] = row["name"]
+            items.append(item)
+        return {
+            "totals": totals,
+            "matched": matched,
+            "truncated": len(groups) > limit,
+            "groups": items,
+        }
+
+    async def query(
+        self, scope: str, where: OperationFilter, group_by: str = "none", limit: int = 100
+    ) -> Dict[str, object]:
+        """
+        Операции (group_by="none") или агрегаты по контрагенту/дню/месяцу и итоги по валютам.
+        Возвращается не больше limit строк; truncated — были ли отброшены строки.
+        """
+        return await asyncio.to_thread(self._query, scope, where, group_by, limit)
+
+    # CHANGE: Выгрузка полной выписки по ссылке вместо встраивания всех операций в ответ tool
+    # WHY: Выписка на 50 тыс. операций превращала результат tool в многомегабайтный JSON для LLM
+    # QUOTE(TЗ): "The full dataset should be exposed as a streamed NDJSON/CSV export resource
+    #             written chunk by chunk."
+    # REF: user-037
+    def _create_export(
+        self, scope: str, account_id: str, start: date, end: date, expires_at: datetime
+    ) -> str:
+        export_id = secrets.token_urlsafe(16)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM exports WHERE expires_at < ?",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+            connection.execute(
+                "INSERT INTO exports VALUES (?, ?, ?, ?, ?, ?)",
+                (export_id, scope, account_id, start.isoformat(), end.isoformat(), expires_at.isoformat()),
+            )
+        return export_id
+
+    async def create_export(
+        self, scope: str, account_id: Optional[str], start: date, end: date, ttl_hours: float = 24.0
+    ) -> str:
+        """
+        Регистрирует выгрузку операций счёта за [start, end] и возвращает её идентификатор.
+        Идентификатор случайный и служит ключом доступа: токен банка для выгрузки не нужен.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=ttl_hours)
+        return await asyncio.to_thread(
+            self._create_export, scope, account_id or "", start, end, expires_at
+        )
+
+    def _find_export(self, export_id: str) -> Optional[Tuple[str, OperationFilter]]:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT scope, account_id, period_start, period_end FROM exports"
+                " WHERE export_id = ? AND expires_at >= ?",
+                (export_id, datetime.now(timezone.utc).isoformat()),
+            ).fetchone()
+        if row is None:
+            return None
+        scope, account_id, start, end = row
+        return scope, OperationFilter(
+            start=date.fromisoformat(start), end=date.fromisoformat(end), account_id=account_id
+        )
+
+    async def find_export(self, export_id: str) -> Optional[Tuple[str, OperationFilter]]:
+        """Область и условия выгрузки; None, если выгрузки нет или срок её действия истёк."""
+        return await asyncio.to_thread(self._find_export, export_id)
+
+    def _export_rows(
+        self,
+        scope: str,
+        where: OperationFilter,
+        after: Optional[Tuple[str, str]],
+        offset: int,
+        limit: int,
+    ) -> List[Tuple[object, ...]]:
+        condition, params = where.where(scope)
+        if after is not None:
+            condition += " AND (COALESCE(timestamp, date), op_key) > (?, ?)"
+            params = [*params, *after]
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                f"SELECT {', '.join(_COLUMNS)}, COALESCE(timestamp, date), op_key"
+                f" FROM operations WHERE {condition}"
+                " ORDER BY COALESCE(timestamp, date), op_key LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+
+    async def export_chunks(
+        self,
+        scope: str,
+        where: OperationFilter,
+        fmt: str,
+        chunk_rows: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Операции в формате ndjson или csv кусками по chunk_rows строк (по умолчанию
+        EXPORT_CHUNK_ROWS): в памяти не держится вся выписка. offset/limit — страница выгрузки
+        (строки после первых offset, не больше limit).
+        """
+        # CHANGE: Каждый кусок читается целиком в своём asyncio.to_thread, курсор между кусками
+        #         не держится — продолжение по ключу сортировки последней строки
+        # WHY: Синхронный генератор держал соединение SQLite между next(), а StreamingResponse и
+        #      iterate_in_threadpool вызывают next() в разных потоках — параллельные выгрузки
+        #      падали с ProgrammingError
+        # REF: user-037
+        chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(_COLUMNS)
+            yield buffer.getvalue()
+        after: Optional[Tuple[str, str]] = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_rows if remaining is None else min(chunk_rows, remaining)
+            rows = await asyncio.to_thread(self._export_rows, scope, where, after, offset, size)
+            if not rows:
+                break
+            offset = 0
+            after = (rows[-1][-2], rows[-1][-1])
+            rows = [row[:-2] for row in rows]
+            if fmt == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows
+                )
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                break
+
+
+class StagedLoad:
+    """
+    Сохранение одной выписки частями: add складывает операции окна в staged_operations по мере
+    загрузки, finish одной транзакцией переносит их в operations и отмечает покрытые дни,
+    abort отбрасывает. До finish запросы query_operations загрузку не видят.
+    """
+
+    def __init__(self, store: OperationStore, scope: str, account_id: str) -> None:
+        self.store = store
+        self.scope = scope
+        self.account_id = account_id
+        self.load_id = secrets.token_hex(16)
+
+    async def add(self, operations: Sequence[Dict[str, object]]) -> None:
+        await asyncio.to_thread(
+            self.store._stage, self.load_id, self.scope, self.account_id, operations
+        )
+
+    async def finish(
+        self,
+        start: date,
+        end: date,
+        complete: bool,
+        failed_days: Iterable[date] = (),
+        today: Optional[date] = None,
+    ) -> None:
+        """complete=False — операции сохраняются, но период не считается покрытым."""
+        today = today or date.today()
+        failed: Set[date] = set(failed_days)
+        covered: List[str] = []
+        if complete:
+            day = start
+            while day <= end:
+                if day < today - timedelta(days=self.store.closed_lag_days) and day not in failed:
+                    covered.append(day.isoformat())
+                day += timedelta(days=1)
+        await asyncio.to_thread(
+            self.store._commit, self.load_id, self.scope, self.account_id, covered
+        )
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(self.store._discard, self.load_id)
+
+
+def get_operation_store() -> OperationStore:
+    """Хранилище в BANK_STORE_PATH (по умолчанию operations.sqlite3 в каталоге кэша выписок)."""
+    return OperationStore(
+        path=os.getenv("BANK_STORE_PATH") or os.path.join(statement_cache_dir(), "operations.sqlite3"),
+        closed_lag_days=int(os.getenv("BANK_CACHE_CLOSED_LAG_DAYS", "1")),
+    )
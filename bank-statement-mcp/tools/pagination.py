@@ -0,0 +1,175 @@
+"""
+Постраничная загрузка операций выписки: offset (skip/records), номер страницы и курсор.
+"""
+# CHANGE: Полная пагинация выписки для всех трёх банков
+# WHY: Модульбанк запрашивался с фиксированным {"records": 50, "skip": 0}, T-Bank и Альфа —
+#      одним GET; по загруженным счетам выписка молча обрезалась
+# QUOTE(TЗ): "cursor/offset pagination for every provider, with pages fetched concurrently where
+#             the API allows it (bounded parallelism, ordered merge)"
+# REF: user-031
+import asyncio
+import itertools
+import os
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional
+
+Operation = Dict[str, object]
+
+
+@dataclass
+class StatementPage:
+    """
+    Одна страница ответа банка.
+
+    Attributes:
+        operations: Операции страницы
+        has_more: Есть ли следующие страницы
+        next_cursor: Курсор следующей страницы (T-Bank)
+        total_pages: Общее число страниц, если банк его сообщает (Альфа)
+    """
+
+    operations: List[Operation]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    total_pages: Optional[int] = None
+
+
+def page_concurrency() -> int:
+    """Число одновременно загружаемых страниц (BANK_PAGE_CONCURRENCY, по умолчанию 4)."""
+    return max(1, int(os.getenv("BANK_PAGE_CONCURRENCY", "4")))
+
+
+def max_pages() -> int:
+    """Предохранитель от бесконечной пагинации (BANK_MAX_PAGES, по умолчанию 1000)."""
+    return max(1, int(os.getenv("BANK_MAX_PAGES", "1000")))
+
+
+async def _ordered_window(
+    requests: Iterator[Awaitable[StatementPage]],
+    concurrency: int,
+) -> AsyncIterator[StatementPage]:
+    """
+    Выполняет запросы страниц скользящим окном из concurrency задач и отдаёт их строго по порядку.
+
+    Инвариант: одновременно в полёте не больше concurrency запросов; после страницы с
+    has_more=False оставшиеся запросы окна отменяются.
+    """
+    pending: Deque["asyncio.Task[StatementPage]"] = deque()
+
+    def fill() -> None:
+        while len(pending) < concurrency:
+            request = next(requests, None)
+            if request is None:
+                return
+            pending.append(asyncio.ensure_future(request))
+
+    try:
+        fill()
+        while pending:
+            page = await pending.popleft()
+            yield page
+            if not page.has_more:
+                return
+            fill()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def iter_offset_pages(
+    fetch: Callable[[int, int], Awaitable[List[Operation]]],
+    page_size: int,
+    concurrency: int,
+) -> AsyncIterator[StatementPage]:
+    """
+    Пагинация skip/records (Модульбанк). Общее число записей банк не сообщает, поэтому первая
+    страница запрашивается одна, а дальше — окном по concurrency смещений; короткая страница
+    означает конец выписки.
+    """
+
+    async def load(skip: int) -> StatementPage:
+        operations = await fetch(skip, page_size)
+        return StatementPage(operations=operations, has_more=len(operations) >= page_size)
+
+    first = await load(0)
+    yield first
+    if not first.has_more:
+        return
+    offsets = itertools.count(page_size, page_size)
+    async with aclosing(_ordered_window((load(skip) for skip in offsets), concurrency)) as window:
+        async for page in window:
+            yield page
+
+
+async def iter_numbered_pages(
+    fetch: Callable[[int], Awaitable[StatementPage]],
+    concurrency: int,
+) -> AsyncIterator[StatementPage]:
+    """
+    Пагинация по номеру страницы (Альфа). Если банк вернул total_pages, остальные страницы
+    загружаются параллельно, иначе — последовательно по признаку has_more.
+    """
+    first = await fetch(1)
+    yield first
+    if not first.has_more:
+        return
+    if first.total_pages:
+        numbers: Iterator[int] = iter(range(2, first.total_pages + 1))
+    else:
+        numbers = itertools.count(2)
+        concurrency = 1
+    async with aclosing(_ordered_window((fetch(number) for number in numbers), concurrency)) as window:
+        async for page in window:
+            yield page
+
+
+async def iter_cursor_pages(
+    fetch: Callable[[Optional[str]], Awaitable[StatementPage]],
+) -> AsyncIterator[StatementPage]:
+    """Пагинация по курсору (T-Bank): следующий курсор известен только после ответа, поэтому последовательно."""
+    cursor: Optional[str] = None
+    while True:
+        page = await fetch(cursor)
+        yield page
+        if not page.has_more or not page.next_cursor:
+            return
+        cursor = page.next_cursor
+
+
+@dataclass
+class StatementAccumulator:
+    """
+    Приёмник страниц выписки: операции складываются постранично по мере загрузки.
+
+    Attributes:
+        limit_pages: Максимум страниц, после которого загрузка останавливается
+        operations: Операции в порядке страниц
+        pages: Число загруженных страниц
+        truncated: Загрузка остановлена по limit_pages, хотя банк сообщал о следующих страницах
+    """
+
+    limit_pages: int = field(default_factory=max_pages)
+    operations: List[Operation] = field(default_factory=list)
+    pages: int = 0
+    truncated: bool = False
+
+    def add_page(self, page: StatementPage) -> bool:
+        """Добавляет страницу; False — достигнут лимит страниц и загрузку нужно прекратить."""
+        self.operations.extend(page.operations)
+        self.pages += 1
+        if page.has_more and self.pages >= self.limit_pages:
+            self.truncated = True
+            return False
+        return True
+
+    async def consume(self, pages: AsyncIterator[StatementPage]) -> "StatementAccumulator":
+        """Забирает страницы из итератора, при остановке закрывает его и отменяет запросы в полёте."""
+        async with aclosing(pages):
+            async for page in pages:
+                if not self.add_page(page):
+                    break
+        return self
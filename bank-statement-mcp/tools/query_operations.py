@@ -0,0 +1,207 @@
+"""
+Запросы к локальному хранилищу операций: фильтры и агрегаты без повторной выгрузки из банка.
+"""
+# CHANGE: Tool выборки из хранилища операций
+# WHY: Уточняющие вопросы по выписке («платежи ИНН X за квартал», «все операции больше 500 тыс.»)
+#      выполнялись новым запросом в банк и полной передачей выписки агенту
+# QUOTE(TЗ): "follow-ups take milliseconds with no upstream traffic"
+# REF: user-036
+from typing import Optional, Tuple, Union
+
+from fastmcp import Context
+from mcp.shared.exceptions import McpError
+from mcp.types import TextContent
+from opentelemetry import trace
+from pydantic import Field
+
+from mcp_instance import mcp
+from .operation_store import (
+    STORE_GROUP_BY,
+    OperationFilter,
+    get_operation_store,
+    store_enabled,
+    store_scope,
+)
+from .statement_source import (
+    bank_error,
+    current_mode,
+    load_statement,
+    normalize_account_id,
+    require_account,
+    resolve_provider,
+    resolve_token,
+)
+from .utils import NoopContext, ToolResult, format_error
+from .windows import parse_period
+
+tracer = trace.get_tracer(__name__)
+
+MAX_LIMIT = 1000
+
+
+def _optional(value: object, kind: Union[type, Tuple[type, ...]]) -> Optional[object]:
+    """Значение параметра нужного типа; FieldInfo при прямом вызове .fn и пустые строки — None."""
+    if isinstance(value, bool) or not isinstance(value, kind):
+        return None
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+
+@mcp.tool(
+    name="query_operations",
+    description="""Поиск и агрегаты по операциям расчётного счёта за период: по контрагенту (ИНН или часть
+названия), сумме, направлению и тексту назначения платежа. Операции хранятся локально после первой
+загрузки выписки, повторные запросы за загруженный период выполняются без обращения к банку.""",
+)
+async def query_operations(
+    from_date: str = Field(..., description="Дата начала в формате YYYY-MM-DD"),
+    to_date: str = Field(..., description="Дата конца в формате YYYY-MM-DD"),
+    account_id: Optional[str] = Field(None, description="ID счёта (опционально, если несколько)"),
+    bank_provider: Optional[str] = Field(
+        default=None,
+        description="Банк для запроса: tbank | modulbank | alfa. Если не указано — используется BANK_PROVIDER из окружения.",
+    ),
+    counterparty: Optional[str] = Field(None, description="ИНН контрагента или часть его названия"),
+    min_amount: Optional[float] = Field(None, description="Минимальная сумма операции (по модулю)"),
+    max_amount: Optional[float] = Field(None, description="Максимальная сумма операции (по модулю)"),
+    direction: str = Field("all", description="in — поступления, out — списания, all — все"),
+    purpose: Optional[str] = Field(None, description="Часть текста назначения платежа"),
+    group_by: str = Field(
+        "none", description="none — список операций, counterparty | day | month — агрегаты"
+    ),
+    limit: int = Field(100, description="Максимум строк в ответе (1–1000)"),
+    ctx: Optional[Context] = None,
+) -> ToolResult:
+    """
+    Возвращает выборку операций или агрегаты в structured_content.
+
+    Args:
+        from_date: Дата начала периода в формате YYYY-MM-DD
+        to_date: Дата конца периода в формате YYYY-MM-DD
+        account_id: Опциональный ID счёта
+        bank_provider: Банк, если не задан BANK_PROVIDER
+        counterparty: ИНН или часть названия контрагента
+        min_amount: Нижняя граница суммы по модулю
+        max_amount: Верхняя граница суммы по модулю
+        direction: Направление операций
+        purpose: Текст назначения платежа
+        group_by: Группировка
+        limit: Максимум строк
+        ctx: Context для логирования и прогресса
+
+    Returns:
+        ToolResult с content, structured_content (totals, operations или groups) и meta
+
+    Raises:
+        McpError: При ошибках валидации (-32602) или API (-32603)
+    """
+    direction = direction if isinstance(direction, str) else "all"
+    group_by = group_by if isinstance(group_by, str) else "none"
+    limit = limit if isinstance(limit, int) else 100
+    if direction not in ("in", "out", "all"):
+        raise format_error("direction должен быть in | out | all", code=-32602)
+    if group_by not in STORE_GROUP_BY:
+        raise format_error("group_by должен быть none | counterparty | day | month", code=-32602)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise format_error(f"limit должен быть от 1 до {MAX_LIMIT}", code=-32602)
+    if not store_enabled():
+        raise format_error("Локальное хранилище операций отключено (BANK_STORE=off)", code=-32602)
+
+    provider = resolve_provider(bank_provider)
+    mode = current_mode()
+    token = resolve_token(provider, mode)
+
+    safe_ctx = ctx or NoopContext()
+
+    normalized_account_id = normalize_account_id(account_id)
+    require_account(provider, normalized_account_id)
+    start, end = parse_period(from_date, to_date)
+    where = OperationFilter(
+        start=start,
+        end=end,
+        account_id=normalized_account_id or "",
+        counterparty=_optional(counterparty, str),
+        min_amount=_optional(min_amount, (int, float)),
+        max_amount=_optional(max_amount, (int, float)),
+        direction=direction,
+        purpose=_optional(purpose, str),
+    )
+
+    with tracer.start_as_current_span("query_operations") as span:
+        span.set_attribute("bank", provider)
+        span.set_attribute("from_date", from_date)
+        span.set_attribute("to_date", to_date)
+        span.set_attribute("group_by", group_by)
+
+        store = get_operation_store()
+        scope = store_scope(provider, mode, token)
+        source = "store"
+        statement = None
+        if not await store.covers(scope, normalized_account_id, start, end):
+            # Период ещё не загружен (или включает незакрытые дни) — догружаем через общий загрузчик,
+            # он сохранит операции в хранилище
+            source = "bank"
+            await safe_ctx.info(f"📡 Загрузка выписки {provider.upper()} за {from_date} — {to_date}")
+            try:
+                loaded = await load_statement(
+                    provider=provider,
+                    token=token,
+                    mode=mode,
+                    account_id=normalized_account_id,
+                    from_date=from_date,
+                    to_date=to_date,
+                    ctx=safe_ctx,
+                )
+            except McpError:
+                raise
+            except Exception as error:
+                mcp_error = bank_error(error)
+                await safe_ctx.error(f"❌ {mcp_error.error.message}: {error}")
+                raise mcp_error from error
+            statement = loaded.statement
+
+        result = await store.query(scope, where, group_by=group_by, limit=limit)
+        span.set_attribute("source", source)
+        span.set_attribute("matched", result["matched"])
+        await safe_ctx.info(f"✅ Найдено операций: {result['matched']}")
+
+        lines = [
+            f"Операции {provider.upper()} за {from_date}–{to_date}: найдено {result['matched']}"
+        ]
+        for total in result["totals"]:
+            lines.append(
+                f"{total['currency']}: 📈 {total['inflow']:,.2f}, 📉 {total['outflow']:,.2f}, "
+                f"сальдо {total['net']:+,.2f}"
+            )
+        if result["truncated"]:
+            lines.append(f"Показаны первые {limit} строк")
+        # CHANGE: Неполная загрузка из банка видна в ответе, как в get_bank_statement
+        # WHY: Итоги по выписке с незагруженными окнами выглядели полными
+        # REF: user-036
+        failed_windows = statement.failed_windows() if statement is not None else []
+        statement_truncated = bool(statement is not None and statement.truncated)
+        if failed_windows:
+            failed = ", ".join(f"{w['from']}–{w['to']}" for w in failed_windows)
+            lines.append(f"⚠️ Выписка неполная, не загружены периоды: {failed}")
+            await safe_ctx.error(f"⚠️ Не удалось загрузить периоды: {failed}")
+        if statement_truncated:
+            lines.append("⚠️ Выписка обрезана по BANK_MAX_PAGES, итоги неполные")
+
+        return ToolResult(
+            content=[TextContent(type="text", text="\n".join(lines))],
+            structured_content={
+                "bank": provider,
+                "period": {"from": from_date, "to": to_date},
+                **result,
+            },
+            meta={
+                "mode": mode,
+                "bank": provider,
+                "source": source,
+                "matched": result["matched"],
+                "truncated": result["truncated"],
+                "failed_windows": failed_windows,
+                "statement_truncated": statement_truncated,
+            },
+        )
@@ -0,0 +1,95 @@
+"""
+Ограничение размера ответа tool: top-N операций в тексте и лимит операций в structured_content.
+"""
+# CHANGE: Текст и structured_content выписки ограничены по числу операций
+# WHY: _format_tbank_statement выводил строку на каждую операцию с разбором даты, а structured_content
+#      содержал весь список — выписка на 50 тыс. операций превращалась в многомегабайтный ответ для LLM
+# QUOTE(TЗ): "We want rendering capped at a configurable top-N with aggregated totals for the rest."
+# REF: user-037
+import heapq
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Tuple
+
+Operation = Dict[str, object]
+
+
+def render_top_n() -> int:
+    """BANK_RENDER_TOP_N — сколько операций выводится в human_text (по умолчанию 50)."""
+    return max(0, int(os.getenv("BANK_RENDER_TOP_N", "50")))
+
+
+def inline_operations_limit() -> int:
+    """BANK_INLINE_OPERATIONS — сколько операций встраивается в structured_content (по умолчанию 500)."""
+    return max(0, int(os.getenv("BANK_INLINE_OPERATIONS", "500")))
+
+
+@dataclass
+class TopOperations:
+    """
+    Крупнейшие операции и итоги по остальным.
+
+    Attributes:
+        shown: Крупнейшие по модулю суммы операции в исходном порядке
+        rest_count: Сколько операций не показано
+        rest_inflow: Поступления по непоказанным операциям
+        rest_outflow: Списания по непоказанным операциям (положительное число)
+    """
+
+    shown: List[Operation] = field(default_factory=list)
+    rest_count: int = 0
+    rest_inflow: float = 0.0
+    rest_outflow: float = 0.0
+
+
+class TopCollector:
+    """
+    top-N операций по модулю суммы по мере поступления: в памяти только N операций (min-heap),
+    вытесненные сразу суммируются в итоги. При равных суммах остаётся более ранняя операция.
+    signed_amount — сумма со знаком (приход +, расход −) в формате банка.
+    """
+
+    def __init__(self, limit: int, signed_amount: Callable[[Operation], float]) -> None:
+        self.limit = max(0, limit)
+        self.signed_amount = signed_amount
+        self._heap: List[Tuple[float, int, float, Operation]] = []
+        self._seq = 0
+        self._rest = TopOperations()
+
+    def add(self, operation: Operation) -> None:
+        amount = self.signed_amount(operation)
+        item = (abs(amount), -self._seq, amount, operation)
+        self._seq += 1
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+            return
+        if self.limit:
+            item = heapq.heappushpop(self._heap, item)
+        evicted = item[2]
+        self._rest.rest_count += 1
+        if evicted >= 0:
+            self._rest.rest_inflow += evicted
+        else:
+            self._rest.rest_outflow -= evicted
+
+    def result(self) -> TopOperations:
+        """Крупнейшие операции в порядке поступления и итоги по остальным."""
+        return TopOperations(
+            shown=[item[3] for item in sorted(self._heap, key=lambda item: -item[1])],
+            rest_count=self._rest.rest_count,
+            rest_inflow=self._rest.rest_inflow,
+            rest_outflow=self._rest.rest_outflow,
+        )
+
+
+def select_top(
+    operations: Sequence[Operation], limit: int, signed_amount: Callable[[Operation], float]
+) -> TopOperations:
+    """
+    top-N операций по модулю суммы за O(n log N); остальные только суммируются.
+    signed_amount — сумма со знаком (приход +, расход −) в формате банка.
+    """
+    collector = TopCollector(limit, signed_amount)
+    for operation in operations:
+        collector.add(operation)
+    return collector.result()
@@ -0,0 +1,223 @@
+"""
+Инкрементальный локальный кэш выписок: закрытые банковские дни хранятся неизменяемыми сегментами.
+"""
+# CHANGE: Кэш выписки по (банк, счёт) с сегментами на каждый закрытый день
+# WHY: Прошедшие банковские дни не меняются, а каждый вызов get_bank_statement заново
+#      выгружал весь период из банка
+# QUOTE(TЗ): "keeps closed days permanently and only fetches the missing days plus \"today\" from
+#             upstream. It should merge the segments on read"
+# REF: user-033
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import AbstractSet, Awaitable, Callable, Dict, List, Optional, Set
+
+from .pagination import Operation
+from .windows import StatementFold, Window, WindowedStatement, WindowSink, operation_day
+
+# Сколько закрытых дней читать из кэша за один раз
+CACHE_READ_DAYS = 31
+
+
+def cache_enabled() -> bool:
+    """BANK_CACHE = on | off (по умолчанию on)."""
+    return os.getenv("BANK_CACHE", "on").lower() not in ("off", "0", "false", "no")
+
+
+def cache_key(provider: str, mode: str, token: str, account_id: Optional[str]) -> str:
+    """
+    Ключ кэша (банк, режим, токен, счёт) в виде хэша: номер счёта и токен не попадают в пути.
+    Токен входит в ключ, чтобы выписки разных клиентов без account_id не смешивались.
+    """
+    raw = "|".join([provider, mode, token, account_id or "default"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class CachedStatement(WindowedStatement):
+    """Выписка, собранная из кэшированных сегментов и догруженных из банка дней."""
+
+    cached_days: int = 0
+    fetched_days: int = 0
+
+
+class StatementCache:
+    """
+    Каталог сегментов {directory}/{key}/{YYYY-MM-DD}.json.
+
+    Инварианты:
+    - сегмент пишется только для закрытого дня (старше closed_lag_days от сегодня) и только если
+      окно, в котором он загружен, получено полностью (без обрезки и без отказавших окон);
+    - записанный сегмент не меняется, запись атомарная (временный файл + os.replace);
+    - пустой закрытый день тоже сохраняется, чтобы не запрашивать его повторно.
+    """
+
+    def __init__(self, directory: str, closed_lag_days: int = 1) -> None:
+        self.directory = directory
+        self.closed_lag_days = max(0, closed_lag_days)
+
+    def is_closed(self, day: date, today: Optional[date] = None) -> bool:
+        today = today or date.today()
+        return day < today - timedelta(days=self.closed_lag_days)
+
+    def _segment_path(self, key: str, day: date) -> str:
+        return os.path.join(self.directory, key, f"{day.isoformat()}.json")
+
+    def _cached_days(self, key: str, days: List[date]) -> List[date]:
+        return [day for day in days if os.path.exists(self._segment_path(key, day))]
+
+    def _read_segments(self, key: str, days: List[date]) -> Dict[date, List[Operation]]:
+        segments: Dict[date, List[Operation]] = {}
+        for day in days:
+            try:
+                with open(self._segment_path(key, day), "r", encoding="utf-8") as handle:
+                    segments[day] = json.load(handle)["operations"]
+            except (OSError, ValueError, KeyError):
+                continue
+        return segments
+
+    def _write_segments(self, key: str, segments: Dict[date, List[Operation]]) -> None:
+        folder = os.path.join(self.directory, key)
+        os.makedirs(folder, exist_ok=True)
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        for day, operations in segments.items():
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(
+                    {"day": day.isoformat(), "fetched_at": fetched_at, "operations": operations},
+                    handle,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self._segment_path(key, day))
+
+    async def _store_window(
+        self,
+        key: str,
+        window: Window,
+        operations: List[Operation],
+        today: date,
+        skip_days: AbstractSet[date] = frozenset(),
+    ) -> None:
+        """Пишет сегменты закрытых дней полностью загруженного окна."""
+        window_start, window_end = window
+        fresh: Dict[date, List[Operation]] = {}
+        for operation in operations:
+            day = operation_day(operation)
+            # Операции без даты нельзя отнести к сегменту — такое окно не кэшируем
+            if day is None:
+                return
+            # Граница суток у банка может не совпадать с датой в строке (часовой пояс):
+            # операция хранится в окне, в котором была получена
+            day = min(max(day, window_start), window_end)
+            fresh.setdefault(day, []).append(operation)
+        to_write: Dict[date, List[Operation]] = {}
+        for offset in range((window_end - window_start).days + 1):
+            day = window_start + timedelta(days=offset)
+            if self.is_closed(day, today) and day not in skip_days:
+                to_write[day] = fresh.get(day, [])
+        if to_write:
+            await asyncio.to_thread(self._write_segments, key, to_write)
+
+    async def load(
+        self,
+        key: str,
+        start: date,
+        end: date,
+        fetch_range: Callable[[date, date, Optional[WindowSink]], Awaitable[WindowedStatement]],
+        today: Optional[date] = None,
+        fold: Optional[StatementFold] = None,
+    ) -> CachedStatement:
+        """
+        Складывает выписку за [start, end] в fold: закрытые дни читаются из кэша по
+        CACHE_READ_DAYS дней, остальные — запросом fetch_range на каждый непрерывный отрезок
+        недостающих дней. Загруженные окна пишутся в кэш и передаются в fold по мере готовности.
+
+        Без fold операции собираются в result.operations (упорядочены по дням).
+        """
+        today = today or date.today()
+        collect = fold is None
+        fold = fold if fold is not None else StatementFold()
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        closed = [day for day in days if self.is_closed(day, today)]
+        cached: Set[date] = set()
+        for chunk_start in range(0, len(closed), CACHE_READ_DAYS):
+            chunk = await asyncio.to_thread(
+                self._cached_days, key, closed[chunk_start : chunk_start + CACHE_READ_DAYS]
+            )
+            if not chunk:
+                continue
+            segments = await asyncio.to_thread(self._read_segments, key, chunk)
+            # Нечитаемый сегмент догружается из банка, как отсутствующий
+            cached.update(segments)
+            operations = [operation for day in sorted(segments) for operation in segments[day]]
+            await fold.add((chunk[0], chunk[-1]), operations, True)
+        missing = [day for day in days if day not in cached]
+
+        result = CachedStatement(cached_days=len(cached), fetched_days=len(missing))
+
+        async def on_window(window: Window, operations: List[Operation], complete: bool) -> None:
+            if complete:
+                await self._store_window(key, window, operations, today)
+            await fold.add(window, operations, complete)
+
+        ranges = _runs(missing)
+        fetched = await asyncio.gather(
+            *(fetch_range(range_start, range_end, on_window) for range_start, range_end in ranges)
+        )
+        for window, part in zip(ranges, fetched):
+            result.pages += part.pages
+            result.windows += part.windows
+            result.duplicates += part.duplicates
+            result.truncated = result.truncated or part.truncated
+            result.failed.extend(part.failed)
+            # fetch_range без on_window вернул операции отрезка одним списком
+            if part.operations:
+                if not part.truncated:
+                    await self._store_window(key, window, part.operations, today, failed_days(part))
+                await fold.add(window, part.operations, not part.truncated)
+
+        if collect:
+            result.operations = fold.operations
+            result.duplicates += fold.duplicates
+        return result
+
+
+def _runs(days: List[date]) -> List[Window]:
+    """Непрерывные отрезки из отсортированного списка дней."""
+    runs: List[Window] = []
+    for day in days:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def failed_days(part: WindowedStatement) -> Set[date]:
+    """Дни из окон, которые не удалось загрузить."""
+    days: Set[date] = set()
+    for failure in part.failed:
+        day = date.fromisoformat(failure.from_date)
+        last = date.fromisoformat(failure.to_date)
+        while day <= last:
+            days.add(day)
+            day += timedelta(days=1)
+    return days
+
+
+def statement_cache_dir() -> str:
+    """BANK_CACHE_DIR (по умолчанию во временном каталоге системы)."""
+    return os.getenv("BANK_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bank-statement-mcp"))
+
+
+def get_statement_cache() -> StatementCache:
+    """Кэш в BANK_CACHE_DIR (по умолчанию во временном каталоге системы)."""
+    return StatementCache(
+        directory=statement_cache_dir(),
+        closed_lag_days=int(os.getenv("BANK_CACHE_CLOSED_LAG_DAYS", "1")),
+    )
+
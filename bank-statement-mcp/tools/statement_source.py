@@ -0,0 +1,624 @@
+"""
+Источник выписок: выбор банка и токена, загрузка операций счёта из T‑Bank, Модульбанка и Альфа-Банка.
+Используется tools get_bank_statement и get_consolidated_statement.
+"""
+# CHANGE: Загрузка выписки вынесена из tool get_bank_statement в общий модуль
+# WHY: Сводная выписка по нескольким счетам и банкам должна использовать те же пагинацию,
+#      окна и кэш, что и выписка по одному счёту
+# QUOTE(TЗ): "discovers or accepts all accounts across the configured providers, fetches them concurrently"
+# REF: user-034
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+from mcp.shared.exceptions import ErrorData, McpError
+
+from metrics import record_statement
+from . import mocks
+from .pagination import (
+    StatementAccumulator,
+    StatementPage,
+    iter_cursor_pages,
+    iter_numbered_pages,
+    iter_offset_pages,
+    page_concurrency,
+)
+from .http_clients import CircuitOpenError, ProviderClient, get_http_clients
+from .normalize import normalize_operation
+from .operation_store import StagedLoad, get_operation_store, store_enabled, store_scope
+from .statement_cache import cache_enabled, cache_key, failed_days, get_statement_cache
+from .utils import NoopContext, decode_json, format_error, require_env_vars
+from .windows import (
+    StatementFold,
+    Window,
+    WindowedStatement,
+    WindowSink,
+    fetch_windows,
+    parse_period,
+    split_period,
+    window_unit,
+)
+
+PROVIDERS = ("tbank", "modulbank", "alfa")
+
+# CHANGE: Размер страницы для каждого банка
+# WHY: Модульбанк отдаёт не больше 50 записей за запрос, T-Bank — до 5000, у Альфы постраничный вывод
+# REF: user-031, modulbankv1.json ("Кол-во возвращаемых записей. От 0 до 50")
+PAGE_SIZE: Dict[str, int] = {"tbank": 1000, "modulbank": 50, "alfa": 100}
+
+URL_MAP: Dict[str, str] = {
+    "tbank": "https://business-api.tinkoff.ru/api/v1/statement",
+    "modulbank": "https://api.modulbank.ru/v1",
+    "alfa": "https://api.alfabank.ru/statement/v2",
+}
+
+# Списки счетов: у Альфы в используемом API метода нет, выписка берётся по счёту ключа
+ACCOUNTS_URL_MAP: Dict[str, str] = {
+    "tbank": "https://business-api.tinkoff.ru/api/v4/bank-accounts",
+    "tbank_sandbox": "https://business.tbank.ru/openapi/sandbox/api/v4/bank-accounts",
+    "modulbank": "https://api.modulbank.ru/v1/account-info",
+}
+
+
+def api_url(url: str) -> str:
+    """
+    URL банка. При BANK_API_BASE_URL запрос уходит на эмулятор банков (benchmarks/fake_bank.py):
+    https://host/path превращается в {BANK_API_BASE_URL}/host/path.
+    """
+    # CHANGE: Сервер можно направить на локальный эмулятор API банков
+    # WHY: Поведение на выписках в 100 тыс. операций и при задержках банка нужно измерять локально
+    # QUOTE(TЗ): "the server should be pointable at it"
+    # REF: user-041
+    base = os.getenv("BANK_API_BASE_URL", "").rstrip("/")
+    if not base:
+        return url
+    parsed = urlsplit(url)
+    return f"{base}/{parsed.netloc}{parsed.path}"
+
+
+def resolve_provider(bank_provider: Optional[str]) -> str:
+    """Банк из параметра вызова или BANK_PROVIDER; McpError(-32602), если банк не поддерживается."""
+    explicit_provider = bank_provider if isinstance(bank_provider, str) else None
+    provider_source = explicit_provider or os.getenv("BANK_PROVIDER", "")
+    provider = provider_source.lower() if isinstance(provider_source, str) else ""
+    if provider not in PROVIDERS:
+        raise format_error("Укажите BANK_PROVIDER: tbank|modulbank|alfa", code=-32602)
+    return provider
+
+
+def current_mode() -> str:
+    return os.getenv("MODE", "test").lower()
+
+
+def token_var(provider: str) -> str:
+    return "T_BANK_TOKEN" if provider == "tbank" else f"{provider.upper()}_TOKEN"
+
+
+def resolve_token(provider: str, mode: str) -> str:
+    """Токен банка; для песочницы Модульбанка — sandbox токен без обязательного env."""
+    if provider == "modulbank" and mode == "test":
+        # CHANGE: Для песочницы используем дефолтный sandbox токен без обязательного env
+        # WHY: Документация запрещает реальные токены, нужно sandboxtoken
+        # QUOTE(TЗ): "Вместо реальных идентификаторов ... sandboxtoken"
+        # REF: modulbankv1.json
+        return os.getenv("MODULBANK_SANDBOX_TOKEN", "sandboxtoken")
+    name = token_var(provider)
+    return require_env_vars([name])[name]
+
+
+def configured_providers(mode: str) -> List[str]:
+    """Банки, для которых задан токен (в test режиме Модульбанк доступен через песочницу)."""
+    return [
+        provider
+        for provider in PROVIDERS
+        if os.getenv(token_var(provider)) or (provider == "modulbank" and mode == "test")
+    ]
+
+
+def normalize_account_id(account_id: Optional[str]) -> Optional[str]:
+    return account_id.strip() if isinstance(account_id, str) and account_id.strip() else None
+
+
+def require_account(provider: str, account_id: Optional[str]) -> None:
+    if provider == "modulbank" and not account_id:
+        # CHANGE: Ранний валидатор account_id для Модульбанка
+        # WHY: Путь /operation-history/{accountId} без идентификатора возвращает 400, нужно ловить раньше
+        # QUOTE(TЗ): "для запроса просмотра истории операций ... accountId обязателен"
+        # REF: modulbankv1.json
+        raise format_error("Для Модульбанка нужно указать account_id", code=-32602)
+
+
+def bank_error(error: Exception) -> McpError:
+    """Ошибка загрузки выписки в виде McpError(-32603)."""
+    if isinstance(error, McpError):
+        return error
+    if isinstance(error, CircuitOpenError):
+        return McpError(
+            ErrorData(
+                code=-32603,
+                message=(
+                    f"Банк {error.provider} временно недоступен после серии ошибок, "
+                    f"повторите через {error.retry_after:.0f} с"
+                ),
+            )
+        )
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code if error.response else 0
+        return McpError(ErrorData(code=-32603, message=f"Банк вернул ошибку {status_code}"))
+    return McpError(ErrorData(code=-32603, message="Не удалось получить выписку"))
+
+
+@dataclass
+class LoadedStatement:
+    """
+    Выписка одного счёта.
+
+    Attributes:
+        provider: Банк
+        mode: test | sandbox | prod (как в meta.mode)
+        account_id: Счёт, если указан
+        operations: Операции в формате банка по дате (не больше keep из load_statement)
+        total: Сколько всего операций в выписке; None — len(operations)
+        statement: Сведения о загрузке (страницы, окна, кэш); None для заглушек
+        mock_payload: Полный ответ заглушки в test режиме
+    """
+
+    provider: str
+    mode: str
+    account_id: Optional[str]
+    operations: List[Dict[str, object]] = field(default_factory=list)
+    total: Optional[int] = None
+    statement: Optional[WindowedStatement] = None
+    mock_payload: Optional[Dict[str, object]] = None
+
+    @property
+    def total_operations(self) -> int:
+        return self.total if self.total is not None else len(self.operations)
+
+    def meta(self) -> Dict[str, object]:
+        """Поля meta о загрузке: страницы, окна, дубликаты, кэш."""
+        if self.statement is None:
+            return {
+                "mode": self.mode,
+                "total_operations": self.total_operations,
+                "bank": self.provider,
+                "pages_fetched": 0,
+                "truncated": False,
+            }
+        statement = self.statement
+        cache_meta: Dict[str, object] = {"enabled": False}
+        if hasattr(statement, "cached_days"):
+            cache_meta = {
+                "enabled": True,
+                "cached_days": statement.cached_days,
+                "fetched_days": statement.fetched_days,
+            }
+        return {
+            "mode": self.mode,
+            "total_operations": self.total_operations,
+            "bank": self.provider,
+            "pages_fetched": statement.pages,
+            "truncated": statement.truncated,
+            "windows": statement.windows,
+            "duplicates_removed": statement.duplicates,
+            "failed_windows": statement.failed_windows(),
+            "cache": cache_meta,
+        }
+
+
+async def load_statement(
+    *,
+    provider: str,
+    token: str,
+    mode: str,
+    account_id: Optional[str],
+    from_date: str,
+    to_date: str,
+    ctx: NoopContext,
+    keep: Optional[int] = None,
+    observers: Sequence[Callable[[Dict[str, object]], None]] = (),
+) -> LoadedStatement:
+    """
+    Загружает выписку счёта: заглушка в test режиме для Альфы, песочницы T-Bank и Модульбанка
+    в test режиме, иначе боевой API. Ошибки банка пробрасываются как есть (см. bank_error).
+
+    Окна складываются в StatementFold по мере загрузки: в loaded.operations остаются первые
+    по дате keep операций (None — все), каждая операция выписки передаётся observers.
+    """
+    period_start, period_end = parse_period(from_date, to_date)
+    sandbox = mode == "test"
+
+    if sandbox and provider not in ["modulbank", "tbank"]:
+        mock_payload = mocks.get_bank_statement_mock(
+            provider=provider,
+            from_date=from_date,
+            to_date=to_date,
+            account_id=account_id,
+        )
+        operations = mock_payload.get("operations", [])
+        for operation in operations:
+            for observer in observers:
+                observer(operation)
+        loaded = LoadedStatement(
+            provider=provider,
+            mode="test",
+            account_id=account_id,
+            operations=operations,
+            mock_payload=mock_payload,
+        )
+        store_load = _begin_store(provider, mode, token, account_id)
+        if store_load is not None:
+            await store_load.add_window((period_start, period_end), operations, True)
+            await store_load.finish(period_start, period_end, complete=True, failed=(), ctx=ctx)
+        return loaded
+
+    headers = (
+        {"X-API-Key": token} if provider == "alfa" else {"Authorization": f"Bearer {token}"}
+    )
+
+    async def fetch_window(window_from: str, window_to: str) -> StatementAccumulator:
+        if provider == "modulbank":
+            # CHANGE: В тестовом режиме ходим в sandbox Модульбанка вместо локальных моков
+            # WHY: Нужно получать реальные ответы песочницы для проверки совместимости
+            # QUOTE(TЗ): "если запрос идет к модульбанку и в режиме тест то нужно отдавать запрос к модульбанку в режиме песочницы"
+            # REF: user-message
+            return await _fetch_modulbank_history(
+                base_url=api_url(URL_MAP["modulbank"]),
+                token=token,
+                account_id=account_id,
+                from_date=window_from,
+                to_date=window_to,
+                sandbox=sandbox,
+                ctx=ctx,
+            )
+        if provider == "tbank" and sandbox:
+            return await _fetch_tbank_sandbox(
+                account_number=account_id,
+                from_date=window_from,
+                to_date=window_to,
+                ctx=ctx,
+            )
+        params: Dict[str, str] = {"from": window_from, "to": window_to}
+        if account_id:
+            params["accountId"] = account_id
+        client = get_http_clients().client(provider)
+        if provider == "tbank":
+            return await _fetch_tbank_pages(
+                client=client, url=api_url(URL_MAP[provider]), headers=headers, params=params
+            )
+        return await _fetch_alfa_pages(
+            client=client, url=api_url(URL_MAP[provider]), headers=headers, params=params
+        )
+
+    # CHANGE: Длинный период загружается окнами (BANK_WINDOW), каждое окно повторяется отдельно
+    # WHY: Таймаут одного большого запроса за год заставлял перезапрашивать весь период
+    # QUOTE(TЗ): "A single failed window should not force a full refetch."
+    # REF: user-032
+    # Песочница Модульбанка игнорирует даты (работают только records и skip) — окно одно
+    unit = "none" if provider == "modulbank" and sandbox else window_unit()
+
+    # CHANGE: Окна складываются в StatementFold по мере загрузки вместо одного списка операций
+    # WHY: Выписка на 100 тыс. операций держалась в памяти целиком (плюс копия для хранилища),
+    #      хотя ответу нужны только первые BANK_INLINE_OPERATIONS операций и агрегаты
+    # QUOTE(TЗ): "Operations should be streamed into the aggregation step instead of collected in one list"
+    # REF: user-031
+    fold = StatementFold(keep=keep, observers=observers)
+    store_load = _begin_store(provider, mode, token, account_id)
+    if store_load is not None:
+        fold.sinks.append(store_load.add_window)
+
+    async def fetch_range(
+        range_start: date, range_end: date, on_window: Optional[WindowSink] = fold.add
+    ) -> WindowedStatement:
+        return await fetch_windows(
+            split_period(range_start, range_end, unit), fetch_window, on_window=on_window
+        )
+
+    # CHANGE: Закрытые дни берутся из локального кэша, из банка догружаются только недостающие
+    # WHY: Повторный анализ за 12 месяцев должен стоить одного маленького запроса, а не полной выгрузки
+    # QUOTE(TЗ): "a repeated 12-month analysis costs one small delta call instead of a full re-download"
+    # REF: user-033
+    # Песочница Модульбанка отдаёт операции без учёта дат — по дням их не разложить
+    try:
+        if cache_enabled() and not (provider == "modulbank" and sandbox):
+            statement: WindowedStatement = await get_statement_cache().load(
+                cache_key(provider, mode, token, account_id),
+                period_start,
+                period_end,
+                fetch_range,
+                fold=fold,
+            )
+        else:
+            statement = await fetch_range(period_start, period_end)
+    except BaseException:
+        if store_load is not None:
+            await store_load.abort()
+        raise
+    statement.duplicates += fold.duplicates
+
+    loaded = LoadedStatement(
+        provider=provider,
+        mode="sandbox" if sandbox else mode,
+        account_id=account_id,
+        operations=fold.operations,
+        total=fold.count,
+        statement=statement,
+    )
+    record_statement(provider, fold.count)
+    if store_load is not None:
+        await store_load.finish(
+            period_start,
+            period_end,
+            # Песочница Модульбанка игнорирует даты — период нельзя считать загруженным
+            complete=not statement.truncated and not (provider == "modulbank" and sandbox),
+            failed=failed_days(statement),
+            ctx=ctx,
+        )
+    return loaded
+
+
+# CHANGE: Каждая загруженная выписка попадает в хранилище операций
+# WHY: Уточняющие вопросы по уже загруженному периоду выполняются локально, без банка
+# REF: user-036
+class _StoreLoad:
+    """
+    Сохранение выписки в локальное хранилище (query_operations) по окнам; сбой записи выписку
+    не ломает — загрузка в хранилище отменяется, а ошибка сообщается в finish.
+    """
+
+    def __init__(self, provider: str, account_id: Optional[str], load: StagedLoad) -> None:
+        self.provider = provider
+        self.account_id = account_id
+        self.load = load
+        self.error: Optional[BaseException] = None
+
+    async def add_window(
+        self, window: Window, operations: List[Dict[str, object]], complete: bool
+    ) -> None:
+        if self.error is not None:
+            return
+        try:
+            await self.load.add(
+                [normalize_operation(self.provider, self.account_id, op) for op in operations]
+            )
+        except (sqlite3.Error, OSError) as error:
+            self.error = error
+
+    async def finish(
+        self, start: date, end: date, complete: bool, failed: Iterable[date], ctx: NoopContext
+    ) -> None:
+        if self.error is None:
+            try:
+                await self.load.finish(start, end, complete, failed)
+                return
+            except (sqlite3.Error, OSError) as error:
+                self.error = error
+        await self.abort()
+        await ctx.error(f"⚠️ Не удалось сохранить операции в локальное хранилище: {self.error}")
+
+    async def abort(self) -> None:
+        try:
+            await self.load.abort()
+        except (sqlite3.Error, OSError):
+            pass
+
+
+def _begin_store(
+    provider: str, mode: str, token: str, account_id: Optional[str]
+) -> Optional[_StoreLoad]:
+    if not store_enabled():
+        return None
+    load = get_operation_store().begin_load(store_scope(provider, mode, token), account_id)
+    return _StoreLoad(provider, account_id, load)
+
+
+async def discover_accounts(provider: str, token: str, mode: str) -> List[Optional[str]]:
+    """
+    Счета банка по токену. Если банк не даёт список счетов (Альфа) или запрос не удался,
+    возвращается [None] — выписка по счёту ключа; для Модульбанка счёт обязателен, ошибка пробрасывается.
+    """
+    sandbox = mode == "test"
+    if provider == "alfa" and sandbox:
+        return [account["id"] for account in mocks.get_accounts_mock(provider)]
+    client = get_http_clients().client(
+        "tbank_sandbox" if provider == "tbank" and sandbox else provider
+    )
+    try:
+        if provider == "modulbank":
+            response = await client.post(
+                api_url(ACCOUNTS_URL_MAP["modulbank"]),
+                idempotent=True,
+                headers=_modulbank_headers(token, sandbox),
+            )
+            companies = decode_json(response)
+            return [
+                account["id"]
+                for company in (companies if isinstance(companies, list) else [])
+                for account in company.get("bankAccounts") or []
+                if account.get("id") and account.get("status", "New") == "New"
+            ]
+        if provider == "tbank":
+            url = api_url(ACCOUNTS_URL_MAP["tbank_sandbox" if sandbox else "tbank"])
+            sandbox_token = os.getenv("T_BANK_SANDBOX_TOKEN", "TBankSandboxToken")
+            response = await client.get(
+                url, headers={"Authorization": f"Bearer {sandbox_token if sandbox else token}"}
+            )
+            accounts = decode_json(response)
+            numbers = [
+                account.get("accountNumber")
+                for account in (accounts if isinstance(accounts, list) else [])
+                if account.get("accountNumber")
+            ]
+            return numbers or [None]
+    except (httpx.HTTPError, CircuitOpenError, ValueError):
+        if provider == "modulbank":
+            raise
+    return [None]
+
+
+async def _fetch_modulbank_history(
+    *,
+    base_url: str,
+    token: str,
+    account_id: Optional[str],
+    from_date: str,
+    to_date: str,
+    sandbox: bool,
+    ctx: NoopContext,
+) -> StatementAccumulator:
+    """
+    Выполняет запрос к operation-history Модульбанка с поддержкой песочницы.
+    Выписка выгружается целиком страницами skip/records.
+    """
+    # CHANGE: Жёстко требуем account_id для соответствия спецификации
+    # WHY: Endpoint /operation-history/{accountId} требует идентификатор счёта
+    # QUOTE(TЗ): "если запрос идет к модульбанку и в режиме тест то нужно отдавать запрос к модульбанку в режиме песочницы"
+    # REF: user-message
+    if not account_id:
+        raise format_error("Для Модульбанка нужно указать account_id", code=-32602)
+
+    headers = _modulbank_headers(token, sandbox)
+
+    # В песочнице работают только фильтры records и skip, даты не передаём
+    period: Dict[str, object] = {} if sandbox else {
+        "from": f"{from_date}T00:00:00",
+        "till": f"{to_date}T23:59:59",
+    }
+
+    endpoint = f"{base_url}/operation-history/{account_id}"
+
+    client = get_http_clients().client("modulbank")
+
+    async def fetch_page(skip: int, records: int) -> List[Dict[str, object]]:
+        payload = {**period, "records": records, "skip": skip}
+        # История операций — чтение, повтор безопасен
+        response = await client.post(endpoint, idempotent=True, headers=headers, json=payload)
+        return _extract_operations(decode_json(response))
+
+    statement = await StatementAccumulator().consume(
+        iter_offset_pages(fetch_page, PAGE_SIZE["modulbank"], page_concurrency())
+    )
+
+    if sandbox:
+        await ctx.info("🧪 Модульбанк sandbox ответ получен")
+    return statement
+
+
+def _modulbank_headers(token: str, sandbox: bool) -> Dict[str, str]:
+    """Заголовки Модульбанка; в песочнице — sandbox: on и тестовые ключи вместо реальных."""
+    sandbox_token = os.getenv("MODULBANK_SANDBOX_TOKEN", "sandboxtoken")
+    auth_token = sandbox_token if sandbox else token
+    headers: Dict[str, str] = {"Authorization": f"Bearer {auth_token}"}
+    if sandbox:
+        headers["sandbox"] = "on"
+        headers["clientId"] = os.getenv("MODULBANK_SANDBOX_CLIENT_ID", "sandboxapp")
+        headers["clientSecret"] = os.getenv("MODULBANK_SANDBOX_CLIENT_SECRET", "sandboxappsecret")
+        headers["token"] = auth_token
+    return headers
+
+
+def _extract_operations(data: object) -> List[Dict[str, object]]:
+    """Список операций из ответа банка: массив или поле operations/transactions/items."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+    return data.get("operations") or data.get("transactions") or data.get("items") or []
+
+
+async def _fetch_tbank_pages(
+    *, client: ProviderClient, url: str, headers: Dict[str, str], params: Dict[str, str]
+) -> StatementAccumulator:
+    """
+    Выписка T-Bank по курсору: limit операций на страницу, следующая страница по nextCursor.
+    """
+    limit = PAGE_SIZE["tbank"]
+
+    async def fetch_page(cursor: Optional[str]) -> StatementPage:
+        page_params = {**params, "limit": str(limit)}
+        if cursor:
+            page_params["cursor"] = cursor
+        response = await client.get(url, headers=headers, params=page_params)
+        data = decode_json(response)
+        next_cursor = data.get("nextCursor") if isinstance(data, dict) else None
+        return StatementPage(
+            operations=_extract_operations(data),
+            has_more=isinstance(next_cursor, str) and bool(next_cursor),
+            next_cursor=next_cursor if isinstance(next_cursor, str) else None,
+        )
+
+    return await StatementAccumulator().consume(iter_cursor_pages(fetch_page))
+
+
+async def _fetch_alfa_pages(
+    *, client: ProviderClient, url: str, headers: Dict[str, str], params: Dict[str, str]
+) -> StatementAccumulator:
+    """
+    Выписка Альфа-Банка по номерам страниц. Если в ответе есть totalPages,
+    остальные страницы загружаются параллельно (не больше BANK_PAGE_CONCURRENCY).
+    """
+    size = PAGE_SIZE["alfa"]
+
+    async def fetch_page(number: int) -> StatementPage:
+        page_params = {**params, "page": str(number), "size": str(size)}
+        response = await client.get(url, headers=headers, params=page_params)
+        data = decode_json(response)
+        operations = _extract_operations(data)
+        if not isinstance(data, dict):
+            return StatementPage(operations=operations, has_more=len(operations) >= size)
+        pagination = data.get("pagination") if isinstance(data.get("pagination"), dict) else {}
+        total_pages = data.get("totalPages") or pagination.get("totalPages")
+        links = data.get("_links") if isinstance(data.get("_links"), list) else []
+        if isinstance(total_pages, int) and total_pages > 0:
+            has_more = number < total_pages
+        elif links:
+            has_more = any(isinstance(link, dict) and link.get("rel") == "next" for link in links)
+        else:
+            has_more = len(operations) >= size
+        return StatementPage(
+            operations=operations,
+            has_more=has_more,
+            total_pages=total_pages if isinstance(total_pages, int) else None,
+        )
+
+    return await StatementAccumulator().consume(
+        iter_numbered_pages(fetch_page, page_concurrency())
+    )
+
+
+async def _fetch_tbank_sandbox(
+    *,
+    account_number: Optional[str],
+    from_date: str,
+    to_date: str,
+    ctx: NoopContext,
+) -> StatementAccumulator:
+    """
+    Запрашивает выписку в песочнице T-Bank (все страницы по курсору).
+
+    Требуется:
+    - account_number (используем account_id поля вызова)
+    - токен T_BANK_SANDBOX_TOKEN (default TBankSandboxToken)
+    """
+    if not account_number:
+        raise format_error("Для T-Bank sandbox нужно указать account_id (accountNumber)", code=-32602)
+
+    sandbox_token = os.getenv("T_BANK_SANDBOX_TOKEN", "TBankSandboxToken")
+    headers = {"Authorization": f"Bearer {sandbox_token}"}
+    params = {
+        "accountNumber": account_number,
+        "from": f"{from_date}T00:00:00.000Z",
+        "to": f"{to_date}T23:59:59.999Z",
+    }
+
+    url = api_url("https://business.tbank.ru/openapi/sandbox/api/v1/statement")
+
+    statement = await _fetch_tbank_pages(
+        client=get_http_clients().client("tbank_sandbox"), url=url, headers=headers, params=params
+    )
+    await ctx.info("🧪 T-Bank sandbox ответ получен")
+    return statement
@@ -8,6 +8,14 @@
 from dataclasses import dataclass
 from typing import Dict, List
 
+# CHANGE: orjson как необязательный быстрый декодер ответов банков
+# WHY: Ответы выписок на десятки тысяч операций декодируются заметно быстрее, чем json stdlib
+# REF: user-034
+try:
+    import orjson
+except ImportError:  # pragma: no cover - без extra speedups остаётся json stdlib
+    orjson = None
+
 from mcp.shared.exceptions import ErrorData, McpError
 from mcp.types import TextContent
 
@@ -28,6 +36,36 @@ class ToolResult:
     meta: Dict[str, object]
 
 
+class NoopContext:
+    """Контекст-заглушка для случаев, когда ctx не передан."""
+
+    async def info(self, message: str) -> None:
+        return None
+
+    async def error(self, message: str) -> None:
+        return None
+
+    async def report_progress(self, progress: int, total: int) -> None:
+        return None
+
+
+def mask_account(account_id: str) -> str:
+    """Номер счёта для логов и span: последние 4 символа."""
+    # CHANGE: Полный номер счёта не пишется в атрибуты span
+    # REF: user-040
+    return f"…{account_id[-4:]}" if len(account_id) > 4 else account_id
+
+
+def decode_json(response: object) -> object:
+    """
+    JSON тела ответа httpx: orjson по сырым байтам, если установлен, иначе response.json().
+    """
+    content = getattr(response, "content", None)
+    if orjson is not None and isinstance(content, (bytes, bytearray)):
+        return orjson.loads(content)
+    return response.json()
+
+
 def format_error(message: str, code: int = -32603) -> McpError:
     """
     Форматирует ошибку в McpError.
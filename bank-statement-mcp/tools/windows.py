@@ -0,0 +1,290 @@
+"""
+Разбиение длинного периода выписки на окна (месяц/неделя) и параллельная загрузка окон.
+"""
+# CHANGE: Выписка за длинный период загружается окнами с повтором каждого окна отдельно
+# WHY: Годовая выписка была одним запросом с таймаутом 30 с; на больших счетах он падал,
+#      и весь период запрашивался заново
+# QUOTE(TЗ): "split long periods into monthly or weekly windows, fetch them concurrently with
+#             per-window retry and backoff, and deduplicate operations at window boundaries by operation id"
+# REF: user-032
+import asyncio
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import httpx
+
+from .pagination import Operation, StatementAccumulator
+from .utils import format_error
+
+Window = Tuple[date, date]
+
+# Поля идентификатора операции у разных банков: T-Bank, Модульбанк, Альфа
+OPERATION_ID_FIELDS = ("operationId", "id", "transactionId", "uuid")
+
+# Поля даты операции у разных банков: T-Bank, заглушки/Альфа, Модульбанк
+OPERATION_DATE_FIELDS = ("operationDate", "date", "executed", "created", "transactionDate")
+
+# Приёмник операций одного окна: (окно, операции в формате банка, окно загружено полностью)
+WindowSink = Callable[[Window, List[Operation], bool], Awaitable[None]]
+
+
+def parse_period(from_date: str, to_date: str) -> Window:
+    """Проверяет даты YYYY-MM-DD и порядок границ периода."""
+    try:
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+    except (TypeError, ValueError):
+        raise format_error("Даты периода должны быть в формате YYYY-MM-DD", code=-32602)
+    if start > end:
+        raise format_error("Дата начала периода позже даты конца", code=-32602)
+    return start, end
+
+
+def split_period(start: date, end: date, unit: str) -> List[Window]:
+    """
+    Делит [start, end] на непересекающиеся окна по календарным месяцам или неделям (пн–вс).
+    unit="none" — одно окно на весь период.
+    """
+    if unit not in ("month", "week"):
+        return [(start, end)]
+    windows: List[Window] = []
+    current = start
+    while current <= end:
+        if unit == "month":
+            next_start = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        else:
+            next_start = current + timedelta(days=7 - current.weekday())
+        window_end = min(end, next_start - timedelta(days=1))
+        windows.append((current, window_end))
+        current = window_end + timedelta(days=1)
+    return windows
+
+
+def operation_id(operation: Operation) -> Optional[str]:
+    """Идентификатор операции или None, если банк его не вернул."""
+    for name in OPERATION_ID_FIELDS:
+        value = operation.get(name)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def operation_day(operation: Operation) -> Optional[date]:
+    """Банковский день операции по первым 10 символам поля даты (YYYY-MM-DD)."""
+    for name in OPERATION_DATE_FIELDS:
+        value = operation.get(name)
+        if isinstance(value, str) and len(value) >= 10:
+            try:
+                return date.fromisoformat(value[:10])
+            except ValueError:
+                continue
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Повторяем сетевые ошибки, таймауты, 429 и 5xx; 4xx (токен, параметры) не повторяем."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code if error.response is not None else 0
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+# CHANGE: Ошибку, уже повторённую HTTP-клиентом банка, окно больше не повторяет
+# WHY: Повторы ProviderClient (BANK_HTTP_RETRIES) вкладывались в повторы окна (BANK_WINDOW_RETRIES):
+#      до 9 запросов на окно к деградировавшему банку
+# REF: user-039
+RETRIED_ATTR = "bank_retried"
+
+
+def mark_retried(error: BaseException) -> BaseException:
+    """Помечает ошибку, после которой запрос уже повторялся нижним уровнем."""
+    setattr(error, RETRIED_ATTR, True)
+    return error
+
+
+def was_retried(error: BaseException) -> bool:
+    return bool(getattr(error, RETRIED_ATTR, False))
+
+
+@dataclass
+class WindowFailure:
+    """Окно, которое не удалось загрузить после всех повторов."""
+
+    from_date: str
+    to_date: str
+    error: str
+
+
+@dataclass
+class WindowedStatement:
+    """
+    Выписка, собранная из окон.
+
+    Attributes:
+        operations: Операции в порядке окон без дубликатов по id (пусто, если задан on_window)
+        pages: Суммарное число страниц по всем окнам
+        truncated: Хотя бы одно окно обрезано по BANK_MAX_PAGES
+        windows: Число окон
+        duplicates: Сколько операций отброшено как повтор на границах окон
+        failed: Окна, не загруженные после повторов
+    """
+
+    operations: List[Operation] = field(default_factory=list)
+    pages: int = 0
+    truncated: bool = False
+    windows: int = 0
+    duplicates: int = 0
+    failed: List[WindowFailure] = field(default_factory=list)
+
+    def merge(self, part: StatementAccumulator, seen: Set[str]) -> None:
+        for operation in part.operations:
+            key = operation_id(operation)
+            if key is not None:
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+            self.operations.append(operation)
+        self.pages += part.pages
+        self.truncated = self.truncated or part.truncated
+
+    def failed_windows(self) -> List[Dict[str, str]]:
+        return [{"from": f.from_date, "to": f.to_date, "error": f.error} for f in self.failed]
+
+
+class StatementFold:
+    """
+    Шаг агрегации выписки: загруженные окна складываются сюда по мере готовности и сразу
+    освобождаются.
+
+    Инварианты:
+    - операции дедуплицируются по id (границы окон, кэш и догруженные дни);
+    - в памяти остаются только keep операций, самые ранние по дате (None — все), остальные
+      учитываются в count и передаются observers (например, top-N для текста ответа);
+    - sinks получают каждое окно целиком до дедупликации — для сохранения в кэш и хранилище.
+    """
+
+    def __init__(
+        self,
+        keep: Optional[int] = None,
+        observers: Sequence[Callable[[Operation], None]] = (),
+    ) -> None:
+        self.keep = keep
+        self.observers = list(observers)
+        self.sinks: List[WindowSink] = []
+        self.count = 0
+        self.duplicates = 0
+        self._seen: Set[str] = set()
+        self._kept: List[Tuple[Tuple[int, str, int], Operation]] = []
+        self._lock = asyncio.Lock()
+
+    async def add(self, window: Window, operations: List[Operation], complete: bool = True) -> None:
+        async with self._lock:
+            for sink in self.sinks:
+                await sink(window, operations, complete)
+            for operation in operations:
+                key = operation_id(operation)
+                if key is not None:
+                    if key in self._seen:
+                        self.duplicates += 1
+                        continue
+                    self._seen.add(key)
+                for observer in self.observers:
+                    observer(operation)
+                if self.keep is None or self.keep > 0:
+                    day = operation_day(operation)
+                    # Операции без даты — в конце, внутри дня — в порядке получения
+                    order = (0, day.isoformat(), self.count) if day else (1, "", self.count)
+                    self._kept.append((order, operation))
+                self.count += 1
+            if self.keep is not None and len(self._kept) > 2 * self.keep:
+                self._trim()
+
+    def _trim(self) -> None:
+        self._kept.sort(key=lambda item: item[0])
+        if self.keep is not None:
+            del self._kept[self.keep :]
+
+    @property
+    def operations(self) -> List[Operation]:
+        """Сохранённые операции по дате (не больше keep)."""
+        self._trim()
+        return [operation for _, operation in self._kept]
+
+
+def window_unit() -> str:
+    """Размер окна: BANK_WINDOW = month | week | none (по умолчанию month)."""
+    return os.getenv("BANK_WINDOW", "month").lower()
+
+
+async def fetch_windows(
+    windows: List[Window],
+    fetch: Callable[[str, str], Awaitable[StatementAccumulator]],
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    on_window: Optional[WindowSink] = None,
+) -> WindowedStatement:
+    """
+    Загружает окна параллельно (не больше concurrency одновременно), каждое окно повторяется
+    отдельно до retries раз с экспоненциальной задержкой и джиттером.
+
+    С on_window операции каждого загруженного окна сразу передаются туда (обычно
+    StatementFold.add) и не собираются в WindowedStatement.operations: в памяти одновременно
+    только окна в работе.
+
+    Инварианты:
+    - ошибка, уже повторённая HTTP-клиентом банка (was_retried), окном не повторяется;
+    - неповторяемая ошибка (например 401) или отказ всех окон пробрасывается вызывающему;
+    - если отказали только некоторые окна, остальные возвращаются, а отказавшие — в failed.
+    """
+    concurrency = concurrency or max(1, int(os.getenv("BANK_WINDOW_CONCURRENCY", "3")))
+    retries = retries if retries is not None else max(0, int(os.getenv("BANK_WINDOW_RETRIES", "2")))
+    backoff = backoff if backoff is not None else float(os.getenv("BANK_WINDOW_BACKOFF", "0.5"))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_with_retries(window: Window) -> StatementAccumulator:
+        window_from, window_to = window[0].isoformat(), window[1].isoformat()
+        async with semaphore:
+            attempt = 0
+            while True:
+                try:
+                    return await fetch(window_from, window_to)
+                except Exception as error:
+                    if attempt >= retries or not is_retryable(error) or was_retried(error):
+                        raise
+                    await asyncio.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+                    attempt += 1
+
+    async def load(window: Window) -> StatementAccumulator:
+        part = await fetch_with_retries(window)
+        if on_window is None:
+            return part
+        # CHANGE: Окно отдаётся в агрегацию сразу после загрузки, в результате остаются счётчики
+        # WHY: Выписка на 100 тыс. операций целиком собиралась в один список до агрегации
+        # QUOTE(TЗ): "Operations should be streamed into the aggregation step instead of collected in one list"
+        # REF: user-031
+        await on_window(window, part.operations, not part.truncated)
+        return StatementAccumulator(limit_pages=part.limit_pages, pages=part.pages, truncated=part.truncated)
+
+    results = await asyncio.gather(*(load(window) for window in windows), return_exceptions=True)
+
+    statement = WindowedStatement(windows=len(windows))
+    seen: Set[str] = set()
+    errors: List[BaseException] = []
+    for window, result in zip(windows, results):
+        if isinstance(result, BaseException):
+            if not is_retryable(result):
+                raise result
+            errors.append(result)
+            statement.failed.append(
+                WindowFailure(window[0].isoformat(), window[1].isoformat(), type(result).__name__)
+            )
+            continue
+        statement.merge(result, seen)
+    if errors and len(errors) == len(windows):
+        raise errors[0]
+    return statement
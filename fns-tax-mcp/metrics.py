@@ -0,0 +1,180 @@
+"""Prometheus metrics for fns-tax-mcp."""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+
+# CHANGE: Метрики очередей планировщика исходящих запросов к api-fns.ru
+# WHY: Нужно видеть, сколько ждут interactive/batch/background вызовы при общем ключе
+# QUOTE(TЗ): "Queue depth and wait time per class should be exposed as metrics."
+# REF: user-026
+fns_queue_depth = Gauge(
+    "fns_queue_depth",
+    "Upstream api-fns.ru calls waiting for a slot by priority class",
+    labelnames=("priority",),
+)
+
+fns_inflight = Gauge(
+    "fns_inflight",
+    "Upstream api-fns.ru calls in flight by priority class",
+    labelnames=("priority",),
+)
+
+fns_queue_wait_seconds = Histogram(
+    "fns_queue_wait_seconds",
+    "Time spent waiting for an upstream slot by priority class",
+    labelnames=("priority",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+
+# CHANGE: Метрики использования каждого ключа из пула FNS_API_TOKENS
+# WHY: Нужно видеть, какой ключ сколько тратит и какие выведены из ротации
+# QUOTE(TЗ): "per-key usage should be visible"
+# REF: user-027
+fns_key_requests_total = Counter(
+    "fns_key_requests_total",
+    "Upstream api-fns.ru requests by masked key and outcome",
+    labelnames=("key", "outcome"),
+)
+
+fns_key_available = Gauge(
+    "fns_key_available",
+    "1 if the api-fns.ru key is in rotation, 0 if taken out after quota/auth errors",
+    labelnames=("key",),
+)
+
+fns_key_quota_remaining = Gauge(
+    "fns_key_quota_remaining",
+    "Remaining api-fns.ru quota by masked key and method",
+    labelnames=("key", "method"),
+)
+
+# CHANGE: Метрики контроля допуска входящих вызовов и задержек апстрима
+# WHY: Нужно видеть, сколько вызовов выполняется/ждет/отклонено и почему
+# QUOTE(TЗ): "The whole replica should degrade gracefully instead of collapsing."
+# REF: user-028
+fns_admission_inflight = Gauge(
+    "fns_admission_inflight",
+    "Tool calls currently admitted by tool",
+    labelnames=("tool",),
+)
+
+fns_admission_queue_depth = Gauge(
+    "fns_admission_queue_depth",
+    "Tool calls waiting for admission",
+)
+
+fns_admission_rejected_total = Counter(
+    "fns_admission_rejected_total",
+    "Tool calls rejected by admission control by tool and reason",
+    labelnames=("tool", "reason"),
+)
+
+fns_upstream_latency_seconds = Histogram(
+    "fns_upstream_latency_seconds",
+    "api-fns.ru request latency seconds",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 40, 60),
+)
+
+# CHANGE: Счетчики отмен вызовов tools и прерванных запросов к api-fns.ru
+# WHY: Нужно видеть, сколько работы бросают клиенты и сколько запросов апстрима прервано
+# QUOTE(TЗ): "cancellations are counted in metrics"
+# REF: user-029
+fns_tool_cancelled_total = Counter(
+    "fns_tool_cancelled_total",
+    "Tool calls abandoned by the client by tool and reason (client_cancel, disconnect)",
+    labelnames=("tool", "reason"),
+)
+
+fns_upstream_cancelled_total = Counter(
+    "fns_upstream_cancelled_total",
+    "In-flight api-fns.ru requests aborted by cancellation by method",
+    labelnames=("method",),
+)
+
+
+def set_queue_depth(priority: str, depth: int) -> None:
+    try:
+        fns_queue_depth.labels(priority=priority).set(depth)
+    except Exception:
+        pass
+
+
+def set_inflight(priority: str, count: int) -> None:
+    try:
+        fns_inflight.labels(priority=priority).set(count)
+    except Exception:
+        pass
+
+
+def observe_queue_wait(priority: str, seconds: float) -> None:
+    try:
+        fns_queue_wait_seconds.labels(priority=priority).observe(seconds)
+    except Exception:
+        pass
+
+
+def record_key_request(key: str, outcome: str) -> None:
+    try:
+        fns_key_requests_total.labels(key=key, outcome=outcome).inc()
+    except Exception:
+        pass
+
+
+def set_key_available(key: str, available: bool) -> None:
+    try:
+        fns_key_available.labels(key=key).set(1 if available else 0)
+    except Exception:
+        pass
+
+
+def set_key_quota_remaining(key: str, method: str, remaining: float) -> None:
+    try:
+        fns_key_quota_remaining.labels(key=key, method=method).set(remaining)
+    except Exception:
+        pass
+
+
+def set_admission_inflight(tool: str, count: int) -> None:
+    try:
+        fns_admission_inflight.labels(tool=tool).set(count)
+    except Exception:
+        pass
+
+
+def set_admission_queue_depth(depth: int) -> None:
+    try:
+        fns_admission_queue_depth.set(depth)
+    except Exception:
+        pass
+
+
+def record_admission_rejected(tool: str, reason: str) -> None:
+    try:
+        fns_admission_rejected_total.labels(tool=tool, reason=reason).inc()
+    except Exception:
+        pass
+
+
+def observe_upstream_latency(seconds: float) -> None:
+    try:
+        fns_upstream_latency_seconds.observe(seconds)
+    except Exception:
+        pass
+
+
+def record_tool_cancelled(tool: str, reason: str) -> None:
+    try:
+        fns_tool_cancelled_total.labels(tool=tool, reason=reason).inc()
+    except Exception:
+        pass
+
+
+def record_upstream_cancelled(method: str) -> None:
+    try:
+        fns_upstream_cancelled_total.labels(method=method).inc()
+    except Exception:
+        pass
+
+
+async def metrics_handler() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
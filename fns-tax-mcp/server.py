@@ -20,11 +20,14 @@ except ImportError:
 
 from opentelemetry import trace
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from fastmcp.server.server import default_lifespan
 
 from mcp_instance import mcp
+from metrics import metrics_handler
 
+from tools.admission import AdmissionMiddleware, get_admission_controller
+from tools.cancellation import CancellationMiddleware
 from tools import (
     generate_usn_declaration,
     generate_osno_declaration,
@@ -132,6 +135,18 @@ async def external_ip_lifespan(server: FastMCP):
 # REF: user message 2025-12-10
 mcp._lifespan = external_ip_lifespan
 
+# CHANGE: Контроль допуска всех tools/call: лимиты одновременных вызовов, очередь, быстрый отказ
+# WHY: При деградации api-fns.ru реплика должна отказывать повторяемой ошибкой, а не копить вызовы
+# QUOTE(TЗ): "The whole replica should degrade gracefully instead of collapsing."
+# REF: user-028
+# CHANGE: Отмена/отключение клиента прерывает вызов tool и его запрос к api-fns.ru
+# WHY: Брошенные агентом вызовы держали соединения и буферы до таймаута 40–60 с
+# QUOTE(TЗ): "We want cancellation to be honored end to end"
+# REF: user-029
+# Middleware отмены — внешний, чтобы покрывать и ожидание в очереди допуска
+mcp.add_middleware(CancellationMiddleware())
+mcp.add_middleware(AdmissionMiddleware())
+
 def init_tracing():
     pass
 
@@ -142,7 +157,11 @@ def init_tracing():
 @mcp.custom_route("/health", methods=["GET"])
 async def health_handler(request: Request) -> JSONResponse:
     """Health check endpoint."""
-    return JSONResponse({"status": "ok", "service": "fns-tax-mcp"})
+    return JSONResponse({
+        "status": "ok",
+        "service": "fns-tax-mcp",
+        "admission": get_admission_controller().snapshot(),
+    })
 
 @mcp.custom_route("/", methods=["GET"])
 async def root_handler(request: Request) -> JSONResponse:
@@ -154,6 +173,14 @@ async def root_handler(request: Request) -> JSONResponse:
         "tools": [tool.name for tool in tools.values()]
     })
 
+# CHANGE: Prometheus endpoint с глубиной очередей и временем ожидания по классам приоритета
+# WHY: Нужно видеть конкуренцию interactive/batch/background за ключ API-ФНС
+# QUOTE(TЗ): "Queue depth and wait time per class should be exposed as metrics."
+# REF: user-026
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_route(request: Request) -> Response:
+    return await metrics_handler()
+
 def main():
     PORT = int(os.getenv("PORT", "8080"))
     HOST = os.getenv("HOST", "0.0.0.0")
@@ -164,6 +191,7 @@ def main():
     print(f"🚀 MCP Server: http://{HOST}:{PORT}/mcp")
     print(f"📊 Health: http://{HOST}:{PORT}/health")
     print(f"📋 Info: http://{HOST}:{PORT}/")
+    print(f"📈 Metrics: http://{HOST}:{PORT}/metrics")
     print("=" * 60)
     
     # CHANGE: Использование mcp.run() с streamable-http транспортом
@@ -0,0 +1,80 @@
+"""Тесты контроля допуска входящих вызовов."""
+import asyncio
+
+import pytest
+
+from tools.admission import (
+    REASON_QUEUE_FULL,
+    REASON_QUEUE_TIMEOUT,
+    REASON_UPSTREAM_SLO,
+    AdmissionController,
+    OverloadedError,
+    UpstreamLatencyTracker,
+    parse_tool_limits,
+)
+
+
+def test_parse_tool_limits():
+    """Тест разбора FNS_TOOL_LIMITS."""
+    assert parse_tool_limits("get_extract=4, multcheck_companies=2,bad=x") == {
+        "get_extract": 4,
+        "multcheck_companies": 2,
+    }
+
+
+def test_latency_tracker_slo():
+    """p95 выше SLO в пределах окна считается нарушением, после окна — нет."""
+    tracker = UpstreamLatencyTracker(slo_seconds=1.0, window_seconds=10.0, min_samples=3)
+    for i in range(5):
+        tracker.observe(2.0, now=100.0 + i)
+    assert tracker.breached(now=105.0) is True
+    assert tracker.breached(now=120.0) is False
+
+
+@pytest.mark.asyncio
+async def test_per_tool_limit_and_bounded_queue():
+    """Лимит на tool ставит вызов в очередь, переполненная очередь отклоняет сразу."""
+    controller = AdmissionController(max_inflight=10, per_tool_limit=1, max_queue=1, queue_timeout=1.0)
+    await controller.acquire("get_company_data")
+    await controller.acquire("search_companies")
+
+    queued = asyncio.create_task(controller.acquire("get_company_data"))
+    await asyncio.sleep(0)
+    assert controller.snapshot()["queued"] == 1
+
+    with pytest.raises(OverloadedError) as exc_info:
+        await controller.acquire("get_company_data")
+    assert exc_info.value.reason == REASON_QUEUE_FULL
+    assert exc_info.value.error.data["retryable"] is True
+
+    controller.release("get_company_data")
+    await asyncio.wait_for(queued, timeout=1)
+    assert controller.snapshot()["per_tool"]["get_company_data"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_retryable():
+    """Вызов, не дождавшийся слота, получает повторяемую ошибку и не занимает слот."""
+    controller = AdmissionController(max_inflight=1, max_queue=4, queue_timeout=0.01)
+    await controller.acquire("get_company_data")
+    with pytest.raises(OverloadedError) as exc_info:
+        await controller.acquire("search_companies")
+    assert exc_info.value.reason == REASON_QUEUE_TIMEOUT
+    assert controller.snapshot()["queued"] == 0
+    assert controller.snapshot()["inflight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_upstream_slo_sheds_only_upstream_tools():
+    """При нарушении SLO вызовы API-ФНС не ждут в очереди, локальные tools не затронуты."""
+    tracker = UpstreamLatencyTracker(slo_seconds=1.0, min_samples=1)
+    tracker.observe(30.0)
+    controller = AdmissionController(max_inflight=2, max_queue=10, latency=tracker)
+
+    await controller.acquire("get_company_data")
+    with pytest.raises(OverloadedError) as exc_info:
+        await controller.acquire("get_company_data")
+    assert exc_info.value.reason == REASON_UPSTREAM_SLO
+
+    await controller.acquire("generate_usn_declaration")
+    assert controller.snapshot()["inflight"] == 2
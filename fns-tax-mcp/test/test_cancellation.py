@@ -0,0 +1,108 @@
+"""Тесты сквозной отмены вызовов."""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+
+from tools import cancellation, token_pool
+from tools.cancellation import CancellationMiddleware
+from tools.fns_client import FileTooLargeError, FnsClient
+
+
+class SlowPdfStream(httpx.AsyncByteStream):
+    """Тело ответа, которое отдается чанками с паузами и запоминает закрытие."""
+
+    def __init__(self, chunks: int, delay: float) -> None:
+        self.chunks = chunks
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for _ in range(self.chunks):
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            yield b"%PDF" + b"0" * 1020
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def single_key(monkeypatch):
+    monkeypatch.setenv("FNS_API_TOKENS", "testkey1")
+    monkeypatch.delenv("FNS_API_TOKEN", raising=False)
+    token_pool.get_token_pool.cache_clear()
+    yield token_pool.get_token_pool()
+    token_pool.get_token_pool.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_streamed_download(single_key):
+    """Отмена во время скачивания закрывает поток и не помечает ключ как ошибочный."""
+    stream = SlowPdfStream(chunks=100, delay=0.01)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=stream)
+
+    async def call():
+        async with FnsClient(transport=httpx.MockTransport(handler)) as client:
+            return await client.download("https://api-fns.ru/api/vyp", params={"req": "7707083893"})
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert stream.closed is True
+    assert stream.sent < stream.chunks
+    key = single_key.keys[0]
+    assert key.inflight == 0
+    assert key.available(0) is True
+
+
+@pytest.mark.asyncio
+async def test_download_size_limit(single_key):
+    """Файл больше лимита не буферизуется целиком."""
+    stream = SlowPdfStream(chunks=10, delay=0)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=stream)
+
+    async with FnsClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(FileTooLargeError):
+            await client.download("https://api-fns.ru/api/vyp", params={}, max_bytes=4096)
+    assert stream.sent < stream.chunks
+    assert stream.closed is True
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_tool_call(monkeypatch):
+    """Обрыв соединения клиента отменяет выполняющийся вызов tool."""
+    state = {"disconnected": False, "tool_cancelled": False}
+
+    class FakeRequest:
+        async def is_disconnected(self):
+            return state["disconnected"]
+
+    monkeypatch.setattr(cancellation, "_current_http_request", lambda: FakeRequest())
+
+    async def call_next(context):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["tool_cancelled"] = True
+            raise
+
+    middleware = CancellationMiddleware(poll_interval=0.01)
+    context = SimpleNamespace(message=SimpleNamespace(name="get_extract"))
+    task = asyncio.create_task(middleware.on_call_tool(context, call_next))
+    await asyncio.sleep(0.03)
+    state["disconnected"] = True
+
+    with pytest.raises(McpError):
+        await asyncio.wait_for(task, timeout=1)
+    assert state["tool_cancelled"] is True
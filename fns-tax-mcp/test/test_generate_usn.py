@@ -16,7 +16,7 @@ async def test_generate_usn_declaration_success():
     ctx.error = AsyncMock()
     
     result = await generate_usn_declaration.fn(
-        inn="123456789012",
+        inn="500100732259",
         period="Q1",
         year=2025,
         income=500000.0,
@@ -26,7 +26,7 @@ async def test_generate_usn_declaration_success():
     )
     
     assert isinstance(result, ToolResult)
-    assert result.structured_content["inn"] == "123456789012"
+    assert result.structured_content["inn"] == "500100732259"
     assert result.structured_content["tax_rate"] == 6
     assert result.structured_content["tax_amount"] == 30000.0
     assert result.structured_content["status"] == "generated"
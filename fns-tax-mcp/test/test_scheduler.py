@@ -0,0 +1,92 @@
+"""Тесты планировщика исходящих запросов к API-ФНС."""
+import asyncio
+
+import pytest
+
+from tools.fns_client import resolve_priority
+from tools.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    PriorityScheduler,
+    parse_weights,
+)
+
+
+def test_parse_weights():
+    """Тест разбора весов из переменной окружения."""
+    weights = parse_weights("interactive=10, batch=3,unknown=5,background=x")
+    assert weights[PRIORITY_INTERACTIVE] == 10.0
+    assert weights[PRIORITY_BATCH] == 3.0
+    assert weights[PRIORITY_BACKGROUND] == 1.0
+    assert "unknown" not in weights
+
+
+def test_resolve_priority():
+    """Тест классификации вызовов по методу API-ФНС."""
+    assert resolve_priority("egr") == PRIORITY_INTERACTIVE
+    assert resolve_priority("multcheck") == PRIORITY_BATCH
+    assert resolve_priority("stat") == PRIORITY_BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_interactive_reserved_capacity():
+    """Batch не может занять зарезервированные за interactive слоты."""
+    scheduler = PriorityScheduler(max_concurrency=3, interactive_reserved=1)
+    await scheduler.acquire(PRIORITY_BATCH)
+    await scheduler.acquire(PRIORITY_BATCH)
+
+    third_batch = asyncio.create_task(scheduler.acquire(PRIORITY_BATCH))
+    await asyncio.sleep(0)
+    assert not third_batch.done()
+
+    await asyncio.wait_for(scheduler.acquire(PRIORITY_INTERACTIVE), timeout=1)
+    assert scheduler.snapshot()[PRIORITY_BATCH]["queued"] == 1
+
+    scheduler.release(PRIORITY_BATCH)
+    await asyncio.wait_for(third_batch, timeout=1)
+    assert scheduler.snapshot()[PRIORITY_BATCH]["inflight"] == 2
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_order():
+    """При одном слоте доли классов пропорциональны весам."""
+    scheduler = PriorityScheduler(
+        max_concurrency=1,
+        interactive_reserved=0,
+        weights={PRIORITY_INTERACTIVE: 3.0, PRIORITY_BATCH: 1.0},
+    )
+    order = []
+
+    async def call(priority):
+        async with scheduler.slot(priority):
+            order.append(priority)
+            await asyncio.sleep(0)
+
+    await scheduler.acquire(PRIORITY_BACKGROUND)
+    tasks = [asyncio.create_task(call(PRIORITY_BATCH)) for _ in range(4)]
+    tasks += [asyncio.create_task(call(PRIORITY_INTERACTIVE)) for _ in range(12)]
+    await asyncio.sleep(0)
+    scheduler.release(PRIORITY_BACKGROUND)
+    await asyncio.gather(*tasks)
+
+    first_eight = order[:8]
+    assert first_eight.count(PRIORITY_INTERACTIVE) == 6
+    assert first_eight.count(PRIORITY_BATCH) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    """Отмененный ожидающий вызов не занимает слот и убирается из очереди."""
+    scheduler = PriorityScheduler(max_concurrency=1, interactive_reserved=0)
+    await scheduler.acquire(PRIORITY_INTERACTIVE)
+    waiter = asyncio.create_task(scheduler.acquire(PRIORITY_BATCH))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.snapshot()[PRIORITY_BATCH]["queued"] == 0
+
+    scheduler.release(PRIORITY_INTERACTIVE)
+    await asyncio.wait_for(scheduler.acquire(PRIORITY_BATCH), timeout=1)
+    assert scheduler.snapshot()[PRIORITY_BATCH]["inflight"] == 1
@@ -0,0 +1,77 @@
+"""Тесты пула ключей API-ФНС."""
+import httpx
+import pytest
+
+from tools import token_pool
+from tools.fns_client import FnsClient
+from tools.token_pool import NoAvailableKeyError, TokenPool, parse_keys
+
+
+def test_parse_keys():
+    """Тест разбора FNS_API_TOKENS."""
+    keys = parse_keys("paid1, free1:free:100 ,paid2:paid:5000")
+    assert [k.token for k in keys] == ["paid1", "free1", "paid2"]
+    assert keys[1].free is True
+    assert keys[1].daily_limit == 100
+    assert keys[2].free is False
+    assert keys[2].daily_limit == 5000
+
+
+def test_free_key_not_used_for_paid_method():
+    """Free-ключ не получает методы вне FREE_ALLOWED_TOOLS."""
+    pool = TokenPool(parse_keys("freekey:free"))
+    assert pool.choose("egr").token == "freekey"
+    with pytest.raises(NoAvailableKeyError):
+        pool.choose("nalogbi")
+
+
+def test_choose_prefers_remaining_quota():
+    """Выбирается ключ с большим остатком квоты по методу."""
+    pool = TokenPool(parse_keys("aaaa1,bbbb2"))
+    pool.apply_stat(pool.keys[0], {"Методы": {"egr": {"Лимит": "100", "Истрачено": "90"}}})
+    pool.apply_stat(pool.keys[1], {"Методы": {"egr": {"Лимит": "100", "Истрачено": "10"}}})
+    key = pool.choose("egr")
+    assert key.token == "bbbb2"
+    pool.record(key, "egr", 200)
+    assert key.method_used["egr"] == 11
+
+
+def test_quota_error_takes_key_out_of_rotation():
+    """Ключ с ошибкой квоты выводится из ротации."""
+    pool = TokenPool(parse_keys("aaaa1,bbbb2"))
+    first = pool.choose("egr")
+    assert pool.record(first, "egr", 429) == token_pool.OUTCOME_QUOTA
+    snapshot = {item["key"]: item for item in pool.snapshot()}
+    assert snapshot[first.key_id]["available"] is False
+    assert snapshot[first.key_id]["disabled_reason"] == "quota"
+    for _ in range(3):
+        assert pool.choose("egr").token != first.token
+
+
+@pytest.mark.asyncio
+async def test_client_fails_over_to_next_key(monkeypatch):
+    """FnsClient повторяет запрос на другом ключе после ошибки авторизации."""
+    monkeypatch.setenv("FNS_API_TOKENS", "badkey1,goodkey2")
+    monkeypatch.delenv("FNS_API_TOKEN", raising=False)
+    token_pool.get_token_pool.cache_clear()
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        key = request.url.params["key"]
+        seen.append(key)
+        if key == "badkey1":
+            return httpx.Response(403, json={"error": "key"})
+        return httpx.Response(200, json={"items": []})
+
+    try:
+        async with FnsClient(transport=httpx.MockTransport(handler)) as client:
+            response = await client.get("https://api-fns.ru/api/egr", params={"req": "7707083893"})
+            assert response.status_code == 200
+            assert seen == ["badkey1", "goodkey2"]
+
+            response = await client.get("https://api-fns.ru/api/egr", params={"req": "7707083893"})
+            assert response.status_code == 200
+            assert seen[-1] == "goodkey2"
+            assert seen.count("badkey1") == 1
+    finally:
+        token_pool.get_token_pool.cache_clear()
@@ -0,0 +1,76 @@
+"""Тесты предварительной проверки ИНН/ОГРН/паспорта."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastmcp import Context
+from mcp.shared.exceptions import McpError
+
+from tools.get_company_data import get_company_data
+from tools.multcheck_companies import multcheck_companies
+from tools.utils import (
+    inn_error,
+    normalize_search_query,
+    ogrn_error,
+    require_company_id,
+    require_company_id_list,
+    require_inn,
+    require_passport,
+    validate_inn,
+    validate_ogrn,
+)
+
+
+def test_inn_checksum():
+    """Тест контрольных цифр ИНН ЮЛ и ФЛ."""
+    assert validate_inn("7707083893") is True
+    assert validate_inn("500100732259") is True
+    assert validate_inn("7707083894") is False
+    assert validate_inn("500100732250") is False
+    assert "контрольная цифра" in inn_error("7707083894")
+
+
+def test_ogrn_checksum():
+    """Тест контрольной цифры ОГРН и ОГРНИП."""
+    assert validate_ogrn("1027700132195") is True
+    assert validate_ogrn("1027700132196") is False
+    assert "ожидалась 5" in ogrn_error("1027700132196")
+
+
+def test_normalization():
+    """Пробелы и дефисы убираются до проверки."""
+    assert require_company_id(" 77 07-083 893 ") == "7707083893"
+    assert require_passport("45 08 123456") == "4508123456"
+    assert require_company_id_list("7707083893, 1027700132195,7707083893") == "7707083893,1027700132195"
+
+
+def test_precise_errors():
+    """Ошибка указывает причину и элемент списка."""
+    with pytest.raises(McpError, match="Элемент 2"):
+        require_company_id_list("7707083893,7707083894")
+    with pytest.raises(McpError, match="12 цифр"):
+        require_inn("7707083893", person_only=True)
+    with pytest.raises(McpError) as exc_info:
+        require_passport("4508 12345")
+    assert exc_info.value.error.code == -32602
+
+
+def test_search_query_validates_only_identifiers():
+    """Свободный текст не проверяется, ОГРН с неверной контрольной цифрой отклоняется."""
+    assert normalize_search_query("Сбербанк") == "Сбербанк"
+    assert normalize_search_query("1027700132195") == "1027700132195"
+    with pytest.raises(McpError):
+        normalize_search_query("1027700132196")
+
+
+@pytest.mark.asyncio
+async def test_invalid_inn_rejected_before_api_call(monkeypatch):
+    """Невалидный идентификатор не доходит до api-fns.ru даже в prod-режиме."""
+    monkeypatch.setenv("FNS_MODE", "prod")
+    ctx = MagicMock(spec=Context)
+    ctx.info = AsyncMock()
+    ctx.error = AsyncMock()
+
+    with pytest.raises(McpError, match="контрольная цифра"):
+        await get_company_data.fn(req="7707083894", ctx=ctx)
+    with pytest.raises(McpError, match="Элемент 1"):
+        await multcheck_companies.fn(req="12345", ctx=ctx)
+    ctx.info.assert_not_called()
@@ -0,0 +1,269 @@
+"""Контроль допуска входящих вызовов tools и сброс нагрузки при деградации API-ФНС."""
+# CHANGE: Ограничение одновременных вызовов (глобально и на tool), ограниченная очередь,
+#         быстрый отказ с повторяемой ошибкой MCP при переполнении или нарушении SLO апстрима
+# WHY: Когда api-fns.ru тормозит, каждый вызов держит корутину, соединение httpx и таймаут 40–60 с;
+#      память и задержки растут, пока контейнер не убьют
+# QUOTE(TЗ): "a max-concurrent-calls limit per tool and globally, bounded queues, and fast rejection
+#             with a retryable MCP error once the queue or the upstream latency SLO is exceeded"
+# REF: user-028
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from mcp.shared.exceptions import McpError, ErrorData
+
+from metrics import (
+    observe_upstream_latency,
+    record_admission_rejected,
+    set_admission_inflight,
+    set_admission_queue_depth,
+)
+
+# Код JSON-RPC для перегрузки сервера (implementation-defined server error)
+OVERLOADED_CODE = -32000
+
+REASON_QUEUE_FULL = "queue_full"
+REASON_QUEUE_TIMEOUT = "queue_timeout"
+REASON_UPSTREAM_SLO = "upstream_slo"
+
+# Tools без обращения к api-fns.ru: на них не распространяется сброс по SLO апстрима
+LOCAL_TOOLS = {
+    "generate_usn_declaration",
+    "generate_osno_declaration",
+    "generate_nds_declaration",
+    "generate_6ndfl_declaration",
+}
+
+
+def parse_tool_limits(raw: Optional[str]) -> Dict[str, int]:
+    """Разбирает переопределения лимитов вида "get_extract=4,multcheck_companies=2"."""
+    limits: Dict[str, int] = {}
+    if not raw:
+        return limits
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name and value.strip().isdigit():
+            limits[name] = int(value)
+    return limits
+
+
+class OverloadedError(McpError):
+    """Повторяемый отказ в допуске: клиент может повторить вызов через retry_after секунд."""
+
+    def __init__(self, tool: str, reason: str, retry_after: float) -> None:
+        super().__init__(
+            ErrorData(
+                code=OVERLOADED_CODE,
+                message=f"Сервер перегружен ({reason}), повторите вызов {tool} через {retry_after:.0f} с",
+                data={"retryable": True, "retry_after": retry_after, "reason": reason, "tool": tool},
+            )
+        )
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class UpstreamLatencyTracker:
+    """Скользящее окно задержек запросов к api-fns.ru и проверка p95 против SLO."""
+
+    def __init__(self, slo_seconds: float = 10.0, window_seconds: float = 30.0, min_samples: int = 5) -> None:
+        self.slo_seconds = slo_seconds
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._checked_at = float("-inf")
+        self._breached = False
+
+    def observe(self, seconds: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._samples.append((now, seconds))
+        self._expire(now)
+        observe_upstream_latency(seconds)
+
+    def _expire(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def p95(self, now: Optional[float] = None) -> Optional[float]:
+        self._expire(time.monotonic() if now is None else now)
+        if len(self._samples) < self.min_samples:
+            return None
+        values = sorted(value for _, value in self._samples)
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def breached(self, now: Optional[float] = None) -> bool:
+        # Проверка на каждом входящем вызове: пересчет p95 не чаще раза в секунду
+        now = time.monotonic() if now is None else now
+        if now - self._checked_at >= 1.0 or now < self._checked_at:
+            p95 = self.p95(now)
+            self._breached = p95 is not None and p95 > self.slo_seconds
+            self._checked_at = now
+        return self._breached
+
+
+@dataclass
+class _Waiter:
+    tool: str
+    future: asyncio.Future
+
+
+class AdmissionController:
+    """
+    Допуск вызовов tools.
+
+    Инварианты:
+    - одновременно выполняется не больше max_inflight вызовов, по каждому tool — не больше его лимита;
+    - ожидающих не больше max_queue, каждый ждет не дольше queue_timeout;
+    - при нарушении SLO апстрима глобальный лимит для tools с API-ФНС уменьшается вдвое,
+      а вызовы, которым нужно ждать, отклоняются сразу (очередь не растет).
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 64,
+        per_tool_limit: int = 16,
+        tool_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 32,
+        queue_timeout: float = 5.0,
+        latency: Optional[UpstreamLatencyTracker] = None,
+    ) -> None:
+        self.max_inflight = max(1, max_inflight)
+        self.per_tool_limit = max(1, per_tool_limit)
+        self.tool_limits = dict(tool_limits or {})
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.latency = latency or UpstreamLatencyTracker()
+        self._inflight: Dict[str, int] = {}
+        self._total = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    def _limit(self, tool: str) -> int:
+        return self.tool_limits.get(tool, self.per_tool_limit)
+
+    def _global_limit(self, tool: str) -> int:
+        if tool not in LOCAL_TOOLS and self.latency.breached():
+            return max(1, self.max_inflight // 2)
+        return self.max_inflight
+
+    def _has_capacity(self, tool: str) -> bool:
+        return self._total < self._global_limit(tool) and self._inflight.get(tool, 0) < self._limit(tool)
+
+    def _admit(self, tool: str) -> None:
+        self._inflight[tool] = self._inflight.get(tool, 0) + 1
+        self._total += 1
+        set_admission_inflight(tool, self._inflight[tool])
+
+    def _wake(self) -> None:
+        for waiter in list(self._waiters):
+            if waiter.future.done():
+                self._waiters.remove(waiter)
+                continue
+            if self._has_capacity(waiter.tool):
+                self._waiters.remove(waiter)
+                self._admit(waiter.tool)
+                waiter.future.set_result(None)
+        set_admission_queue_depth(len(self._waiters))
+
+    def _reject(self, tool: str, reason: str, retry_after: float) -> OverloadedError:
+        record_admission_rejected(tool, reason)
+        return OverloadedError(tool, reason, retry_after)
+
+    async def acquire(self, tool: str) -> None:
+        """Допускает вызов или бросает OverloadedError; при отмене корректно покидает очередь."""
+        if self._has_capacity(tool) and not any(w.tool == tool for w in self._waiters):
+            self._admit(tool)
+            return
+        if tool not in LOCAL_TOOLS and self.latency.breached():
+            raise self._reject(tool, REASON_UPSTREAM_SLO, self.latency.window_seconds)
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(tool, REASON_QUEUE_FULL, self.queue_timeout)
+
+        waiter = _Waiter(tool=tool, future=asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        set_admission_queue_depth(len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._granted(waiter):
+                return
+            self._drop(waiter)
+            raise self._reject(tool, REASON_QUEUE_TIMEOUT, self.queue_timeout)
+        except asyncio.CancelledError:
+            if self._granted(waiter):
+                self.release(tool)
+            else:
+                self._drop(waiter)
+            raise
+
+    @staticmethod
+    def _granted(waiter: _Waiter) -> bool:
+        return waiter.future.done() and not waiter.future.cancelled()
+
+    def _drop(self, waiter: _Waiter) -> None:
+        waiter.future.cancel()
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        set_admission_queue_depth(len(self._waiters))
+
+    def release(self, tool: str) -> None:
+        self._inflight[tool] = max(0, self._inflight.get(tool, 0) - 1)
+        self._total = max(0, self._total - 1)
+        set_admission_inflight(tool, self._inflight[tool])
+        self._wake()
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.latency.p95()
+        return {
+            "inflight": self._total,
+            "queued": len(self._waiters),
+            "per_tool": {tool: count for tool, count in self._inflight.items() if count},
+            "upstream_p95_seconds": p95,
+            "upstream_slo_breached": self.latency.breached(),
+        }
+
+
+class AdmissionMiddleware(Middleware):
+    """FastMCP middleware: каждый tools/call проходит через AdmissionController."""
+
+    def __init__(self, controller: Optional["AdmissionController"] = None) -> None:
+        self._controller = controller
+
+    @property
+    def controller(self) -> "AdmissionController":
+        return self._controller or get_admission_controller()
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        tool = context.message.name
+        controller = self.controller
+        await controller.acquire(tool)
+        try:
+            return await call_next(context)
+        finally:
+            controller.release(tool)
+
+
+@lru_cache(maxsize=1)
+def get_latency_tracker() -> UpstreamLatencyTracker:
+    return UpstreamLatencyTracker(
+        slo_seconds=float(os.getenv("FNS_UPSTREAM_SLO_SECONDS", "10")),
+        window_seconds=float(os.getenv("FNS_UPSTREAM_SLO_WINDOW", "30")),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    """Единый контроллер допуска процесса, настраивается через переменные окружения."""
+    return AdmissionController(
+        max_inflight=int(os.getenv("FNS_MAX_INFLIGHT_CALLS", "64")),
+        per_tool_limit=int(os.getenv("FNS_MAX_INFLIGHT_PER_TOOL", "16")),
+        tool_limits=parse_tool_limits(os.getenv("FNS_TOOL_LIMITS")),
+        max_queue=int(os.getenv("FNS_ADMISSION_QUEUE", "32")),
+        queue_timeout=float(os.getenv("FNS_ADMISSION_QUEUE_TIMEOUT", "5")),
+        latency=get_latency_tracker(),
+    )
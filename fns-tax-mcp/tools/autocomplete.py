@@ -8,6 +8,8 @@ from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
 from .utils import ToolResult
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -62,18 +64,16 @@ async def autocomplete(
                 meta={"mode": "test", "query": q, "count": len(items)}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "q": q,
-                    "key": token
+                    "q": q
                 }
                 if filter and isinstance(filter, str):
                     params["filter"] = filter
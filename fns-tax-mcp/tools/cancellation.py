@@ -0,0 +1,79 @@
+"""Сквозная отмена вызовов tools: MCP cancel и обрыв HTTP-соединения клиента."""
+# CHANGE: Отмена вызова клиентом прерывает запрос к api-fns.ru и освобождает соединение и буферы
+# WHY: После отмены/отключения агента корутины tools продолжали ждать client.get(...) до 60 с,
+#      а файловые tools докачивали PDF целиком
+# QUOTE(TЗ): "MCP cancel/disconnect aborts the in-flight upstream request and frees its connection
+#             and buffers, and cancellations are counted in metrics"
+# REF: user-029
+
+import asyncio
+import os
+from typing import Any, Optional
+
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from mcp.shared.exceptions import McpError, ErrorData
+from starlette.requests import Request
+
+from metrics import record_tool_cancelled
+
+REASON_CLIENT_CANCEL = "client_cancel"
+REASON_DISCONNECT = "disconnect"
+
+
+def _current_http_request() -> Optional[Request]:
+    """HTTP-запрос текущего tools/call (None для stdio и in-memory клиентов)."""
+    try:
+        return get_http_request()
+    except RuntimeError:
+        return None
+
+
+class CancellationMiddleware(Middleware):
+    """
+    MCP cancel (notifications/cancelled) отменяет корутину обработчика; отмена доходит
+    до вызова tool и его запроса к api-fns.ru. Обрыв HTTP-соединения без cancel
+    обнаруживается опросом request.is_disconnected() и приводит к той же отмене.
+    """
+
+    def __init__(self, poll_interval: Optional[float] = None) -> None:
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else float(os.getenv("FNS_DISCONNECT_POLL_INTERVAL", "0.5"))
+        )
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        tool = context.message.name
+        request = _current_http_request()
+        if request is None or self.poll_interval <= 0:
+            try:
+                return await call_next(context)
+            except asyncio.CancelledError:
+                record_tool_cancelled(tool, REASON_CLIENT_CANCEL)
+                raise
+
+        call = asyncio.ensure_future(call_next(context))
+        disconnected = asyncio.Event()
+        watchdog = asyncio.ensure_future(self._watch(request, call, disconnected))
+        try:
+            # Отмена внешней корутины (MCP cancel) через await отменяет и call
+            return await call
+        except asyncio.CancelledError:
+            if disconnected.is_set():
+                record_tool_cancelled(tool, REASON_DISCONNECT)
+                raise McpError(
+                    ErrorData(code=-32603, message=f"Вызов {tool} прерван: клиент отключился")
+                )
+            record_tool_cancelled(tool, REASON_CLIENT_CANCEL)
+            raise
+        finally:
+            watchdog.cancel()
+
+    async def _watch(self, request: Request, call: asyncio.Future, disconnected: asyncio.Event) -> None:
+        while not call.done():
+            await asyncio.sleep(self.poll_interval)
+            if await request.is_disconnected():
+                disconnected.set()
+                call.cancel()
+                return
@@ -7,7 +7,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult, ensure_allowed_in_free, get_fns_mode
+from .utils import ToolResult, ensure_allowed_in_free, get_fns_mode, require_inn
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -25,6 +27,7 @@ async def check_account_blocks(
     ctx: Context = None
 ) -> ToolResult:
     """Проверка блокировок счета через API-ФНС."""
+    inn = require_inn(inn)
     mode = get_fns_mode()
     
     with tracer.start_as_current_span("check_account_blocks") as span:
@@ -81,18 +84,16 @@ async def check_account_blocks(
                 meta={"mode": "test", "inn": inn}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "inn": inn,
-                    "key": token
+                    "inn": inn
                 }
                 
                 url = "https://api-fns.ru/api/nalogbi"
@@ -165,6 +166,7 @@ async def check_account_blocks_file(
     ctx: Context = None
 ) -> ToolResult:
     """Проверка блокировок счета в виде файла через API-ФНС."""
+    inn = require_inn(inn)
     mode = get_fns_mode()
     
     with tracer.start_as_current_span("check_account_blocks_file") as span:
@@ -195,24 +197,22 @@ async def check_account_blocks_file(
                 meta={"mode": "test", "inn": inn}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with FnsClient(timeout=60.0) as client:
                 params = {
-                    "inn": inn,
-                    "key": token
+                    "inn": inn
                 }
                 if bik:
                     params["bik"] = bik
                 
                 url = "https://api-fns.ru/api/nalogbi_file"
-                response = await client.get(url, params=params)
+                response = await client.download(url, params=params)
                 response.raise_for_status()
                 
                 # Получаем бинарные данные
@@ -6,7 +6,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_company_id
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -25,6 +27,7 @@ async def check_counterparty(
     ctx: Context = None
 ) -> ToolResult:
     """Проверка контрагента через API-ФНС."""
+    req = require_company_id(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("check_counterparty") as span:
@@ -87,18 +90,16 @@ async def check_counterparty(
                 meta={"mode": "test", "req": req}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "req": req,
-                    "key": token
+                    "req": req
                 }
                 
                 url = "https://api-fns.ru/api/check"
@@ -6,7 +6,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_passport
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -24,6 +26,7 @@ async def check_passport(
     ctx: Context = None
 ) -> ToolResult:
     """Проверка паспорта через API-ФНС."""
+    docno = require_passport(docno)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("check_passport") as span:
@@ -50,18 +53,16 @@ async def check_passport(
                 meta={"mode": "test", "docno": docno}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
                     "docno": docno.replace(" ", ""),  # Убираем пробелы
-                    "key": token
                 }
                 
                 url = "https://api-fns.ru/api/mvdpass"
@@ -103,6 +104,7 @@ async def check_passport_info(
     ctx: Context = None
 ) -> ToolResult:
     """Проверка паспорта с информацией через API-ФНС."""
+    docno = require_passport(docno)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("check_passport_info") as span:
@@ -129,18 +131,16 @@ async def check_passport_info(
                 meta={"mode": "test", "docno": docno}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
                     "docno": docno.replace(" ", ""),  # Убираем пробелы
-                    "key": token
                 }
                 
                 url = "https://api-fns.ru/api/mvdinfo"
@@ -0,0 +1,185 @@
+"""Исходящий HTTP-клиент API-ФНС: все запросы к api-fns.ru проходят через планировщик."""
+# CHANGE: Единая точка выхода к api-fns.ru с классификацией запросов по приоритету
+# WHY: Планировщик (tools/scheduler.py) должен видеть каждый исходящий вызов всех tools
+# QUOTE(TЗ): "We want fns-tax-mcp to classify upstream calls by priority class (interactive, batch, background)"
+# REF: user-026
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+import httpx
+
+from metrics import record_upstream_cancelled
+
+from .admission import get_latency_tracker
+from .scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    get_scheduler,
+)
+from .token_pool import OUTCOME_AUTH, OUTCOME_QUOTA, ApiKey, NoAvailableKeyError, get_token_pool
+
+# Методы API-ФНС, которые по своей природе пакетные или служебные.
+# Все остальные считаются интерактивными (ответ ждет пользователь чата).
+METHOD_PRIORITY: Dict[str, str] = {
+    "multinfo": PRIORITY_BATCH,
+    "multcheck": PRIORITY_BATCH,
+    "mon": PRIORITY_BATCH,
+    "stat": PRIORITY_BACKGROUND,
+}
+
+
+class FileTooLargeError(RuntimeError):
+    """Файл от API-ФНС превышает FNS_MAX_FILE_BYTES."""
+
+
+def method_from_url(url: str) -> str:
+    """Имя метода API-ФНС из URL вида https://api-fns.ru/api/egr."""
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+def resolve_priority(method: str) -> str:
+    """Класс приоритета по методу API-ФНС; по умолчанию interactive."""
+    return METHOD_PRIORITY.get(method, PRIORITY_INTERACTIVE)
+
+
+class FnsClient:
+    """
+    Асинхронный клиент API-ФНС с тем же интерфейсом get(), что и httpx.AsyncClient.
+    Каждый запрос занимает слот планировщика своего класса приоритета на время
+    выполнения и чтения ответа. Параметр key подставляется из пула ключей (user-027):
+    при ошибке квоты/авторизации ключ выводится из ротации, а запрос повторяется
+    на следующем подходящем ключе.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 40.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "FnsClient":
+        self._client = httpx.AsyncClient(timeout=self._timeout, transport=self._transport)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        api_key: Optional[ApiKey] = None,
+    ) -> httpx.Response:
+        """GET к API-ФНС; api_key закрепляет запрос за конкретным ключом пула (без перебора)."""
+        return await self._request(url, params, api_key, stream=False)
+
+    async def download(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> httpx.Response:
+        """
+        GET файлового метода API-ФНС (PDF/XLSX) с потоковым чтением тела.
+        Отмена вызова прерывает чтение между чанками, закрывает соединение и отбрасывает
+        уже полученную часть; тело больше max_bytes (FNS_MAX_FILE_BYTES) не буферизуется.
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("FNS_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+        return await self._request(url, params, None, stream=True, max_bytes=max_bytes)
+
+    async def _request(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        api_key: Optional[ApiKey],
+        stream: bool,
+        max_bytes: Optional[int] = None,
+    ) -> httpx.Response:
+        if self._client is None:
+            raise RuntimeError("FnsClient используется вне async with")
+        method = method_from_url(url)
+        priority = resolve_priority(method)
+        pool = get_token_pool()
+        tried: Set[str] = set()
+        response: Optional[httpx.Response] = None
+        async with get_scheduler().slot(priority):
+            if api_key is not None:
+                response, _ = await self._send(pool.take(api_key), method, url, params, stream, max_bytes)
+                return response
+            while True:
+                try:
+                    key = pool.choose(method, exclude=tried)
+                except NoAvailableKeyError:
+                    # Все подходящие ключи выведены из ротации: отдаем последний ответ API как есть
+                    if response is not None:
+                        return response
+                    raise
+                tried.add(key.token)
+                response, outcome = await self._send(key, method, url, params, stream, max_bytes)
+                if outcome not in (OUTCOME_AUTH, OUTCOME_QUOTA):
+                    return response
+
+    async def _send(
+        self,
+        key: ApiKey,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        stream: bool,
+        max_bytes: Optional[int],
+    ) -> Tuple[httpx.Response, str]:
+        pool = get_token_pool()
+        request = self._client.build_request("GET", url, params={**(params or {}), "key": key.token})
+        started = time.monotonic()
+        try:
+            if stream:
+                response = await self._read_streamed(request, max_bytes)
+            else:
+                response = await self._client.send(request)
+        except asyncio.CancelledError:
+            # Отмена — не ошибка ключа и не сигнал о задержке апстрима (user-029)
+            pool.record(key, method, None, cancelled=True)
+            record_upstream_cancelled(method)
+            raise
+        except BaseException:
+            pool.record(key, method, None)
+            get_latency_tracker().observe(time.monotonic() - started)
+            raise
+        # Задержка апстрима питает SLO контроля допуска (user-028)
+        get_latency_tracker().observe(time.monotonic() - started)
+        return response, pool.record(key, method, response.status_code)
+
+    async def _read_streamed(self, request: httpx.Request, max_bytes: Optional[int]) -> httpx.Response:
+        response = await self._client.send(request, stream=True)
+        try:
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if max_bytes and len(body) > max_bytes:
+                    raise FileTooLargeError(
+                        f"Файл от API-ФНС больше допустимых {max_bytes} байт"
+                    )
+        finally:
+            await response.aclose()
+        # Тело уже декодировано: заголовки кодирования/длины исходного ответа не переносим
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=bytes(body),
+            request=request,
+        )
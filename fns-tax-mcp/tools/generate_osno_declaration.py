@@ -5,7 +5,7 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult, validate_inn
+from .utils import ToolResult, require_inn
 from mcp.shared.exceptions import McpError, ErrorData
 from .xml_generator import DeclarationXMLGenerator
 
@@ -30,8 +30,7 @@ async def generate_osno_declaration(
 ) -> ToolResult:
     """Генерирует декларацию ОСНО локально в формате XML по стандартам ФНС."""
     
-    if not validate_inn(inn):
-        raise McpError(ErrorData(code=-32602, message="ИНН должен содержать 10 или 12 цифр"))
+    inn = require_inn(inn)
     
     
     with tracer.start_as_current_span("generate_osno_declaration") as span:
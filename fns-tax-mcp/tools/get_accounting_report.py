@@ -8,7 +8,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_company_id
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -26,6 +28,7 @@ async def get_accounting_report(
     ctx: Context = None
 ) -> ToolResult:
     """Получение бухгалтерской отчетности через API-ФНС."""
+    req = require_company_id(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("get_accounting_report") as span:
@@ -59,18 +62,16 @@ async def get_accounting_report(
                 meta={"mode": "test", "req": req}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "req": req,
-                    "key": token
+                    "req": req
                 }
                 
                 url = "https://api-fns.ru/api/bo"
@@ -121,6 +122,7 @@ async def get_accounting_report_file(
     ctx: Context = None
 ) -> ToolResult:
     """Получение бухгалтерской отчетности в виде файла через API-ФНС."""
+    req = require_company_id(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("get_accounting_report_file") as span:
@@ -155,25 +157,23 @@ async def get_accounting_report_file(
                 meta={"mode": "test", "req": req, "year": year}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with FnsClient(timeout=60.0) as client:
                 params = {
                     "req": req,
-                    "year": year,
-                    "key": token
+                    "year": year
                 }
                 if xls:
                     params["xls"] = 1
                 
                 url = "https://api-fns.ru/api/bo_file"
-                response = await client.get(url, params=params)
+                response = await client.download(url, params=params)
                 response.raise_for_status()
                 
                 # Получаем бинарные данные
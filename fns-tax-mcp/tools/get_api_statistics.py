@@ -6,6 +6,8 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from mcp_instance import mcp
 from .utils import ToolResult
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -54,44 +56,65 @@ async def get_api_statistics(
                 meta={"mode": "test"}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
-                params = {
-                    "key": token
-                }
-                
+            # CHANGE: Статистика запрашивается по каждому ключу пула и синхронизирует его квоты
+            # WHY: Балансировщик выбирает ключ по остатку квоты; использование ключей должно быть видно
+            # QUOTE(TЗ): "per-key usage should be visible"
+            # REF: user-027
+            pool = get_token_pool()
+            stats = []
+            errors = []
+            async with FnsClient(timeout=40.0) as client:
                 url = "https://api-fns.ru/api/stat"
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                result = response.json()
+                for key in pool.keys:
+                    try:
+                        response = await client.get(url, params={}, api_key=key)
+                        response.raise_for_status()
+                        stat = response.json()
+                    except httpx.HTTPError as e:
+                        errors.append(e)
+                        continue
+                    pool.apply_stat(key, stat)
+                    stats.append((key, stat))
+            
+            if not stats:
+                raise errors[0]
+            result = stats[0][1]
             
             await ctx.report_progress(progress=80, total=100)
             
-            human_text = f"Статистика использования API:\n\n"
-            human_text += f"Период: {result.get('ДатаНач', 'N/A')} - {result.get('ДатаОконч', 'N/A')}\n"
-            human_text += f"Статус: {result.get('Статус', 'N/A')}\n\n"
-            human_text += "Методы:\n"
+            human_text = ""
+            for key, stat in stats:
+                if len(pool.keys) > 1:
+                    human_text += f"Ключ {key.key_id}{' (free)' if key.free else ''}:\n"
+                human_text += f"Статистика использования API:\n\n"
+                human_text += f"Период: {stat.get('ДатаНач', 'N/A')} - {stat.get('ДатаОконч', 'N/A')}\n"
+                human_text += f"Статус: {stat.get('Статус', 'N/A')}\n\n"
+                human_text += "Методы:\n"
+                
+                metody = stat.get("Методы", {})
+                for method_name, method_data in metody.items():
+                    limit = method_data.get("Лимит", "N/A")
+                    used = method_data.get("Истрачено", "N/A")
+                    human_text += f"  {method_name}: использовано {used} из {limit}\n"
+                human_text += "\n"
             
-            metody = result.get("Методы", {})
-            for method_name, method_data in metody.items():
-                limit = method_data.get("Лимит", "N/A")
-                used = method_data.get("Истрачено", "N/A")
-                human_text += f"  {method_name}: использовано {used} из {limit}\n"
+            if errors:
+                human_text += f"Не удалось получить статистику по {len(errors)} ключ(ам)\n"
             
             await ctx.report_progress(progress=100, total=100)
             await ctx.info("✅ Статистика получена успешно")
             
             return ToolResult(
                 content=[TextContent(type="text", text=human_text.strip())],
-                structured_content=result,
-                meta={"mode": "prod"}
+                structured_content={**result, "token_pool": pool.snapshot()},
+                meta={"mode": "prod", "keys": len(pool.keys)}
             )
         
         except httpx.HTTPStatusError as e:
@@ -7,7 +7,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_company_id
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -25,6 +27,7 @@ async def get_extract(
     ctx: Context = None
 ) -> ToolResult:
     """Получение выписки через API-ФНС."""
+    req = require_company_id(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("get_extract") as span:
@@ -55,22 +58,20 @@ async def get_extract(
                 meta={"mode": "test", "req": req}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with FnsClient(timeout=60.0) as client:
                 params = {
-                    "req": req,
-                    "key": token
+                    "req": req
                 }
                 
                 url = "https://api-fns.ru/api/vyp"
-                response = await client.get(url, params=params)
+                response = await client.download(url, params=params)
                 response.raise_for_status()
                 
                 # Получаем бинарные данные
@@ -116,6 +117,7 @@ async def get_msp_extract(
     ctx: Context = None
 ) -> ToolResult:
     """Получение выписки МСП через API-ФНС."""
+    req = require_company_id(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("get_msp_extract") as span:
@@ -148,23 +150,21 @@ async def get_msp_extract(
                 meta={"mode": "test", "req": req}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with FnsClient(timeout=60.0) as client:
                 params = {
                     "req": req,
-                    "type": type,
-                    "key": token
+                    "type": type
                 }
                 
                 url = "https://api-fns.ru/api/mspinfo_file"
-                response = await client.get(url, params=params)
+                response = await client.download(url, params=params)
                 response.raise_for_status()
                 
                 # Получаем бинарные данные
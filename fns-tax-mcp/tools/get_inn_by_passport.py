@@ -7,7 +7,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_passport
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -30,6 +32,8 @@ async def get_inn_by_passport(
     ctx: Context = None
 ) -> ToolResult:
     """Получение ИНН по паспорту через API-ФНС."""
+    if doctype in (None, "21"):
+        docno = require_passport(docno)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("get_inn_by_passport") as span:
@@ -65,23 +69,21 @@ async def get_inn_by_passport(
                 meta={"mode": "test", "fam": fam, "nam": nam}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
                     "fam": fam,
                     "nam": nam,
                     "otch": otch,
                     "bdate": bdate,
                     "docno": docno.replace(" ", ""),  # Убираем пробелы
-                    "doctype": doctype or "21",
-                    "key": token
+                    "doctype": doctype or "21"
                 }
                 
                 url = "https://api-fns.ru/api/innfl"
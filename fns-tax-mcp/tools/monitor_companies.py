@@ -7,7 +7,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, require_company_id_list
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -30,6 +32,8 @@ async def monitor_companies(
     ctx: Context = None
 ) -> ToolResult:
     """Мониторинг изменений через API-ФНС."""
+    if cmd in ("add", "del") and isinstance(req, str) and req:
+        req = require_company_id_list(req)
     mode = os.getenv("FNS_MODE", "test").lower()
     
     with tracer.start_as_current_span("monitor_companies") as span:
@@ -76,18 +80,16 @@ async def monitor_companies(
                 meta={"mode": "test", "cmd": cmd}
             )
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "cmd": cmd,
-                    "key": token
+                    "cmd": cmd
                 }
                 if req:
                     params["req"] = req
@@ -0,0 +1,185 @@
+"""Планировщик исходящих запросов к api-fns.ru с приоритетами и взвешенной очередью."""
+# CHANGE: Взвешенная справедливая очередь (WFQ) перед исходящим клиентом API-ФНС
+# WHY: Пакетная проверка на 10k ИНН и чат-пользователи делят один ключ и лимит запросов;
+#      без приоритетов интерактивный get_company_data ждет минутами за батчем
+# QUOTE(TЗ): "classify upstream calls by priority class (interactive, batch, background),
+#             with weighted fair queuing in front of the outbound client and reserved capacity
+#             for interactive calls"
+# REF: user-026
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from metrics import observe_queue_wait, set_inflight, set_queue_depth
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_BACKGROUND)
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    PRIORITY_INTERACTIVE: 8.0,
+    PRIORITY_BATCH: 2.0,
+    PRIORITY_BACKGROUND: 1.0,
+}
+
+
+def parse_weights(raw: Optional[str]) -> Dict[str, float]:
+    """
+    Разбирает строку весов вида "interactive=8,batch=2,background=1".
+    Неизвестные классы и некорректные значения игнорируются.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    if not raw:
+        return weights
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip().lower()
+        if name not in weights:
+            continue
+        try:
+            weight = float(value)
+        except ValueError:
+            continue
+        if weight > 0:
+            weights[name] = weight
+    return weights
+
+
+class PriorityScheduler:
+    """
+    Ограничивает число одновременных запросов к API-ФНС и раздает слоты по классам.
+
+    Инварианты:
+    - всего в полете не больше max_concurrency запросов;
+    - batch и background вместе занимают не больше max_concurrency - interactive_reserved слотов,
+      поэтому interactive всегда имеет зарезервированную емкость;
+    - среди ожидающих классов слот получает класс с минимальным виртуальным временем
+      (stride scheduling), т.е. доли слотов пропорциональны весам.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        interactive_reserved: int = 2,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.max_concurrency - 1)
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update({k: v for k, v in weights.items() if k in self.weights and v > 0})
+        self._queues: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self._pass: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._inflight: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._total_inflight = 0
+
+    def _is_active(self, priority: str) -> bool:
+        return bool(self._queues[priority]) or self._inflight[priority] > 0
+
+    def _activate(self, priority: str) -> None:
+        # Простаивавший класс не копит "кредит": его виртуальное время подтягивается к активным
+        if self._is_active(priority):
+            return
+        active = [self._pass[p] for p in PRIORITIES if p != priority and self._is_active(p)]
+        if active:
+            self._pass[priority] = max(self._pass[priority], min(active))
+
+    def _can_run(self, priority: str) -> bool:
+        if self._total_inflight >= self.max_concurrency:
+            return False
+        if priority == PRIORITY_INTERACTIVE:
+            return True
+        shared = self.max_concurrency - self.interactive_reserved
+        return self._total_inflight - self._inflight[PRIORITY_INTERACTIVE] < shared
+
+    def _pick(self) -> Optional[str]:
+        candidates = [p for p in PRIORITIES if self._queues[p] and self._can_run(p)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: (self._pass[p], PRIORITIES.index(p)))
+
+    def _dispatch(self) -> None:
+        while True:
+            priority = self._pick()
+            if priority is None:
+                return
+            waiter = self._queues[priority].popleft()
+            set_queue_depth(priority, len(self._queues[priority]))
+            if waiter.done():
+                continue
+            self._inflight[priority] += 1
+            self._total_inflight += 1
+            self._pass[priority] += 1.0 / self.weights[priority]
+            set_inflight(priority, self._inflight[priority])
+            waiter.set_result(None)
+
+    async def acquire(self, priority: str) -> None:
+        """Ожидает слот для класса priority; при отмене корректно покидает очередь."""
+        if priority not in self._queues:
+            priority = PRIORITY_INTERACTIVE
+        self._activate(priority)
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        set_queue_depth(priority, len(self._queues[priority]))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            else:
+                waiter.cancel()
+                try:
+                    self._queues[priority].remove(waiter)
+                except ValueError:
+                    pass
+                set_queue_depth(priority, len(self._queues[priority]))
+            raise
+
+    def release(self, priority: str) -> None:
+        """Освобождает слот и передает его следующему по весу ожидающему."""
+        if priority not in self._inflight:
+            priority = PRIORITY_INTERACTIVE
+        self._inflight[priority] -= 1
+        self._total_inflight -= 1
+        set_inflight(priority, self._inflight[priority])
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str) -> AsyncIterator[float]:
+        """Контекст-менеджер слота; отдает время ожидания в очереди в секундах."""
+        started = time.monotonic()
+        await self.acquire(priority)
+        waited = time.monotonic() - started
+        observe_queue_wait(priority, waited)
+        try:
+            yield waited
+        finally:
+            self.release(priority)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Текущее состояние очередей по классам (для /health и отладки)."""
+        return {
+            p: {
+                "queued": len(self._queues[p]),
+                "inflight": self._inflight[p],
+                "weight": self.weights[p],
+            }
+            for p in PRIORITIES
+        }
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> PriorityScheduler:
+    """Единый планировщик процесса, настраивается через переменные окружения."""
+    return PriorityScheduler(
+        max_concurrency=int(os.getenv("FNS_MAX_CONCURRENCY", "8")),
+        interactive_reserved=int(os.getenv("FNS_INTERACTIVE_RESERVED", "2")),
+        weights=parse_weights(os.getenv("FNS_PRIORITY_WEIGHTS")),
+    )
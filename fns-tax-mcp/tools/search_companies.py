@@ -7,7 +7,9 @@ from mcp.types import TextContent
 from opentelemetry import trace
 from pydantic import Field
 from mcp_instance import mcp
-from .utils import ToolResult
+from .utils import ToolResult, normalize_search_query
+from .fns_client import FnsClient
+from .token_pool import get_token_pool
 from mcp.shared.exceptions import McpError, ErrorData
 import httpx
 from . import mocks
@@ -28,6 +30,7 @@ async def search_companies(
     ctx: Context = None
 ) -> ToolResult:
     """Поиск компаний через API-ФНС."""
+    q = normalize_search_query(q)
     
     mode = os.getenv("FNS_MODE", "test").lower()
     
@@ -71,18 +74,16 @@ async def search_companies(
             )
         
         
-        token = os.getenv("FNS_API_TOKEN")
-        if not token:
+        if not get_token_pool().has_keys():
             raise McpError(ErrorData(code=-32602, message="Не указан FNS_API_TOKEN"))
         
         await ctx.report_progress(progress=30, total=100)
         await ctx.info("📤 Отправка запроса в API-ФНС")
         
         try:
-            async with httpx.AsyncClient(timeout=40.0) as client:
+            async with FnsClient(timeout=40.0) as client:
                 params = {
-                    "q": q,
-                    "key": token
+                    "q": q
                 }
                 if page:
                     params["page"] = page
@@ -0,0 +1,297 @@
+"""Пул API-ключей api-fns.ru с балансировкой по остатку квоты и запасу по частоте."""
+# CHANGE: Пул ключей вместо единственного FNS_API_TOKEN
+# WHY: Пропускная способность и дневная квота упирались в один ключ; часть ключей — free
+#      и допускает только методы из FREE_ALLOWED_TOOLS
+# QUOTE(TЗ): "We want a token pool that routes each call to a key that allows the method and has
+#             the most remaining quota and rate headroom. When a key returns quota/auth errors it
+#             should be taken out of rotation automatically, and per-key usage should be visible."
+# REF: user-027
+
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from metrics import record_key_request, set_key_available, set_key_quota_remaining
+
+from .utils import FREE_ALLOWED_TOOLS, get_fns_mode
+
+# Соответствие методов api-fns.ru и tools (для проверки allowlist free-ключей)
+METHOD_TOOLS: Dict[str, str] = {
+    "search": "search_companies",
+    "ac": "autocomplete",
+    "egr": "get_company_data",
+    "multinfo": "multinfo_companies",
+    "multcheck": "multcheck_companies",
+    "check": "check_counterparty",
+    "nalogbi": "check_account_blocks",
+    "nalogbi_file": "check_account_blocks_file",
+    "changes": "track_changes",
+    "mon": "monitor_companies",
+    "vyp": "get_extract",
+    "mspinfo_file": "get_msp_extract",
+    "bo": "get_accounting_report",
+    "bo_file": "get_accounting_report_file",
+    "innfl": "get_inn_by_passport",
+    "mvdpass": "check_passport",
+    "mvdinfo": "check_passport_info",
+    "fl_status": "check_person_status",
+    "fsrar": "get_fsrar_licenses",
+    "stat": "get_api_statistics",
+}
+
+# HTTP-статусы, после которых ключ выводится из ротации
+AUTH_ERROR_STATUSES = {401, 403}
+QUOTA_ERROR_STATUSES = {402, 429}
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_AUTH = "auth"
+OUTCOME_QUOTA = "quota"
+OUTCOME_CANCELLED = "cancelled"
+
+
+class NoAvailableKeyError(RuntimeError):
+    """Нет ни одного ключа, которому разрешен метод и который сейчас в ротации."""
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _next_midnight() -> float:
+    tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    return tomorrow.timestamp()
+
+
+@dataclass
+class ApiKey:
+    """Состояние одного ключа api-fns.ru."""
+
+    token: str
+    free: bool = False
+    daily_limit: Optional[int] = None
+    rate_per_minute: int = 60
+    used_today: int = 0
+    used_day: date = field(default_factory=date.today)
+    inflight: int = 0
+    disabled_until: float = 0.0
+    disabled_reason: Optional[str] = None
+    method_limits: Dict[str, int] = field(default_factory=dict)
+    method_used: Dict[str, int] = field(default_factory=dict)
+    recent: Deque[float] = field(default_factory=deque)
+
+    @property
+    def key_id(self) -> str:
+        """Маскированный идентификатор ключа для логов и метрик."""
+        return f"…{self.token[-4:]}" if len(self.token) > 4 else "…"
+
+    def allows(self, method: str) -> bool:
+        if not self.free:
+            return True
+        return METHOD_TOOLS.get(method) in FREE_ALLOWED_TOOLS
+
+    def available(self, now: float) -> bool:
+        if self.disabled_until and now >= self.disabled_until:
+            self.disabled_until = 0.0
+            self.disabled_reason = None
+            set_key_available(self.key_id, True)
+        return not self.disabled_until
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self.used_day:
+            self.used_day = today
+            self.used_today = 0
+            self.method_used.clear()
+
+    def remaining(self, method: str) -> float:
+        """Остаток квоты по методу; inf, если лимит неизвестен."""
+        self._roll_day()
+        candidates: List[float] = []
+        if method in self.method_limits:
+            candidates.append(self.method_limits[method] - self.method_used.get(method, 0))
+        if self.daily_limit is not None:
+            candidates.append(self.daily_limit - self.used_today)
+        return min(candidates) if candidates else float("inf")
+
+    def rate_headroom(self, now: float) -> int:
+        while self.recent and now - self.recent[0] > 60.0:
+            self.recent.popleft()
+        return self.rate_per_minute - len(self.recent)
+
+
+def parse_keys(raw: Optional[str], default_free: bool = False, rate_per_minute: int = 60) -> List[ApiKey]:
+    """
+    Разбирает список ключей вида "token1,token2:free,token3:paid:5000".
+    Суффиксы: free|paid — тип ключа, число — дневной лимит запросов.
+    """
+    keys: List[ApiKey] = []
+    if not raw:
+        return keys
+    for entry in raw.split(","):
+        parts = [p.strip() for p in entry.strip().split(":") if p.strip()]
+        if not parts:
+            continue
+        key = ApiKey(token=parts[0], free=default_free, rate_per_minute=rate_per_minute)
+        for option in parts[1:]:
+            if option.lower() == "free":
+                key.free = True
+            elif option.lower() == "paid":
+                key.free = False
+            elif option.isdigit():
+                key.daily_limit = int(option)
+        keys.append(key)
+    return keys
+
+
+class TokenPool:
+    """
+    Выбирает ключ для каждого вызова API-ФНС.
+
+    Порядок предпочтения среди ключей, которые разрешают метод и находятся в ротации:
+    есть запас по частоте > больший остаток квоты по методу > больший запас по частоте >
+    меньше запросов в полете.
+    """
+
+    def __init__(self, keys: Iterable[ApiKey], auth_cooldown: float = 3600.0) -> None:
+        self.keys: List[ApiKey] = []
+        seen: Set[str] = set()
+        for key in keys:
+            if key.token not in seen:
+                seen.add(key.token)
+                self.keys.append(key)
+        self.auth_cooldown = auth_cooldown
+        for key in self.keys:
+            set_key_available(key.key_id, True)
+
+    def has_keys(self) -> bool:
+        return bool(self.keys)
+
+    def choose(self, method: str, exclude: Optional[Set[str]] = None) -> ApiKey:
+        now = time.time()
+        candidates = [
+            key
+            for key in self.keys
+            if key.allows(method)
+            and key.available(now)
+            and key.remaining(method) > 0
+            and (not exclude or key.token not in exclude)
+        ]
+        if not candidates:
+            raise NoAvailableKeyError(f"Нет доступного ключа API-ФНС для метода {method}")
+        best = max(
+            candidates,
+            key=lambda k: (
+                k.rate_headroom(now) > 0,
+                k.remaining(method),
+                k.rate_headroom(now),
+                -k.inflight,
+            ),
+        )
+        return self.take(best, now)
+
+    def take(self, key: ApiKey, now: Optional[float] = None) -> ApiKey:
+        """Отмечает запрос на ключе (в полете и в окне частоты); парный вызов — record()."""
+        key.inflight += 1
+        key.recent.append(time.time() if now is None else now)
+        return key
+
+    def record(self, key: ApiKey, method: str, status_code: Optional[int], cancelled: bool = False) -> str:
+        """Учитывает результат запроса; при ошибке квоты/авторизации выводит ключ из ротации."""
+        key.inflight = max(0, key.inflight - 1)
+        if cancelled:
+            outcome = OUTCOME_CANCELLED
+        elif status_code is None:
+            outcome = OUTCOME_ERROR
+        elif status_code in AUTH_ERROR_STATUSES:
+            outcome = OUTCOME_AUTH
+            self.disable(key, "auth", time.time() + self.auth_cooldown)
+        elif status_code in QUOTA_ERROR_STATUSES:
+            outcome = OUTCOME_QUOTA
+            self.disable(key, "quota", _next_midnight())
+        elif status_code < 400:
+            outcome = OUTCOME_OK
+            key._roll_day()
+            key.used_today += 1
+            key.method_used[method] = key.method_used.get(method, 0) + 1
+            remaining = key.remaining(method)
+            if remaining != float("inf"):
+                set_key_quota_remaining(key.key_id, method, remaining)
+        else:
+            outcome = OUTCOME_ERROR
+        record_key_request(key.key_id, outcome)
+        return outcome
+
+    def disable(self, key: ApiKey, reason: str, until: float) -> None:
+        key.disabled_until = until
+        key.disabled_reason = reason
+        set_key_available(key.key_id, False)
+
+    def apply_stat(self, key: ApiKey, stat: Dict[str, Any]) -> None:
+        """Синхронизирует лимиты ключа с ответом метода stat ("Методы": {"egr": {"Лимит", "Истрачено"}})."""
+        key._roll_day()
+        methods = stat.get("Методы", {}) if isinstance(stat, dict) else {}
+        if not isinstance(methods, dict):
+            return
+        for method, data in methods.items():
+            if not isinstance(data, dict):
+                continue
+            limit = _to_int(data.get("Лимит"))
+            used = _to_int(data.get("Истрачено"))
+            if limit is not None:
+                key.method_limits[method] = limit
+            if used is not None:
+                key.method_used[method] = used
+            if limit is not None and used is not None:
+                set_key_quota_remaining(key.key_id, method, limit - used)
+        status = str(stat.get("Статус", "")).upper()
+        if status == "FREE":
+            key.free = True
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Использование каждого ключа (без раскрытия самого ключа)."""
+        now = time.time()
+        return [
+            {
+                "key": key.key_id,
+                "free": key.free,
+                "available": key.available(now),
+                "disabled_reason": key.disabled_reason,
+                "used_today": key.used_today,
+                "daily_limit": key.daily_limit,
+                "inflight": key.inflight,
+                "rate_headroom": key.rate_headroom(now),
+                "methods": {
+                    method: {
+                        "limit": key.method_limits.get(method),
+                        "used": key.method_used.get(method, 0),
+                    }
+                    for method in sorted(set(key.method_limits) | set(key.method_used))
+                },
+            }
+            for key in self.keys
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_token_pool() -> TokenPool:
+    """
+    Единый пул ключей процесса.
+    FNS_API_TOKENS — список ключей; FNS_API_TOKEN поддерживается для обратной совместимости
+    (в режиме free считается free-ключом).
+    """
+    rate = int(os.getenv("FNS_KEY_RATE_PER_MIN", "60"))
+    keys = parse_keys(os.getenv("FNS_API_TOKENS"), rate_per_minute=rate)
+    keys += parse_keys(
+        os.getenv("FNS_API_TOKEN"),
+        default_free=get_fns_mode() == "free",
+        rate_per_minute=rate,
+    )
+    return TokenPool(keys, auth_cooldown=float(os.getenv("FNS_KEY_AUTH_COOLDOWN", "3600")))
@@ -1,5 +1,6 @@
 """Общие утилиты для tools."""
-from typing import Any, Dict, List, Set
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
 from mcp.types import TextContent
 from dataclasses import dataclass
 import os
@@ -15,19 +16,156 @@ class ToolResult:
     meta: Dict[str, Any]
 
 
+# CHANGE: Нормализация и проверка контрольных сумм ИНН/ОГРН/ОГРНИП/паспорта перед запросом к API
+# WHY: validate_inn проверял только длину, а tools поиска/проверок/выписок/мониторинга отправляли
+#      в api-fns.ru любые строки, тратя квоту и круговую задержку на опечатки
+# QUOTE(TЗ): "a fast validation layer with INN and OGRN/OGRNIP checksum checks and normalization
+#             (spaces, dashes) in front of every FNS tool and the batch paths"
+# REF: user-030
+_IDENTIFIER_SEPARATORS = re.compile(r"[\s\-\u00a0\u2010-\u2015]")
+
+_INN10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN11_WEIGHTS = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN12_WEIGHTS = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+
+def normalize_identifier(value: Optional[str]) -> str:
+    """Убирает пробелы, дефисы и тире: "77 07-083 893" -> "7707083893"."""
+    return _IDENTIFIER_SEPARATORS.sub("", value or "")
+
+
+def _inn_control(digits: str, weights: Tuple[int, ...]) -> int:
+    return sum(int(d) * w for d, w in zip(digits, weights)) % 11 % 10
+
+
+def inn_error(inn: Optional[str]) -> Optional[str]:
+    """Причина невалидности ИНН или None, если ИНН корректен (длина и контрольные цифры)."""
+    value = normalize_identifier(inn)
+    if not value.isdigit() or len(value) not in (10, 12):
+        return f"ИНН должен содержать 10 или 12 цифр, получено: {inn!r}"
+    if len(value) == 10:
+        expected = _inn_control(value, _INN10_WEIGHTS)
+        if expected != int(value[9]):
+            return f"ИНН {value}: неверная контрольная цифра (ожидалась {expected} в 10-м разряде)"
+        return None
+    expected11 = _inn_control(value, _INN11_WEIGHTS)
+    if expected11 != int(value[10]):
+        return f"ИНН {value}: неверная контрольная цифра (ожидалась {expected11} в 11-м разряде)"
+    expected12 = _inn_control(value, _INN12_WEIGHTS)
+    if expected12 != int(value[11]):
+        return f"ИНН {value}: неверная контрольная цифра (ожидалась {expected12} в 12-м разряде)"
+    return None
+
+
+def ogrn_error(ogrn: Optional[str]) -> Optional[str]:
+    """Причина невалидности ОГРН (13 цифр) / ОГРНИП (15 цифр) или None."""
+    value = normalize_identifier(ogrn)
+    if not value.isdigit() or len(value) not in (13, 15):
+        return f"ОГРН должен содержать 13 цифр (ОГРНИП — 15), получено: {ogrn!r}"
+    if len(value) == 13:
+        expected = int(value[:12]) % 11 % 10
+        name = "ОГРН"
+    else:
+        expected = int(value[:14]) % 13 % 10
+        name = "ОГРНИП"
+    if expected != int(value[-1]):
+        return f"{name} {value}: неверная контрольная цифра (ожидалась {expected})"
+    return None
+
+
+def company_id_error(value: Optional[str]) -> Optional[str]:
+    """Проверка параметра "ОГРН или ИНН": вид определяется по числу цифр."""
+    normalized = normalize_identifier(value)
+    if normalized.isdigit() and len(normalized) in (13, 15):
+        return ogrn_error(normalized)
+    if normalized.isdigit() and len(normalized) in (10, 12):
+        return inn_error(normalized)
+    return f"Ожидается ИНН (10/12 цифр) или ОГРН (13/15 цифр), получено: {value!r}"
+
+
+def passport_error(docno: Optional[str]) -> Optional[str]:
+    """Серия и номер паспорта РФ: 4 + 6 цифр."""
+    value = normalize_identifier(docno)
+    if not value.isdigit() or len(value) != 10:
+        return f"Серия и номер паспорта РФ должны содержать 10 цифр, получено: {docno!r}"
+    return None
+
+
 def validate_inn(inn: str) -> bool:
-    """Валидация ИНН (10 или 12 цифр)."""
-    
-    if not inn:
-        return False
-    
-    # Убираем пробелы и проверяем, что все символы - цифры
-    inn_clean = inn.strip().replace(" ", "")
-    if not inn_clean.isdigit():
-        return False
-    
-    # Проверяем длину
-    return len(inn_clean) in (10, 12)
+    """Валидация ИНН: 10 или 12 цифр с корректными контрольными цифрами."""
+    return inn_error(inn) is None
+
+
+def validate_ogrn(ogrn: str) -> bool:
+    """Валидация ОГРН/ОГРНИП по контрольной цифре."""
+    return ogrn_error(ogrn) is None
+
+
+def _invalid_params(message: str) -> McpError:
+    return McpError(ErrorData(code=-32602, message=message))
+
+
+def require_inn(inn: str, person_only: bool = False) -> str:
+    """Нормализованный ИНН или McpError(-32602) с точной причиной."""
+    error = inn_error(inn)
+    if error:
+        raise _invalid_params(error)
+    value = normalize_identifier(inn)
+    if person_only and len(value) != 12:
+        raise _invalid_params(f"ИНН физического лица должен содержать 12 цифр, получено: {inn!r}")
+    return value
+
+
+def require_company_id(req: str) -> str:
+    """Нормализованный ИНН/ОГРН/ОГРНИП или McpError(-32602) с точной причиной."""
+    error = company_id_error(req)
+    if error:
+        raise _invalid_params(error)
+    return normalize_identifier(req)
+
+
+def require_company_id_list(req: str, max_items: int = 100) -> str:
+    """
+    Проверка списка "ОГРН или ИНН через запятую" для пакетных методов.
+    Возвращает нормализованный список без дубликатов в исходном порядке.
+    """
+    items: List[str] = []
+    seen: Set[str] = set()
+    for position, raw in enumerate((req or "").split(","), start=1):
+        if not raw.strip():
+            continue
+        error = company_id_error(raw)
+        if error:
+            raise _invalid_params(f"Элемент {position}: {error}")
+        value = normalize_identifier(raw)
+        if value not in seen:
+            seen.add(value)
+            items.append(value)
+    if not items:
+        raise _invalid_params("Не указан ни один ИНН или ОГРН")
+    if len(items) > max_items:
+        raise _invalid_params(f"Слишком много компаний: {len(items)}, допускается не более {max_items}")
+    return ",".join(items)
+
+
+def require_passport(docno: str) -> str:
+    """Нормализованные серия и номер паспорта РФ или McpError(-32602)."""
+    error = passport_error(docno)
+    if error:
+        raise _invalid_params(error)
+    return normalize_identifier(docno)
+
+
+def normalize_search_query(q: str) -> str:
+    """
+    Поисковая строка свободная (название, ФИО, адрес, телефон), поэтому проверяется только
+    запрос, который однозначно является ИНН ФЛ/ОГРН/ОГРНИП (12, 13 или 15 цифр после
+    нормализации). 10 цифр не проверяются: так же выглядит телефон без кода страны.
+    """
+    normalized = normalize_identifier(q)
+    if normalized.isdigit() and len(normalized) in (12, 13, 15):
+        return require_company_id(normalized)
+    return q
 
 
 def format_tax_amount(amount: float) -> str:
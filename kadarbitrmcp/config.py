@@ -12,6 +12,33 @@ class Settings:
     mode: str
     base_url: str
     timeout: float
+    http2: bool
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    cache_enabled: bool
+    cache_dir: Optional[str]
+    case_ttl: float
+    search_ttl: float
+    cache_max_entries: int
+    search_concurrency: int
+    search_page_cap: int
+    details_concurrency: int
+    rate_limit: float
+    batch_concurrency: int
+    batch_max_inns: int
+    pdf_cache_mb: float
+    pdf_workers: int
+    pdf_ruling_chars: int
+    watch_max_cases: int
+    watch_max_details: int
+    timeout_min: float
+    timeout_multiplier: float
+    retries: int
+    retry_backoff: float
+    hedge: bool
+    breaker_failures: int
+    breaker_reset: float
     host: str
     port: int
     otel_endpoint: Optional[str]
@@ -27,6 +54,33 @@ class Settings:
         api_key = os.getenv("ARBITR_API_KEY", "")
         base_url = os.getenv("ARBITR_BASE_URL", "https://service.api-assist.com/parser/arbitr_api").rstrip("/")
         timeout = float(os.getenv("ARBITR_TIMEOUT", "15"))
+        http2 = os.getenv("ARBITR_HTTP2", "false").lower() in {"1", "true", "yes"}
+        max_connections = int(os.getenv("ARBITR_MAX_CONNECTIONS", "20"))
+        max_keepalive_connections = int(os.getenv("ARBITR_MAX_KEEPALIVE", "10"))
+        keepalive_expiry = float(os.getenv("ARBITR_KEEPALIVE_EXPIRY", "30"))
+        cache_enabled = os.getenv("ARBITR_CACHE", "on").lower() not in {"0", "off", "false", "no"}
+        cache_dir = os.getenv("ARBITR_CACHE_DIR") or None
+        case_ttl = float(os.getenv("ARBITR_CASE_TTL", "600"))
+        search_ttl = float(os.getenv("ARBITR_SEARCH_TTL", "300"))
+        cache_max_entries = int(os.getenv("ARBITR_CACHE_MAX_ENTRIES", "2000"))
+        search_concurrency = int(os.getenv("ARBITR_SEARCH_CONCURRENCY", "4"))
+        search_page_cap = int(os.getenv("ARBITR_SEARCH_PAGE_CAP", "40"))
+        details_concurrency = int(os.getenv("ARBITR_DETAILS_CONCURRENCY", "8"))
+        rate_limit = float(os.getenv("ARBITR_RATE_LIMIT", "10"))
+        batch_concurrency = int(os.getenv("ARBITR_BATCH_CONCURRENCY", "4"))
+        batch_max_inns = int(os.getenv("ARBITR_BATCH_MAX_INNS", "5000"))
+        pdf_cache_mb = float(os.getenv("ARBITR_PDF_CACHE_MB", "200"))
+        pdf_workers = int(os.getenv("ARBITR_PDF_WORKERS", "2"))
+        pdf_ruling_chars = int(os.getenv("ARBITR_PDF_RULING_CHARS", "3000"))
+        watch_max_cases = int(os.getenv("ARBITR_WATCH_MAX_CASES", "5000"))
+        watch_max_details = int(os.getenv("ARBITR_WATCH_MAX_DETAILS", "200"))
+        timeout_min = float(os.getenv("ARBITR_TIMEOUT_MIN", "2"))
+        timeout_multiplier = float(os.getenv("ARBITR_TIMEOUT_MULTIPLIER", "3"))
+        retries = int(os.getenv("ARBITR_RETRIES", "2"))
+        retry_backoff = float(os.getenv("ARBITR_RETRY_BACKOFF", "0.5"))
+        hedge = os.getenv("ARBITR_HEDGE", "on").lower() not in {"0", "off", "false", "no"}
+        breaker_failures = int(os.getenv("ARBITR_BREAKER_FAILURES", "5"))
+        breaker_reset = float(os.getenv("ARBITR_BREAKER_RESET", "30"))
         host = os.getenv("HOST", "0.0.0.0")
         port = int(os.getenv("PORT", "8080"))
         otel_endpoint = os.getenv("OTEL_ENDPOINT")
@@ -41,6 +95,33 @@ class Settings:
             mode=mode,
             base_url=base_url,
             timeout=timeout,
+            http2=http2,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            cache_enabled=cache_enabled,
+            cache_dir=cache_dir,
+            case_ttl=case_ttl,
+            search_ttl=search_ttl,
+            cache_max_entries=cache_max_entries,
+            search_concurrency=search_concurrency,
+            search_page_cap=search_page_cap,
+            details_concurrency=details_concurrency,
+            rate_limit=rate_limit,
+            batch_concurrency=batch_concurrency,
+            batch_max_inns=batch_max_inns,
+            pdf_cache_mb=pdf_cache_mb,
+            pdf_workers=pdf_workers,
+            pdf_ruling_chars=pdf_ruling_chars,
+            watch_max_cases=watch_max_cases,
+            watch_max_details=watch_max_details,
+            timeout_min=timeout_min,
+            timeout_multiplier=timeout_multiplier,
+            retries=retries,
+            retry_backoff=retry_backoff,
+            hedge=hedge,
+            breaker_failures=breaker_failures,
+            breaker_reset=breaker_reset,
             host=host,
             port=port,
             otel_endpoint=otel_endpoint,
@@ -1,7 +1,18 @@
 """Shared FastMCP instance for arbitr-mcp."""
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastmcp import FastMCP
 
-mcp = FastMCP("arbitr-mcp")
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    from tools.arbitr_client import api_client_session
+    from tools.pdf_store import pdf_pool_session
+
+    async with api_client_session(), pdf_pool_session():
+        yield
 
 
+mcp = FastMCP("arbitr-mcp", lifespan=lifespan)
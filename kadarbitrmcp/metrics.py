@@ -18,6 +18,12 @@ tool_duration_seconds = Histogram(
     buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
 )
 
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Case and search cache lookups by cache/result",
+    labelnames=("cache", "result"),
+)
+
 
 def record_tool_call(tool: str, status: str, mode: str) -> None:
     try:
@@ -33,6 +39,13 @@ def observe_duration(tool: str, mode: str, seconds: float) -> None:
         pass
 
 
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    try:
+        cache_requests_total.labels(cache=cache, result="hit" if hit else "miss").inc()
+    except Exception:
+        pass
+
+
 async def metrics_handler() -> Response:
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
@@ -21,6 +21,12 @@ from tools import (
     arbitr_details_by_number,
     arbitr_details_by_id,
     arbitr_download_pdf,
+    arbitr_search_with_details,
+    arbitr_batch_exposure,
+    arbitr_watch_inns,
+    arbitr_watch_poll,
+    arbitr_watch_events,
+    arbitr_litigation_graph,
 )
 
 tracer = trace.get_tracer(__name__)
@@ -1,5 +1,7 @@
 """Tests for Arbitr MCP tools and HTTP client."""
 
+import asyncio
+import os
 import pathlib
 import sys
 
@@ -16,8 +18,24 @@ from tools import (
     arbitr_details_by_number,
     arbitr_details_by_id,
     arbitr_download_pdf,
+    arbitr_search_with_details,
+    arbitr_batch_exposure,
+    arbitr_watch_inns,
+    arbitr_watch_poll,
+    arbitr_watch_events,
+    arbitr_litigation_graph,
 )
-from tools.arbitr_client import ArbitrApiClient, ArbitrApiError
+from tools.arbitr_client import (
+    ArbitrApiClient,
+    ArbitrApiError,
+    CircuitOpenError,
+    api_client_session,
+    get_api_client,
+)
+from tools.arbitr_stubs import stub_details_by_id, stub_pdf_download
+from tools.case_cache import CaseCache
+from tools.litigation_graph import get_litigation_graph
+from tools.pdf_store import PdfStore, ruling_paragraphs
 
 
 class MockContext:
@@ -34,6 +52,11 @@ class MockContext:
 @pytest.fixture(autouse=True)
 def ensure_test_mode(monkeypatch):
     monkeypatch.setenv("ARBITR_MODE", "test")
+    monkeypatch.setattr("tools.arbitr_client._shared", None)
+    monkeypatch.setattr("tools.case_cache._cache", None)
+    monkeypatch.setattr("tools.pdf_store._store", None)
+    monkeypatch.setattr("tools.watch_store._store", None)
+    monkeypatch.setattr("tools.litigation_graph._graph", None)
     reload_settings()
     yield
     reload_settings()
@@ -110,3 +133,481 @@ async def test_client_handles_403(monkeypatch):
     with pytest.raises(ArbitrApiError):
         await client.search_cases(Inn="TEST")
 
+
+
+@pytest.mark.asyncio
+async def test_client_retries_transient_errors_and_opens_circuit(monkeypatch):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    monkeypatch.setenv("ARBITR_RATE_LIMIT", "0")
+    monkeypatch.setenv("ARBITR_RETRY_BACKOFF", "0")
+    monkeypatch.setenv("ARBITR_BREAKER_FAILURES", "3")
+    settings = reload_settings()
+    statuses = [503, 200]
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        status = statuses.pop(0) if statuses else 503
+        if status == 200:
+            return httpx.Response(200, json={"Success": 1, "Cases": [], "PagesCount": 1})
+        return httpx.Response(status, json={"error": "unavailable"})
+
+    client = ArbitrApiClient(settings, transport=httpx.MockTransport(handler))
+    assert (await client.details_by_id("id-1"))["Success"] == 1
+    assert len(calls) == 2
+
+    # three transient failures in a row exhaust the retries and open the circuit
+    with pytest.raises(ArbitrApiError) as failed:
+        await client.details_by_id("id-2")
+    assert failed.value.status_code == 503 and "key=" not in str(failed.value)
+    assert len(calls) == 5 and client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await client.details_by_id("id-3")
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_keep_circuit_open(monkeypatch):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    monkeypatch.setenv("ARBITR_RATE_LIMIT", "0")
+    monkeypatch.setenv("ARBITR_RETRIES", "0")
+    monkeypatch.setenv("ARBITR_BREAKER_FAILURES", "1")
+    settings = reload_settings()
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["CaseId"])
+        if len(calls) == 1:
+            return httpx.Response(503, json={"error": "unavailable"})
+        if len(calls) == 2:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"Success": 1, "Cases": []})
+
+    client = ArbitrApiClient(settings, transport=httpx.MockTransport(handler))
+    with pytest.raises(ArbitrApiError):
+        await client.details_by_id("id-1")
+    client.breaker.opened_at -= settings.breaker_reset
+
+    probe = asyncio.ensure_future(client.details_by_id("id-2"))
+    await asyncio.sleep(0.05)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert (await client.details_by_id("id-3"))["Success"] == 1
+    assert client.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_client_hedges_slow_idempotent_request(monkeypatch):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    monkeypatch.setenv("ARBITR_RATE_LIMIT", "0")
+    settings = reload_settings()
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["CaseId"])
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"Success": 1, "Cases": [{"CaseId": "id-1"}]})
+
+    client = ArbitrApiClient(settings, transport=httpx.MockTransport(handler))
+    for _ in range(20):
+        client._tracker("details_by_id").observe(0.01)
+    assert client.attempt_timeout("details_by_id") == settings.timeout_min
+
+    data = await asyncio.wait_for(client.details_by_id("id-1"), timeout=1)
+    assert data["Cases"][0]["CaseId"] == "id-1"
+    assert calls == ["id-1", "id-1"]
+    assert client.hedge_delay("pdf_download") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_in_flight_request(monkeypatch):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    monkeypatch.setenv("ARBITR_RATE_LIMIT", "0")
+    settings = reload_settings()
+    cancelled = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.params["CaseId"])
+            raise
+        return httpx.Response(200, json={"Success": 1, "Cases": []})
+
+    client = ArbitrApiClient(settings, transport=httpx.MockTransport(handler))
+    for _ in range(20):
+        client._tracker("details_by_id").observe(1.0)
+
+    # the caller gives up while the primary request is still inside the hedge delay
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(client.details_by_id("id-1"), timeout=0.05)
+    await asyncio.sleep(0)
+    assert cancelled == ["id-1"]
+
+
+@pytest.mark.asyncio
+async def test_tools_share_pooled_client(monkeypatch, ctx):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    settings = reload_settings()
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json={"Success": 1, "Cases": [], "PagesCount": 1})
+
+    shared = get_api_client(settings)
+    shared.transport = httpx.MockTransport(handler)
+
+    async with api_client_session():
+        await arbitr_search_cases.fn(Inn="TEST", ctx=ctx)
+        pooled = shared.client
+        await arbitr_details_by_id.fn(CaseId="6fb9afec-b71d-4183-b917-4cace5958c16", ctx=ctx)
+        assert get_api_client(settings) is shared
+        assert shared.client is pooled
+
+    assert paths == ["search", "details_by_id"]
+    assert pooled.is_closed
+    assert get_api_client(settings) is not shared
+
+
+def _prod_with_transport(monkeypatch, handler, **env):
+    monkeypatch.setenv("ARBITR_MODE", "prod")
+    monkeypatch.setenv("ARBITR_API_KEY", "dummy-key")
+    monkeypatch.setenv("ARBITR_RATE_LIMIT", "0")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    settings = reload_settings()
+    get_api_client(settings).transport = httpx.MockTransport(handler)
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_finished_case_cached_on_disk_by_number_and_id(monkeypatch, tmp_path, ctx):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=stub_details_by_id())
+
+    _prod_with_transport(monkeypatch, handler, ARBITR_CACHE_DIR=str(tmp_path))
+    case_id = "6fb9afec-b71d-4183-b917-4cace5958c16"
+
+    first = await arbitr_details_by_number.fn(CaseNumber="A71-1202/2015", ctx=ctx)
+    by_id = await arbitr_details_by_id.fn(CaseId=case_id, ctx=ctx)
+    assert first["meta"]["cached"] is False
+    assert by_id["meta"]["cached"] is True
+    assert calls == ["details_by_number"]
+
+    restarted = CaseCache(directory=str(tmp_path))
+    assert restarted.get_by_number("А71-1202/2015")["Cases"][0]["CaseId"] == case_id
+    assert restarted.get_by_id(case_id) is not None
+
+
+def test_active_case_and_search_expire():
+    now = [0.0]
+    cache = CaseCache(case_ttl=60, search_ttl=10, clock=lambda: now[0])
+    active = stub_details_by_id()
+    active["Cases"][0]["Finished"] = False
+    cache.put_details(active)
+    cache.put_search({"Inn": " Роснефть ", "page": None}, {"Success": 1, "Cases": []})
+
+    assert cache.get_search({"Inn": "РОСНЕФТЬ"}) is not None
+    assert cache.get_by_number("А71-1202/2015") is not None
+    now[0] = 30
+    assert cache.get_search({"Inn": "РОСНЕФТЬ"}) is None
+    assert cache.get_by_id("6fb9afec-b71d-4183-b917-4cace5958c16") is not None
+    now[0] = 61
+    assert cache.get_by_id("6fb9afec-b71d-4183-b917-4cace5958c16") is None
+
+
+def test_case_number_aliases_bounded():
+    cache = CaseCache(max_entries=2)
+    for index in range(10):
+        cache.put_details({"Cases": [{"CaseId": f"id-{index}", "CaseNumber": f"А40-{index}/2024"}]})
+
+    assert len(cache.numbers.entries) == 4
+    assert cache.get_by_number("A40-9/2024")["Cases"][0]["CaseId"] == "id-9"
+    assert cache.get_by_number("А40-0/2024") is None
+
+
+@pytest.mark.asyncio
+async def test_search_all_pages_dedups_and_splits_dates(monkeypatch, ctx):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        requests.append((params.get("DateFrom"), params.get("DateTo"), params.get("page")))
+        if params.get("DateFrom") == "2024-01-01" and params.get("DateTo") == "2024-01-31":
+            return httpx.Response(200, json={"Success": 1, "Cases": [], "PagesCount": 5})
+        page = int(params["page"])
+        cases = [{"CaseId": f"{params['DateFrom']}-{page}"}, {"CaseId": "shared"}]
+        return httpx.Response(200, json={"Success": 1, "Cases": cases, "PagesCount": 2})
+
+    _prod_with_transport(monkeypatch, handler, ARBITR_SEARCH_PAGE_CAP="3")
+    result = await arbitr_search_cases.fn(
+        Inn="7706107510", DateFrom="2024-01-01", DateTo="2024-01-31", all_pages=True, ctx=ctx
+    )
+
+    ids = [case["CaseId"] for case in result["structured_content"]["Cases"]]
+    assert sorted(ids) == ["2024-01-01-1", "2024-01-01-2", "2024-01-17-1", "2024-01-17-2", "shared"]
+    assert result["structured_content"]["Windows"] == 3
+    assert result["meta"]["truncated"] is False
+    assert ("2024-01-17", "2024-01-31", "2") in requests
+
+
+@pytest.mark.asyncio
+async def test_search_with_details_merges_profile(monkeypatch, ctx):
+    details_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        if endpoint == "search":
+            cases = [
+                {"CaseId": f"case-{i}", "CaseNumber": f"А40-{i}/2024", "StartDate": f"2024-0{i}-01"}
+                for i in range(1, 5)
+            ]
+            return httpx.Response(200, json={"Success": 1, "Cases": cases, "PagesCount": 1})
+        case_id = request.url.params["CaseId"]
+        details_calls.append(case_id)
+        if case_id == "case-3":
+            return httpx.Response(400, json={"error": "Case not found", "error_code": 40001})
+        if case_id == "case-4":
+            return httpx.Response(504, text="Gateway Timeout")
+        detail = stub_details_by_id()["Cases"][0]
+        detail.update({"CaseId": case_id, "StartDate": None})
+        return httpx.Response(200, json={"Success": 1, "Cases": [detail]})
+
+    _prod_with_transport(monkeypatch, handler, ARBITR_RETRY_BACKOFF="0", ARBITR_BREAKER_FAILURES="0")
+    result = await arbitr_search_with_details.fn(Inn="1841012052", top_n=0, ctx=ctx)
+
+    cases = result["structured_content"]["cases"]
+    assert sorted(set(details_calls)) == ["case-1", "case-2", "case-3", "case-4"]
+    assert [case["case_id"] for case in cases] == ["case-4", "case-3", "case-2", "case-1"]
+    assert cases[2]["role"] == "plaintiff"
+    assert cases[2]["claim_sum"] == 10000
+    assert cases[2]["last_instance"] == "Первая инстанция"
+    assert cases[1]["error"] == "Case not found"
+    assert "HTTP 504" in cases[0]["error"]
+    assert result["meta"]["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_exposure_counts_roles_and_bankruptcy(monkeypatch, ctx):
+    def party(inn):
+        return [{"Name": "ООО", "Inn": inn}]
+
+    portfolio = {
+        "7706107510": [
+            {"CaseId": "a", "CaseType": "Б", "Plaintiffs": party("1111111111"), "Respondents": party("7706107510")},
+            {"CaseId": "b", "CaseType": "А", "Plaintiffs": party("7706107510"), "Respondents": party("2222222222")},
+        ],
+        "500100732259": [],
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inn = request.url.params["Inn"]
+        if inn == "1234567890":
+            return httpx.Response(403, json={"error": "Invalid access key", "error_code": 40301})
+        if inn == "7707083893":
+            return httpx.Response(502, text="Bad Gateway")
+        return httpx.Response(200, json={"Success": 1, "Cases": portfolio[inn], "PagesCount": 1})
+
+    _prod_with_transport(monkeypatch, handler, ARBITR_RETRY_BACKOFF="0", ARBITR_BREAKER_FAILURES="0")
+    result = await arbitr_batch_exposure.fn(
+        inns=["500100732259", "7707083893"],
+        inns_csv="ИНН;Название\n7706107510;Роснефть\n1234567890;Ошибка\nабв;Мусор\n",
+        ctx=ctx,
+    )
+
+    summary = result["structured_content"]["summary"]
+    by_inn = {item["inn"]: item for item in result["structured_content"]["results"]}
+    assert [item["inn"] for item in result["structured_content"]["results"]] == [
+        "500100732259",
+        "7707083893",
+        "7706107510",
+        "1234567890",
+    ]
+    assert by_inn["7706107510"]["roles"]["respondent"] == 1
+    assert by_inn["7706107510"]["roles"]["plaintiff"] == 1
+    assert by_inn["7706107510"]["bankruptcy"] is True
+    assert by_inn["500100732259"]["total_cases"] == 0
+    assert by_inn["1234567890"]["error"] == "Invalid access key"
+    assert "HTTP 502" in by_inn["7707083893"]["error"] and "key=" not in by_inn["7707083893"]["error"]
+    assert summary["failed"] == 2
+    assert summary["rejected"] == ["абв"]
+    assert summary["bankruptcy"] == ["7706107510"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_downloaded_once_and_served_as_resource(monkeypatch, ctx):
+    from fastmcp import Client
+
+    from mcp_instance import mcp
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["url"])
+        return httpx.Response(200, json=stub_pdf_download())
+
+    _prod_with_transport(monkeypatch, handler)
+    url = "https://kad.arbitr.ru/PdfDocument/test.pdf"
+    first = await arbitr_download_pdf.fn(url=url, ctx=ctx)
+    second = await arbitr_download_pdf.fn(url=url, extract_text=True, ctx=ctx)
+
+    assert calls == [url]
+    assert "pdfContent" not in first["structured_content"]
+    assert second["meta"]["cached"] is True
+    digest = first["structured_content"]["sha256"]
+
+    async with Client(mcp) as client:
+        contents = await client.read_resource(f"arbitr-pdf://{digest}")
+    assert contents[0].mimeType == "application/pdf"
+    assert contents[0].blob
+
+
+@pytest.mark.asyncio
+async def test_pdf_disk_store_bounded_by_size(tmp_path):
+    store = PdfStore(str(tmp_path), max_bytes=250)
+    first = await store.put("https://kad.arbitr.ru/a.pdf", b"a" * 100)
+    second = await store.put("https://kad.arbitr.ru/b.pdf", b"b" * 100)
+    os.utime(tmp_path / "pdf" / f"{first}.pdf", (1, 1))
+    os.utime(tmp_path / "pdf" / f"{second}.pdf", (2, 2))
+    assert await store.read(first) == b"a" * 100  # touched: now the most recently used
+
+    third = await store.put("https://kad.arbitr.ru/c.pdf", b"c" * 100)
+
+    assert sorted(path.stem for path in (tmp_path / "pdf").glob("*.pdf")) == sorted([first, third])
+    assert await store.read(second) is None
+    assert await PdfStore(str(tmp_path)).lookup("https://kad.arbitr.ru/b.pdf") is None
+    assert await PdfStore(str(tmp_path)).lookup("https://kad.arbitr.ru/a.pdf") == first
+
+
+def test_ruling_paragraphs_after_last_marker():
+    text = (
+        "Суд установил, что истец РЕШИЛ: обратиться в суд.\n\n"
+        "Р Е Ш И Л:\n"
+        "1. Взыскать с ООО «Ответчик» 100 000 руб.\n"
+        "2. Решение может быть обжаловано.\n\n"
+        "Судья Иванов И.И."
+    )
+    assert ruling_paragraphs(text) == [
+        "1. Взыскать с ООО «Ответчик» 100 000 руб.",
+        "2. Решение может быть обжаловано.",
+        "Судья Иванов И.И.",
+    ]
+    assert ruling_paragraphs("без резолютивной части") == []
+
+
+@pytest.mark.asyncio
+async def test_watcher_polls_incrementally_and_logs_changes(monkeypatch, ctx):
+    inn = "7706107510"
+    search_cases = [{"CaseId": "a", "CaseNumber": "А40-1/2024", "Respondents": [{"Inn": inn}]}]
+    states = {"a": "Рассмотрение дела", "b": "Рассмотрение дела"}
+    searches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if request.url.path.endswith("search"):
+            searches.append(params.get("DateFrom"))
+            return httpx.Response(200, json={"Success": 1, "Cases": search_cases, "PagesCount": 1})
+        case_id = params["CaseId"]
+        case = {"CaseId": case_id, "State": states[case_id], "Finished": False, "CaseInstances": []}
+        return httpx.Response(200, json={"Success": 1, "Cases": [case]})
+
+    _prod_with_transport(monkeypatch, handler)
+    await arbitr_watch_inns.fn(add=[inn, "bad"], ctx=ctx)
+
+    first = await arbitr_watch_poll.fn(ctx=ctx)
+    assert first["structured_content"]["baselined"] == 1
+    assert first["meta"]["events"] == 0
+
+    search_cases.append({"CaseId": "b", "CaseNumber": "А40-2/2024", "Plaintiffs": [{"Inn": inn}]})
+    states["a"] = "Рассмотрение дела завершено"
+    second = await arbitr_watch_poll.fn(ctx=ctx)
+
+    kinds = sorted((event["kind"], event["case_id"]) for event in second["structured_content"]["events"])
+    assert kinds == [("new_case", "b"), ("state_changed", "a")]
+    assert searches[0] is None
+    assert searches[1] is not None
+
+    log = await arbitr_watch_events.fn(kind="new_case", ctx=ctx)
+    assert [event["case_number"] for event in log["structured_content"]["events"]] == ["А40-2/2024"]
+
+
+@pytest.mark.asyncio
+async def test_watcher_keeps_sync_date_on_truncated_search_and_upstream_errors(monkeypatch, ctx):
+    inns = ["7706107510", "7707083893"]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if request.url.path.endswith("search"):
+            if params["Inn"] == inns[1]:
+                return httpx.Response(502, text="Bad Gateway")
+            cases = [{"CaseId": case_id, "Respondents": [{"Inn": inns[0]}]} for case_id in ("a", "b")]
+            return httpx.Response(200, json={"Success": 1, "Cases": cases, "PagesCount": 1})
+        return httpx.Response(504, text="Gateway Timeout")
+
+    _prod_with_transport(
+        monkeypatch,
+        handler,
+        ARBITR_CACHE="off",
+        ARBITR_WATCH_MAX_CASES="1",
+        ARBITR_RETRY_BACKOFF="0",
+        ARBITR_BREAKER_FAILURES="0",
+    )
+    await arbitr_watch_inns.fn(add=inns, ctx=ctx)
+    result = await arbitr_watch_poll.fn(ctx=ctx)
+
+    assert result["structured_content"]["truncated"] == [inns[0]]
+    assert [item["inn"] for item in result["structured_content"]["failed"]] == [inns[1]]
+    assert result["meta"]["failed"] == 2
+    watched = await arbitr_watch_inns.fn(ctx=ctx)
+    assert [item["last_sync"] for item in watched["structured_content"]["watched"]] == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_litigation_graph_from_fetched_cases(monkeypatch, ctx):
+    def party(inn):
+        return [{"Name": f"ООО {inn}", "Inn": inn}]
+
+    cases = [
+        {"CaseId": "1", "CaseNumber": "А40-1/2024", "Plaintiffs": party("1111111111"), "Respondents": party("7706107510")},
+        {"CaseId": "2", "CaseNumber": "А40-2/2024", "Plaintiffs": party("1111111111"), "Respondents": party("7706107510")},
+        {"CaseId": "3", "CaseNumber": "А40-3/2024", "Plaintiffs": party("7706107510"), "Respondents": party("2222222222")},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"Success": 1, "Cases": cases, "PagesCount": 1})
+
+    _prod_with_transport(monkeypatch, handler)
+    await arbitr_search_cases.fn(Inn="7706107510", ctx=ctx)
+
+    repeat = await arbitr_litigation_graph.fn(query="repeat", inn="7706107510", ctx=ctx)
+    assert [item["inn"] for item in repeat["structured_content"]["items"]] == ["1111111111"]
+    assert repeat["structured_content"]["items"][0]["cases"] == 2
+
+    neighbors = await arbitr_litigation_graph.fn(inn="7706107510", direction="sues", ctx=ctx)
+    assert [item["inn"] for item in neighbors["structured_content"]["items"]] == ["2222222222"]
+
+    portfolio = await arbitr_litigation_graph.fn(
+        query="portfolio", inns=["1111111111", "2222222222", "7706107510", "3333333333"], ctx=ctx
+    )
+    assert portfolio["structured_content"]["components"] == [["1111111111", "2222222222", "7706107510"]]
+    assert len(portfolio["structured_content"]["pairs"]) == 2
+
+    graph = get_litigation_graph(reload_settings())
+    edges = graph.edge_count
+    assert graph.add_payload({"Cases": cases}) == 0
+    widened = {**cases[0], "Respondents": party("7706107510") + party("4444444444")}
+    assert graph.add_payload({"Cases": [widened]}) == 1
+    assert graph.edge_count == edges + 1
@@ -6,12 +6,26 @@ from .arbitr_api import (
     get_case_by_id as arbitr_details_by_id,
     download_case_pdf as arbitr_download_pdf,
 )
+from .batch_exposure import batch_exposure as arbitr_batch_exposure
+from .litigants import litigation_graph as arbitr_litigation_graph
+from .search_details import search_with_details as arbitr_search_with_details
+from .watcher import (
+    watch_inns as arbitr_watch_inns,
+    watch_poll as arbitr_watch_poll,
+    watch_events as arbitr_watch_events,
+)
 
 __all__ = [
     "arbitr_search_cases",
     "arbitr_details_by_number",
     "arbitr_details_by_id",
     "arbitr_download_pdf",
+    "arbitr_search_with_details",
+    "arbitr_batch_exposure",
+    "arbitr_watch_inns",
+    "arbitr_watch_poll",
+    "arbitr_watch_events",
+    "arbitr_litigation_graph",
 ]
 
 
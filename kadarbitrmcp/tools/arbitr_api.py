@@ -1,5 +1,6 @@
 """MCP tools for kad.arbitr.ru via api-assist.com."""
 
+import base64
 import time
 from typing import Optional
 
@@ -8,40 +9,29 @@ from mcp.types import TextContent
 from mcp.shared.exceptions import McpError, ErrorData
 from opentelemetry import trace
 from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
 from config import get_settings
 from metrics import observe_duration, record_tool_call
 from mcp_instance import mcp
-from .arbitr_client import ArbitrApiClient, ArbitrApiError
-from .arbitr_stubs import (
-    stub_details_by_id,
-    stub_details_by_number,
-    stub_pdf_download,
-    stub_search_cases,
+from .arbitr_client import ArbitrApiError, get_api_client
+from .arbitr_stubs import stub_pdf_download
+from .case_source import (
+    fetch_details_by_id,
+    fetch_details_by_number,
+    fetch_search,
+    search_all_pages,
 )
+from .pdf_store import extract_text as extract_pdf, get_pdf_store, ruling_paragraphs
+from .tool_args import arg, ctx_info, ctx_progress
 
 tracer = trace.get_tracer(__name__)
 
 
-async def _ctx_info(ctx: Optional[Context], message: str) -> None:
-    if ctx:
-        try:
-            await ctx.info(message)
-        except Exception:
-            pass
-
-
-async def _ctx_progress(ctx: Optional[Context], progress: int, total: int = 100) -> None:
-    if ctx:
-        try:
-            await ctx.report_progress(progress=progress, total=total)
-        except Exception:
-            pass
-
-
 @mcp.tool(
     name="arbitr_search_cases",
-    description="Поиск арбитражных дел на kad.arbitr.ru через api-assist. Поддерживает фильтры по ИНН/названию, роли, датам, суду и типу дела.",
+    description="Поиск арбитражных дел на kad.arbitr.ru через api-assist. Поддерживает фильтры по ИНН/названию, роли, датам, суду и типу дела. С all_pages=true загружает все страницы сразу.",
 )
 async def search_cases(
     page: Optional[int] = Field(None, description="Номер страницы (начиная с 1)."),
@@ -51,6 +41,12 @@ async def search_cases(
     DateTo: Optional[str] = Field(None, description="Дата окончания поиска YYYY-MM-DD."),
     Court: Optional[str] = Field(None, description="Наименование суда как на kad.arbitr.ru."),
     CaseType: Optional[str] = Field(None, description="Тип дела: A, B, G."),
+    all_pages: bool = Field(
+        False,
+        description="Загрузить все страницы параллельно (дела без дублей); page игнорируется. "
+        "Слишком большие выборки автоматически делятся по датам.",
+    ),
+    max_cases: int = Field(1000, description="Предел числа дел при all_pages=true."),
     ctx: Context = None,
 ) -> dict:
     """Search cases on kad.arbitr.ru via api-assist."""
@@ -60,45 +56,64 @@ async def search_cases(
     mode = settings.mode
     tool_name = "arbitr_search_cases"
 
-    await _ctx_info(ctx, "🔍 Запуск поиска дел")
-    await _ctx_progress(ctx, 5)
+    await ctx_info(ctx, "🔍 Запуск поиска дел")
+    await ctx_progress(ctx, 5)
 
     try:
         with tracer.start_as_current_span(tool_name) as span:
             span.set_attribute("mode", mode)
             span.set_attribute("case_mode", "search")
 
-            if mode == "test":
-                data = stub_search_cases()
+            params = {
+                "page": arg(page),
+                "Inn": arg(Inn),
+                "InnType": arg(InnType),
+                "DateFrom": arg(DateFrom),
+                "DateTo": arg(DateTo),
+                "Court": arg(Court),
+                "CaseType": arg(CaseType),
+            }
+            all_pages = bool(arg(all_pages))
+            span.set_attribute("all_pages", all_pages)
+            cached = False
+            if all_pages:
+
+                async def on_progress(done: int, total: int) -> None:
+                    await ctx_progress(ctx, done, total)
+
+                data = await search_all_pages(settings, params, int(arg(max_cases)), on_progress)
             else:
-                client = ArbitrApiClient(settings)
-                data = await client.search_cases(
-                    page=page,
-                    Inn=Inn,
-                    InnType=InnType,
-                    DateFrom=DateFrom,
-                    DateTo=DateTo,
-                    Court=Court,
-                    CaseType=CaseType,
-                )
+                data, cached = await fetch_search(settings, params)
+            span.set_attribute("cached", cached)
 
             cases = data.get("Cases", []) if isinstance(data, dict) else []
             pages = data.get("PagesCount") if isinstance(data, dict) else None
 
             summary_lines = [f"Найдено дел: {len(cases)}"]
-            if pages:
+            if all_pages:
+                summary_lines.append(f"Загружено страниц: {pages}")
+                if data.get("Truncated"):
+                    summary_lines.append("Выборка обрезана: уточните фильтры или увеличьте max_cases")
+            elif pages:
                 summary_lines.append(f"Всего страниц: {pages}")
 
             for case in cases[:5]:
                 summary_lines.append(f"№ {case.get('CaseNumber')} — {case.get('Court')} ({case.get('CaseType')})")
 
-            await _ctx_progress(ctx, 100)
+            await ctx_progress(ctx, 100)
             record_tool_call(tool_name, "ok", mode)
 
             return {
                 "content": [TextContent(type="text", text="\n".join(summary_lines))],
                 "structured_content": data,
-                "meta": {"mode": mode, "pages": pages, "returned": len(cases)},
+                "meta": {
+                    "mode": mode,
+                    "pages": pages,
+                    "returned": len(cases),
+                    "cached": cached,
+                    "all_pages": all_pages,
+                    "truncated": bool(data.get("Truncated")),
+                },
             }
     except ArbitrApiError as exc:
         record_tool_call(tool_name, "fail", mode)
@@ -125,19 +140,16 @@ async def get_case_by_number(
     mode = settings.mode
     tool_name = "arbitr_details_by_number"
 
-    await _ctx_info(ctx, f"ℹ️ Запрос деталей по делу {CaseNumber}")
-    await _ctx_progress(ctx, 5)
+    await ctx_info(ctx, f"ℹ️ Запрос деталей по делу {CaseNumber}")
+    await ctx_progress(ctx, 5)
 
     try:
         with tracer.start_as_current_span(tool_name) as span:
             span.set_attribute("mode", mode)
             span.set_attribute("case_number", CaseNumber)
 
-            if mode == "test":
-                data = stub_details_by_number()
-            else:
-                client = ArbitrApiClient(settings)
-                data = await client.details_by_number(CaseNumber)
+            data, cached = await fetch_details_by_number(settings, CaseNumber)
+            span.set_attribute("cached", cached)
 
             cases = data.get("Cases", []) if isinstance(data, dict) else []
             title = cases[0].get("CaseNumber") if cases else CaseNumber
@@ -145,13 +157,13 @@ async def get_case_by_number(
 
             human_text = f"Дело {title}\nСтатус: {status}\nИнстанций: {len(cases[0].get('CaseInstances', [])) if cases else 0}"
 
-            await _ctx_progress(ctx, 100)
+            await ctx_progress(ctx, 100)
             record_tool_call(tool_name, "ok", mode)
 
             return {
                 "content": [TextContent(type="text", text=human_text)],
                 "structured_content": data,
-                "meta": {"mode": mode, "case_number": CaseNumber},
+                "meta": {"mode": mode, "case_number": CaseNumber, "cached": cached},
             }
     except ArbitrApiError as exc:
         record_tool_call(tool_name, "fail", mode)
@@ -178,19 +190,16 @@ async def get_case_by_id(
     mode = settings.mode
     tool_name = "arbitr_details_by_id"
 
-    await _ctx_info(ctx, f"ℹ️ Запрос деталей по ID дела {CaseId}")
-    await _ctx_progress(ctx, 5)
+    await ctx_info(ctx, f"ℹ️ Запрос деталей по ID дела {CaseId}")
+    await ctx_progress(ctx, 5)
 
     try:
         with tracer.start_as_current_span(tool_name) as span:
             span.set_attribute("mode", mode)
             span.set_attribute("case_id", CaseId)
 
-            if mode == "test":
-                data = stub_details_by_id()
-            else:
-                client = ArbitrApiClient(settings)
-                data = await client.details_by_id(CaseId)
+            data, cached = await fetch_details_by_id(settings, CaseId)
+            span.set_attribute("cached", cached)
 
             cases = data.get("Cases", []) if isinstance(data, dict) else []
             title = cases[0].get("CaseNumber") if cases else CaseId
@@ -198,13 +207,13 @@ async def get_case_by_id(
 
             human_text = f"Дело {title}\nСтатус: {status}\nID: {CaseId}"
 
-            await _ctx_progress(ctx, 100)
+            await ctx_progress(ctx, 100)
             record_tool_call(tool_name, "ok", mode)
 
             return {
                 "content": [TextContent(type="text", text=human_text)],
                 "structured_content": data,
-                "meta": {"mode": mode, "case_id": CaseId},
+                "meta": {"mode": mode, "case_id": CaseId, "cached": cached},
             }
     except ArbitrApiError as exc:
         record_tool_call(tool_name, "fail", mode)
@@ -218,44 +227,94 @@ async def get_case_by_id(
 
 @mcp.tool(
     name="arbitr_download_pdf",
-    description="Скачать PDF судебного документа по прямой ссылке с kad.arbitr.ru через api-assist.",
+    description="Скачать PDF судебного документа по прямой ссылке с kad.arbitr.ru через api-assist. Документ сохраняется и отдаётся MCP-ресурсом arbitr-pdf://{sha256}; с extract_text=true возвращается текст и резолютивная часть вместо base64.",
 )
 async def download_case_pdf(
     url: str = Field(..., description="Полный URL PDF файла с kad.arbitr.ru"),
+    extract_text: bool = Field(
+        False, description="Извлечь текст на сервере и вернуть резолютивную часть (РЕШИЛ/ПОСТАНОВИЛ)."
+    ),
+    include_base64: bool = Field(False, description="Вернуть PDF целиком в base64 (pdfContent), как раньше."),
     ctx: Context = None,
 ) -> dict:
-    """Download PDF content (base64) by URL."""
+    """Download a PDF by URL into the content-addressed store; optionally extract its text."""
 
     start = time.perf_counter()
     settings = get_settings()
     mode = settings.mode
     tool_name = "arbitr_download_pdf"
 
-    await _ctx_info(ctx, "📥 Скачивание PDF документа")
-    await _ctx_progress(ctx, 5)
+    await ctx_info(ctx, "📥 Скачивание PDF документа")
+    await ctx_progress(ctx, 5)
 
     try:
         with tracer.start_as_current_span(tool_name) as span:
             span.set_attribute("mode", mode)
             span.set_attribute("url", url)
 
-            if mode == "test":
-                data = stub_pdf_download()
-            else:
-                client = ArbitrApiClient(settings)
-                data = await client.download_pdf(url)
-
-            pdf_content = data.get("pdfContent")
-            length = len(pdf_content or "")
-            human_text = "PDF не найден" if not pdf_content else f"Получен PDF (base64), длина: {length} символов"
-
-            await _ctx_progress(ctx, 100)
+            store = get_pdf_store(settings)
+            digest = await store.lookup(url)
+            cached = digest is not None
+            span.set_attribute("cached", cached)
+            if digest is None:
+                if mode == "test":
+                    data = stub_pdf_download()
+                else:
+                    data = await get_api_client(settings).download_pdf(url)
+                pdf_content = data.get("pdfContent")
+                if pdf_content:
+                    digest = await store.put(url, base64.b64decode(pdf_content))
+            await ctx_progress(ctx, 60)
+
+            if digest is None:
+                record_tool_call(tool_name, "ok", mode)
+                return {
+                    "content": [TextContent(type="text", text="PDF не найден")],
+                    "structured_content": {"Success": 1, "url": url},
+                    "meta": {"mode": mode, "has_pdf": False, "length": 0, "cached": False},
+                }
+
+            pdf = await store.read(digest) or b""
+            structured = {
+                "Success": 1,
+                "url": url,
+                "sha256": digest,
+                "size": len(pdf),
+                "resource_uri": f"arbitr-pdf://{digest}",
+                "http_path": f"/pdf/{digest}",
+            }
+            lines = [f"PDF: {len(pdf)} байт, ресурс arbitr-pdf://{digest}" + (" (из кэша)" if cached else "")]
+
+            if arg(extract_text):
+                text = await extract_pdf(settings, store, digest)
+                if text is None:
+                    structured["text_available"] = False
+                    lines.append("Извлечение текста недоступно: установите пакет pypdf")
+                else:
+                    ruling = ruling_paragraphs(text, settings.pdf_ruling_chars)
+                    structured.update(
+                        {
+                            "text_available": True,
+                            "text_resource_uri": f"arbitr-pdf-text://{digest}",
+                            "text_length": len(text),
+                            "ruling": ruling,
+                        }
+                    )
+                    if ruling:
+                        lines.append("Резолютивная часть:")
+                        lines.extend(ruling)
+                    else:
+                        lines.append(text[: settings.pdf_ruling_chars])
+            if arg(include_base64):
+                structured["pdfContent"] = base64.b64encode(pdf).decode("ascii")
+
+            await ctx_progress(ctx, 100)
             record_tool_call(tool_name, "ok", mode)
 
             return {
-                "content": [TextContent(type="text", text=human_text)],
-                "structured_content": data,
-                "meta": {"mode": mode, "has_pdf": bool(pdf_content), "length": length},
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": structured,
+                "meta": {"mode": mode, "has_pdf": True, "length": len(pdf), "cached": cached},
             }
     except ArbitrApiError as exc:
         record_tool_call(tool_name, "fail", mode)
@@ -267,3 +326,36 @@ async def download_case_pdf(
         observe_duration(tool_name, mode, time.perf_counter() - start)
 
 
+@mcp.resource(
+    "arbitr-pdf://{digest}",
+    name="arbitr_pdf",
+    description="PDF судебного документа, ранее скачанный arbitr_download_pdf (ключ — SHA-256 файла)",
+    mime_type="application/pdf",
+)
+async def pdf_resource(digest: str) -> bytes:
+    data = await get_pdf_store(get_settings()).read(digest)
+    if data is None:
+        raise McpError(ErrorData(code=-32602, message=f"PDF {digest} не найден, скачайте его заново"))
+    return data
+
+
+@mcp.resource(
+    "arbitr-pdf-text://{digest}",
+    name="arbitr_pdf_text",
+    description="Текст PDF судебного документа, извлечённый arbitr_download_pdf с extract_text=true",
+    mime_type="text/plain",
+)
+async def pdf_text_resource(digest: str) -> str:
+    settings = get_settings()
+    text = await extract_pdf(settings, get_pdf_store(settings), digest)
+    if text is None:
+        raise McpError(ErrorData(code=-32602, message=f"Текст PDF {digest} недоступен"))
+    return text
+
+
+@mcp.custom_route("/pdf/{digest}", methods=["GET"])
+async def pdf_route(request: Request) -> Response:
+    data = await get_pdf_store(get_settings()).read(request.path_params["digest"])
+    if data is None:
+        return JSONResponse({"error": "PDF not found"}, status_code=404)
+    return Response(data, media_type="application/pdf")
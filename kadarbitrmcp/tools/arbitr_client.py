@@ -1,10 +1,20 @@
 """HTTP client for api-assist.com arbitr endpoints."""
 
-from typing import Any, Dict, Optional
+import asyncio
+import importlib.util
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
 
 import httpx
 
 from config import Settings
+from metrics import observe_duration, record_tool_call
+
+# GET endpoints that are safe to duplicate with a hedged request
+HEDGED_PATHS = frozenset({"search", "details_by_id", "details_by_number"})
 
 
 class ArbitrApiError(Exception):
@@ -16,22 +26,198 @@ class ArbitrApiError(Exception):
         self.error_code = error_code
 
 
+class CircuitOpenError(ArbitrApiError):
+    """Raised without calling api-assist while the circuit breaker is open."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Network errors, timeouts, 429 and 5xx are transient. 400/403 (validation, auth, limits)
+    and api-level error_code answers are final; only 5xxxx error codes mean a server fault.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    if isinstance(exc, ArbitrApiError):
+        if exc.status_code is not None:
+            return exc.status_code == 429 or exc.status_code >= 500
+        return exc.error_code is not None and 50000 <= exc.error_code < 60000
+    return False
+
+
+def upstream_error(path: str, exc: Exception) -> ArbitrApiError:
+    """ArbitrApiError for a failed request; httpx messages carry the URL with the access key."""
+    if isinstance(exc, ArbitrApiError):
+        return exc
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return ArbitrApiError(f"api-assist {path} responded with HTTP {status}", status_code=status)
+    if isinstance(exc, httpx.TimeoutException):
+        return ArbitrApiError(f"api-assist {path} did not respond in time")
+    return ArbitrApiError(f"api-assist {path} request failed: {type(exc).__name__}")
+
+
+class LatencyTracker:
+    """Rolling window of successful response times of one endpoint."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th quantile (0..1) or None until min_samples responses were seen."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive transient failures and rejects calls for `reset`
+    seconds; then one probe is let through and its outcome closes or reopens the circuit.
+    """
+
+    def __init__(self, failures: int, reset: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.reset = reset
+        self.clock = clock
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset else "open"
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError while open; True when this call is the half-open probe."""
+        if self.failures <= 0 or self.opened_at is None:
+            return False
+        remaining = self.reset - (self.clock() - self.opened_at)
+        if remaining > 0 or self._probing:
+            raise CircuitOpenError(
+                f"api-assist is unavailable after {self.consecutive} failed requests, "
+                f"retry in {max(remaining, 0):.0f} s"
+            )
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """Ends a probe that finished without an outcome (e.g. it was cancelled)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.consecutive = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.consecutive += 1
+        self._probing = False
+        if self.failures > 0 and (self.opened_at is not None or self.consecutive >= self.failures):
+            self.opened_at = self.clock()
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart; rate <= 0 disables the limit."""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.clock = clock
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        now = self.clock()
+        wait = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def build_http_client(
+    settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None
+) -> httpx.AsyncClient:
+    """Pooled keep-alive client; HTTP/2 only when enabled and the h2 package is installed."""
+    return httpx.AsyncClient(
+        timeout=settings.timeout,
+        transport=transport,
+        http2=settings.http2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+    )
+
+
 class ArbitrApiClient:
+    """api-assist client; one pooled httpx.AsyncClient is reused until aclose()."""
+
     def __init__(self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.settings = settings
         self.transport = transport
+        self.limiter = RateLimiter(settings.rate_limit)
+        self.breaker = CircuitBreaker(settings.breaker_failures, settings.breaker_reset)
+        self.latency: Dict[str, LatencyTracker] = {}
+        self._client: Optional[httpx.AsyncClient] = None
 
-    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        if self.settings.mode == "prod" and not self.settings.api_key:
-            raise ArbitrApiError("ARBITR_API_KEY is required for prod mode")
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = build_http_client(self.settings, self.transport)
+        return self._client
 
-        query = {"key": self.settings.api_key}
-        query.update({k: v for k, v in params.items() if v is not None})
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-        url = f"{self.settings.base_url}/{path}"
+    async def __aenter__(self) -> "ArbitrApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _tracker(self, path: str) -> LatencyTracker:
+        return self.latency.setdefault(path, LatencyTracker())
+
+    def attempt_timeout(self, path: str) -> float:
+        """p99 x ARBITR_TIMEOUT_MULTIPLIER within [ARBITR_TIMEOUT_MIN, ARBITR_TIMEOUT]."""
+        p99 = self._tracker(path).percentile(0.99)
+        if p99 is None:
+            return self.settings.timeout
+        return min(self.settings.timeout, max(self.settings.timeout_min, p99 * self.settings.timeout_multiplier))
 
-        async with httpx.AsyncClient(timeout=self.settings.timeout, transport=self.transport) as client:
-            response = await client.get(url, params=query)
+    def hedge_delay(self, path: str) -> Optional[float]:
+        """Observed p95 of an idempotent endpoint; None disables hedging for the call."""
+        if not self.settings.hedge or path not in HEDGED_PATHS:
+            return None
+        return self._tracker(path).percentile(0.95)
+
+    def _record(self, path: str, status: str) -> None:
+        record_tool_call(f"api_{path}", status, self.settings.mode)
+
+    async def _send(self, path: str, url: str, query: Dict[str, Any]) -> Dict[str, Any]:
+        await self.limiter.acquire()
+        start = time.perf_counter()
+        # the attempt outcome (ok / retry / fail) is recorded once, in _get
+        response = await self.client.get(url, params=query, timeout=self.attempt_timeout(path))
+        elapsed = time.perf_counter() - start
+        observe_duration(f"api_{path}", self.settings.mode, elapsed)
+        if response.status_code < 500:
+            self._tracker(path).observe(elapsed)
 
         if response.status_code in (400, 403):
             payload = response.json()
@@ -52,6 +238,80 @@ class ArbitrApiClient:
 
         raise ArbitrApiError("Unexpected API response format")
 
+    async def _hedged(self, path: str, send: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Starts a second identical request if the first is slower than p95; first success wins."""
+        delay = self.hedge_delay(path)
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        try:
+            if delay is None:
+                return await primary
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._record(path, "hedge")
+            pending = {primary, asyncio.ensure_future(send())}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            # also on caller cancellation: no request keeps the limiter slot or the connection
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.settings.mode == "prod" and not self.settings.api_key:
+            raise ArbitrApiError("ARBITR_API_KEY is required for prod mode")
+
+        query = {"key": self.settings.api_key}
+        query.update({k: v for k, v in params.items() if v is not None})
+
+        url = f"{self.settings.base_url}/{path}"
+        attempts = max(0, self.settings.retries) + 1
+
+        attempt = 0
+        while True:
+            try:
+                probe = self.breaker.before_call()
+            except CircuitOpenError:
+                self._record(path, "circuit_open")
+                raise
+            try:
+                data = await self._hedged(path, lambda: self._send(path, url, query))
+            except (ArbitrApiError, httpx.HTTPError) as exc:
+                if not is_retryable(exc):
+                    # api-assist answered: the service is healthy even if the request is not
+                    self.breaker.record_success()
+                    self._record(path, "fail")
+                    raise upstream_error(path, exc) from exc
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= attempts or self.breaker.state == "open":
+                    self._record(path, "fail")
+                    raise upstream_error(path, exc) from exc
+                self._record(path, "retry")
+                # full jitter: uniform(0, backoff * 2^(attempt - 1)), attempt counts failures so far
+                await asyncio.sleep(random.uniform(0, self.settings.retry_backoff * 2 ** (attempt - 1)))
+                continue
+            except Exception:
+                self.breaker.record_failure()
+                self._record(path, "fail")
+                raise
+            finally:
+                # a cancelled probe records no outcome and must not keep the circuit open
+                if probe:
+                    self.breaker.release()
+            self.breaker.record_success()
+            self._record(path, "ok")
+            return data
+
     async def search_cases(self, **params: Any) -> Dict[str, Any]:
         return await self._get("search", params)
 
@@ -65,3 +325,36 @@ class ArbitrApiClient:
         return await self._get("pdf_download", {"url": url})
 
 
+_shared: Optional[ArbitrApiClient] = None
+_sessions = 0
+
+
+def get_api_client(settings: Settings) -> ArbitrApiClient:
+    """Client shared by all tools; rebuilt only when settings change."""
+    global _shared
+    if _shared is None or _shared.settings != settings:
+        _shared = ArbitrApiClient(settings)
+    return _shared
+
+
+async def close_api_client() -> None:
+    global _shared
+    client, _shared = _shared, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def api_client_session() -> AsyncIterator[None]:
+    """
+    Server lifespan hook. FastMCP 2.x enters the lifespan once per MCP session, so sessions
+    are counted and the shared pool is closed when the last one ends.
+    """
+    global _sessions
+    _sessions += 1
+    try:
+        yield
+    finally:
+        _sessions -= 1
+        if _sessions == 0:
+            await close_api_client()
@@ -0,0 +1,231 @@
+"""Arbitration exposure for a portfolio of INNs in one tool call."""
+
+import asyncio
+import csv
+import io
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastmcp import Context
+from mcp.types import TextContent
+from mcp.shared.exceptions import McpError, ErrorData
+from opentelemetry import trace
+from pydantic import Field
+
+from config import Settings, get_settings
+from metrics import observe_duration, record_tool_call
+from mcp_instance import mcp
+from .arbitr_client import ArbitrApiError
+from .case_source import fetch_details_by_id, search_all_pages
+from .case_summary import BANKRUPTCY_CASE_TYPES, PARTY_ROLES, claim_sum, first_case, participant_role
+from .tool_args import arg, ctx_info, ctx_progress
+
+tracer = trace.get_tracer(__name__)
+
+ROLES = tuple(role for _, role in PARTY_ROLES)
+
+
+def parse_inns(inns: Optional[List[str]], inns_csv: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Valid INNs (10 or 12 digits, first occurrence order) and rejected values."""
+    raw: List[str] = list(inns or [])
+    if inns_csv:
+        rows = [row for row in csv.reader(io.StringIO(inns_csv.strip()), delimiter=_delimiter(inns_csv)) if row]
+        column = 0
+        if rows:
+            header = [cell.strip().casefold() for cell in rows[0]]
+            for name in ("inn", "инн"):
+                if name in header:
+                    column = header.index(name)
+                    rows = rows[1:]
+                    break
+        raw.extend(row[column] for row in rows if len(row) > column)
+
+    valid: List[str] = []
+    rejected: List[str] = []
+    seen = set()
+    for value in raw:
+        inn = str(value).strip()
+        if not inn:
+            continue
+        if not (inn.isdigit() and len(inn) in (10, 12)):
+            rejected.append(inn)
+        elif inn not in seen:
+            seen.add(inn)
+            valid.append(inn)
+    return valid, rejected
+
+
+def _delimiter(text: str) -> str:
+    first_line = text.strip().splitlines()[0] if text.strip() else ""
+    return ";" if first_line.count(";") > first_line.count(",") else ","
+
+
+def compute_exposure(inn: str, cases: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    roles = dict.fromkeys(ROLES + ("unknown",), 0)
+    claims = dict.fromkeys(ROLES + ("unknown",), 0.0)
+    active = finished = total = 0
+    bankruptcy_cases = 0
+    for case in cases:
+        total += 1
+        role = participant_role(case, inn) or "unknown"
+        roles[role] += 1
+        amount = claim_sum(case)
+        if amount is not None:
+            claims[role] += amount
+        if case.get("Finished") is True:
+            finished += 1
+        elif case.get("Finished") is False:
+            active += 1
+        if case.get("CaseType") in BANKRUPTCY_CASE_TYPES:
+            bankruptcy_cases += 1
+    return {
+        "inn": inn,
+        "total_cases": total,
+        "roles": roles,
+        "active": active,
+        "finished": finished,
+        "state_unknown": total - active - finished,
+        "bankruptcy": bankruptcy_cases > 0,
+        "bankruptcy_cases": bankruptcy_cases,
+        "claims_total": sum(claims.values()),
+        "claims_by_role": claims,
+    }
+
+
+async def _inn_exposure(
+    settings: Settings, inn: str, max_cases: int, with_details: bool
+) -> Dict[str, Any]:
+    search = await search_all_pages(settings, {"Inn": inn, "InnType": "Any"}, max_cases)
+    cases: List[Dict[str, Any]] = search.get("Cases") or []
+    if with_details:
+        semaphore = asyncio.Semaphore(max(1, settings.details_concurrency))
+
+        async def detail(case: Dict[str, Any]) -> Dict[str, Any]:
+            if not case.get("CaseId"):
+                return case
+            async with semaphore:
+                payload, _ = await fetch_details_by_id(settings, case["CaseId"])
+            detailed = first_case(payload) or {}
+            return {**case, **{k: v for k, v in detailed.items() if v is not None}}
+
+        cases = list(await asyncio.gather(*(detail(case) for case in cases)))
+    result = compute_exposure(inn, cases)
+    result["truncated"] = bool(search.get("Truncated"))
+    return result
+
+
+def _format_line(item: Dict[str, Any]) -> str:
+    if "error" in item:
+        return f"{item['inn']}: ошибка — {item['error']}"
+    roles = item["roles"]
+    line = (
+        f"{item['inn']}: дел {item['total_cases']} (истец {roles['plaintiff']}, "
+        f"ответчик {roles['respondent']})"
+    )
+    if item["active"] or item["finished"]:
+        line += f", в работе {item['active']}, завершено {item['finished']}"
+    if item["claims_total"]:
+        line += f", сумма исков {item['claims_total']:,.0f} ₽".replace(",", " ")
+    if item["bankruptcy"]:
+        line += " 🛑 банкротство"
+    return line
+
+
+@mcp.tool(
+    name="arbitr_batch_exposure",
+    description="Арбитражная нагрузка по списку ИНН (до тысяч контрагентов): для каждого ИНН — число дел по ролям (истец/ответчик), в работе и завершённые, наличие банкротства (тип дела Б) и суммы исков. ИНН передаются списком или CSV-текстом.",
+)
+async def batch_exposure(
+    inns: Optional[List[str]] = Field(None, description="Список ИНН (10 или 12 цифр)."),
+    inns_csv: Optional[str] = Field(
+        None, description="CSV с ИНН: колонка inn/ИНН или первая колонка; разделитель , или ;."
+    ),
+    with_details: bool = Field(
+        False,
+        description="Загружать детали каждого дела: точные статусы и суммы исков, но значительно дольше.",
+    ),
+    max_cases_per_inn: int = Field(1000, description="Предел числа дел на один ИНН."),
+    ctx: Context = None,
+) -> dict:
+    """Litigation exposure for many INNs, searched concurrently under the api-assist rate limit."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_batch_exposure"
+
+    try:
+        valid, rejected = parse_inns(arg(inns), arg(inns_csv))
+        if not valid:
+            raise McpError(ErrorData(code=-32602, message="Не передано ни одного корректного ИНН (10 или 12 цифр)"))
+        if len(valid) > settings.batch_max_inns:
+            raise McpError(
+                ErrorData(
+                    code=-32602,
+                    message=f"Слишком много ИНН: {len(valid)}, максимум {settings.batch_max_inns} за вызов",
+                )
+            )
+
+        await ctx_info(ctx, f"📊 Арбитражная нагрузка по {len(valid)} ИНН")
+        await ctx_progress(ctx, 0, len(valid))
+
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            span.set_attribute("inns", len(valid))
+            with_details = bool(arg(with_details))
+            max_cases = int(arg(max_cases_per_inn))
+            semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+            results: Dict[str, Dict[str, Any]] = {}
+
+            async def run(inn: str) -> None:
+                async with semaphore:
+                    try:
+                        item = await _inn_exposure(settings, inn, max_cases, with_details)
+                    except ArbitrApiError as exc:
+                        item = {"inn": inn, "error": str(exc)}
+                results[inn] = item
+                await ctx_info(ctx, _format_line(item))
+                await ctx_progress(ctx, len(results), len(valid))
+
+            await asyncio.gather(*(run(inn) for inn in valid))
+            items = [results[inn] for inn in valid]
+            failed = [item for item in items if "error" in item]
+            ok = [item for item in items if "error" not in item]
+
+            summary = {
+                "inns": len(valid),
+                "failed": len(failed),
+                "rejected": rejected,
+                "with_cases": sum(1 for item in ok if item["total_cases"]),
+                "as_respondent": sum(1 for item in ok if item["roles"]["respondent"]),
+                "bankruptcy": [item["inn"] for item in ok if item["bankruptcy"]],
+                "claims_total": sum(item["claims_total"] for item in ok),
+            }
+            lines = [
+                f"ИНН: {len(valid)}, с делами: {summary['with_cases']}, "
+                f"ответчики: {summary['as_respondent']}, банкротство: {len(summary['bankruptcy'])}"
+            ]
+            if failed:
+                lines.append(f"Ошибки: {len(failed)}")
+            if rejected:
+                lines.append(f"Пропущены некорректные ИНН: {len(rejected)}")
+            ranked = sorted(ok, key=lambda item: (item["roles"]["respondent"], item["total_cases"]), reverse=True)
+            lines.extend(_format_line(item) for item in ranked[:20] if item["total_cases"])
+
+            record_tool_call(tool_name, "ok", mode)
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {"summary": summary, "results": items},
+                "meta": {"mode": mode, "inns": len(valid), "failed": len(failed), "with_details": with_details},
+            }
+    except McpError:
+        record_tool_call(tool_name, "fail", mode)
+        raise
+    except ArbitrApiError as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=str(exc)))
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to compute batch exposure: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)
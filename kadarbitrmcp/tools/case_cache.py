@@ -0,0 +1,213 @@
+"""Cache of api-assist case details and search results.
+
+Finished cases (``Finished: True``) never change: they are kept without expiry and, when
+``ARBITR_CACHE_DIR`` is set, written to disk so they survive restarts. Active cases and search
+results expire after short TTLs. Lookups by case number resolve to the case id, so
+``details_by_number`` and ``details_by_id`` share entries.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Settings
+from metrics import record_cache_lookup
+
+# Latin letters that look like the Cyrillic court prefix letters in case numbers (А40-1/2024)
+_LATIN_TO_CYRILLIC = str.maketrans({"A": "А", "B": "В", "C": "С", "E": "Е", "K": "К"})
+
+
+def normalize_case_number(number: str) -> str:
+    return "".join(number.split()).upper().translate(_LATIN_TO_CYRILLIC)
+
+
+def search_key(params: Dict[str, Any]) -> str:
+    """Cache key of a search query: empty params dropped, strings trimmed and case-folded."""
+    normalized = {}
+    for name, value in params.items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).casefold()
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def is_finished(payload: Dict[str, Any]) -> bool:
+    cases = payload.get("Cases") or []
+    return bool(cases) and all(case.get("Finished") is True for case in cases)
+
+
+class _TtlStore:
+    """LRU of (expires_at, value); expires_at None keeps the entry until evicted."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float]) -> None:
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+        self.entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = None if ttl is None else self.clock() + ttl
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class CaseCache:
+    def __init__(
+        self,
+        case_ttl: float = 600.0,
+        search_ttl: float = 300.0,
+        max_entries: int = 2000,
+        directory: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.case_ttl = case_ttl
+        self.search_ttl = search_ttl
+        self.cases = _TtlStore(max_entries, clock)
+        self.searches = _TtlStore(max_entries, clock)
+        # case number -> CaseId aliases, bounded like the entries they point to (a case has at
+        # most two spellings: the one it was requested by and the one api-assist returns)
+        self.numbers = _TtlStore(2 * max_entries, clock)
+        self.directory = Path(directory) if directory else None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "CaseCache":
+        return cls(
+            case_ttl=settings.case_ttl,
+            search_ttl=settings.search_ttl,
+            max_entries=settings.cache_max_entries,
+            directory=settings.cache_dir,
+        )
+
+    def get_by_id(self, case_id: str) -> Optional[Dict[str, Any]]:
+        payload = self.cases.get(case_id) or self._read(case_id)
+        record_cache_lookup("case", payload is not None)
+        return payload
+
+    def get_by_number(self, case_number: str) -> Optional[Dict[str, Any]]:
+        number = normalize_case_number(case_number)
+        case_id = self.numbers.get(number) or self._read_alias(number)
+        payload = None
+        if case_id:
+            payload = self.cases.get(case_id) or self._read(case_id)
+        record_cache_lookup("case", payload is not None)
+        return payload
+
+    def put_details(
+        self,
+        payload: Dict[str, Any],
+        case_id: Optional[str] = None,
+        case_number: Optional[str] = None,
+    ) -> None:
+        cases = payload.get("Cases") or []
+        if not cases:
+            return
+        case_id = cases[0].get("CaseId") or case_id
+        if not case_id:
+            return
+        finished = is_finished(payload)
+        self.cases.put(case_id, payload, None if finished else self.case_ttl)
+        numbers = {normalize_case_number(n) for n in (cases[0].get("CaseNumber"), case_number) if n}
+        for number in numbers:
+            self.numbers.put(number, case_id, None)
+        if finished:
+            self._write(case_id, payload, numbers)
+
+    def get_search(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        payload = self.searches.get(search_key(params))
+        record_cache_lookup("search", payload is not None)
+        return payload
+
+    def put_search(self, params: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        self.searches.put(search_key(params), payload, self.search_ttl)
+
+    def _path(self, kind: str, name: str) -> Path:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return self.directory / kind / f"{digest}.json"  # type: ignore[operator]
+
+    def _read(self, case_id: str) -> Optional[Dict[str, Any]]:
+        if self.directory is None:
+            return None
+        try:
+            payload = json.loads(self._path("cases", case_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self.cases.put(case_id, payload, None)
+        return payload
+
+    def _read_alias(self, number: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        try:
+            case_id = self._path("numbers", number).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if case_id:
+            self.numbers.put(number, case_id, None)
+        return case_id or None
+
+    def _write(self, case_id: str, payload: Dict[str, Any], numbers: "set[str]") -> None:
+        if self.directory is None:
+            return
+        try:
+            _write_atomic(self._path("cases", case_id), json.dumps(payload, ensure_ascii=False))
+            for number in numbers:
+                _write_atomic(self._path("numbers", number), case_id)
+        except OSError:
+            pass
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class _NullCache(CaseCache):
+    """ARBITR_CACHE=off: every lookup misses, nothing is stored."""
+
+    def get_by_id(self, case_id: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def get_by_number(self, case_number: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def put_details(self, payload: Dict[str, Any], case_id=None, case_number=None) -> None:
+        return None
+
+    def get_search(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return None
+
+    def put_search(self, params: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        return None
+
+
+_cache: Optional[CaseCache] = None
+_cache_settings: Optional[Settings] = None
+
+
+def get_case_cache(settings: Settings) -> CaseCache:
+    """Cache shared by all tools; rebuilt only when settings change."""
+    global _cache, _cache_settings
+    if _cache is None or _cache_settings != settings:
+        _cache = CaseCache.from_settings(settings) if settings.cache_enabled else _NullCache()
+        _cache_settings = settings
+    return _cache
@@ -0,0 +1,171 @@
+"""Cached access to api-assist data shared by the arbitr tools.
+
+Every function returns ``(payload, cached)``. In test mode the stubs are returned instead of
+calling api-assist, so composite tools work unchanged in both modes. Payloads fetched from
+api-assist are also added to the litigation graph.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config import Settings
+from .arbitr_client import get_api_client
+from .arbitr_stubs import stub_details_by_id, stub_details_by_number, stub_search_cases
+from .case_cache import get_case_cache
+from .litigation_graph import get_litigation_graph
+
+# Lower bound of a search window when DateFrom is not given
+SEARCH_EPOCH = date(2000, 1, 1)
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+async def fetch_search(settings: Settings, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    if settings.mode == "test":
+        data = stub_search_cases()
+        get_litigation_graph(settings).add_payload(data)
+        return data, False
+    cache = get_case_cache(settings)
+    data = cache.get_search(params)
+    if data is not None:
+        return data, True
+    data = await get_api_client(settings).search_cases(**params)
+    cache.put_search(params, data)
+    get_litigation_graph(settings).add_payload(data)
+    return data, False
+
+
+async def fetch_details_by_id(
+    settings: Settings, case_id: str, fresh: bool = False
+) -> Tuple[Dict[str, Any], bool]:
+    """fresh=True skips the cached copy (the answer still refreshes the cache)."""
+    if settings.mode == "test":
+        data = stub_details_by_id()
+        get_litigation_graph(settings).add_payload(data)
+        return data, False
+    cache = get_case_cache(settings)
+    data = None if fresh else cache.get_by_id(case_id)
+    if data is not None:
+        return data, True
+    data = await get_api_client(settings).details_by_id(case_id)
+    cache.put_details(data, case_id=case_id)
+    get_litigation_graph(settings).add_payload(data)
+    return data, False
+
+
+async def fetch_details_by_number(
+    settings: Settings, case_number: str
+) -> Tuple[Dict[str, Any], bool]:
+    if settings.mode == "test":
+        data = stub_details_by_number()
+        get_litigation_graph(settings).add_payload(data)
+        return data, False
+    cache = get_case_cache(settings)
+    data = cache.get_by_number(case_number)
+    if data is not None:
+        return data, True
+    data = await get_api_client(settings).details_by_number(case_number)
+    cache.put_details(data, case_number=case_number)
+    get_litigation_graph(settings).add_payload(data)
+    return data, False
+
+
+@dataclass
+class _SearchRun:
+    settings: Settings
+    semaphore: asyncio.Semaphore
+    max_cases: int
+    on_progress: Optional[ProgressCallback]
+    cases: List[Dict[str, Any]] = field(default_factory=list)
+    seen: Set[str] = field(default_factory=set)
+    pages_total: int = 0
+    pages_done: int = 0
+    windows: int = 0
+    truncated: bool = False
+
+    @property
+    def full(self) -> bool:
+        return len(self.cases) >= self.max_cases
+
+    async def page(self, params: Dict[str, Any], page: int) -> Dict[str, Any]:
+        async with self.semaphore:
+            if self.full:
+                return {}
+            data, _ = await fetch_search(self.settings, {**params, "page": page})
+        for case in data.get("Cases") or []:
+            key = case.get("CaseId") or case.get("CaseNumber")
+            if key in self.seen or self.full:
+                continue
+            if key:
+                self.seen.add(key)
+            self.cases.append(case)
+        self.pages_done += 1
+        if self.on_progress is not None:
+            await self.on_progress(self.pages_done, max(self.pages_total, self.pages_done))
+        return data
+
+
+def _window(params: Dict[str, Any]) -> Optional[Tuple[date, date]]:
+    try:
+        start = date.fromisoformat(params["DateFrom"]) if params.get("DateFrom") else SEARCH_EPOCH
+        end = date.fromisoformat(params["DateTo"]) if params.get("DateTo") else date.today()
+    except ValueError:
+        return None
+    return (start, end) if start <= end else None
+
+
+async def _search_window(run: _SearchRun, params: Dict[str, Any]) -> None:
+    run.windows += 1
+    run.pages_total += 1
+    first = await run.page(params, 1)
+    pages = int(first.get("PagesCount") or 1)
+    cap = run.settings.search_page_cap
+
+    window = _window(params)
+    if pages >= cap and window is not None and window[0] < window[1] and not run.full:
+        # Too many pages for one query: api-assist stops at the cap, so split the date range
+        start, end = window
+        middle = start + (end - start) // 2
+        halves = (
+            {**params, "DateFrom": start.isoformat(), "DateTo": middle.isoformat()},
+            {**params, "DateFrom": (middle + timedelta(days=1)).isoformat(), "DateTo": end.isoformat()},
+        )
+        await asyncio.gather(*(_search_window(run, half) for half in halves))
+        return
+
+    if pages > cap:
+        run.truncated = True
+    last = min(pages, cap)
+    run.pages_total += last - 1
+    await asyncio.gather(*(run.page(params, page) for page in range(2, last + 1)))
+    if run.full:
+        run.truncated = True
+
+
+async def search_all_pages(
+    settings: Settings,
+    params: Dict[str, Any],
+    max_cases: int,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    All pages of a search: after the first page reveals PagesCount, the rest are fetched
+    concurrently (ARBITR_SEARCH_CONCURRENCY) and cases are deduplicated by CaseId. Queries at
+    the page cap are split in halves by date until each window fits.
+    """
+    run = _SearchRun(
+        settings=settings,
+        semaphore=asyncio.Semaphore(max(1, settings.search_concurrency)),
+        max_cases=max(1, max_cases),
+        on_progress=on_progress,
+    )
+    await _search_window(run, {k: v for k, v in params.items() if k != "page"})
+    return {
+        "Success": 1,
+        "Cases": run.cases,
+        "PagesCount": run.pages_done,
+        "Windows": run.windows,
+        "Truncated": run.truncated,
+    }
@@ -0,0 +1,77 @@
+"""Compact view of an api-assist case: participant role, claim amount, state, last instance."""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+PARTY_ROLES = (
+    ("Plaintiffs", "plaintiff"),
+    ("Respondents", "respondent"),
+    ("Thirds", "third"),
+    ("Others", "other"),
+)
+
+BANKRUPTCY_CASE_TYPES = {"Б", "B"}
+
+
+def _matches(party: Dict[str, Any], query: str) -> bool:
+    inn = str(party.get("Inn") or "")
+    if query.isdigit():
+        return inn == query
+    return query.casefold() in str(party.get("Name") or "").casefold()
+
+
+def participant_role(case: Dict[str, Any], inn: Optional[str]) -> Optional[str]:
+    """Role of the searched INN (or name) in the case; None if it is not listed."""
+    if not inn:
+        return None
+    query = inn.strip()
+    for key, role in PARTY_ROLES:
+        if any(_matches(party, query) for party in case.get(key) or []):
+            return role
+    return None
+
+
+def _events(case: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    for instance in case.get("CaseInstances") or []:
+        yield from instance.get("InstanceEvents") or []
+
+
+def claim_sum(case: Dict[str, Any]) -> Optional[float]:
+    """Claim amount of the case: the case-level ClaimSum or the largest one among events."""
+    value = case.get("ClaimSum")
+    if isinstance(value, (int, float)):
+        return float(value)
+    sums = [event["ClaimSum"] for event in _events(case) if isinstance(event.get("ClaimSum"), (int, float))]
+    return float(max(sums)) if sums else None
+
+
+def last_event_date(case: Dict[str, Any]) -> Optional[str]:
+    dates = [str(event["Date"])[:10] for event in _events(case) if event.get("Date")]
+    return max(dates) if dates else None
+
+
+def summarize_case(case: Dict[str, Any], inn: Optional[str] = None) -> Dict[str, Any]:
+    instances = case.get("CaseInstances") or []
+    last_instance = instances[-1] if instances else None
+    court = case.get("Court")
+    if last_instance and isinstance(last_instance.get("Court"), dict):
+        court = court or last_instance["Court"].get("Name")
+    return {
+        "case_id": case.get("CaseId"),
+        "case_number": case.get("CaseNumber"),
+        "case_type": case.get("CaseType"),
+        "court": court,
+        "start_date": case.get("StartDate"),
+        "role": participant_role(case, inn),
+        "claim_sum": claim_sum(case),
+        "state": case.get("State"),
+        "finished": case.get("Finished"),
+        "last_instance": last_instance.get("Name") if last_instance else None,
+        "last_event_date": last_event_date(case),
+    }
+
+
+def first_case(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not isinstance(payload, dict):
+        return None
+    cases: List[Dict[str, Any]] = payload.get("Cases") or []
+    return cases[0] if cases else None
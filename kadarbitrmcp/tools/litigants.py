@@ -0,0 +1,108 @@
+"""Queries over the local litigation graph: counterparties, repeat plaintiffs, portfolio links."""
+
+import time
+from typing import List, Optional
+
+from fastmcp import Context
+from mcp.types import TextContent
+from mcp.shared.exceptions import McpError, ErrorData
+from opentelemetry import trace
+from pydantic import Field
+
+from config import get_settings
+from metrics import observe_duration, record_tool_call
+from mcp_instance import mcp
+from .batch_exposure import parse_inns
+from .litigation_graph import DIRECTIONS, get_litigation_graph
+from .tool_args import arg
+
+tracer = trace.get_tracer(__name__)
+
+QUERIES = ("neighbors", "repeat", "portfolio")
+
+
+def _party(item: dict) -> str:
+    return f"{item.get('name') or '—'} (ИНН {item.get('inn') or '—'})"
+
+
+@mcp.tool(
+    name="arbitr_litigation_graph",
+    description="Граф участников арбитражных дел, которые сервер уже загружал (без запросов к api-assist): neighbors — с кем судится ИНН, repeat — кто неоднократно подаёт иски к ИНН, portfolio — кто из списка ИНН судится друг с другом и связанные группы.",
+)
+async def litigation_graph(
+    query: str = Field("neighbors", description="neighbors, repeat или portfolio."),
+    inn: Optional[str] = Field(None, description="ИНН для neighbors и repeat."),
+    direction: str = Field("any", description="Для neighbors: any, sues (ИНН — истец), sued_by (ИНН — ответчик)."),
+    inns: Optional[List[str]] = Field(None, description="ИНН портфеля для portfolio."),
+    inns_csv: Optional[str] = Field(None, description="CSV с ИНН портфеля (колонка inn/ИНН или первая)."),
+    min_cases: int = Field(2, description="Для repeat: минимум дел от одного истца."),
+    limit: int = Field(50, description="Максимум строк в ответе."),
+    ctx: Context = None,
+) -> dict:
+    """Answer neighbor, repeat-litigant and portfolio questions from the local graph."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_litigation_graph"
+
+    try:
+        query = arg(query)
+        direction = arg(direction)
+        inn = arg(inn)
+        limit = int(arg(limit))
+        if query not in QUERIES:
+            raise McpError(ErrorData(code=-32602, message=f"query должен быть одним из: {', '.join(QUERIES)}"))
+        if direction not in DIRECTIONS:
+            raise McpError(ErrorData(code=-32602, message=f"direction должен быть одним из: {', '.join(DIRECTIONS)}"))
+        if query != "portfolio" and not inn:
+            raise McpError(ErrorData(code=-32602, message=f"Для query={query} нужен inn"))
+
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            span.set_attribute("query", query)
+            graph = get_litigation_graph(settings)
+            stats = {"parties": len(graph.names), "edges": graph.edge_count, "cases": len(graph.case_numbers)}
+
+            if query == "portfolio":
+                portfolio_inns, rejected = parse_inns(arg(inns), arg(inns_csv))
+                result = graph.portfolio(portfolio_inns)
+                lines = [
+                    f"ИНН в портфеле: {len(portfolio_inns)}, известны графу: {len(result['known'])}, "
+                    f"пар с делами: {len(result['pairs'])}, связанных групп: {len(result['components'])}"
+                ]
+                lines.extend(
+                    f"{_party(pair['plaintiff'])} → {_party(pair['respondent'])}: дел {pair['cases']}"
+                    for pair in result["pairs"][:limit]
+                )
+                structured = {**result, "pairs": result["pairs"][:limit], "rejected": rejected}
+            else:
+                if query == "repeat":
+                    items = graph.repeat_litigants(inn, int(arg(min_cases)), limit)
+                    lines = [f"Истцов с {int(arg(min_cases))}+ делами против {inn}: {len(items)}"]
+                else:
+                    items = graph.neighbors(inn, direction, limit)
+                    lines = [f"Контрагентов по делам {inn}: {len(items)}"]
+                lines.extend(
+                    f"{_party(item)}: дел {item['cases']} (их иски {item['sued_by_them']}, "
+                    f"иски к ним {item['sued_them']})"
+                    for item in items
+                )
+                structured = {"inn": inn, "items": items}
+                if graph.node_for(inn) is None:
+                    lines.append("ИНН ещё не встречался в загруженных делах: сначала выполните поиск по нему")
+
+            record_tool_call(tool_name, "ok", mode)
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {**structured, "graph": stats},
+                "meta": {"mode": mode, "query": query, **stats},
+            }
+    except McpError:
+        record_tool_call(tool_name, "fail", mode)
+        raise
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to query litigation graph: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)
@@ -0,0 +1,247 @@
+"""Graph of litigants built from every case the server has fetched.
+
+Nodes are participants (keyed by INN, else OGRN, else normalized name); every case adds a
+plaintiff -> respondent edge per pair. Edges are appended to compact ``array('i')`` buffers and
+indexed on demand into CSR arrays (NumPy) for neighbor, repeat-litigant and portfolio queries.
+Each case remembers the span of its edges, so re-fetching a case only compares against those.
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import Settings
+
+DIRECTIONS = ("any", "sues", "sued_by")
+
+
+def party_key(party: Dict[str, Any]) -> Optional[str]:
+    inn = str(party.get("Inn") or "").strip()
+    if inn:
+        return f"inn:{inn}"
+    ogrn = str(party.get("Ogrn") or "").strip()
+    if ogrn:
+        return f"ogrn:{ogrn}"
+    name = " ".join(str(party.get("Name") or "").split()).casefold()
+    return f"name:{name}" if name else None
+
+
+class _Csr:
+    """Edges grouped by one endpoint: edges of node i are order[ptr[i]:ptr[i + 1]]."""
+
+    def __init__(self, endpoint: np.ndarray, nodes: int) -> None:
+        self.order = np.argsort(endpoint, kind="stable")
+        self.ptr = np.zeros(nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(endpoint, minlength=nodes), out=self.ptr[1:])
+
+    def edges(self, node: int) -> np.ndarray:
+        return self.order[self.ptr[node] : self.ptr[node + 1]]
+
+
+class LitigationGraph:
+    def __init__(self) -> None:
+        self.keys: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.inns: List[Optional[str]] = []
+        self.case_ids: Dict[str, int] = {}
+        self.case_numbers: List[Optional[str]] = []
+        self.src = array("i")
+        self.dst = array("i")
+        self.case = array("i")
+        # edges of case i: span (case_start[i], case_count[i]) plus rare later spans in _extra
+        self.case_start = array("i")
+        self.case_count = array("i")
+        self._extra: Dict[int, List[Tuple[int, int]]] = {}
+        self._index: Optional[Tuple[_Csr, _Csr]] = None
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    def _node(self, party: Dict[str, Any]) -> Optional[int]:
+        key = party_key(party)
+        if key is None:
+            return None
+        node = self.keys.get(key)
+        if node is None:
+            node = len(self.names)
+            self.keys[key] = node
+            self.names.append(str(party.get("Name") or "").strip())
+            self.inns.append(str(party.get("Inn") or "").strip() or None)
+        elif not self.names[node] and party.get("Name"):
+            self.names[node] = str(party["Name"]).strip()
+        return node
+
+    def _case_pairs(self, case_index: int) -> Set[Tuple[int, int]]:
+        spans = [(self.case_start[case_index], self.case_count[case_index])]
+        spans.extend(self._extra.get(case_index, ()))
+        return {(self.src[i], self.dst[i]) for start, count in spans for i in range(start, start + count)}
+
+    def add_case(self, case: Dict[str, Any]) -> int:
+        case_key = case.get("CaseId") or case.get("CaseNumber")
+        if not case_key:
+            return 0
+        case_index = self.case_ids.get(case_key)
+        known: Set[Tuple[int, int]] = set()
+        if case_index is not None:
+            known = self._case_pairs(case_index)
+        plaintiffs = [n for n in map(self._node, case.get("Plaintiffs") or []) if n is not None]
+        respondents = [n for n in map(self._node, case.get("Respondents") or []) if n is not None]
+        if case_index is None:
+            case_index = len(self.case_numbers)
+            self.case_ids[case_key] = case_index
+            self.case_numbers.append(case.get("CaseNumber"))
+            self.case_start.append(len(self.src))
+            self.case_count.append(0)
+        start = len(self.src)
+        for plaintiff in plaintiffs:
+            for respondent in respondents:
+                pair = (plaintiff, respondent)
+                if plaintiff == respondent or pair in known:
+                    continue
+                known.add(pair)
+                self.src.append(plaintiff)
+                self.dst.append(respondent)
+                self.case.append(case_index)
+        added = len(self.src) - start
+        if added:
+            if self.case_start[case_index] + self.case_count[case_index] == start:
+                self.case_count[case_index] += added
+            else:
+                self._extra.setdefault(case_index, []).append((start, added))
+            self._index = None
+        return added
+
+    def add_payload(self, payload: Dict[str, Any]) -> int:
+        if not isinstance(payload, dict):
+            return 0
+        return sum(self.add_case(case) for case in payload.get("Cases") or [])
+
+    def node_for(self, inn: str) -> Optional[int]:
+        return self.keys.get(f"inn:{inn.strip()}")
+
+    def _csr(self) -> Tuple[_Csr, _Csr]:
+        if self._index is None:
+            nodes = len(self.names)
+            self._index = (
+                _Csr(np.frombuffer(self.src, dtype=np.int32), nodes),
+                _Csr(np.frombuffer(self.dst, dtype=np.int32), nodes),
+            )
+        return self._index
+
+    def _counterparties(self, node: int, direction: str) -> Dict[int, Dict[str, Any]]:
+        by_src, by_dst = self._csr()
+        src = np.frombuffer(self.src, dtype=np.int32)
+        dst = np.frombuffer(self.dst, dtype=np.int32)
+        cases = np.frombuffer(self.case, dtype=np.int32)
+        result: Dict[int, Dict[str, Any]] = {}
+        sides = []
+        if direction in ("any", "sues"):
+            sides.append(("sues", by_src.edges(node), dst))
+        if direction in ("any", "sued_by"):
+            sides.append(("sued_by", by_dst.edges(node), src))
+        for label, edges, other_end in sides:
+            others = other_end[edges]
+            for other, case_index in zip(others.tolist(), cases[edges].tolist()):
+                item = result.setdefault(other, {"sues": set(), "sued_by": set()})
+                item[label].add(case_index)
+        return result
+
+    def _describe(self, node: int) -> Dict[str, Any]:
+        return {"inn": self.inns[node], "name": self.names[node]}
+
+    def neighbors(self, inn: str, direction: str = "any", limit: int = 50) -> List[Dict[str, Any]]:
+        """Counterparties of an INN with the number of shared cases, most frequent first."""
+        node = self.node_for(inn)
+        if node is None:
+            return []
+        items = []
+        for other, sides in self._counterparties(node, direction).items():
+            cases = sides["sues"] | sides["sued_by"]
+            items.append(
+                {
+                    **self._describe(other),
+                    "cases": len(cases),
+                    "sued_by_them": len(sides["sued_by"]),
+                    "sued_them": len(sides["sues"]),
+                    "case_numbers": sorted(filter(None, (self.case_numbers[c] for c in cases)))[:5],
+                }
+            )
+        items.sort(key=lambda item: (-item["cases"], item["name"]))
+        return items[: max(1, limit)]
+
+    def repeat_litigants(self, inn: str, min_cases: int = 2, limit: int = 50) -> List[Dict[str, Any]]:
+        """Plaintiffs that sued the INN in at least min_cases distinct cases."""
+        plaintiffs = self.neighbors(inn, "sued_by", limit=len(self.names) or 1)
+        return [item for item in plaintiffs if item["cases"] >= min_cases][: max(1, limit)]
+
+    def portfolio(self, inns: Iterable[str]) -> Dict[str, Any]:
+        """Direct litigation between portfolio INNs and connected components of that subgraph."""
+        members = {inn: node for inn in inns if (node := self.node_for(inn)) is not None}
+        if len(members) < 2 or not self.edge_count:
+            return {"known": sorted(members), "pairs": [], "components": []}
+        src = np.frombuffer(self.src, dtype=np.int32)
+        dst = np.frombuffer(self.dst, dtype=np.int32)
+        cases = np.frombuffer(self.case, dtype=np.int32)
+        nodes = np.fromiter(members.values(), dtype=np.int32)
+        inside = np.isin(src, nodes) & np.isin(dst, nodes)
+
+        parent = {node: node for node in members.values()}
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        pairs: Dict[Tuple[int, int], Set[int]] = {}
+        for a, b, case_index in zip(src[inside].tolist(), dst[inside].tolist(), cases[inside].tolist()):
+            pairs.setdefault((a, b), set()).add(case_index)
+            parent[find(a)] = find(b)
+
+        groups: Dict[int, List[int]] = {}
+        for node in members.values():
+            groups.setdefault(find(node), []).append(node)
+        components = sorted(
+            (sorted(self.inns[node] for node in group) for group in groups.values() if len(group) > 1),
+            key=len,
+            reverse=True,
+        )
+        return {
+            "known": sorted(members),
+            "pairs": sorted(
+                (
+                    {
+                        "plaintiff": self._describe(a),
+                        "respondent": self._describe(b),
+                        "cases": len(case_set),
+                        "case_numbers": sorted(filter(None, (self.case_numbers[c] for c in case_set)))[:5],
+                    }
+                    for (a, b), case_set in pairs.items()
+                ),
+                key=lambda pair: -pair["cases"],
+            ),
+            "components": components,
+        }
+
+
+_graph: Optional[LitigationGraph] = None
+_graph_dir: Optional[str] = None
+
+
+def get_litigation_graph(settings: Settings) -> LitigationGraph:
+    """Process-wide graph; on creation it is seeded from finished cases in ARBITR_CACHE_DIR."""
+    global _graph, _graph_dir
+    if _graph is None or _graph_dir != settings.cache_dir:
+        _graph = LitigationGraph()
+        _graph_dir = settings.cache_dir
+        if settings.cache_dir:
+            for path in sorted((Path(settings.cache_dir) / "cases").glob("*.json")):
+                try:
+                    _graph.add_payload(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):
+                    continue
+    return _graph
@@ -0,0 +1,267 @@
+"""Content-addressed store of court PDFs and their extracted text.
+
+Documents are keyed by the SHA-256 of their bytes; a URL index maps kad.arbitr.ru links to
+digests, so a judgment is downloaded from api-assist once and then served as the MCP resource
+``arbitr-pdf://{digest}`` (text: ``arbitr-pdf-text://{digest}``) or ``GET /pdf/{digest}``.
+The store lives in ``ARBITR_CACHE_DIR``/pdf or, without it, in memory; both are bounded by
+``ARBITR_PDF_CACHE_MB``.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import io
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from config import Settings
+
+RULING_MARKERS = re.compile(
+    r"(Р\s*Е\s*Ш\s*И\s*Л|П\s*О\s*С\s*Т\s*А\s*Н\s*О\s*В\s*И\s*Л|О\s*П\s*Р\s*Е\s*Д\s*Е\s*Л\s*И\s*Л)\s*:",
+)
+
+
+def extract_pdf_text(data: bytes) -> Optional[str]:
+    """Text of all pages; None if pypdf is not installed. Runs in a worker process."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+
+
+def ruling_paragraphs(text: str, limit: int = 3000) -> List[str]:
+    """Operative part of a judgment: paragraphs after the last РЕШИЛ/ПОСТАНОВИЛ/ОПРЕДЕЛИЛ marker."""
+    markers = list(RULING_MARKERS.finditer(text))
+    if not markers:
+        return []
+    tail = text[markers[-1].end():]
+    paragraphs: List[str] = []
+    size = 0
+    for block in re.split(r"\n\s*\n|\n(?=\d+\.\s)", tail):
+        paragraph = " ".join(block.split())
+        if not paragraph:
+            continue
+        if size + len(paragraph) > limit:
+            if not paragraphs:
+                paragraphs.append(paragraph[:limit])
+            break
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return paragraphs
+
+
+def can_extract_text() -> bool:
+    return importlib.util.find_spec("pypdf") is not None
+
+
+# URLs remembered in memory; older ones fall back to the on-disk index or a new download
+URL_INDEX_SIZE = 10_000
+
+
+class PdfStore:
+    """
+    PDFs and their text, bounded by max_bytes in both modes: in memory an LRU of blobs, on disk
+    an LRU by file mtime (reads touch the file) pruned after every put. Disk I/O runs in
+    asyncio.to_thread.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 200 * 2**20) -> None:
+        self.directory = Path(directory) / "pdf" if directory else None
+        self.max_bytes = max_bytes
+        self.blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self.texts: Dict[str, str] = {}
+        self.urls: "OrderedDict[str, str]" = OrderedDict()
+        self.size = 0
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _remember_url(self, url: str, digest: str) -> None:
+        self.urls[url] = digest
+        self.urls.move_to_end(url)
+        while len(self.urls) > URL_INDEX_SIZE:
+            self.urls.popitem(last=False)
+
+    async def lookup(self, url: str) -> Optional[str]:
+        """Digest of an already downloaded URL whose bytes are still stored."""
+        url = url.strip()
+        digest = self.urls.get(url)
+        if self.directory is None:
+            return digest if digest in self.blobs else None
+        found = await asyncio.to_thread(self._lookup_file, url, digest)
+        if found is not None:
+            self._remember_url(url, found)
+        return found
+
+    def _lookup_file(self, url: str, digest: Optional[str]) -> Optional[str]:
+        if digest is None:
+            try:
+                digest = self._url_path(url).read_text(encoding="ascii").strip() or None
+            except OSError:
+                return None
+        if digest is None or not self._pdf_path(digest).exists():
+            return None
+        return digest
+
+    async def put(self, url: str, data: bytes) -> str:
+        digest = self.digest(data)
+        self._remember_url(url.strip(), digest)
+        if self.directory is not None:
+            await asyncio.to_thread(self._put_file, url.strip(), digest, data)
+            return digest
+        if digest not in self.blobs:
+            self.blobs[digest] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self.blobs) > 1:
+                evicted, blob = self.blobs.popitem(last=False)
+                self.size -= len(blob)
+                self.texts.pop(evicted, None)
+        self.blobs.move_to_end(digest)
+        return digest
+
+    def _put_file(self, url: str, digest: str, data: bytes) -> None:
+        _write_atomic(self._pdf_path(digest), data)
+        _write_atomic(self._url_path(url), digest.encode("ascii"))
+        self._prune(keep=digest)
+
+    def _prune(self, keep: str) -> None:
+        """Drops the least recently used PDFs (and their text) until the directory fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.pdf"):  # type: ignore[union-attr]
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            text = path.with_suffix(".txt")
+            size = stat.st_size + (text.stat().st_size if text.exists() else 0)
+            entries.append((stat.st_mtime, size, path))
+            total += size
+        entries.sort()
+        evicted = set()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            path.unlink(missing_ok=True)
+            path.with_suffix(".txt").unlink(missing_ok=True)
+            evicted.add(path.stem)
+            total -= size
+        if not evicted:
+            return
+        for url_file in (self.directory / "urls").glob("*"):  # type: ignore[operator]
+            try:
+                if url_file.read_text(encoding="ascii").strip() in evicted:
+                    url_file.unlink()
+            except OSError:
+                continue
+
+    async def read(self, digest: str) -> Optional[bytes]:
+        if digest in self.blobs:
+            self.blobs.move_to_end(digest)
+            return self.blobs[digest]
+        if self.directory is None or not re.fullmatch(r"[0-9a-f]{64}", digest):
+            return None
+        return await asyncio.to_thread(self._read_file, digest)
+
+    def _read_file(self, digest: str) -> Optional[bytes]:
+        path = self._pdf_path(digest)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    async def read_text(self, digest: str) -> Optional[str]:
+        if digest in self.texts:
+            return self.texts[digest]
+        if self.directory is None or not re.fullmatch(r"[0-9a-f]{64}", digest):
+            return None
+        return await asyncio.to_thread(self._read_text_file, digest)
+
+    def _read_text_file(self, digest: str) -> Optional[str]:
+        try:
+            return (self.directory / f"{digest}.txt").read_text(encoding="utf-8")  # type: ignore[operator]
+        except OSError:
+            return None
+
+    async def put_text(self, digest: str, text: str) -> None:
+        if self.directory is not None:
+            await asyncio.to_thread(_write_atomic, self.directory / f"{digest}.txt", text.encode("utf-8"))
+        elif digest in self.blobs:
+            self.texts[digest] = text
+
+    def _pdf_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.pdf"  # type: ignore[operator]
+
+    def _url_path(self, url: str) -> Path:
+        return self.directory / "urls" / hashlib.sha1(url.encode("utf-8")).hexdigest()  # type: ignore[operator]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+_store: Optional[PdfStore] = None
+_store_settings: Optional[Settings] = None
+_pool: Optional[ProcessPoolExecutor] = None
+_sessions = 0
+
+
+def get_pdf_store(settings: Settings) -> PdfStore:
+    global _store, _store_settings
+    if _store is None or _store_settings != settings:
+        _store = PdfStore(settings.cache_dir, int(settings.pdf_cache_mb * 2**20))
+        _store_settings = settings
+    return _store
+
+
+async def extract_text(settings: Settings, store: PdfStore, digest: str) -> Optional[str]:
+    """Extracted text of a stored PDF, computed once in the process pool and then kept."""
+    text = await store.read_text(digest)
+    if text is not None:
+        return text
+    data = await store.read(digest)
+    if data is None or not can_extract_text():
+        return None
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max(1, settings.pdf_workers))
+    text = await asyncio.get_running_loop().run_in_executor(_pool, extract_pdf_text, data)
+    if text is not None:
+        await store.put_text(digest, text)
+    return text
+
+
+def close_pdf_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@asynccontextmanager
+async def pdf_pool_session() -> AsyncIterator[None]:
+    """Server lifespan hook: the text extraction pool is shut down when the last session ends."""
+    global _sessions
+    _sessions += 1
+    try:
+        yield
+    finally:
+        _sessions -= 1
+        if _sessions == 0:
+            close_pdf_pool()
+
@@ -0,0 +1,145 @@
+"""Search plus concurrent case details in one tool call (litigation profile)."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Context
+from mcp.types import TextContent
+from mcp.shared.exceptions import McpError, ErrorData
+from opentelemetry import trace
+from pydantic import Field
+
+from config import get_settings
+from metrics import observe_duration, record_tool_call
+from mcp_instance import mcp
+from .arbitr_client import ArbitrApiError
+from .case_source import fetch_details_by_id, fetch_search, search_all_pages
+from .case_summary import first_case, summarize_case
+from .tool_args import arg, ctx_info, ctx_progress
+
+tracer = trace.get_tracer(__name__)
+
+ROLE_LABELS = {"plaintiff": "истец", "respondent": "ответчик", "third": "третье лицо", "other": "иное"}
+
+
+def _format_line(item: Dict[str, Any]) -> str:
+    parts = [f"№ {item.get('case_number')}", item.get("start_date") or "—"]
+    if item.get("role"):
+        parts.append(ROLE_LABELS.get(item["role"], item["role"]))
+    if item.get("claim_sum") is not None:
+        parts.append(f"{item['claim_sum']:,.0f} ₽".replace(",", " "))
+    if item.get("last_instance"):
+        parts.append(item["last_instance"])
+    if item.get("state"):
+        parts.append(item["state"])
+    return " — ".join(parts)
+
+
+@mcp.tool(
+    name="arbitr_search_with_details",
+    description="Судебный профиль участника за один вызов: поиск дел по ИНН/названию и параллельная загрузка деталей первых top_n дел. Возвращает компактную сводку: роль, сумма иска, статус, последняя инстанция и дата.",
+)
+async def search_with_details(
+    Inn: str = Field(..., description="ИНН или наименование участника процесса."),
+    InnType: Optional[str] = Field("Any", description="Any, Plaintiff, Respondent, Third, Other."),
+    DateFrom: Optional[str] = Field(None, description="Дата начала поиска YYYY-MM-DD."),
+    DateTo: Optional[str] = Field(None, description="Дата окончания поиска YYYY-MM-DD."),
+    Court: Optional[str] = Field(None, description="Наименование суда как на kad.arbitr.ru."),
+    CaseType: Optional[str] = Field(None, description="Тип дела: A, B, G."),
+    top_n: int = Field(20, description="Сколько дел дополнить деталями; 0 — все найденные."),
+    all_pages: bool = Field(False, description="Искать по всем страницам, а не только по первой."),
+    ctx: Context = None,
+) -> dict:
+    """Search cases and fetch details for the top-N concurrently."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_search_with_details"
+
+    await ctx_info(ctx, f"🔍 Судебный профиль {Inn}")
+    await ctx_progress(ctx, 5)
+
+    try:
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            params = {
+                "Inn": Inn,
+                "InnType": arg(InnType),
+                "DateFrom": arg(DateFrom),
+                "DateTo": arg(DateTo),
+                "Court": arg(Court),
+                "CaseType": arg(CaseType),
+            }
+            top_n = int(arg(top_n))
+            if arg(all_pages):
+                search = await search_all_pages(settings, params, max_cases=max(top_n, 1000))
+            else:
+                search, _ = await fetch_search(settings, {**params, "page": 1})
+            found: List[Dict[str, Any]] = search.get("Cases") or []
+            selected = found[:top_n] if top_n > 0 else found
+            span.set_attribute("cases_found", len(found))
+            span.set_attribute("cases_detailed", len(selected))
+            await ctx_progress(ctx, 10)
+
+            semaphore = asyncio.Semaphore(max(1, settings.details_concurrency))
+            done = 0
+            cache_hits = 0
+
+            async def enrich(case: Dict[str, Any]) -> Dict[str, Any]:
+                nonlocal done, cache_hits
+                error = None
+                detailed = None
+                case_id = case.get("CaseId")
+                if case_id:
+                    async with semaphore:
+                        try:
+                            payload, cached = await fetch_details_by_id(settings, case_id)
+                            detailed = first_case(payload)
+                            cache_hits += cached
+                        except ArbitrApiError as exc:
+                            error = str(exc)
+                done += 1
+                await ctx_progress(ctx, 10 + int(90 * done / max(len(selected), 1)))
+                merged = {**case, **{k: v for k, v in (detailed or {}).items() if v is not None}}
+                item = summarize_case(merged, Inn)
+                if error:
+                    item["error"] = error
+                return item
+
+            items = await asyncio.gather(*(enrich(case) for case in selected))
+            items.sort(key=lambda item: item.get("start_date") or "", reverse=True)
+            errors = sum(1 for item in items if "error" in item)
+
+            lines = [f"Найдено дел: {len(found)}, с деталями: {len(items) - errors}"]
+            if errors:
+                lines.append(f"Не удалось загрузить детали: {errors}")
+            lines.extend(_format_line(item) for item in items)
+
+            await ctx_progress(ctx, 100)
+            record_tool_call(tool_name, "ok", mode)
+
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {
+                    "inn": Inn,
+                    "total_found": len(found),
+                    "pages": search.get("PagesCount"),
+                    "cases": items,
+                },
+                "meta": {
+                    "mode": mode,
+                    "detailed": len(items) - errors,
+                    "errors": errors,
+                    "cache_hits": cache_hits,
+                },
+            }
+    except ArbitrApiError as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=str(exc)))
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to build litigation profile: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)
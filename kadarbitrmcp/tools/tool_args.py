@@ -0,0 +1,27 @@
+"""Helpers shared by the MCP tool functions: Field() defaults and best-effort ctx reporting."""
+
+from typing import Optional
+
+from fastmcp import Context
+from pydantic.fields import FieldInfo
+
+
+def arg(value):
+    """Default of a Field() parameter when the tool function is called directly (tool.fn)."""
+    return value.default if isinstance(value, FieldInfo) else value
+
+
+async def ctx_info(ctx: Optional[Context], message: str) -> None:
+    if ctx:
+        try:
+            await ctx.info(message)
+        except Exception:
+            pass
+
+
+async def ctx_progress(ctx: Optional[Context], progress: int, total: int = 100) -> None:
+    if ctx:
+        try:
+            await ctx.report_progress(progress=progress, total=total)
+        except Exception:
+            pass
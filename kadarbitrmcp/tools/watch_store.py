@@ -0,0 +1,224 @@
+"""SQLite state of the new-case watcher: watched INNs, their known cases and the event log.
+
+For every watched INN the store keeps the last sync date and the set of seen CaseIds, so a poll
+only searches from the last sync. Active cases remember their state and last instance to detect
+changes. Without ``ARBITR_CACHE_DIR`` the database is in memory and lasts until restart.
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import Settings
+from .case_summary import summarize_case
+
+EVENT_KINDS = ("new_case", "state_changed", "instance_changed", "finished")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watched (
+    inn TEXT PRIMARY KEY,
+    added_at TEXT NOT NULL,
+    last_sync TEXT
+);
+CREATE TABLE IF NOT EXISTS watched_cases (
+    inn TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    case_number TEXT,
+    start_date TEXT,
+    state TEXT,
+    finished INTEGER,
+    last_instance TEXT,
+    instances INTEGER,
+    checked_at TEXT,
+    PRIMARY KEY (inn, case_id)
+);
+CREATE INDEX IF NOT EXISTS watched_cases_track ON watched_cases (finished, checked_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inn TEXT NOT NULL,
+    case_id TEXT,
+    case_number TEXT,
+    kind TEXT NOT NULL,
+    detail TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_inn ON events (inn, id);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class WatchStore:
+    def __init__(self, path: str = ":memory:") -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def add(self, inns: Iterable[str]) -> List[str]:
+        added = []
+        with self.conn:
+            for inn in inns:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO watched (inn, added_at) VALUES (?, ?)", (inn, _now())
+                )
+                if cursor.rowcount:
+                    added.append(inn)
+        return added
+
+    def remove(self, inns: Iterable[str]) -> int:
+        removed = 0
+        with self.conn:
+            for inn in inns:
+                removed += self.conn.execute("DELETE FROM watched WHERE inn = ?", (inn,)).rowcount
+                self.conn.execute("DELETE FROM watched_cases WHERE inn = ?", (inn,))
+        return removed
+
+    def watched(self, inns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT w.inn, w.added_at, w.last_sync, COUNT(c.case_id) AS cases "
+            "FROM watched w LEFT JOIN watched_cases c ON c.inn = w.inn "
+            "GROUP BY w.inn ORDER BY w.added_at, w.inn"
+        ).fetchall()
+        selected = set(inns) if inns is not None else None
+        return [dict(row) for row in rows if selected is None or row["inn"] in selected]
+
+    def known_case_ids(self, inn: str) -> Set[str]:
+        rows = self.conn.execute("SELECT case_id FROM watched_cases WHERE inn = ?", (inn,))
+        return {row["case_id"] for row in rows}
+
+    def record_cases(self, inn: str, cases: Iterable[Dict[str, Any]], emit: bool) -> List[Dict[str, Any]]:
+        """Stores unseen cases; with emit=True every unseen case becomes a new_case event."""
+        known = self.known_case_ids(inn)
+        events = []
+        with self.conn:
+            for case in cases:
+                case_id = case.get("CaseId")
+                if not case_id or case_id in known:
+                    continue
+                known.add(case_id)
+                summary = summarize_case(case, inn)
+                self.conn.execute(
+                    "INSERT INTO watched_cases (inn, case_id, case_number, start_date) VALUES (?, ?, ?, ?)",
+                    (inn, case_id, summary["case_number"], summary["start_date"]),
+                )
+                if emit:
+                    events.append(self._event(inn, case_id, summary["case_number"], "new_case", summary))
+        return events
+
+    def set_synced(self, inn: str, day: str) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE watched SET last_sync = ? WHERE inn = ?", (day, inn))
+
+    def cases_to_track(self, limit: int, inns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Not finished cases, least recently checked first."""
+        query = (
+            "SELECT inn, case_id, case_number, state, finished, last_instance, instances, checked_at "
+            "FROM watched_cases WHERE finished IS NOT 1"
+        )
+        params: List[Any] = []
+        if inns is not None:
+            inns = list(inns)
+            query += f" AND inn IN ({','.join('?' * len(inns))})"
+            params.extend(inns)
+        query += " ORDER BY checked_at IS NOT NULL, checked_at LIMIT ?"
+        params.append(max(0, limit))
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def update_case(self, tracked: Dict[str, Any], case: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Saves the current state of a tracked case; changes become events once a state is known."""
+        summary = summarize_case(case, tracked["inn"])
+        instances = len(case.get("CaseInstances") or [])
+        events = []
+        with self.conn:
+            if tracked["checked_at"] is not None:
+                base = (tracked["inn"], tracked["case_id"], tracked["case_number"])
+                if summary["state"] != tracked["state"]:
+                    events.append(
+                        self._event(*base, "state_changed", {"from": tracked["state"], "to": summary["state"]})
+                    )
+                if instances != tracked["instances"] or summary["last_instance"] != tracked["last_instance"]:
+                    events.append(
+                        self._event(
+                            *base,
+                            "instance_changed",
+                            {"from": tracked["last_instance"], "to": summary["last_instance"], "instances": instances},
+                        )
+                    )
+                if summary["finished"] is True:
+                    events.append(self._event(*base, "finished", {"state": summary["state"]}))
+            finished = None if summary["finished"] is None else int(bool(summary["finished"]))
+            self.conn.execute(
+                "UPDATE watched_cases SET state = ?, finished = ?, last_instance = ?, instances = ?, "
+                "checked_at = ? WHERE inn = ? AND case_id = ?",
+                (
+                    summary["state"],
+                    finished,
+                    summary["last_instance"],
+                    instances,
+                    _now(),
+                    tracked["inn"],
+                    tracked["case_id"],
+                ),
+            )
+        return events
+
+    def events(
+        self,
+        since_id: int = 0,
+        inn: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM events WHERE id > ?"
+        params: List[Any] = [since_id]
+        if inn:
+            query += " AND inn = ?"
+            params.append(inn)
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY id LIMIT ?"
+        params.append(max(1, limit))
+        rows = []
+        for row in self.conn.execute(query, params):
+            item = dict(row)
+            item["detail"] = json.loads(item["detail"]) if item["detail"] else None
+            rows.append(item)
+        return rows
+
+    def _event(
+        self, inn: str, case_id: str, case_number: Optional[str], kind: str, detail: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        created_at = _now()
+        cursor = self.conn.execute(
+            "INSERT INTO events (inn, case_id, case_number, kind, detail, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (inn, case_id, case_number, kind, json.dumps(detail, ensure_ascii=False), created_at),
+        )
+        return {
+            "id": cursor.lastrowid,
+            "inn": inn,
+            "case_id": case_id,
+            "case_number": case_number,
+            "kind": kind,
+            "detail": detail,
+            "created_at": created_at,
+        }
+
+
+_store: Optional[WatchStore] = None
+_store_path: Optional[str] = None
+
+
+def get_watch_store(settings: Settings) -> WatchStore:
+    global _store, _store_path
+    path = str(Path(settings.cache_dir) / "watcher.sqlite3") if settings.cache_dir else ":memory:"
+    if _store is None or _store_path != path:
+        _store = WatchStore(path)
+        _store_path = path
+    return _store
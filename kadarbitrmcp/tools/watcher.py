@@ -0,0 +1,286 @@
+"""New-case watcher tools: watch list, incremental poll and event log."""
+
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Context
+from mcp.types import TextContent
+from mcp.shared.exceptions import McpError, ErrorData
+from opentelemetry import trace
+from pydantic import Field
+
+from config import Settings, get_settings
+from metrics import observe_duration, record_tool_call
+from mcp_instance import mcp
+from .arbitr_client import ArbitrApiError
+from .batch_exposure import parse_inns
+from .case_source import fetch_details_by_id, search_all_pages
+from .case_summary import first_case
+from .tool_args import arg, ctx_info, ctx_progress
+from .watch_store import EVENT_KINDS, WatchStore, get_watch_store
+
+tracer = trace.get_tracer(__name__)
+
+# Cases registered on the day of the last sync can appear after it; re-read that day
+OVERLAP_DAYS = 1
+
+EVENT_LABELS = {
+    "new_case": "новое дело",
+    "state_changed": "изменился статус",
+    "instance_changed": "новая инстанция",
+    "finished": "дело завершено",
+}
+
+
+def _format_event(event: Dict[str, Any]) -> str:
+    line = f"#{event['id']} {event['inn']}: {EVENT_LABELS.get(event['kind'], event['kind'])} № {event['case_number']}"
+    detail = event.get("detail") or {}
+    if event["kind"] == "state_changed" and detail.get("to"):
+        line += f" — {detail['to']}"
+    elif event["kind"] == "instance_changed" and detail.get("to"):
+        line += f" — {detail['to']}"
+    return line
+
+
+async def _poll_inn(
+    settings: Settings, store: WatchStore, watched: Dict[str, Any], today: date
+) -> Dict[str, Any]:
+    inn = watched["inn"]
+    params: Dict[str, Any] = {"Inn": inn, "InnType": "Any"}
+    baseline = watched["last_sync"] is None
+    if not baseline:
+        since = date.fromisoformat(watched["last_sync"]) - timedelta(days=OVERLAP_DAYS)
+        params["DateFrom"] = since.isoformat()
+    search = await search_all_pages(settings, params, settings.watch_max_cases)
+    events = store.record_cases(inn, search.get("Cases") or [], emit=not baseline)
+    truncated = bool(search.get("Truncated"))
+    if not truncated:
+        # cases past ARBITR_WATCH_MAX_CASES were not seen, so the next poll re-reads the period
+        store.set_synced(inn, today.isoformat())
+    return {
+        "inn": inn,
+        "baseline": baseline,
+        "truncated": truncated,
+        "pages": search.get("PagesCount"),
+        "events": events,
+    }
+
+
+async def _track_cases(
+    settings: Settings, store: WatchStore, inns: Optional[List[str]]
+) -> Dict[str, Any]:
+    tracked = store.cases_to_track(settings.watch_max_details, inns)
+    semaphore = asyncio.Semaphore(max(1, settings.details_concurrency))
+    events: List[Dict[str, Any]] = []
+    errors = 0
+
+    async def check(item: Dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                # an active case may sit in the TTL cache: tracking must see the current state
+                payload, _ = await fetch_details_by_id(settings, item["case_id"], fresh=True)
+            except ArbitrApiError:
+                errors += 1
+                return
+        case = first_case(payload)
+        if case is not None:
+            events.extend(store.update_case(item, case))
+
+    await asyncio.gather(*(check(item) for item in tracked))
+    return {"checked": len(tracked), "errors": errors, "events": events}
+
+
+@mcp.tool(
+    name="arbitr_watch_inns",
+    description="Список ИНН для мониторинга новых арбитражных дел: добавить, убрать, показать. Первый arbitr_watch_poll запоминает текущие дела, дальше события — только по новым делам и изменениям.",
+)
+async def watch_inns(
+    add: Optional[List[str]] = Field(None, description="ИНН, которые нужно начать отслеживать."),
+    remove: Optional[List[str]] = Field(None, description="ИНН, которые больше не отслеживать."),
+    add_csv: Optional[str] = Field(None, description="CSV с ИНН для добавления (колонка inn/ИНН или первая)."),
+    ctx: Context = None,
+) -> dict:
+    """Manage the watch list."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_watch_inns"
+
+    try:
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            store = get_watch_store(settings)
+            to_add, rejected = parse_inns(arg(add), arg(add_csv))
+            to_remove, _ = parse_inns(arg(remove), None)
+            added = store.add(to_add)
+            removed = store.remove(to_remove)
+            watched = store.watched()
+
+            lines = [f"Отслеживается ИНН: {len(watched)}"]
+            if added:
+                lines.append(f"Добавлено: {len(added)}")
+            if removed:
+                lines.append(f"Убрано: {removed}")
+            if rejected:
+                lines.append(f"Пропущены некорректные ИНН: {len(rejected)}")
+            lines.extend(
+                f"{item['inn']}: дел {item['cases']}, синхронизация {item['last_sync'] or 'не было'}"
+                for item in watched[:20]
+            )
+            record_tool_call(tool_name, "ok", mode)
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {
+                    "added": added,
+                    "removed": removed,
+                    "rejected": rejected,
+                    "watched": watched[:1000],
+                },
+                "meta": {"mode": mode, "watched": len(watched)},
+            }
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to update watch list: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)
+
+
+@mcp.tool(
+    name="arbitr_watch_poll",
+    description="Инкрементальная проверка отслеживаемых ИНН: поиск только дел с даты прошлой синхронизации и проверка статусов активных дел. Новые дела и изменения пишутся в журнал событий.",
+)
+async def watch_poll(
+    inns: Optional[List[str]] = Field(None, description="Проверить только эти ИНН (по умолчанию — все отслеживаемые)."),
+    track_changes: bool = Field(True, description="Проверять статус и инстанции незавершённых дел."),
+    ctx: Context = None,
+) -> dict:
+    """Poll watched INNs incrementally and append events to the log."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_watch_poll"
+
+    try:
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            store = get_watch_store(settings)
+            subset = arg(inns)
+            watched = store.watched(subset)
+            span.set_attribute("inns", len(watched))
+            await ctx_info(ctx, f"👀 Проверка {len(watched)} ИНН")
+
+            today = date.today()
+            semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+            results: List[Dict[str, Any]] = []
+            failed: List[Dict[str, str]] = []
+
+            async def poll(item: Dict[str, Any]) -> None:
+                async with semaphore:
+                    try:
+                        results.append(await _poll_inn(settings, store, item, today))
+                    except ArbitrApiError as exc:
+                        failed.append({"inn": item["inn"], "error": str(exc)})
+                await ctx_progress(ctx, len(results) + len(failed), len(watched) + 1)
+
+            await asyncio.gather(*(poll(item) for item in watched))
+            events = [event for result in results for event in result["events"]]
+
+            tracking = {"checked": 0, "errors": 0, "events": []}
+            if arg(track_changes):
+                tracking = await _track_cases(settings, store, subset)
+                events.extend(tracking["events"])
+            await ctx_progress(ctx, len(watched) + 1, len(watched) + 1)
+
+            baselined = sum(1 for result in results if result["baseline"])
+            truncated = [result["inn"] for result in results if result["truncated"]]
+            lines = [
+                f"Проверено ИНН: {len(results)}, первичная синхронизация: {baselined}, "
+                f"событий: {len(events)}"
+            ]
+            if truncated:
+                lines.append(
+                    f"Выборка обрезана по ARBITR_WATCH_MAX_CASES, дата синхронизации не сдвинута: "
+                    f"{', '.join(truncated[:20])}"
+                )
+            if tracking["checked"]:
+                lines.append(f"Проверено активных дел: {tracking['checked']}")
+            if failed:
+                lines.append(f"Ошибки: {len(failed)}")
+            lines.extend(_format_event(event) for event in events[:50])
+
+            record_tool_call(tool_name, "ok", mode)
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {
+                    "polled": len(results),
+                    "baselined": baselined,
+                    "search_pages": sum(int(result["pages"] or 0) for result in results),
+                    "cases_checked": tracking["checked"],
+                    "truncated": truncated,
+                    "failed": failed,
+                    "events": events[:500],
+                },
+                "meta": {
+                    "mode": mode,
+                    "events": len(events),
+                    "failed": len(failed) + tracking["errors"],
+                    "truncated": len(truncated),
+                },
+            }
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to poll watched INNs: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)
+
+
+@mcp.tool(
+    name="arbitr_watch_events",
+    description="Журнал событий мониторинга: новые дела, смена статуса, новые инстанции, завершение. Фильтры по ИНН, типу события и номеру последнего прочитанного события.",
+)
+async def watch_events(
+    since_id: int = Field(0, description="Вернуть события с id больше этого (для чтения по порядку)."),
+    inn: Optional[str] = Field(None, description="Только события по этому ИНН."),
+    kind: Optional[str] = Field(None, description="new_case, state_changed, instance_changed, finished."),
+    limit: int = Field(100, description="Максимум событий в ответе."),
+    ctx: Context = None,
+) -> dict:
+    """Read the watcher event log."""
+
+    start = time.perf_counter()
+    settings = get_settings()
+    mode = settings.mode
+    tool_name = "arbitr_watch_events"
+
+    try:
+        kind = arg(kind)
+        if kind and kind not in EVENT_KINDS:
+            raise McpError(ErrorData(code=-32602, message=f"Неизвестный тип события: {kind}"))
+        with tracer.start_as_current_span(tool_name) as span:
+            span.set_attribute("mode", mode)
+            events = get_watch_store(settings).events(
+                since_id=int(arg(since_id)), inn=arg(inn), kind=kind, limit=int(arg(limit))
+            )
+            lines = [f"Событий: {len(events)}"] + [_format_event(event) for event in events]
+            record_tool_call(tool_name, "ok", mode)
+            return {
+                "content": [TextContent(type="text", text="\n".join(lines))],
+                "structured_content": {
+                    "events": events,
+                    "last_id": events[-1]["id"] if events else int(arg(since_id)),
+                },
+                "meta": {"mode": mode, "returned": len(events)},
+            }
+    except McpError:
+        record_tool_call(tool_name, "fail", mode)
+        raise
+    except Exception as exc:
+        record_tool_call(tool_name, "fail", mode)
+        raise McpError(ErrorData(code=-32603, message=f"Failed to read watch events: {exc}"))
+    finally:
+        observe_duration(tool_name, mode, time.perf_counter() - start)